@@ -1,8 +1,10 @@
 #!/usr/bin/env python3
 import argparse
 import glob
+import io
 import os
-from typing import Tuple
+import zipfile
+from typing import Iterator, Tuple
 
 import numpy as np
 
@@ -12,6 +14,9 @@ try:
 except Exception:
     PIL_AVAILABLE = False
 
+# Labels of the <prior>_mask.zip sidecar written by scripts/render_vipe_pointcloud.py (RENDER_LABEL_*).
+LABEL_EMPTY, LABEL_STATIC, LABEL_DYNAMIC = 0, 1, 2
+
 
 def load_image_grayscale(image_path: str) -> np.ndarray:
     if PIL_AVAILABLE:
@@ -25,76 +30,19 @@ def load_image_grayscale(image_path: str) -> np.ndarray:
     return arr.astype(np.float32)
 
 
-def make_mask(gray: np.ndarray, threshold: float) -> Tuple[np.ndarray, np.ndarray]:
-    logical = (gray >= threshold).astype(np.uint8)
-    vis = (logical * 255).astype(np.uint8)
-    return logical, vis
-
-
-def main():
-    parser = argparse.ArgumentParser(description="Create masks for all frames in a render directory and compute white-pixel metrics.")
-    parser.add_argument("--dir", required=True, help="Render directory containing frame_*.png")
-    parser.add_argument("--threshold", type=float, default=30.0, help="Threshold in [0,255]")
-    args = parser.parse_args()
-
-    # Collect only original frames, skip already-generated mask images
-    frame_paths = sorted(glob.glob(os.path.join(args.dir, "frame_*.png")))
-    frame_paths = [p for p in frame_paths if not p.endswith("_mask.png")]
-    if not frame_paths:
-        raise FileNotFoundError(f"No frames found in: {args.dir}")
-
-    total_white_pixels = 0
-    frames_with_any_white = 0
-
-    for frame_path in frame_paths:
-        gray = load_image_grayscale(frame_path)
-        logical, vis = make_mask(gray, args.threshold)
-
-        mask_path = os.path.splitext(frame_path)[0] + "_mask.png"
-        if PIL_AVAILABLE:
-            Image.fromarray(vis).save(mask_path)
-        else:
-            import imageio.v3 as iio
-            iio.imwrite(mask_path, vis)
-
-        ones = int(logical.sum())
-        total_white_pixels += ones
-        if ones > 0:
-            frames_with_any_white += 1
-
-    print(f"total_white_pixels={total_white_pixels}")
-    print(f"frames_with_any_white={frames_with_any_white}")
-    print(f"num_frames={len(frame_paths)}")
-
-
-if __name__ == "__main__":
-    main()
-
-#!/usr/bin/env python3
-import argparse
-import glob
-import os
-from typing import Tuple
-
-import numpy as np
-
-try:
-    from PIL import Image
-    PIL_AVAILABLE = True
-except Exception:
-    PIL_AVAILABLE = False
+def decode_png(data: bytes) -> np.ndarray:
+    if PIL_AVAILABLE:
+        return np.asarray(Image.open(io.BytesIO(data)))
+    import imageio.v3 as iio
+    return iio.imread(data, extension=".png")
 
 
-def load_image_grayscale(image_path: str) -> np.ndarray:
+def save_mask(mask_path: str, vis: np.ndarray) -> None:
     if PIL_AVAILABLE:
-        img = Image.open(image_path).convert("L")
-        return np.asarray(img, dtype=np.float32)
-    import imageio.v3 as iio
-    arr = iio.imread(image_path)
-    if arr.ndim == 3:
-        r, g, b = arr[..., 0], arr[..., 1], arr[..., 2]
-        arr = 0.299 * r + 0.587 * g + 0.114 * b
-    return arr.astype(np.float32)
+        Image.fromarray(vis).save(mask_path)
+    else:
+        import imageio.v3 as iio
+        iio.imwrite(mask_path, vis)
 
 
 def make_mask(gray: np.ndarray, threshold: float) -> Tuple[np.ndarray, np.ndarray]:
@@ -103,42 +51,64 @@ def make_mask(gray: np.ndarray, threshold: float) -> Tuple[np.ndarray, np.ndarra
     return logical, vis
 
 
+def read_label_sidecar(mask_zip_path: str) -> Iterator[Tuple[int, np.ndarray]]:
+    """Per-frame (frame index in the prior video, uint8 label) from a <prior>_mask.zip render sidecar."""
+    with zipfile.ZipFile(mask_zip_path, "r") as z:
+        for name in sorted(z.namelist()):
+            if name.endswith(".png"):
+                yield int(os.path.splitext(name)[0]), decode_png(z.read(name))
+
+
 def main():
     parser = argparse.ArgumentParser(description="Create masks for all frames in a render directory and compute white-pixel metrics.")
-    parser.add_argument("--dir", required=True, help="Render directory containing frame_*.png")
-    parser.add_argument("--threshold", type=float, default=30.0, help="Threshold in [0,255]")
+    parser.add_argument("--dir", required=True, help="Render directory containing <prior>_mask.zip, or frame_*.png for renders without sidecars")
+    parser.add_argument("--prior", default="ego_Prior", help="Stem of the rendered prior video whose mask sidecar is used (default: ego_Prior)")
+    parser.add_argument("--threshold", type=float, default=30.0, help="Threshold in [0,255], only used for frame_*.png without a mask sidecar")
     args = parser.parse_args()
 
-    frame_paths = sorted(glob.glob(os.path.join(args.dir, "frame_*.png")))
-    if not frame_paths:
-        raise FileNotFoundError(f"No frames found in: {args.dir}")
-
     total_white_pixels = 0
     frames_with_any_white = 0
+    num_frames = 0
+
+    mask_zip_path = os.path.join(args.dir, f"{args.prior}_mask.zip")
+    if os.path.exists(mask_zip_path):
+        # Coverage straight from the renderer's z-buffer: no decoding of the lossy video and no black-pixel guess.
+        total_dynamic_pixels = 0
+        for frame_idx, label in read_label_sidecar(mask_zip_path):
+            logical = (label != LABEL_EMPTY).astype(np.uint8)
+            save_mask(os.path.join(args.dir, f"frame_{frame_idx:05d}_mask.png"), logical * 255)
+
+            ones = int(logical.sum())
+            total_white_pixels += ones
+            total_dynamic_pixels += int((label == LABEL_DYNAMIC).sum())
+            if ones > 0:
+                frames_with_any_white += 1
+            num_frames += 1
+        if num_frames == 0:
+            raise FileNotFoundError(f"No frames found in: {mask_zip_path}")
+        print(f"total_dynamic_pixels={total_dynamic_pixels}")
+    else:
+        # Collect only original frames, skip already-generated mask images
+        frame_paths = sorted(glob.glob(os.path.join(args.dir, "frame_*.png")))
+        frame_paths = [p for p in frame_paths if not p.endswith("_mask.png")]
+        if not frame_paths:
+            raise FileNotFoundError(f"No {args.prior}_mask.zip or frames found in: {args.dir}")
+
+        for frame_path in frame_paths:
+            gray = load_image_grayscale(frame_path)
+            logical, vis = make_mask(gray, args.threshold)
+            save_mask(os.path.splitext(frame_path)[0] + "_mask.png", vis)
+
+            ones = int(logical.sum())
+            total_white_pixels += ones
+            if ones > 0:
+                frames_with_any_white += 1
+        num_frames = len(frame_paths)
 
-    for frame_path in frame_paths:
-        gray = load_image_grayscale(frame_path)
-        logical, vis = make_mask(gray, args.threshold)
-
-        mask_path = os.path.splitext(frame_path)[0] + "_mask.png"
-        if PIL_AVAILABLE:
-            Image.fromarray(vis).save(mask_path)
-        else:
-            import imageio.v3 as iio
-            iio.imwrite(mask_path, vis)
-
-        ones = int(logical.sum())
-        total_white_pixels += ones
-        if ones > 0:
-            frames_with_any_white += 1
-
-    # Print simple key=value pairs for easy parsing in bash
     print(f"total_white_pixels={total_white_pixels}")
     print(f"frames_with_any_white={frames_with_any_white}")
-    print(f"num_frames={len(frame_paths)}")
+    print(f"num_frames={num_frames}")
 
 
 if __name__ == "__main__":
     main()
-
-
@@ -0,0 +1,548 @@
+#!/usr/bin/env python3
+"""
+Benchmark the stream, artifact and rendering hot paths on a deterministic synthetic scene.
+
+The scene (procedural RGB with camera motion, slanted-plane depth, a moving masked object and known poses) is
+generated from a fixed seed, so timings are comparable across commits. Results are written as JSON.
+
+    python scripts/benchmark_cpu.py --output bench.json
+    python scripts/benchmark_cpu.py --only depth.reliable_depth_mask_range,depth.bilinear_splatting
+
+The stream decode cases time the host-side decoding without the upload to CUDA. The cached stream case uploads
+its frames and is reported as skipped on hosts without a GPU. The rendering cases import
+`scripts/render_vipe_pointcloud.py` and are skipped if pytorch3d is not installed. Cases that fail (e.g. because
+the artifacts could not be written without the compiled extension) are reported with their error.
+"""
+
+import argparse
+import importlib.util
+import json
+import logging
+import platform
+import subprocess
+import tempfile
+import time
+import traceback
+
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Iterator
+
+import cv2
+import numpy as np
+import torch
+
+from vipe.slam.interface import SLAMMap
+from vipe.streams.base import CachedVideoStream, FrameAttribute, VideoFrame, VideoStream
+from vipe.streams.frame_dir_stream import FrameDirStream
+from vipe.streams.raw_mp4_stream import RawMp4Stream
+from vipe.utils.cameras import CameraType
+from vipe.utils.depth import bilinear_splatting, reliable_depth_mask_range, reliable_depth_mask_range_batch
+from vipe.utils.geometry import se3_matrix_to_se3
+from vipe.utils.io import (
+    ArtifactPath,
+    read_depth_artifacts,
+    read_instance_artifacts,
+    read_intrinsics_artifacts,
+    read_pose_artifacts,
+    read_rgb_artifacts,
+    save_artifacts,
+)
+
+
+# Per-frame INFO logs of the benchmarked code (e.g. the render script) would dominate some timings.
+logging.basicConfig(level=logging.WARNING, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+RENDER_SCRIPT_PATH = Path(__file__).parent / "render_vipe_pointcloud.py"
+
+
+@dataclass(kw_only=True)
+class SyntheticScene:
+    # (N, H, W, 3) float32 RGB in [0, 1]
+    rgb: torch.Tensor
+    # (N, H, W) float32 metric depth
+    depth: torch.Tensor
+    # (N, H, W) uint8 instance ids, 0 for background
+    instance: torch.Tensor
+    # (N, 4, 4) float64 OpenCV c2w matrices
+    c2w: np.ndarray
+    # (4,) pinhole intrinsics [fx, fy, cx, cy]
+    intrinsics: torch.Tensor
+    fps: float = 30.0
+
+    def __len__(self) -> int:
+        return self.rgb.shape[0]
+
+    @property
+    def frame_size(self) -> tuple[int, int]:
+        return self.rgb.shape[1], self.rgb.shape[2]
+
+
+def make_synthetic_scene(n_frames: int, height: int, width: int, seed: int = 0) -> SyntheticScene:
+    """
+    Camera translating sideways in front of a textured slanted plane, with a box-shaped object moving across
+    the image. Depth, instance masks and poses are exact.
+    """
+    generator = torch.Generator().manual_seed(seed)
+    phase = torch.rand(3, generator=generator) * 2 * np.pi
+
+    fx = fy = 0.8 * width
+    cx, cy = width / 2, height / 2
+    vv, uu = torch.meshgrid(torch.arange(height).float(), torch.arange(width).float(), indexing="ij")
+
+    rgb_list, depth_list, instance_list, c2w_list = [], [], [], []
+    for frame_idx in range(n_frames):
+        t = frame_idx / max(n_frames - 1, 1)
+        shift = 0.25 * width * t
+
+        # Background: slanted plane, farther at the top of the image.
+        depth = 2.0 + 1.5 * (1.0 - vv / height) + 0.05 * torch.sin(uu / 13.0 + phase[0])
+        rgb = torch.stack(
+            [
+                0.5 + 0.5 * torch.sin((uu + shift) / 17.0 + phase[0]),
+                0.5 + 0.5 * torch.sin(vv / 11.0 + phase[1]),
+                0.5 + 0.5 * torch.sin((uu + shift + vv) / 23.0 + phase[2]),
+            ],
+            dim=-1,
+        )
+
+        # Moving object closer to the camera.
+        box_size = max(height, width) // 6
+        box_u0 = int((width - box_size) * t)
+        box_v0 = (height - box_size) // 2
+        instance = torch.zeros((height, width), dtype=torch.uint8)
+        instance[box_v0 : box_v0 + box_size, box_u0 : box_u0 + box_size] = 1
+        object_mask = instance > 0
+        depth[object_mask] = 1.0
+        rgb[object_mask] = torch.tensor([0.9, 0.1, 0.1])
+
+        c2w = np.eye(4)
+        angle = 0.1 * t
+        c2w[:3, :3] = np.array(
+            [[np.cos(angle), 0.0, np.sin(angle)], [0.0, 1.0, 0.0], [-np.sin(angle), 0.0, np.cos(angle)]]
+        )
+        c2w[:3, 3] = [0.5 * t, 0.0, 0.0]
+
+        rgb_list.append(rgb.clamp(0.0, 1.0))
+        depth_list.append(depth)
+        instance_list.append(instance)
+        c2w_list.append(c2w)
+
+    return SyntheticScene(
+        rgb=torch.stack(rgb_list),
+        depth=torch.stack(depth_list),
+        instance=torch.stack(instance_list),
+        c2w=np.stack(c2w_list),
+        intrinsics=torch.tensor([fx, fy, cx, cy]).float(),
+    )
+
+
+class SyntheticVideoStream(VideoStream):
+    """Host-memory stream over a synthetic scene, with all the attributes written by `save_artifacts`."""
+
+    def __init__(self, scene: SyntheticScene, name: str = "synthetic") -> None:
+        super().__init__()
+        self.scene = scene
+        self._name = name
+        self.poses = se3_matrix_to_se3(torch.from_numpy(scene.c2w).float(), unbatch=False)
+
+    def frame_size(self) -> tuple[int, int]:
+        return self.scene.frame_size
+
+    def fps(self) -> float:
+        return self.scene.fps
+
+    def name(self) -> str:
+        return self._name
+
+    def __len__(self) -> int:
+        return len(self.scene)
+
+    def attributes(self) -> set[FrameAttribute]:
+        return {
+            FrameAttribute.POSE,
+            FrameAttribute.INTRINSICS,
+            FrameAttribute.CAMERA_TYPE,
+            FrameAttribute.METRIC_DEPTH,
+            FrameAttribute.INSTANCE,
+        }
+
+    def supports_random_access(self) -> bool:
+        return True
+
+    def get_frame(self, index: int) -> VideoFrame:
+        return VideoFrame(
+            raw_frame_idx=index,
+            rgb=self.scene.rgb[index],
+            pose=self.poses[index],
+            camera_type=CameraType.PINHOLE,
+            intrinsics=self.scene.intrinsics,
+            instance=self.scene.instance[index],
+            instance_phrases={1: "object"},
+            metric_depth=self.scene.depth[index],
+        )
+
+    def __iter__(self) -> Iterator[VideoFrame]:
+        for frame_idx in range(len(self)):
+            yield self.get_frame(frame_idx)
+
+
+def build_synthetic_slam_map(scene: SyntheticScene, keyframe_gap: int = 4, subsample: int = 4) -> SLAMMap:
+    """Back-project every `keyframe_gap`-th frame into a SLAM map with exact geometry."""
+    height, width = scene.frame_size
+    fx, fy, cx, cy = scene.intrinsics.tolist()
+    vv, uu = torch.meshgrid(
+        torch.arange(0, height, subsample).float(), torch.arange(0, width, subsample).float(), indexing="ij"
+    )
+    rays = torch.stack([(uu - cx) / fx, (vv - cy) / fy, torch.ones_like(uu)], dim=-1).reshape(-1, 3)
+
+    xyz_list, rgb_list, counts = [], [], []
+    keyframe_inds = list(range(0, len(scene), keyframe_gap))
+    for frame_idx in keyframe_inds:
+        c2w = torch.from_numpy(scene.c2w[frame_idx]).float()
+        xyz_cam = rays * scene.depth[frame_idx, ::subsample, ::subsample].reshape(-1, 1)
+        xyz_list.append(xyz_cam @ c2w[:3, :3].T + c2w[:3, 3])
+        rgb_list.append(scene.rgb[frame_idx, ::subsample, ::subsample].reshape(-1, 3))
+        counts.append(xyz_cam.shape[0])
+
+    counts_t = torch.tensor(counts)
+    packinfo = torch.stack([torch.cumsum(counts_t, 0) - counts_t, counts_t], dim=-1).reshape(-1, 1, 2)
+    return SLAMMap(
+        dense_disp_xyz=torch.cat(xyz_list),
+        dense_disp_rgb=torch.cat(rgb_list),
+        dense_disp_packinfo=packinfo,
+        dense_disp_frame_inds=keyframe_inds,
+    )
+
+
+class SkipBenchmark(Exception):
+    pass
+
+
+def time_function(fn: Callable[[], object], repeat: int, warmup: int) -> dict:
+    for _ in range(warmup):
+        fn()
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    timings_np = np.array(timings)
+    return {
+        "mean_s": float(timings_np.mean()),
+        "min_s": float(timings_np.min()),
+        "std_s": float(timings_np.std()),
+        "repeat": repeat,
+    }
+
+
+def load_render_script():
+    try:
+        spec = importlib.util.spec_from_file_location("render_vipe_pointcloud", RENDER_SCRIPT_PATH)
+        assert spec is not None and spec.loader is not None
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+    except ImportError as e:
+        raise SkipBenchmark(f"render script dependencies missing: {e}")
+    return module
+
+
+def require_cuda():
+    if not torch.cuda.is_available():
+        raise SkipBenchmark("cached streams upload frames to CUDA")
+
+
+class BenchmarkSuite:
+    def __init__(self, scene: SyntheticScene, work_dir: Path, render_size: tuple[int, int]) -> None:
+        self.scene = scene
+        self.work_dir = work_dir
+        self.render_size = render_size
+        self.stream = SyntheticVideoStream(scene)
+        self.artifact_path = ArtifactPath(work_dir / "artifacts", self.stream.name())
+        self.frame_dir = work_dir / "frames"
+        self._slam_map: SLAMMap | None = None
+        self._render_module = None
+        self._background = None
+        self._artifacts_error: str | None = None
+
+    def prepare(self) -> None:
+        """
+        Write the on-disk inputs (artifacts, mp4 and frame directory) once, outside of the timed regions.
+        If the artifacts cannot be written, the cases reading them fail with the reason.
+        """
+        self.frame_dir.mkdir(parents=True, exist_ok=True)
+        for frame_idx in range(len(self.scene)):
+            bgr = (self.scene.rgb[frame_idx].numpy()[..., ::-1] * 255).astype(np.uint8)
+            cv2.imwrite(str(self.frame_dir / f"{frame_idx:06d}.jpg"), bgr)
+        try:
+            save_artifacts(self.artifact_path, self.stream)
+        except Exception as e:
+            logger.warning(f"Could not write the artifacts: {e}")
+            self._artifacts_error = format_error(e)
+
+    def require_artifacts(self) -> None:
+        if self._artifacts_error is not None:
+            raise RuntimeError(f"artifacts could not be written: {self._artifacts_error}")
+
+    def cases(self) -> dict[str, tuple[Callable[[], object], int]]:
+        """Benchmark name -> (function, number of items processed per call)."""
+        n_frames = len(self.scene)
+        return {
+            "stream.raw_mp4_decode": (self.raw_mp4_decode, n_frames),
+            "stream.frame_dir_decode": (self.frame_dir_decode, n_frames),
+            "stream.cached_iteration": (self.cached_iteration, n_frames),
+            "artifacts.save": (self.save_artifacts, n_frames),
+            "artifacts.read_rgb": (self.read_rgb, n_frames),
+            "artifacts.read_depth": (self.read_depth, n_frames),
+            "artifacts.read_instance": (self.read_instance, n_frames),
+            "artifacts.read_pose": (self.read_pose, n_frames),
+            "artifacts.read_intrinsics": (self.read_intrinsics, n_frames),
+            "depth.reliable_depth_mask_range": (self.depth_mask, n_frames),
+            "depth.reliable_depth_mask_range_batch": (
+                lambda: reliable_depth_mask_range_batch(self.scene.depth),
+                n_frames,
+            ),
+            "depth.bilinear_splatting": (self.bilinear_splatting, n_frames),
+            "slam.project_map": (self.project_map, n_frames),
+            "render.build_background_pointcloud": (self.build_background_pointcloud, n_frames),
+            "render.points_pytorch3d": (self.render_pinhole, 1),
+            "render.points_fisheye": (self.render_fisheye, 1),
+            "render.points_zbuffer": (self.render_zbuffer, 1),
+            "render.points_zbuffer_fisheye": (self.render_zbuffer_fisheye, 1),
+            "render.fisheye_projection_exact": (lambda: self.fisheye_projection(lut=False), 1),
+            "render.fisheye_projection_lut": (lambda: self.fisheye_projection(lut=True), 1),
+        }
+
+    def raw_mp4_decode(self):
+        self.require_artifacts()
+        for _ in RawMp4Stream(self.artifact_path.rgb_path)._decoded_frames():
+            pass
+
+    def frame_dir_decode(self):
+        for _ in FrameDirStream(self.frame_dir)._decoded_frames():
+            pass
+
+    def cached_iteration(self):
+        require_cuda()
+        cached_stream = CachedVideoStream(self.stream)
+        _ = cached_stream[len(cached_stream) - 1]
+        for _ in cached_stream:
+            pass
+
+    def save_artifacts(self):
+        save_artifacts(ArtifactPath(self.work_dir / "artifacts_save", self.stream.name()), self.stream)
+
+    def read_rgb(self):
+        self.require_artifacts()
+        list(read_rgb_artifacts(self.artifact_path.rgb_path))
+
+    def read_depth(self):
+        self.require_artifacts()
+        list(read_depth_artifacts(self.artifact_path.depth_path))
+
+    def read_instance(self):
+        self.require_artifacts()
+        list(read_instance_artifacts(self.artifact_path.mask_path))
+
+    def read_pose(self):
+        self.require_artifacts()
+        read_pose_artifacts(self.artifact_path.pose_path)
+
+    def read_intrinsics(self):
+        self.require_artifacts()
+        read_intrinsics_artifacts(self.artifact_path.intrinsics_path, self.artifact_path.camera_type_path)
+
+    def depth_mask(self):
+        for depth in self.scene.depth:
+            reliable_depth_mask_range(depth)
+
+    def bilinear_splatting(self):
+        height, width = self.scene.frame_size
+        vv, uu = torch.meshgrid(
+            torch.arange(height).float() + 0.5, torch.arange(width).float() + 0.5, indexing="ij"
+        )
+        # Horizontal flow inversely proportional to depth (parallax of a sideways camera motion).
+        for rgb, depth in zip(self.scene.rgb, self.scene.depth):
+            uv = torch.stack([uu + 8.0 / depth, vv], dim=-1)
+            bilinear_splatting(rgb, uv)
+
+    def project_map(self):
+        if self._slam_map is None:
+            self._slam_map = build_synthetic_slam_map(self.scene)
+        poses = self.stream.poses
+        for frame_idx in range(len(self.scene)):
+            self._slam_map.project_map(
+                frame_idx, 0, self.scene.frame_size, self.scene.intrinsics, poses[frame_idx], CameraType.PINHOLE
+            )
+
+    @property
+    def render_module(self):
+        if self._render_module is None:
+            self._render_module = load_render_script()
+        return self._render_module
+
+    def build_background_pointcloud(self):
+        self.require_artifacts()
+        self._background = self.render_module.build_background_pointcloud(
+            str(self.artifact_path.base_path), np.eye(4), artifact_name=self.artifact_path.artifact_name
+        )
+
+    def _rendering_inputs(self):
+        if self._background is None:
+            self.build_background_pointcloud()
+        points, colors, image_size = self._background
+        # Look at the scene from the first camera, moved slightly backwards.
+        w2c = np.linalg.inv(self.scene.c2w[0])
+        w2c[2, 3] += 0.3
+        fx, fy, cx, cy = self.scene.intrinsics.tolist()
+        K = np.array([[fx, 0.0, cx], [0.0, fy, cy], [0.0, 0.0, 1.0]])
+        return points, colors, image_size, w2c, K
+
+    def require_pytorch3d(self):
+        if not self.render_module.HAS_PYTORCH3D:
+            raise SkipBenchmark("pytorch3d is not installed")
+
+    def render_pinhole(self):
+        self.require_pytorch3d()
+        points, colors, image_size, w2c, K = self._rendering_inputs()
+        height, width = self.render_size
+        self.render_module.render_points_pytorch3d(
+            points, colors, K, T_w2c=w2c, W=width, H=height, device="cpu", original_image_size=image_size, is_aria=False
+        )
+
+    def render_fisheye(self):
+        self.require_pytorch3d()
+        points, colors, image_size, w2c, K = self._rendering_inputs()
+        height, width = self.render_size
+        self.render_module.render_points_fisheye(
+            points, colors, w2c, K, W=width, H=height, device="cpu", original_image_size=image_size, is_aria=False,
+            **self._fisheye_distortion(),
+        )
+
+    def render_zbuffer(self):
+        points, colors, image_size, w2c, K = self._rendering_inputs()
+        height, width = self.render_size
+        self.render_module.render_points_zbuffer(
+            points, colors, K, T_w2c=w2c, W=width, H=height, device="cpu", original_image_size=image_size, is_aria=False
+        )
+
+    def render_zbuffer_fisheye(self):
+        points, colors, image_size, w2c, K = self._rendering_inputs()
+        height, width = self.render_size
+        self.render_module.render_points_zbuffer_fisheye(
+            points, colors, w2c, K, W=width, H=height, device="cpu", original_image_size=image_size, is_aria=False,
+            **self._fisheye_distortion(),
+        )
+
+    def fisheye_projection(self, lut: bool):
+        points, _, _, w2c, _ = self._rendering_inputs()
+        pts_cam = torch.from_numpy(points @ w2c[:3, :3].T + w2c[:3, 3]).float()
+        pts_cam = pts_cam[pts_cam[:, 2] > 0]
+        distortion = self._fisheye_distortion()
+        coeffs = (
+            distortion["radial_distortion_coeffs"],
+            distortion["tangential_distortion_coeffs"],
+            distortion["thinPrism_distortion_coeffs"],
+        )
+        if lut:
+            self.render_module.FisheyeProjectionLUT(1.0, (0.0, 0.0), *coeffs).project_ndc(pts_cam)
+        else:
+            self.render_module.fisheye_distort(pts_cam[:, :2] / pts_cam[:, 2:3], *coeffs)
+
+    def _fisheye_distortion(self) -> dict:
+        radial, tangential, thin_prism, _, _ = self.render_module.load_aria_distortion_coeffs(None)
+        return {
+            "radial_distortion_coeffs": radial,
+            "tangential_distortion_coeffs": tangential,
+            "thinPrism_distortion_coeffs": thin_prism,
+        }
+
+
+def format_error(error: BaseException) -> str:
+    return f"{type(error).__name__}: {error}"
+
+
+def environment_info() -> dict:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "HEAD"], cwd=Path(__file__).parent, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "commit": commit,
+        "python": platform.python_version(),
+        "torch": torch.__version__,
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "torch_threads": torch.get_num_threads(),
+        "cuda_available": torch.cuda.is_available(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark ViPE hot paths on a synthetic scene")
+    parser.add_argument("--output", type=Path, default=None, help="JSON output path (default: print to stdout)")
+    parser.add_argument("--frames", type=int, default=48, help="Number of synthetic frames")
+    parser.add_argument("--height", type=int, default=240, help="Frame height")
+    parser.add_argument("--width", type=int, default=320, help="Frame width")
+    parser.add_argument("--render_size", type=int, nargs=2, default=(448, 448), metavar=("H", "W"))
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per benchmark")
+    parser.add_argument("--warmup", type=int, default=1, help="Untimed runs per benchmark")
+    parser.add_argument("--threads", type=int, default=None, help="torch intra-op threads (default: torch default)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--only", type=str, default=None, help="Comma-separated benchmark names or prefixes to run")
+    args = parser.parse_args()
+
+    if args.threads is not None:
+        torch.set_num_threads(args.threads)
+    torch.manual_seed(args.seed)
+
+    scene = make_synthetic_scene(args.frames, args.height, args.width, seed=args.seed)
+    results: dict[str, dict] = {}
+
+    with tempfile.TemporaryDirectory(prefix="vipe_bench_") as work_dir:
+        suite = BenchmarkSuite(scene, Path(work_dir), tuple(args.render_size))
+        suite.prepare()
+
+        selected = args.only.split(",") if args.only is not None else None
+        for name, (fn, n_items) in suite.cases().items():
+            if selected is not None and not any(name.startswith(s) for s in selected):
+                continue
+            try:
+                result = time_function(fn, args.repeat, args.warmup)
+                result["items_per_s"] = n_items / result["min_s"] if result["min_s"] > 0 else None
+                result["status"] = "ok"
+            except SkipBenchmark as e:
+                result = {"status": "skipped", "reason": str(e)}
+            except Exception as e:
+                # A broken case must not hide the results of the others.
+                logger.warning(f"{name} failed:\n{traceback.format_exc()}")
+                result = {"status": "failed", "error": format_error(e)}
+            results[name] = result
+            logger.info(f"{name}: {result}")
+
+    report = {
+        "scene": {
+            "frames": args.frames,
+            "height": args.height,
+            "width": args.width,
+            "render_size": list(args.render_size),
+            "seed": args.seed,
+        },
+        "environment": environment_info(),
+        "results": results,
+    }
+    report_json = json.dumps(report, indent=2)
+    if args.output is not None:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(report_json)
+    else:
+        print(report_json)
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,277 @@
+"""
+Render many priors with render_vipe_pointcloud.py from one process pool.
+
+Jobs are read from a JSONL manifest, one object per line, whose keys are the options of render_vipe_pointcloud.py
+(without the dashes) plus an optional "id":
+
+    {"input_dir": "vipe_results/take_a", "meta_json_path": "meta/take_a.json", "start_frame": 0, "end_frame": 48,
+     "point_size": 5.0, "fish_eye_rendering": true, "use_mean_bg": true}
+
+Every worker imports torch / PyTorch3D once and renders all jobs of a take (same input_dir or gtdepth_dir) in turn,
+in order of their start frame, building each background point cloud once for all of its frame ranges. Jobs with
+"window_background": true build the background of their own window instead, and overlapping windows (e.g. 49 frames
+with stride 25) only unproject the frames that the previous window did not have.
+
+Output layout under --out_root (jobs that set their own out_dir keep it):
+    <out_root>/<job id>/ego_Prior.mp4 (+ sidecars)     job ids default to <take>_<start:06d>_<end:06d>
+    <out_root>/render_status/<job id>.json              state (running, done, failed), options, output, error, time
+    <out_root>/render_status/<job id>.log               log of the job
+Jobs already done with the same options are skipped, so an interrupted batch is resumed by running it again.
+
+Use --device cpu (z-buffer renderer, no GPU or PyTorch3D needed) to run the driver on any machine.
+"""
+
+import argparse
+import json
+import logging
+import multiprocessing
+import os
+import sys
+import time
+import traceback
+
+from pathlib import Path
+from typing import List, Optional
+
+
+logger = logging.getLogger(__name__)
+
+STATUS_DIR_NAME = "render_status"
+
+# Set in every worker by _init_worker.
+_render_module = None
+
+
+def load_manifest(manifest_path: str) -> List[dict]:
+    jobs = []
+    with open(manifest_path, "r") as f:
+        for line_idx, line in enumerate(f):
+            line = line.strip()
+            if not line:
+                continue
+            job = json.loads(line)
+            if "meta_json_path" not in job or "end_frame" not in job:
+                raise ValueError(f"{manifest_path}:{line_idx + 1}: jobs need meta_json_path and end_frame")
+            if not job.get("input_dir") and not job.get("gtdepth_dir"):
+                raise ValueError(f"{manifest_path}:{line_idx + 1}: jobs need input_dir or gtdepth_dir")
+            jobs.append(job)
+    return jobs
+
+
+def take_key(job: dict) -> str:
+    return os.path.realpath(job.get("gtdepth_dir") or job["input_dir"])
+
+
+def default_job_id(job: dict) -> str:
+    job_id = f"{Path(take_key(job)).name}_{int(job.get('start_frame', 0)):06d}_{int(job['end_frame']):06d}"
+    return job_id + "_exo" if job.get("render_target") == "exo" else job_id
+
+
+def job_to_argv(job: dict) -> List[str]:
+    """Command line of render_vipe_pointcloud.py for a manifest job."""
+    argv = []
+    for key, value in job.items():
+        if key == "id" or value is None:
+            continue
+        flag = f"--{key}"
+        if isinstance(value, bool):
+            if value:
+                argv.append(flag)
+        elif isinstance(value, (list, tuple)):
+            argv += [flag, *(str(v) for v in value)]
+        else:
+            argv += [flag, str(value)]
+    return argv
+
+
+def prepare_jobs(jobs: List[dict], out_root: str, device: str) -> List[dict]:
+    """Resolve job ids and output directories, and force the z-buffer renderer in CPU mode."""
+    prepared = []
+    seen_ids = set()
+    for job in jobs:
+        job = dict(job)
+        job_id = job.pop("id", None) or default_job_id(job)
+        if job_id in seen_ids:
+            raise ValueError(f"Duplicate job id '{job_id}', set distinct 'id' fields in the manifest")
+        seen_ids.add(job_id)
+        if "out_dir" not in job:
+            job["out_dir"] = os.path.join(out_root, job_id)
+            job["out_dir_no_append"] = True
+        if device == "cpu":
+            if job.get("renderer", "zbuffer") != "zbuffer":
+                logger.warning(f"Job {job_id}: rendering with 'zbuffer' instead of '{job['renderer']}' on CPU")
+            job["renderer"] = "zbuffer"
+        prepared.append({"id": job_id, "argv": job_to_argv(job), "take": take_key(job),
+                         "start": int(job.get("start_frame", 0))})
+    return prepared
+
+
+def status_path(status_dir: str, job_id: str) -> str:
+    return os.path.join(status_dir, f"{job_id}.json")
+
+
+def read_status(status_dir: str, job_id: str) -> Optional[dict]:
+    path = status_path(status_dir, job_id)
+    if not os.path.exists(path):
+        return None
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+def write_status(status_dir: str, job_id: str, status: dict) -> None:
+    path = status_path(status_dir, job_id)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(status, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def is_done(status: Optional[dict], argv: List[str]) -> bool:
+    return (
+        status is not None
+        and status.get("state") == "done"
+        and status.get("argv") == argv
+        and (status.get("output") is None or os.path.exists(status["output"]))
+    )
+
+
+def _load_render_module():
+    sys.path.insert(0, str(Path(__file__).resolve().parent))
+    import render_vipe_pointcloud
+
+    return render_vipe_pointcloud
+
+
+def _init_worker(device: str, device_queue, num_threads: Optional[int]) -> None:
+    global _render_module
+    if device == "cpu":
+        os.environ["CUDA_VISIBLE_DEVICES"] = ""
+    elif device_queue is not None:
+        os.environ["CUDA_VISIBLE_DEVICES"] = device_queue.get()
+    _render_module = _load_render_module()
+    if num_threads is not None:
+        import torch
+
+        torch.set_num_threads(num_threads)
+
+
+def _run_job(job: dict, status_dir: str, backgrounds: dict) -> dict:
+    status = {"id": job["id"], "argv": job["argv"], "state": "running", "pid": os.getpid()}
+    write_status(status_dir, job["id"], status)
+
+    log_handler = logging.FileHandler(os.path.join(status_dir, f"{job['id']}.log"), mode="w")
+    log_handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+    logging.getLogger().addHandler(log_handler)
+    start_time = time.perf_counter()
+    try:
+        args = _render_module.get_parser().parse_args(job["argv"])
+        output = _render_module.render_prior(args, backgrounds=backgrounds)
+        status.update(state="done", output=output)
+    except Exception as e:
+        logging.getLogger().error(traceback.format_exc())
+        status.update(state="failed", error=f"{type(e).__name__}: {e}")
+    finally:
+        logging.getLogger().removeHandler(log_handler)
+        log_handler.close()
+    status["elapsed_s"] = round(time.perf_counter() - start_time, 3)
+    write_status(status_dir, job["id"], status)
+    return status
+
+
+def _run_take(take_jobs: List[dict], status_dir: str) -> List[dict]:
+    # Background clouds are shared between the jobs of one take and dropped afterwards.
+    backgrounds = {}
+    return [_run_job(job, status_dir, backgrounds) for job in take_jobs]
+
+
+def _run_take_star(task) -> List[dict]:
+    return _run_take(*task)
+
+
+def run_batch(jobs: List[dict], out_root: str, workers: int = 1, device: str = "cuda",
+              gpus: Optional[List[str]] = None, force: bool = False) -> List[dict]:
+    """Render the prepared manifest jobs and return their final status."""
+    status_dir = os.path.join(out_root, STATUS_DIR_NAME)
+    os.makedirs(status_dir, exist_ok=True)
+
+    results, pending = [], []
+    for job in jobs:
+        status = read_status(status_dir, job["id"])
+        if not force and is_done(status, job["argv"]):
+            results.append(dict(status, state="skipped"))
+        else:
+            pending.append(job)
+    logger.info(f"{len(pending)} of {len(jobs)} jobs to render ({len(jobs) - len(pending)} already done)")
+
+    takes = {}
+    for job in sorted(pending, key=lambda job: job["start"]):
+        takes.setdefault(job["take"], []).append(job)
+    # Longest takes first, so the pool does not end waiting on one of them.
+    tasks = sorted(takes.values(), key=len, reverse=True)
+
+    num_threads = max(1, (os.cpu_count() or 1) // max(1, workers)) if device == "cpu" else None
+    if workers <= 0:
+        _init_worker(device, None, num_threads)
+        for task in tasks:
+            results += _run_take(task, status_dir)
+        return results
+
+    ctx = multiprocessing.get_context("spawn")
+    device_queue = None
+    if device == "cuda" and gpus:
+        device_queue = ctx.Queue()
+        for worker_idx in range(workers):
+            device_queue.put(gpus[worker_idx % len(gpus)])
+    with ctx.Pool(workers, initializer=_init_worker, initargs=(device, device_queue, num_threads)) as pool:
+        for task_results in pool.imap_unordered(_run_take_star, [(task, status_dir) for task in tasks]):
+            for status in task_results:
+                logger.info(f"Job {status['id']}: {status['state']} in {status['elapsed_s']:.1f}s")
+            results += task_results
+    return results
+
+
+def get_parser():
+    parser = argparse.ArgumentParser(
+        description="Render the jobs of a manifest with render_vipe_pointcloud.py in a worker pool"
+    )
+    parser.add_argument(
+        "--manifest", required=True, help="JSONL file with one render_vipe_pointcloud.py job per line (options by name)"
+    )
+    parser.add_argument("--out_root", required=True, help="Root of the job output directories and of render_status/")
+    parser.add_argument(
+        "--workers", type=int, default=1, help="Worker processes (default: 1; 0 renders in this process)"
+    )
+    parser.add_argument(
+        "--device",
+        type=str,
+        default="cuda",
+        choices=("cuda", "cpu"),
+        help="'cpu' hides the GPUs and renders with the z-buffer renderer",
+    )
+    parser.add_argument(
+        "--gpus", type=str, default=None, help="Comma-separated GPU ids assigned to the workers round-robin, e.g. '0,1'"
+    )
+    parser.add_argument("--force", action="store_true", help="Render every job again, including the ones already done")
+    return parser
+
+
+def main():
+    logging.basicConfig(level=logging.INFO)
+    args = get_parser().parse_args()
+
+    jobs = prepare_jobs(load_manifest(args.manifest), args.out_root, args.device)
+    gpus = args.gpus.split(",") if args.gpus else None
+    results = run_batch(jobs, args.out_root, workers=args.workers, device=args.device, gpus=gpus, force=args.force)
+
+    counts = {}
+    for status in results:
+        counts[status["state"]] = counts.get(status["state"], 0) + 1
+    logger.info("Batch finished: " + ", ".join(f"{n} {state}" for state, n in sorted(counts.items())))
+    for status in results:
+        if status["state"] == "failed":
+            logger.error(f"Job {status['id']} failed: {status['error']}")
+    sys.exit(1 if counts.get("failed") else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,24 +1,35 @@
 import argparse
+import contextlib
+import io
+import itertools
 import json
 import logging
+import math
 import os
+import threading
+import zipfile
+from abc import ABC, abstractmethod
 from pathlib import Path
-from typing import List, Tuple, Optional
+from typing import List, Tuple, Optional, Union
 
 import cv2
 import numpy as np
 import torch
 from tqdm import tqdm
 
-# PyTorch3D for rendering and camera transformations
-from pytorch3d.structures import Pointclouds
-from pytorch3d.renderer import (
-    PointsRasterizationSettings,
-    PointsRenderer,
-    PointsRasterizer,
-    AlphaCompositor,
-)
-from pytorch3d.renderer.fisheyecameras import FishEyeCameras
+# PyTorch3D for rendering and camera transformations (optional with the z-buffer renderer)
+try:
+    from pytorch3d.structures import Pointclouds
+    from pytorch3d.renderer import (
+        OrthographicCameras,
+        PointsRasterizationSettings,
+        PointsRasterizer,
+        AlphaCompositor,
+    )
+    from pytorch3d.renderer.fisheyecameras import FishEyeCameras
+    HAS_PYTORCH3D = True
+except ImportError:
+    HAS_PYTORCH3D = False
 
 # Import ViPE modules
 from vipe.slam.interface import SLAMMap
@@ -31,11 +42,23 @@ from vipe.utils.io import (
     read_rgb_artifacts,
 )
 from vipe.utils.cameras import CameraType
-from vipe.utils.depth import reliable_depth_mask_range
+from vipe.utils.depth import StreamingRobustMean, reliable_depth_mask_range, reliable_depth_mask_range_batch
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+RENDERERS = ("pytorch3d", "zbuffer")
+# Per-pixel labels of the rendered mask sidecars (see RenderAuxWriter).
+RENDER_LABEL_EMPTY, RENDER_LABEL_STATIC, RENDER_LABEL_DYNAMIC = 0, 1, 2
+
+# Frames whose reliable depth masks are computed together while building a background.
+DEPTH_MASK_BATCH_SIZE = 8
+
+
+def require_pytorch3d():
+    if not HAS_PYTORCH3D:
+        raise ImportError("PyTorch3D is not installed. Install it or render with --renderer zbuffer.")
+
 def generate_background(W, H, mode="solid", color=(0.0, 0.0, 0.0), noise_range=(0, 255), seed=42):
     """
     Generate background for inpainting-friendly rendering.
@@ -144,8 +167,6 @@ def load_aria_distortion_coeffs(
         - focal_length: Single focal length [f] (None if using defaults)
         - principal_point: Principal point [cx, cy] (None if using defaults)
     """
-    import json
-    
     # If no calibration file provided, return default Ego-Exo4D distortion coefficients
     if online_calibration_path is None:
         logger.info("No online_calibration_path provided. Using default Ego-Exo4D fisheye distortion coefficients.")
@@ -170,22 +191,43 @@ def load_aria_distortion_coeffs(
         return radial_distortion_coeffs, tangential_distortion_coeffs, thinPrism_distortion_coeffs, None, None
     
     logger.info(f"Loading Aria distortion coefficients from {online_calibration_path}")
-    
-    # Read the JSONL file
-    with open(online_calibration_path, 'r') as f:
-        lines = f.readlines()
-    
-    if not lines:
+    calibration = get_aria_online_calibration(online_calibration_path)
+
+    if len(calibration) == 0:
         logger.error("online_calibration.jsonl is empty.")
         return None, None, None, None, None
 
-    if frame_idx >= len(lines):
+    if frame_idx >= len(calibration):
         logger.warning(f"Frame {frame_idx} not found, using frame 0")
         frame_idx = 0
+
+    radial_distortion_coeffs, tangential_distortion_coeffs, thinPrism_distortion_coeffs, focal_length, principal_point = (
+        calibration[frame_idx]
+    )
+    if radial_distortion_coeffs is None:
+        return None, None, None, None, None
+
+    f = focal_length[0]
+    cx, cy = principal_point
+    k1, k2, k3, k4, k5, k6 = radial_distortion_coeffs
+    p1, p2 = tangential_distortion_coeffs
+    s1, s2, s3, s4 = thinPrism_distortion_coeffs
+    logger.info(f"Loaded Aria distortion coefficients:")
+    logger.info(f"  Focal length: f={f:.1f}")
+    logger.info(f"  Principal point: cx={cx:.1f}, cy={cy:.1f}")
+    logger.info(f"  Radial distortion coeffs: k1={k1:.6f}, k2={k2:.6f}, k3={k3:.6f}, k4={k4:.6f}, k5={k5:.6f}, k6={k6:.6f}")
+    logger.info(f"  Tangential distortion coeffs: p1={p1:.6f}, p2={p2:.6f}")
+    logger.info(f"  ThinPrism distortion coeffs: s1={s1:.6f}, s2={s2:.6f}, s3={s3:.6f}, s4={s4:.6f}")
     
-    # Parse the JSON for the specified frame
-    calibration_data = json.loads(lines[frame_idx])
-    
+    return radial_distortion_coeffs, tangential_distortion_coeffs, thinPrism_distortion_coeffs, focal_length, principal_point
+
+
+def parse_aria_rgb_calibration(calibration_data: dict):
+    """
+    FisheyeRadTanThinPrism parameters of the camera-rgb entry of one online calibration record, as
+    (radial [k1..k6], tangential [p1, p2], thin prism [s1..s4], focal length [f], principal point [cx, cy]).
+    All five are None if the record has no usable camera-rgb calibration.
+    """
     # Find the camera-rgb (Aria RGB camera) calibration
     aria_calib = None
     for cam_calib in calibration_data.get('CameraCalibrations', []):
@@ -204,34 +246,75 @@ def load_aria_distortion_coeffs(
         return None, None, None, None, None
     
     params = projection.get('Params', [])
-    if len(params) < 10:
+    if len(params) < 15:
         logger.error("Insufficient parameters for FisheyeRadTanThinPrism model.")
         return None, None, None, None, None
 
     # FisheyeRadTanThinPrism parameter layout:
-    # [f, cx, cy, k1, k2, k3, k4, k5, k6, p1, p2, s1, s2, s3, s4] maybe...
-    f = params[0]
-    cx, cy = params[1], params[2]
+    # [f, cx, cy, k1, k2, k3, k4, k5, k6, p1, p2, s1, s2, s3, s4]
     # (k: radial distortion, p: tangential distortion, s: thinPrism distortion)
-    k1, k2, k3, k4, k5, k6 = params[3], params[4], params[5], params[6], params[7], params[8]
-    p1, p2 = params[9], params[10]
-    s1, s2, s3, s4 = params[11], params[12], params[13], params[14]
+    params = np.asarray(params[:15], dtype=np.float64)
+    return params[3:9], params[9:11], params[11:15], params[0:1], params[1:3]
 
-    
-    radial_distortion_coeffs = np.array([k1, k2, k3, k4, k5, k6])
-    tangential_distortion_coeffs = np.array([p1, p2])
-    thinPrism_distortion_coeffs = np.array([s1, s2, s3, s4])
-    focal_length = np.array([f])
-    principal_point = np.array([cx, cy])
-    
-    logger.info(f"Loaded Aria distortion coefficients:")
-    logger.info(f"  Focal length: f={f:.1f}")
-    logger.info(f"  Principal point: cx={cx:.1f}, cy={cy:.1f}")
-    logger.info(f"  Radial distortion coeffs: k1={k1:.6f}, k2={k2:.6f}, k3={k3:.6f}, k4={k4:.6f}, k5={k5:.6f}, k6={k6:.6f}")
-    logger.info(f"  Tangential distortion coeffs: p1={p1:.6f}, p2={p2:.6f}")
-    logger.info(f"  ThinPrism distortion coeffs: s1={s1:.6f}, s2={s2:.6f}, s3={s3:.6f}, s4={s4:.6f}")
-    
-    return radial_distortion_coeffs, tangential_distortion_coeffs, thinPrism_distortion_coeffs, focal_length, principal_point
+
+class AriaOnlineCalibration:
+    """
+    Random access to the per-frame camera-rgb calibration of an Ego-Exo4D online_calibration.jsonl, where line i
+    holds the calibration of frame i.
+
+    The file is scanned once for line offsets; a line is only read and parsed when its frame is requested, and parsed
+    frames are cached. Use `get_aria_online_calibration` to share one index per file within a process.
+    """
+
+    def __init__(self, path: str, block_size: int = 1 << 24) -> None:
+        self.path = str(path)
+        line_starts = [np.zeros(1, dtype=np.int64)]
+        file_size = 0
+        with open(self.path, "rb") as f:
+            while block := f.read(block_size):
+                newlines = np.flatnonzero(np.frombuffer(block, dtype=np.uint8) == ord("\n"))
+                line_starts.append(newlines.astype(np.int64) + file_size + 1)
+                file_size += len(block)
+        line_starts = np.concatenate(line_starts)
+        line_ends = np.append(line_starts[1:], file_size)
+        # Skip empty lines (e.g. the trailing newline) without parsing anything.
+        non_empty = line_ends - line_starts > 1
+        non_empty[-1] = line_ends[-1] > line_starts[-1]
+        self.line_offsets = line_starts[non_empty]
+        self.line_lengths = (line_ends - line_starts)[non_empty]
+        self._cache: dict = {}
+        self._lock = threading.Lock()
+        logger.info(f"Indexed {len(self)} online calibration records in {self.path}")
+
+    def __len__(self) -> int:
+        return len(self.line_offsets)
+
+    def read_record(self, line_idx: int) -> dict:
+        with open(self.path, "rb") as f:
+            f.seek(int(self.line_offsets[line_idx]))
+            return json.loads(f.read(int(self.line_lengths[line_idx])))
+
+    def __getitem__(self, frame_idx: int):
+        """Calibration of a frame as returned by `parse_aria_rgb_calibration` (clamped to the last record)."""
+        line_idx = min(max(int(frame_idx), 0), len(self) - 1)
+        with self._lock:
+            if line_idx not in self._cache:
+                self._cache[line_idx] = parse_aria_rgb_calibration(self.read_record(line_idx))
+            return self._cache[line_idx]
+
+
+_aria_calibration_cache: dict = {}
+_aria_calibration_lock = threading.Lock()
+
+
+def get_aria_online_calibration(path: str) -> AriaOnlineCalibration:
+    """Process-wide `AriaOnlineCalibration` for a file, rebuilt only if the file changes."""
+    stat = os.stat(path)
+    key = (os.path.realpath(path), stat.st_mtime_ns, stat.st_size)
+    with _aria_calibration_lock:
+        if key not in _aria_calibration_cache:
+            _aria_calibration_cache[key] = AriaOnlineCalibration(path)
+        return _aria_calibration_cache[key]
 
 
 def load_camera_params_from_meta(
@@ -409,11 +492,176 @@ def get_artifact_image_size(input_dir: str, artifact_name: str) -> Optional[Tupl
     return None
 
 
+def _frame_lookup(read_artifacts, path: Path, frame_indices: List[int]):
+    """
+    Look up the (frame_idx, value) pairs of read_artifacts(path, frame_indices) by ascending frame index,
+    returning None for frames (or whole artifacts) that are missing.
+    """
+    pairs = read_artifacts(path, frame_indices) if Path(path).exists() else iter(())
+    pending = next(pairs, None)
+
+    def lookup(frame_idx: int):
+        nonlocal pending
+        while pending is not None and pending[0] < frame_idx:
+            pending = next(pairs, None)
+        return pending[1] if pending is not None and pending[0] == frame_idx else None
+
+    return lookup
+
+
+def read_artifact_frames(artifact_path: ArtifactPath, frame_indices):
+    """
+    (frame_idx, rgb, depth, instance_mask) of the ascending artifact frame_indices, with None for a missing depth or
+    instance mask. Only these frames are decoded: the RGB video seeks to them and the zipped depth and masks are
+    selected by entry name, so the frames of a render window cost the same wherever it lies in the take.
+    """
+    frame_indices = list(frame_indices)
+    depths = _frame_lookup(read_depth_artifacts, artifact_path.depth_path, frame_indices)
+    instance_masks = _frame_lookup(read_instance_artifacts, artifact_path.mask_path, frame_indices)
+    for frame_idx, rgb in read_rgb_artifacts(artifact_path.rgb_path, frame_indices):
+        yield frame_idx, rgb, depths(frame_idx), instance_masks(frame_idx)
+
+
+def with_reliable_depth_masks(frames, device: Optional[torch.device] = None, batch_size: int = DEPTH_MASK_BATCH_SIZE):
+    """
+    (frame_idx, rgb, depth, instance_mask, reliable_mask) of the read_artifact_frames `frames` that have a depth.
+    The reliable depth masks are computed batch_size frames at a time (on `device` if given), so the pooling runs
+    once per batch instead of once per frame.
+    """
+
+    def masked(batch):
+        depths = torch.stack([depth for _, _, depth, _ in batch])
+        masks = reliable_depth_mask_range_batch(depths.to(device) if device is not None else depths)
+        for frame, mask in zip(batch, masks):
+            yield (*frame, mask)
+
+    batch = []
+    for frame in frames:
+        if frame[2] is None:
+            continue
+        batch.append(frame)
+        if len(batch) == batch_size:
+            yield from masked(batch)
+            batch = []
+    if batch:
+        yield from masked(batch)
+
+
+def artifact_window(n_frames: int, frame_range: Optional[Tuple[int, int]]) -> range:
+    """Artifact frame indices of the inclusive frame_range (all frames if None), clipped to the n_frames available."""
+    if frame_range is None:
+        return range(n_frames)
+    return range(max(frame_range[0], 0), min(frame_range[1] + 1, n_frames))
+
+
+class FrameAccumulator(ABC):
+    """
+    Per-frame contributions to a background that frames can be added to and removed from, so that overlapping
+    render windows only process the frames they do not share with the previous window.
+    """
+
+    def __init__(self) -> None:
+        self.frame_indices: set = set()
+        self.image_size: Optional[Tuple[int, int]] = None
+        self.source = None
+
+    def bind(self, source) -> None:
+        """Tie the accumulator to one artifact and sampling; frames of another source cannot be mixed in."""
+        if self.source is not None and self.source != source:
+            raise ValueError(f"Background accumulator holds frames of {self.source}, not {source}")
+        self.source = source
+
+    def __len__(self) -> int:
+        return len(self.frame_indices)
+
+    def __contains__(self, frame_idx: int) -> bool:
+        return frame_idx in self.frame_indices
+
+    @abstractmethod
+    def remove(self, frame_idx: int) -> None:
+        """Drop the contribution of an added frame."""
+
+    def retain(self, frame_range: Tuple[int, int]) -> None:
+        """Remove the frames outside the inclusive frame_range."""
+        for frame_idx in sorted(i for i in self.frame_indices if not frame_range[0] <= i <= frame_range[1]):
+            self.remove(frame_idx)
+
+
+class BackgroundAccumulator(FrameAccumulator):
+    """Background points of every frame in ViPE world coordinates (see build_background_pointcloud)."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.contributions: dict = {}
+
+    def add(self, frame_idx: int, points: np.ndarray, colors: np.ndarray) -> None:
+        self.contributions[frame_idx] = (points, colors)
+        self.frame_indices.add(frame_idx)
+
+    def remove(self, frame_idx: int) -> None:
+        del self.contributions[frame_idx]
+        self.frame_indices.remove(frame_idx)
+
+    def pointcloud(self, T_cam_to_world: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Points of all frames in frame order, transformed by T_cam_to_world, and their colors."""
+        if not self.contributions:
+            return np.empty((0, 3)), np.empty((0, 3))
+        frames = sorted(self.contributions)
+        points = np.concatenate([self.contributions[i][0] for i in frames], axis=0)
+        colors = np.concatenate([self.contributions[i][1] for i in frames], axis=0)
+        points_homogeneous = np.hstack([points, np.ones((len(points), 1))])
+        return (T_cam_to_world @ points_homogeneous.T).T[:, :3], colors
+
+
+class MeanBackgroundAccumulator(FrameAccumulator):
+    """
+    Per-pixel mean of the background depth and RGB over a set of frames (StreamingRobustMean) that frames can be
+    added to and removed from: a sliding-window mean for overlapping render windows (see
+    build_mean_background_pointcloud). Invalid pixels are NaN in the added frames and are not counted.
+
+    With store_frames, every frame is kept as float16 depth and uint8 RGB, which hold the values read from the
+    artifacts exactly, so removing it subtracts exactly what was added. Without it frames cannot be removed and
+    the state is O(H * W). With outlier_sigma, samples are rejected against the frames accumulated when they were
+    added, so a sliding window may differ slightly from a mean built from scratch.
+    """
+
+    def __init__(self, device: Union[str, torch.device] = "cpu", store_frames: bool = True,
+                 outlier_sigma: Optional[float] = None) -> None:
+        super().__init__()
+        self.stats = StreamingRobustMean(device, outlier_sigma=outlier_sigma)
+        self.device = self.stats.device
+        self.store_frames = store_frames
+        self.frames: dict = {}
+
+    def add(self, frame_idx: int, masked_depth: torch.Tensor, masked_rgb: torch.Tensor) -> None:
+        if self.image_size is None:
+            self.image_size = tuple(masked_depth.shape)
+        accepted = self.stats.add(masked_depth, masked_rgb)
+        self.frame_indices.add(frame_idx)
+        if self.store_frames:
+            masked_depth = torch.where(accepted, masked_depth.to(self.device, torch.float32), float("nan"))
+            rgb_u8 = torch.round(torch.nan_to_num(masked_rgb.to(self.device), nan=0.0) * 255).to(torch.uint8)
+            self.frames[frame_idx] = (masked_depth.half(), rgb_u8)
+
+    def remove(self, frame_idx: int) -> None:
+        if not self.store_frames:
+            raise RuntimeError("Frames can only be removed from a MeanBackgroundAccumulator with store_frames=True")
+        masked_depth, rgb_u8 = self.frames.pop(frame_idx)
+        self.stats.remove(masked_depth.float(), rgb_u8.float() / 255.0)
+        self.frame_indices.remove(frame_idx)
+
+    def mean(self) -> Tuple[torch.Tensor, torch.Tensor]:
+        """(H, W) mean depth and (H, W, 3) mean RGB as float32, 0 where no frame has a valid sample."""
+        return self.stats.mean()
+
+
 def build_background_pointcloud(
         input_dir: str,
         T_cam_to_world: np.ndarray,
         spatial_subsample: int = 2,
-        artifact_name: Optional[str] = None
+        artifact_name: Optional[str] = None,
+        frame_range: Optional[Tuple[int, int]] = None,
+        accumulator: Optional[BackgroundAccumulator] = None
     ) -> Tuple[np.ndarray, np.ndarray, Tuple[int, int]]:
     """
     Build background-only global point cloud from all frames in world coordinates.
@@ -425,6 +673,9 @@ def build_background_pointcloud(
         input_dir: Path to ViPE inference results
         T_cam_to_world: 4x4 transformation matrix from camera to world coordinates
         spatial_subsample: Spatial subsampling factor for point cloud
+        frame_range: Inclusive (first, last) artifact frame indices to build from instead of all frames
+        accumulator: Per-frame points kept from a previous call (e.g. for the previous, overlapping render window);
+            frames outside frame_range are dropped from it and only the frames it lacks are unprojected
 
     Returns:
         global_points: Nx3 array of 3D points in world coordinates
@@ -434,53 +685,37 @@ def build_background_pointcloud(
     # Use ViPE's ArtifactPath to find inference artifacts
     artifact_path = resolve_artifact_path(input_dir, artifact_name)
 
-
-    # Fallback to original depth-based method
-    global_points = []
-    global_colors = []
-
-    def none_it(inner_it):
-        try:
-            for item in inner_it:
-                yield item
-        except FileNotFoundError:
-            while True:
-                yield None, None
-
-    def none_it_mask(inner_it):
-        try:
-            for item in inner_it:
-                yield item
-        except FileNotFoundError:
-            while True:
-                yield None, None
+    if accumulator is None:
+        accumulator = BackgroundAccumulator()
+    accumulator.bind((str(artifact_path.base_path), artifact_path.artifact_name, spatial_subsample))
+    if frame_range is not None:
+        accumulator.retain(frame_range)
 
     logger.info("Building background point cloud from all frames using depth...")
 
     rays = None
-    frame_count = 0
-    image_size = None  # Will be set from first frame
-
-    for frame_idx, (c2w, (_, rgb), intr, camera_type, (_, depth), (_, instance_mask)) in enumerate(
-        zip(
-            read_pose_artifacts(artifact_path.pose_path)[1].matrix().numpy(),
-            read_rgb_artifacts(artifact_path.rgb_path),
-            *read_intrinsics_artifacts(artifact_path.intrinsics_path, artifact_path.camera_type_path)[1:3],
-            none_it(read_depth_artifacts(artifact_path.depth_path)),
-            none_it_mask(read_instance_artifacts(artifact_path.mask_path)),
-        )
+    num_reused = len(accumulator)
+
+    poses = read_pose_artifacts(artifact_path.pose_path)[1].matrix().numpy()
+    _, intrinsics, camera_types = read_intrinsics_artifacts(
+        artifact_path.intrinsics_path, artifact_path.camera_type_path
+    )
+    window = artifact_window(min(len(poses), len(intrinsics), len(camera_types)), frame_range)
+    # Frames kept in the accumulator from the previous window are neither decoded nor unprojected again.
+    new_frames = [frame_idx for frame_idx in window if frame_idx not in accumulator]
+
+    for frame_idx, rgb, depth, instance_mask, reliable_mask in with_reliable_depth_masks(
+        read_artifact_frames(artifact_path, new_frames)
     ):
-        if depth is None:
-            continue
+        c2w, intr, camera_type = poses[frame_idx], intrinsics[frame_idx], camera_types[frame_idx]
 
-        frame_count += 1
         logger.info(f"Processing frame {frame_idx}")
 
         frame_height, frame_width = rgb.shape[:2]
 
         # Set image size from first frame
-        if image_size is None:
-            image_size = (frame_height, frame_width)
+        if accumulator.image_size is None:
+            accumulator.image_size = (frame_height, frame_width)
             logger.info(f"Detected original image size: {frame_height} x {frame_width}")
 
         sampled_rgb = (rgb.cpu().numpy() * 255).astype(np.uint8)
@@ -512,7 +747,7 @@ def build_background_pointcloud(
         pcd_world = pcd_world_flat.reshape(pcd_camera.shape)  # Restore original shape
 
         # Apply depth mask
-        depth_mask = reliable_depth_mask_range(depth)[::spatial_subsample, ::spatial_subsample].numpy()
+        depth_mask = reliable_mask[::spatial_subsample, ::spatial_subsample].numpy()
 
         # Keep only background (instance == 0) when instance mask is available
         if instance_mask is not None:
@@ -530,50 +765,47 @@ def build_background_pointcloud(
         valid_points = pcd_flat[mask_flat]
         valid_colors = rgb_flat[mask_flat]
 
-        global_points.append(valid_points)
-        global_colors.append(valid_colors)
+        accumulator.add(frame_idx, valid_points, valid_colors)
 
         logger.info(f"Frame {frame_idx}: Added {len(valid_points)} points to background point cloud")
 
     # Concatenate all points
-    if global_points:
-        global_points = np.concatenate(global_points, axis=0)
-        global_colors = np.concatenate(global_colors, axis=0)
-        logger.info(f"Built background point cloud with {len(global_points)} total points from {frame_count} frames")
-
-        # Transform points from ViPE coordinate system to world coordinate system
-        logger.info("Transforming background point cloud from ViPE to world coordinate system...")
-        logger.info(f"Using T_cam_to_world transformation matrix:\n{T_cam_to_world}")
-
-        points_homogeneous = np.hstack([global_points, np.ones((len(global_points), 1))])
-        global_points_transformed = (T_cam_to_world @ points_homogeneous.T).T[:, :3]
-
-        global_points = global_points_transformed
-        logger.info("Successfully transformed background point cloud to world coordinate system")
-
-        return global_points, global_colors, image_size
+    if len(accumulator) > 0:
+        global_points, global_colors = accumulator.pointcloud(T_cam_to_world)
+        logger.info(f"Built background point cloud with {len(global_points)} total points from "
+                    f"{len(accumulator)} frames ({num_reused} reused from the previous window)")
+        logger.info(f"Transformed background point cloud to world coordinates with T_cam_to_world:\n{T_cam_to_world}")
+        return global_points, global_colors, accumulator.image_size
 
     else:
         logger.warning("No valid background points found in any frame")
-        return np.empty((0, 3)), np.empty((0, 3)), image_size
+        return np.empty((0, 3)), np.empty((0, 3)), accumulator.image_size
     
 
-def compute_robust_mean_tensors(stacked_depth: torch.Tensor, stacked_rgb: torch.Tensor) -> Tuple[torch.Tensor, torch.Tensor]:
+def masked_background_frame(rgb: torch.Tensor, depth: torch.Tensor, instance_mask: Optional[torch.Tensor],
+                            reliable_mask: Optional[torch.Tensor] = None) -> Tuple[torch.Tensor, torch.Tensor]:
     """
-    GPU 벡터화된 버전: 픽셀별 NaN-aware 평균을 병렬로 계산.
+    Depth (H, W) and RGB (H, W, 3) of one frame with NaN where the pixel is not reliable static background.
+    reliable_mask is the reliable_depth_mask_range of the depth, computed here if not given.
     """
-    logger.info("Computing mean background using nanmean with GPU vectorization...")
-    
-    # NaN을 무시하고 평균 계산
-    robust_depth = torch.nanmean(stacked_depth, dim=0)
-    robust_rgb = torch.nanmean(stacked_rgb, dim=0)
-    
-    # NaN 값들을 0으로 대체
-    robust_depth = torch.nan_to_num(robust_depth, nan=0.0)
-    robust_rgb = torch.nan_to_num(robust_rgb, nan=0.0)
-    
-    return robust_depth, robust_rgb
+    # Keep only background (instance_id == 0), as in build_background_pointcloud
+    if instance_mask is not None:
+        static_mask = (instance_mask == 0)
+    else:
+        # instance mask가 없으면 모든 픽셀을 유효하게 간주 (기존 방식과 동일)
+        static_mask = torch.ones_like(depth, dtype=torch.bool, device=depth.device)
+
+    # Mask out invalid depth values
+    if reliable_mask is None:
+        reliable_mask = reliable_depth_mask_range(depth)
+    final_mask = static_mask & reliable_mask
+
+    masked_depth = depth.clone().float()
+    masked_depth[~final_mask] = float('nan')
 
+    masked_rgb = rgb.clone().float()
+    masked_rgb[~final_mask.unsqueeze(-1).expand_as(rgb)] = float('nan')
+    return masked_depth, masked_rgb
 
 
 def build_mean_background_pointcloud(
@@ -581,7 +813,10 @@ def build_mean_background_pointcloud(
         T_cam_to_world: np.ndarray,
         spatial_subsample: int = 2,
         max_frames: int = None,
-        artifact_name: Optional[str] = None
+        artifact_name: Optional[str] = None,
+        frame_range: Optional[Tuple[int, int]] = None,
+        accumulator: Optional[MeanBackgroundAccumulator] = None,
+        outlier_sigma: Optional[float] = None
     ) -> Tuple[np.ndarray, np.ndarray, Tuple[int, int], np.ndarray]:
     """
     Build a static background point cloud using nanmean.
@@ -590,7 +825,13 @@ def build_mean_background_pointcloud(
         input_dir: Directory containing ViPE artifacts
         T_cam_to_world: 4x4 transformation matrix from camera to world coordinates
         spatial_subsample: Spatial subsampling factor for point cloud
-        max_frames: Maximum number of frames to process (None for all)
+        max_frames: Maximum number of frames to process from the start of the range (None for all)
+        frame_range: Inclusive (first, last) artifact frame indices to average instead of all frames; the mean
+            depth is unprojected with the pose of the first one
+        accumulator: Running sums kept from a previous call (e.g. for the previous, overlapping render window);
+            frames outside frame_range are subtracted from it and only the frames it lacks are added
+        outlier_sigma: Reject depth samples this many standard deviations from the running mean of their pixel
+            (streaming sigma clipping, see StreamingRobustMean); None averages every valid sample
 
     Returns:
         mean_bg_points: Nx3 array of 3D points in world coordinates (nanmean background)  
@@ -599,97 +840,58 @@ def build_mean_background_pointcloud(
     """
     artifact_path = resolve_artifact_path(input_dir, artifact_name)
 
-    # 최적화: 모든 유효한 프레임을 스택으로 수집
-    valid_depth_frames = []
-    valid_rgb_frames = []
-    image_size = None
-
-    def none_it(inner_it):
-        try:
-            for item in inner_it:
-                yield item
-        except FileNotFoundError:
-            while True:
-                yield None, None
-
-    logger.info("Collecting valid background frames for GPU-optimized batch processing...")
-
     # GPU 최적화: 모든 데이터를 GPU에서 처리하도록 device 설정
     device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
     logger.info(f"Using device: {device}")
 
-    frame_count = 0
-    for frame_idx, ((_, rgb), (_, depth), (_, instance_mask)) in enumerate(
-        zip(
-            read_rgb_artifacts(artifact_path.rgb_path),
-            none_it(read_depth_artifacts(artifact_path.depth_path)),
-            none_it(read_instance_artifacts(artifact_path.mask_path)),
-        )
+    # Per-pixel running sums instead of a stack of all frames; frames are only kept to be removed again
+    # when the caller passes an accumulator for overlapping windows.
+    if accumulator is None:
+        accumulator = MeanBackgroundAccumulator(device, store_frames=False, outlier_sigma=outlier_sigma)
+    accumulator.bind((str(artifact_path.base_path), artifact_path.artifact_name))
+    if frame_range is not None:
+        accumulator.retain(frame_range)
+    num_reused = len(accumulator)
+
+    logger.info("Accumulating valid background frames...")
+
+    poses = read_pose_artifacts(artifact_path.pose_path)[1].matrix().numpy()
+    window = artifact_window(len(poses), frame_range)
+    # 메모리 효율성을 위한 프레임 수 제한
+    if max_frames:
+        window = window[:max_frames]
+    # Frames kept in the accumulator from the previous window are not decoded again.
+    new_frames = [frame_idx for frame_idx in window if frame_idx not in accumulator]
+
+    for frame_idx, rgb, depth, instance_mask, reliable_mask in with_reliable_depth_masks(
+        read_artifact_frames(artifact_path, new_frames), device=accumulator.device
     ):
-        if depth is None:
-            continue
-        
-        # 메모리 효율성을 위한 프레임 수 제한
-        if max_frames and frame_count >= max_frames:
-            break
-
-        if image_size is None:
-            image_size = rgb.shape[:2]
-
         # GPU 최적화: 모든 텐서를 GPU로 이동
-        rgb = rgb.to(device)
-        depth = depth.to(device)
-        if instance_mask is not None:
-            instance_mask = instance_mask.to(device)
+        instance_mask = instance_mask.to(accumulator.device) if instance_mask is not None else None
+        accumulator.add(frame_idx, *masked_background_frame(rgb.to(accumulator.device), depth.to(accumulator.device),
+                                                            instance_mask, reliable_mask))
 
-        # Keep only background (instance_id == 0)
-        # 기존 build_background_pointcloud와 동일한 로직 사용
-        if instance_mask is not None:
-            # 기존 방식: 프레임별로 background만 유지하지만 전체적으로 관대하게 처리
-            static_mask = (instance_mask == 0)
-        else:
-            # instance mask가 없으면 모든 픽셀을 유효하게 간주 (기존 방식과 동일)
-            static_mask = torch.ones_like(depth, dtype=torch.bool, device=device)
-        
-        # Mask out invalid depth values
-        depth_mask = reliable_depth_mask_range(depth)
-        final_mask = static_mask & depth_mask
-
-        # GPU 최적화: 무효한 픽셀을 NaN으로 설정하여 GPU에서 처리
-        masked_depth = depth.clone().float()
-        masked_depth[~final_mask] = float('nan')
-        
-        masked_rgb = rgb.clone().float()
-        masked_rgb[~final_mask.unsqueeze(-1).expand_as(rgb)] = float('nan')
-
-        valid_depth_frames.append(masked_depth)
-        valid_rgb_frames.append(masked_rgb)
-        
-        frame_count += 1
         if frame_idx % 10 == 0:  # 로그 빈도 감소
-            logger.info(f"Collected frame {frame_idx} for GPU batch processing.")
+            logger.info(f"Accumulated frame {frame_idx}.")
 
-    if not valid_depth_frames:
+    if len(accumulator) == 0:
         logger.warning("No valid background frames found.")
-        return np.empty((0, 3)), np.empty((0, 3)), image_size
+        return np.empty((0, 3)), np.empty((0, 3)), accumulator.image_size
 
     # nanmean으로 대표값 계산
-    logger.info(f"Computing nanmean across {len(valid_depth_frames)} frames...")
-    
-    stacked_depth = torch.stack(valid_depth_frames, dim=0)  # Shape: [N_frames, H, W]
-    stacked_rgb = torch.stack(valid_rgb_frames, dim=0)      # Shape: [N_frames, H, W, 3]
-    
-    # nanmean 계산 (GPU 벡터화)
-    mean_depth, mean_rgb = compute_robust_mean_tensors(stacked_depth, stacked_rgb)
-    valid_pixel_mask = mean_depth > 0
+    logger.info(f"Computing nanmean across {len(accumulator)} frames ({num_reused} reused from the previous window)...")
+    mean_depth, mean_rgb = accumulator.mean()
+    mean_depth, mean_rgb = mean_depth.to(device), mean_rgb.to(device)
+    image_size = accumulator.image_size
 
     # --- GPU 최적화된 포인트 클라우드 프로젝션 ---
     logger.info("Projecting optimized mean depth map to a static point cloud using GPU...")
     
     # We need intrinsics and a single pose to project. We can use the first frame's pose.
-    poses_iter = read_pose_artifacts(artifact_path.pose_path)[1].matrix().numpy()
-    c2w = next(iter(poses_iter))
-    intr, camera_type = next(iter(zip(*read_intrinsics_artifacts(artifact_path.intrinsics_path, artifact_path.camera_type_path)[1:3])))
+    first_frame = frame_range[0] if frame_range is not None else 0
+    c2w = poses[first_frame]
+    intrinsics_it = zip(*read_intrinsics_artifacts(artifact_path.intrinsics_path, artifact_path.camera_type_path)[1:3])
+    intr, camera_type = next(itertools.islice(intrinsics_it, first_frame, None))
 
     frame_height, frame_width = image_size
     
@@ -771,26 +973,15 @@ def build_dynamic_points_for_frame(artifact_path: ArtifactPath, frame_idx: int,
     """
 
     # Fallback to original depth-based method for dynamic points
-    # Iterate through artifacts until we hit the desired frame
-    none_it = lambda inner_it: (item for item in inner_it)
-
     artifact = artifact_path
+    c2w = read_pose_artifacts(artifact.pose_path)[1].matrix().numpy()[frame_idx]
+    _, intrinsics, camera_types = read_intrinsics_artifacts(artifact.intrinsics_path, artifact.camera_type_path)
+    intr, camera_type = intrinsics[frame_idx], camera_types[frame_idx]
 
-    # Walk the same zipped iterators but only process the requested frame
+    # Only the requested frame is decoded
     rays = None
 
-    for idx, (c2w, (_, rgb), intr, camera_type, (_, depth), (_, instance_mask)) in enumerate(
-        zip(
-            read_pose_artifacts(artifact.pose_path)[1].matrix().numpy(),
-            read_rgb_artifacts(artifact.rgb_path),
-            *read_intrinsics_artifacts(artifact.intrinsics_path, artifact.camera_type_path)[1:3],
-            none_it(read_depth_artifacts(artifact.depth_path)),
-            none_it(read_instance_artifacts(artifact.mask_path)),
-        )
-    ):
-        if idx != frame_idx:
-            continue
-
+    for _, rgb, depth, instance_mask in read_artifact_frames(artifact, [frame_idx]):
         if depth is None:
             return np.empty((0, 3)), np.empty((0, 3))
 
@@ -851,21 +1042,542 @@ def build_dynamic_points_for_frame(artifact_path: ArtifactPath, frame_idx: int,
         return points_transformed, valid_colors
 
 
+def point_radius_ndc(point_size: float, W: int, H: int) -> float:
+    """Convert a pixel point size to the NDC radius used by the points rasterizer."""
+    px_to_ndc = 2.0 / max(W, H)
+    radius_ndc = float(point_size) * px_to_ndc
+    return max(1e-5, min(0.25, radius_ndc))  # safety clamp
+
+
+def resolve_pinhole_intrinsics(K: np.ndarray, original_image_size: Optional[Tuple[int, int]], W: int, H: int) -> np.ndarray:
+    """3x3 intrinsics scaled from original_image_size to the render resolution (if given)."""
+    K_use = np.asarray(K, dtype=np.float32).copy()
+    if original_image_size is not None:
+        fx, fy = float(K_use[0, 0]), float(K_use[1, 1])
+        cx, cy = float(K_use[0, 2]), float(K_use[1, 2])
+        fx, fy, cx, cy = scale_intrinsics(fx, fy, cx, cy, original_image_size, (H, W))
+        K_use[0, 0], K_use[1, 1] = fx, fy
+        K_use[0, 2], K_use[1, 2] = cx, cy
+    return K_use
+
+
+def resolve_fisheye_intrinsics(ego_intrinsics, focal_length, principal_point, original_image_size, W, H):
+    """
+    Fisheye (f, cx, cy) in render pixels: the online calibration (scaled to the render resolution) if available,
+    otherwise the ego intrinsics as they are.
+    """
+    if focal_length is not None and principal_point is not None:
+        f = focal_length[0]
+        cx, cy = principal_point[0], principal_point[1]
+        logger.info(f"Using intrinsics from online_calibration: f={f:.1f}, cx={cx:.1f}, cy={cy:.1f}")
+        
+        # Scale intrinsics if original image size is provided
+        if original_image_size:
+            f, cx, cy = scale_intrinsics(f, cx, cy, original_image_size, (H, W))
+        else:
+            logger.warning("original_image_size not provided, intrinsics may be incorrect for the target resolution.")
+    else:
+        # Fallback to ego_intrinsics if online calibration data is not provided
+        f = ego_intrinsics[0,0]#, ego_intrinsics[1,1]
+        cx, cy = ego_intrinsics[0,2], ego_intrinsics[1,2]
+        logger.info(f"Using intrinsics from ego_intrinsics: f={f:.1f}, cx={cx:.1f}, cy={cy:.1f}")
+    return f, cx, cy
+
+
+def _fisheye_pix_to_ndc(f, cx, cy, W, H):
+    f_ndc = 2.0 * f / W # W = H
+    cx_ndc = 2.0 * (cx / W) - 1.0
+    cy_ndc = 1.0 - 2.0 * (cy / H)
+    return f_ndc, cx_ndc, cy_ndc
+
+
+def fisheye_camera_axes(is_aria: bool = True) -> np.ndarray:
+    """
+    Change of basis from OpenCV camera axes to the FishEyeCameras ones: p_fisheye = p_opencv @ axes.
+    """
+    # Flip Y and Z axes to convert from OpenCV to PyTorch3D
+    # This is the same transformation that cameras_from_opencv_projection does internally
+    coord_transform_between_opencv_and_pytorch = np.array([
+        [-1,  0,  0],
+        [ 0, -1,  0],
+        [ 0,  0,  1]
+    ], dtype=np.float32)
+
+    if is_aria:
+        # Aria cameras have a non-standard coordinate convention;
+        # apply an extra CCW 90-degree rotation to align axes.
+        coord_transform_for_aria_cam = np.array([
+            [ 0,  1,  0],
+            [-1,  0,  0],
+            [ 0,  0,  1]
+        ], dtype=np.float32)
+        return coord_transform_between_opencv_and_pytorch @ coord_transform_for_aria_cam
+    # Standard OpenCV cameras: only need OpenCV -> PyTorch3D conversion
+    return coord_transform_between_opencv_and_pytorch
+
+
+def fisheye_distort(uv: torch.Tensor, radial_coeffs, tangential_coeffs, thin_prism_coeffs) -> torch.Tensor:
+    """
+    FisheyeRadTanThinPrism distortion of FishEyeCameras, applied to (N, 2) normalized coordinates (x / z, y / z).
+    Multiply by the focal length and add the principal point to get image coordinates.
+    """
+    coeffs = dict(dtype=uv.dtype, device=uv.device)
+    r = torch.linalg.norm(uv, dim=-1, keepdim=True)
+    theta = torch.atan(r)
+    theta_sq = theta * theta
+    theta_radial = torch.ones_like(theta)
+    theta_pow = torch.ones_like(theta)
+    for k in np.asarray(radial_coeffs, dtype=np.float64).tolist():
+        theta_pow = theta_pow * theta_sq
+        theta_radial = theta_radial + k * theta_pow
+    scale = torch.where(r > 1e-12, theta / r.clamp_min(1e-12), torch.ones_like(r))
+    uv_distorted = uv * theta_radial * scale
+
+    r_sq = torch.sum(uv_distorted**2, dim=-1, keepdim=True)
+    p = torch.as_tensor(np.asarray(tangential_coeffs, dtype=np.float64), **coeffs)[None]
+    uv_distorted = uv_distorted + 2.0 * torch.sum(uv_distorted * p, dim=-1, keepdim=True) * uv_distorted + r_sq * p
+    s = torch.as_tensor(np.asarray(thin_prism_coeffs, dtype=np.float64), **coeffs)
+    return uv_distorted + r_sq * s[[0, 2]][None] + r_sq * r_sq * s[[1, 3]][None]
+
+
+def fisheye_project_ndc(dirs_cam: np.ndarray, f_ndc: float, c_ndc: Tuple[float, float],
+                        radial_coeffs, tangential_coeffs, thin_prism_coeffs) -> np.ndarray:
+    """
+    Project (N, 3) camera-space directions (z > 0) with the FisheyeRadTanThinPrism model of FishEyeCameras.
+    Returns (N, 2) NDC coordinates (up to the axis flips, which do not matter for bounds checks).
+    """
+    dirs_cam = np.asarray(dirs_cam, dtype=np.float64)
+    uv = torch.from_numpy(dirs_cam[:, :2] / dirs_cam[:, 2:3])
+    uv_distorted = fisheye_distort(uv, radial_coeffs, tangential_coeffs, thin_prism_coeffs).numpy()
+    return f_ndc * uv_distorted + np.asarray(c_ndc)[None]
+
+
+class FisheyeProjectionLUT:
+    """
+    FisheyeRadTanThinPrism projection of one camera (the model of FishEyeCameras and `fisheye_distort`), with the
+    radial distortion read from a table built once per camera instead of evaluated per point.
+
+    The distorted radius theta * (1 + k1 theta^2 + ... + k6 theta^12), theta = atan(r), is tabulated over
+    t = r / (1 + r) in [0, 1], which covers every direction in front of the camera, and linearly interpolated.
+    The tangential and thin-prism terms are low-order polynomials of the radially distorted coordinates and are
+    applied exactly. `max_error_ndc` bounds the interpolation error of the projection, measured at construction.
+    """
+
+    def __init__(self, f_ndc: float, c_ndc: Tuple[float, float], radial_coeffs, tangential_coeffs,
+                 thin_prism_coeffs, table_size: int = 4096, device: Union[str, torch.device] = "cpu") -> None:
+        self.f_ndc = float(f_ndc)
+        self.c_ndc = (float(c_ndc[0]), float(c_ndc[1]))
+        self.radial_coeffs = np.asarray(radial_coeffs, dtype=np.float64)
+        self.tangential_coeffs = np.asarray(tangential_coeffs, dtype=np.float64)
+        self.thin_prism_coeffs = np.asarray(thin_prism_coeffs, dtype=np.float64)
+        self.device = torch.device(device)
+
+        self.table = torch.from_numpy(self._distorted_radius(np.linspace(0.0, 1.0, table_size))).float()
+        # Linear interpolation is least accurate halfway between the nodes.
+        t_mid = (np.arange(table_size - 1) + 0.5) / (table_size - 1)
+        interpolated = self._interpolate(torch.from_numpy(t_mid).float()).double().numpy()
+        self.max_error_ndc = self.f_ndc * float(np.abs(interpolated - self._distorted_radius(t_mid)).max())
+        self.table = self.table.to(self.device)
+
+    def _distorted_radius(self, t: np.ndarray) -> np.ndarray:
+        theta = np.arctan2(t, 1.0 - t)
+        theta_sq = theta * theta
+        poly = np.zeros_like(theta)
+        for k in self.radial_coeffs[::-1]:
+            poly = (poly + k) * theta_sq
+        return theta * (1.0 + poly)
+
+    def _interpolate(self, t: torch.Tensor) -> torch.Tensor:
+        x = t * (self.table.shape[0] - 1)
+        i0 = x.long().clamp_(0, self.table.shape[0] - 2)
+        return torch.lerp(self.table[i0], self.table[i0 + 1], x - i0)
+
+    def distort(self, uv: torch.Tensor) -> torch.Tensor:
+        """Same as `fisheye_distort` for (N, 2) float32 normalized coordinates (x / z, y / z)."""
+        r = torch.linalg.norm(uv, dim=-1)
+        # theta * (...) / r -> 1 as r -> 0
+        scale = torch.where(r > 1e-12, self._interpolate(r / (1.0 + r)) / r.clamp_min(1e-12), torch.ones_like(r))
+        x, y = uv[:, 0] * scale, uv[:, 1] * scale
+
+        # Tangential and thin-prism terms per coordinate with scalar coefficients (cheaper than broadcasting).
+        p1, p2 = self.tangential_coeffs.tolist()
+        s1, s2, s3, s4 = self.thin_prism_coeffs.tolist()
+        r_sq = x * x + y * y
+        tangential = 1.0 + 2.0 * (p1 * x + p2 * y)
+        x_distorted = x * tangential + r_sq * (p1 + s1 + s2 * r_sq)
+        y_distorted = y * tangential + r_sq * (p2 + s3 + s4 * r_sq)
+        return torch.stack([x_distorted, y_distorted], dim=-1)
+
+    def project_ndc(self, pts_cam: torch.Tensor) -> torch.Tensor:
+        """NDC of (N, 3) points (z > 0) in FishEyeCameras camera axes."""
+        ndc = self.distort(pts_cam[:, :2] / pts_cam[:, 2:3]) * self.f_ndc
+        ndc[:, 0] += self.c_ndc[0]
+        ndc[:, 1] += self.c_ndc[1]
+        return ndc
+
+
+def fisheye_cone_half_angle(f_ndc: float, c_ndc: Tuple[float, float], radial_coeffs, tangential_coeffs,
+                            thin_prism_coeffs, margin_ndc: float = 0.0, margin_rad: float = np.deg2rad(2.0),
+                            n_theta: int = 512, n_phi: int = 256) -> float:
+    """
+    Half angle of the cone around the optical axis that contains every direction landing in the fisheye image.
+    Found by projecting a dense grid of directions, so non-monotonic distortion polynomials are also handled.
+    Points behind the camera are never rasterized, so the cone is at most 90 degrees (plus margin).
+    """
+    theta = np.linspace(0.0, np.pi / 2, n_theta, endpoint=False)
+    phi = np.linspace(0.0, 2 * np.pi, n_phi, endpoint=False)
+    theta_grid, phi_grid = np.meshgrid(theta, phi, indexing="ij")
+    dirs = np.stack(
+        [np.sin(theta_grid) * np.cos(phi_grid), np.sin(theta_grid) * np.sin(phi_grid), np.cos(theta_grid)], axis=-1
+    ).reshape(-1, 3)
+    ndc = fisheye_project_ndc(dirs, f_ndc, c_ndc, radial_coeffs, tangential_coeffs, thin_prism_coeffs)
+    bound = 1.0 + margin_ndc
+    inside = np.all(np.isfinite(ndc) & (np.abs(ndc) <= bound), axis=-1)
+    if not np.any(inside):
+        return np.pi / 2 + margin_rad
+    return float(min(theta_grid.reshape(-1)[inside].max() + np.pi / n_theta / 2 + margin_rad, np.pi / 2 + margin_rad))
+
+
+def filter_render_points(points: np.ndarray, colors: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """float32 copies of the points (and their colors) the renderers keep: finite and not extremely far away."""
+    pts = np.asarray(points, dtype=np.float32).reshape(-1, 3)
+    cols = np.asarray(colors, dtype=np.float32).reshape(-1, 3)
+    keep = np.isfinite(pts).all(axis=1)
+    keep[keep] = np.linalg.norm(pts[keep], axis=1) < 1e6
+    return pts[keep], cols[keep]
+
+
+class ChunkedPointCloud:
+    """
+    Static point cloud bucketed into a voxel grid once per run, so that every render only gathers the chunks that
+    can be visible from the camera (pinhole frustum or fisheye cone).
+
+    Chunks are culled only when their bounding box is entirely outside the (margin-expanded) visible volume, and
+    gathered points keep their original order, so rendered images are the same as without culling.
+    Points are indexed in the order returned by `filter_render_points`, i.e. those the renderers would drop anyway
+    (non-finite or huge coordinates) are excluded.
+    """
+
+    def __init__(self, points: np.ndarray, chunk_size: float = 0.25) -> None:
+        self.chunk_size = chunk_size
+        valid_points = np.asarray(points, dtype=np.float32)
+
+        voxel = np.floor(valid_points / chunk_size).astype(np.int64)
+        _, chunk_ids = np.unique(voxel, axis=0, return_inverse=True)
+        chunk_ids = chunk_ids.reshape(-1)
+        # Stable sort keeps the original point order inside each chunk.
+        order = np.argsort(chunk_ids, kind="stable")
+        self.sorted_point_inds = order
+        sorted_chunk_ids = chunk_ids[order]
+        n_chunks = int(sorted_chunk_ids[-1]) + 1 if len(sorted_chunk_ids) > 0 else 0
+        self.chunk_starts = np.searchsorted(sorted_chunk_ids, np.arange(n_chunks))
+        self.chunk_counts = np.diff(np.append(self.chunk_starts, len(sorted_chunk_ids)))
+
+        sorted_points = valid_points[order]
+        if n_chunks > 0:
+            self.bbox_min = np.minimum.reduceat(sorted_points, self.chunk_starts, axis=0).astype(np.float64)
+            self.bbox_max = np.maximum.reduceat(sorted_points, self.chunk_starts, axis=0).astype(np.float64)
+        else:
+            self.bbox_min = self.bbox_max = np.empty((0, 3))
+        self.centers = (self.bbox_min + self.bbox_max) / 2
+        self.half_extents = (self.bbox_max - self.bbox_min) / 2
+        self.radii = np.linalg.norm(self.half_extents, axis=1)
+        logger.info(f"Indexed {len(valid_points)} points into {n_chunks} chunks of {chunk_size} m")
+
+    def __len__(self) -> int:
+        return len(self.chunk_starts)
+
+    def point_indices(self, visible_chunks: np.ndarray) -> np.ndarray:
+        """Indices of the points of the visible chunks, in their original order."""
+        starts, counts = self.chunk_starts[visible_chunks], self.chunk_counts[visible_chunks]
+        total = int(counts.sum())
+        if total == 0:
+            return np.empty((0,), dtype=np.int64)
+        offsets = np.repeat(starts - (np.cumsum(counts) - counts), counts)
+        return np.sort(self.sorted_point_inds[np.arange(total) + offsets])
+
+    def cull_pinhole(self, T_w2c: np.ndarray, K: np.ndarray, W: int, H: int, margin_px: float = 0.0) -> np.ndarray:
+        """Ids of the chunks that intersect the pinhole frustum (expanded by margin_px)."""
+        fx, fy, cx, cy = K[0, 0], K[1, 1], K[0, 2], K[1, 2]
+        x_min, x_max = (-margin_px - cx) / fx, (W + margin_px - cx) / fx
+        y_min, y_max = (-margin_px - cy) / fy, (H + margin_px - cy) / fy
+        # Inward normals of the frustum planes through the camera center, in camera space.
+        normals_cam = np.array(
+            [[1.0, 0.0, -x_min], [-1.0, 0.0, x_max], [0.0, 1.0, -y_min], [0.0, -1.0, y_max], [0.0, 0.0, 1.0]]
+        )
+        R, t = T_w2c[:3, :3], T_w2c[:3, 3]
+        normals_world = normals_cam @ R
+        offsets = normals_cam @ t
+        # A box is outside if its farthest corner along the inward normal is still behind the plane.
+        max_dist = self.centers @ normals_world.T + self.half_extents @ np.abs(normals_world).T + offsets[None]
+        return np.flatnonzero(np.all(max_dist >= 0, axis=1))
+
+    def cull_cone(self, T_w2c: np.ndarray, half_angle: float, near_clip: float = 0.0) -> np.ndarray:
+        """
+        Ids of the chunks that intersect the cone of `half_angle` around the optical axis and are not entirely
+        within `near_clip` of the camera center.
+        """
+        R, t = T_w2c[:3, :3], T_w2c[:3, 3]
+        cam_center = -R.T @ t
+        axis = R.T @ np.array([0.0, 0.0, 1.0])
+        v = self.centers - cam_center[None]
+        dist = np.linalg.norm(v, axis=1)
+        along = v @ axis
+        perp = np.linalg.norm(v - along[:, None] * axis[None], axis=1)
+        # Angle between the chunk center and the axis beyond the cone, and the distance of the center to the cone.
+        angle_outside = np.arctan2(perp, along) - half_angle
+        dist_to_cone = np.where(angle_outside > 0, dist * np.sin(np.minimum(angle_outside, np.pi / 2)), 0.0)
+        return np.flatnonzero((dist_to_cone <= self.radii) & (dist + self.radii > near_clip))
+
+
+class DevicePointCloud:
+    """
+    Static point cloud uploaded to the render device once per run.
+
+    The renderers take it as the background and append the per-frame dynamic points on the device, so the
+    background is never concatenated, converted or uploaded again on the host. With a `ChunkedPointCloud` index,
+    `select` gathers the visible chunks on the device from a list of chunk ids.
+    """
+
+    def __init__(self, points: np.ndarray, colors: np.ndarray, device: Union[str, torch.device] = "cuda",
+                 chunk_size: Optional[float] = None) -> None:
+        self.device = torch.device(device)
+        pts_np, cols_np = filter_render_points(points, colors)
+        self.points = torch.from_numpy(pts_np).to(self.device)
+        self.colors = torch.from_numpy(cols_np).to(self.device)
+        # Same decision as the renderers' `cols.max() > 1.0`, taken over the whole cloud.
+        self.colors_max = float(cols_np.max()) if len(cols_np) > 0 else 0.0
+
+        self.index = ChunkedPointCloud(pts_np, chunk_size=chunk_size) if chunk_size is not None else None
+        if self.index is not None:
+            self._sorted_point_inds = torch.from_numpy(self.index.sorted_point_inds).to(self.device)
+            self._chunk_starts = torch.from_numpy(self.index.chunk_starts).to(self.device)
+            self._chunk_counts = torch.from_numpy(self.index.chunk_counts).to(self.device)
+
+    def __len__(self) -> int:
+        return self.points.shape[0]
+
+    def select(self, visible_chunks: Optional[np.ndarray] = None) -> Tuple[torch.Tensor, torch.Tensor]:
+        """Points and colors of the visible chunks (all points if None), in their original order."""
+        if visible_chunks is None:
+            return self.points, self.colors
+        assert self.index is not None, "Chunk selection requires a chunk_size."
+        chunks = torch.from_numpy(np.asarray(visible_chunks, dtype=np.int64)).to(self.device)
+        starts, counts = self._chunk_starts[chunks], self._chunk_counts[chunks]
+        total = int(counts.sum())
+        if total == 0:
+            return self.points[:0], self.colors[:0]
+        offsets = torch.repeat_interleave(starts - (torch.cumsum(counts, 0) - counts), counts)
+        point_inds = self._sorted_point_inds[torch.arange(total, device=self.device) + offsets].sort().values
+        return self.points[point_inds], self.colors[point_inds]
+
+
+def assemble_render_points(points_world, colors_world, dynamic_points=None, dynamic_colors=None,
+                           device="cpu", normalize_colors: Optional[bool] = None, return_labels: bool = False):
+    """
+    Points and [0, 1] colors to render, as float32 tensors on `device`.
+
+    Host arrays are filtered with `filter_render_points` and uploaded; tensors (e.g. from `DevicePointCloud`) are
+    taken as already filtered and stay on the device. Dynamic points are filtered and uploaded on their own and
+    appended on the device. Colors are rescaled from 0-255 if their max exceeds 1, unless `normalize_colors` is given.
+    If return_labels, also returns the uint8 RENDER_LABEL_STATIC / RENDER_LABEL_DYNAMIC label of every point.
+    """
+    if isinstance(points_world, torch.Tensor):
+        pts = points_world.to(device=device, dtype=torch.float32)
+        cols = colors_world.to(device=device, dtype=torch.float32)
+    else:
+        pts_np, cols_np = filter_render_points(points_world, colors_world)
+        pts, cols = torch.from_numpy(pts_np).to(device), torch.from_numpy(cols_np).to(device)
+    n_static = pts.shape[0]
+
+    if dynamic_points is not None and len(dynamic_points) > 0:
+        dyn_pts_np, dyn_cols_np = filter_render_points(dynamic_points, dynamic_colors)
+        pts = torch.cat([pts, torch.from_numpy(dyn_pts_np).to(device)])
+        cols = torch.cat([cols, torch.from_numpy(dyn_cols_np).to(device)])
+
+    if normalize_colors is None:
+        normalize_colors = cols.shape[0] > 0 and bool(cols.max() > 1.0)
+    if normalize_colors:
+        cols = cols / 255.0
+    if not return_labels:
+        return pts, cols
+    labels = torch.full((pts.shape[0],), RENDER_LABEL_DYNAMIC, dtype=torch.uint8, device=device)
+    labels[:n_static] = RENDER_LABEL_STATIC
+    return pts, cols, labels
+
+
+def render_aux_from_nearest(nearest: torch.Tensor, depth: torch.Tensor, labels: torch.Tensor) -> dict:
+    """
+    Auxiliary channels of a render, from the (H, W) index of the nearest point drawn at every pixel (-1 where none)
+    and its depth, as given by the z-buffer or the first rasterizer fragment:
+      depth:    (H, W) float32 depth along the camera axis of the nearest point, 0 where no point was drawn
+      coverage: (H, W) bool, whether any point was drawn
+      label:    (H, W) uint8 RENDER_LABEL_* of the nearest point (`labels` of the rendered points)
+    """
+    coverage = nearest >= 0
+    label = torch.full(nearest.shape, RENDER_LABEL_EMPTY, dtype=torch.uint8, device=nearest.device)
+    label[coverage] = labels[nearest[coverage]]
+    return {
+        "depth": torch.where(coverage, depth, torch.zeros_like(depth)).float().cpu().numpy(),
+        "coverage": coverage.cpu().numpy(),
+        "label": label.cpu().numpy(),
+    }
+
+
+def empty_render_aux(H: int, W: int) -> dict:
+    return {
+        "depth": np.zeros((H, W), dtype=np.float32),
+        "coverage": np.zeros((H, W), dtype=bool),
+        "label": np.full((H, W), RENDER_LABEL_EMPTY, dtype=np.uint8),
+    }
+
+
+def _rotate_render_aux(aux: dict) -> dict:
+    # Same as cv2.ROTATE_90_CLOCKWISE on the image.
+    return {k: np.ascontiguousarray(np.rot90(v, -1)) for k, v in aux.items()}
+
+
+def _render_output(image: np.ndarray, aux: Optional[dict], return_aux: bool):
+    return (image, aux) if return_aux else image
+
+
+# Approximate raster memory per pixel: PyTorch3D keeps points_per_pixel fragments (int64 index, z, distance, weight
+# and the compositor's int64 index copy), the z-buffer one packed int64 key plus the color, depth and index outputs.
+PYTORCH3D_BYTES_PER_FRAGMENT = 28
+ZBUFFER_BYTES_PER_PIXEL = 40
+
+
+def plan_render_tiles(H: int, W: int, max_tile_pixels: Optional[int] = None) -> List[Tuple[int, int, int, int]]:
+    """
+    Split an H x W image into a grid of near-square tiles (y0, y1, x0, x1) of at most max_tile_pixels pixels each,
+    or a single tile covering the image if max_tile_pixels is None or not exceeded.
+    """
+    if max_tile_pixels is None or H * W <= max_tile_pixels:
+        return [(0, H, 0, W)]
+    side = max(1, math.isqrt(max_tile_pixels))
+    tile_h, tile_w = math.ceil(H / math.ceil(H / side)), math.ceil(W / math.ceil(W / side))
+    return [
+        (y0, min(y0 + tile_h, H), x0, min(x0 + tile_w, W))
+        for y0 in range(0, H, tile_h)
+        for x0 in range(0, W, tile_w)
+    ]
+
+
+def max_tile_pixels(tile_memory_bytes: Optional[int], bytes_per_pixel: int) -> Optional[int]:
+    if tile_memory_bytes is None:
+        return None
+    return max(1, int(tile_memory_bytes) // bytes_per_pixel)
+
+
+def points_in_tile(pix: torch.Tensor, tile: Tuple[int, int, int, int], margin_px: float) -> torch.Tensor:
+    """Indices of the points whose pixel coordinates `pix` lie within margin_px of the tile (NaN never does)."""
+    y0, y1, x0, x1 = tile
+    u, v = pix[:, 0], pix[:, 1]
+    inside = (u > x0 - margin_px) & (u < x1 + margin_px) & (v > y0 - margin_px) & (v < y1 + margin_px)
+    return torch.nonzero(inside).squeeze(1)
+
+
+def tile_ndc_transform(tile: Tuple[int, int, int, int], W: int, H: int) -> Tuple[float, float, float]:
+    """
+    (scale, offset_x, offset_y) taking the PyTorch3D NDC of a W x H image (+X left, +Y up, shorter side spanning
+    [-1, 1]) to the NDC of its tile (y0, y1, x0, x1): ndc_tile = scale * ndc + offset.
+    """
+    y0, y1, x0, x1 = tile
+    tile_h, tile_w = y1 - y0, x1 - x0
+    half, tile_half = min(W, H) / 2, min(tile_w, tile_h) / 2
+    return half / tile_half, (x0 + tile_w / 2 - W / 2) / tile_half, (y0 + tile_h / 2 - H / 2) / tile_half
+
+
+def stitch_render_tiles(tiles: List[Tuple[int, int, int, int]], H: int, W: int, render_tile
+                        ) -> Tuple[torch.Tensor, torch.Tensor, torch.Tensor]:
+    """
+    Render an H x W image tile by tile. render_tile(tile) returns the (h, w, C) image of the tile (y0, y1, x0, x1),
+    the (h, w) index of the nearest point of every pixel (-1 where none) and its depth; tiles are rendered one at a
+    time so only one tile's raster buffers are alive. Returns the stitched image, nearest point index and depth.
+    """
+    image = nearest = depth = None
+    for tile in tiles:
+        y0, y1, x0, x1 = tile
+        tile_image, tile_nearest, tile_depth = render_tile(tile)
+        if len(tiles) == 1:
+            return tile_image, tile_nearest, tile_depth
+        if image is None:
+            image = tile_image.new_zeros((H, W, tile_image.shape[-1]))
+            nearest = tile_nearest.new_full((H, W), -1)
+            depth = tile_depth.new_zeros((H, W))
+        image[y0:y1, x0:x1] = tile_image
+        nearest[y0:y1, x0:x1] = tile_nearest
+        depth[y0:y1, x0:x1] = tile_depth
+    return image, nearest, depth
+
+
+def rasterize_point_tile(camera, pts: torch.Tensor, cols: torch.Tensor, H: int, W: int, radius: float,
+                         points_per_pixel: int = 20, point_inds: Optional[torch.Tensor] = None
+                         ) -> Tuple[torch.Tensor, torch.Tensor, torch.Tensor]:
+    """
+    Rasterize and alpha-composite points with PyTorch3D into an H x W image (or tile). Returns the (H, W, C) image,
+    the (H, W) index of the nearest point of every pixel (-1 where none; into point_inds if the points are a subset)
+    and its depth.
+    """
+    device = pts.device
+    if pts.shape[0] == 0:
+        return (
+            torch.zeros((H, W, cols.shape[1]), device=device),
+            torch.full((H, W), -1, dtype=torch.long, device=device),
+            torch.full((H, W), -1.0, device=device),
+        )
+    point_cloud = Pointclouds(points=[pts], features=[cols])
+    raster_settings = PointsRasterizationSettings(
+        image_size=(H, W),
+        radius=radius,
+        points_per_pixel=points_per_pixel,
+    )
+    fragments = PointsRasterizer(cameras=camera, raster_settings=raster_settings)(point_cloud)
+    image = composite_point_fragments(fragments, point_cloud, radius)[0]
+    nearest = fragments.idx[0, ..., 0].long()
+    if point_inds is not None:
+        nearest = torch.where(nearest >= 0, point_inds[nearest.clamp_min(0)], nearest)
+    return image, nearest, fragments.zbuf[0, ..., 0]
+
+
+def composite_point_fragments(fragments, point_cloud, radius: float) -> torch.Tensor:
+    """
+    Alpha-composite rasterized points as PointsRenderer does (weights 1 - d^2 / r^2, black background), so the
+    renderers can keep the fragments for the auxiliary channels. Returns (N, H, W, C) images.
+    """
+    weights = 1 - fragments.dists.permute(0, 3, 1, 2) / (radius * radius)
+    compositor = AlphaCompositor(background_color=(0.0, 0.0, 0.0))
+    images = compositor(fragments.idx.long().permute(0, 3, 1, 2), weights, point_cloud.features_packed().permute(1, 0))
+    return images.permute(0, 2, 3, 1)
+
+
 def render_points_pytorch3d(points_world, colors_world, K, T_c2w=None, T_w2c=None,
                             W=640, H=480, point_size=2, device="cuda",
                             original_image_size=None,
                             is_aria: bool = True,
                             background_mode="solid", background_color=(0.0, 0.0, 0.0),
-                            noise_range=(0, 255), seed=42):
+                            noise_range=(0, 255), seed=42,
+                            dynamic_points=None, dynamic_colors=None,
+                            normalize_colors: Optional[bool] = None,
+                            return_aux: bool = False,
+                            tile_memory_bytes: Optional[int] = None):
     """
     Render point cloud from ego view using PyTorch3D for a single image.
 
+    points_world / colors_world are host arrays, or tensors already on the render device (see DevicePointCloud).
+    dynamic_points / dynamic_colors are appended on the device (see assemble_render_points).
+    If return_aux, returns (image, aux) with the depth, coverage and static/dynamic label of the nearest rasterized
+    point of every pixel (see render_aux_from_nearest), rotated like the image.
+    With tile_memory_bytes, the image is rasterized in tiles whose fragment buffers fit that budget, each from the
+    points projecting into it (see plan_render_tiles), and stitched; tiles shift the principal point of the camera.
+
     Notes:
     - We use pytorch3d.utils.cameras_from_opencv_projection to correctly convert
       OpenCV-style intrinsics/extrinsics into a PyTorch3D camera (handles axis conventions).
     - No manual Y/Z flip or extra inverses are applied.
     """
 
+    require_pytorch3d()
     # Lazy import here to avoid touching your global imports
     from pytorch3d.utils import cameras_from_opencv_projection
 
@@ -899,87 +1611,63 @@ def render_points_pytorch3d(points_world, colors_world, K, T_c2w=None, T_w2c=Non
         bg_img = np.full((H, W, 3), background_color, dtype=np.float32)
 
     # Points / colors to tensors (with validity filtering)
-    pts_np = np.asarray(points_world, dtype=np.float32)
-    cols_np = np.asarray(colors_world, dtype=np.float32)
-
-    logger.info(f"Total points before filtering: {pts_np.shape[0]}")
-    logger.info(f"Point cloud bounds: min={pts_np.min(axis=0)}, max={pts_np.max(axis=0)}")
-    logger.info(f"Camera position: {t_cv}")
-
-    finite_mask = np.isfinite(pts_np).all(axis=1)
-    logger.info(f"Finite points: {finite_mask.sum()}/{len(finite_mask)}")
-    if finite_mask.sum() == 0:
-        logger.warning("No finite points found!")
-        return (bg_img * 255).astype(np.uint8)
-
-    pts_np = pts_np[finite_mask]
-    cols_np = cols_np[finite_mask]
-
-    # (Optional) clip out extremely large coordinates to avoid numeric issues
-    mag = np.linalg.norm(pts_np, axis=1)
-    keep = mag < 1e6
-    logger.info(f"Points after magnitude filter: {keep.sum()}/{len(keep)}")
-    pts_np = pts_np[keep]
-    cols_np = cols_np[keep]
-    if pts_np.shape[0] == 0:
-        logger.warning("No points after magnitude filtering!")
-        return (bg_img * 255).astype(np.uint8)
-    
-    # Check distance from camera to points
-    distances = np.linalg.norm(pts_np - t_cv.reshape(1, 3), axis=1)
-    logger.info(f"Distance to points: min={distances.min():.3f}, max={distances.max():.3f}, mean={distances.mean():.3f}")
-    logger.info(f"Final points for rendering: {pts_np.shape[0]}")
-
-    pts = torch.from_numpy(pts_np).to(device=device, dtype=torch.float32)
-    cols = torch.from_numpy(cols_np).to(device=device, dtype=torch.float32)
-    if cols.max() > 1.0:
-        cols = cols / 255.0
-
-    # Pointclouds expects lists
-    point_cloud = Pointclouds(points=[pts], features=[cols])
+    pts, cols, labels = assemble_render_points(
+        points_world, colors_world, dynamic_points, dynamic_colors, device=device, normalize_colors=normalize_colors,
+        return_labels=True,
+    )
+    if pts.shape[0] == 0:
+        logger.warning("No points to render!")
+        return _render_output((bg_img * 255).astype(np.uint8), empty_render_aux(H, W), return_aux)
+    logger.info(f"Final points for rendering: {pts.shape[0]}")
 
     # Scale intrinsics when rendering at a different resolution.
-    K_use = np.asarray(K, dtype=np.float32).copy()
-    if original_image_size is not None:
-        fx, fy = float(K_use[0, 0]), float(K_use[1, 1])
-        cx, cy = float(K_use[0, 2]), float(K_use[1, 2])
-        fx, fy, cx, cy = scale_intrinsics(fx, fy, cx, cy, original_image_size, (H, W))
-        K_use[0, 0], K_use[1, 1] = fx, fy
-        K_use[0, 2], K_use[1, 2] = cx, cy
+    K_use = resolve_pinhole_intrinsics(K, original_image_size, W, H)
 
     # Build camera from OpenCV intrinsics/extrinsics
     R_cv_t = torch.as_tensor(R_cv, dtype=torch.float32, device=device).unsqueeze(0)    # (1,3,3)
     t_cv_t = torch.as_tensor(t_cv, dtype=torch.float32, device=device).unsqueeze(0)    # (1,3)
-    K_t    = torch.as_tensor(K_use, dtype=torch.float32, device=device).unsqueeze(0)   # (1,3,3)
-    image_size_t = torch.tensor([[H, W]], dtype=torch.int64, device=device)            # (1,2)
-
-    camera = cameras_from_opencv_projection(
-        R=R_cv_t,
-        tvec=t_cv_t, 
-        camera_matrix=K_t, 
-        image_size=image_size_t
-    ).to(device)
 
     # Convert pixel point_size to NDC radius
-    px_to_ndc = 2.0 / max(W, H)
-    radius_ndc = float(point_size) * px_to_ndc
-    radius_ndc = max(1e-5, min(0.25, radius_ndc))  # safety clamp
-
-    # Rasterizer / Renderer
-    raster_settings = PointsRasterizationSettings(
-        image_size=(H, W),
-        radius=radius_ndc,
-        points_per_pixel=20,
-    )
-    rasterizer = PointsRasterizer(cameras=camera, raster_settings=raster_settings)
-    renderer = PointsRenderer(
-        rasterizer=rasterizer,
-        compositor=AlphaCompositor(background_color=(0.0, 0.0, 0.0)),
+    radius_ndc = point_radius_ndc(point_size, W, H)
+    radius_px = radius_ndc * min(W, H) / 2
+    points_per_pixel = 20
+    tiles = plan_render_tiles(
+        H, W, max_tile_pixels(tile_memory_bytes, points_per_pixel * PYTORCH3D_BYTES_PER_FRAGMENT)
     )
+    if len(tiles) > 1:
+        # Project once to pick the points of every tile; the rasterizer never draws points behind the camera.
+        pts_cam = pts @ R_cv_t[0].T + t_cv_t
+        z = pts_cam[:, 2]
+        pix = torch.stack(
+            [K_use[0, 0] * pts_cam[:, 0] / z + K_use[0, 2], K_use[1, 1] * pts_cam[:, 1] / z + K_use[1, 2]], dim=-1
+        )
+        pix[z <= 0] = float("nan")
+
+    def render_tile(tile):
+        y0, y1, x0, x1 = tile
+        tile_h, tile_w = y1 - y0, x1 - x0
+        point_inds = None if len(tiles) == 1 else points_in_tile(pix, tile, radius_px + 1.0)
+        tile_pts = pts if point_inds is None else pts[point_inds]
+        tile_cols = cols if point_inds is None else cols[point_inds]
+
+        K_tile = K_use.copy()
+        K_tile[0, 2] -= x0
+        K_tile[1, 2] -= y0
+        K_t = torch.as_tensor(K_tile, dtype=torch.float32, device=device).unsqueeze(0)      # (1,3,3)
+        image_size_t = torch.tensor([[tile_h, tile_w]], dtype=torch.int64, device=device)  # (1,2)
+
+        camera = cameras_from_opencv_projection(
+            R=R_cv_t,
+            tvec=t_cv_t, 
+            camera_matrix=K_t, 
+            image_size=image_size_t
+        ).to(device)
+        # Same radius in pixels as on the whole image.
+        radius = radius_ndc * (min(W, H) / min(tile_h, tile_w))
+        return rasterize_point_tile(camera, tile_pts, tile_cols, tile_h, tile_w, radius, points_per_pixel, point_inds)
 
     # Render
-    image = renderer(point_cloud)  # (1, H, W, C)
-    img = image[0]                 # (H, W, C)
+    img, nearest, zbuf = stitch_render_tiles(tiles, H, W, render_tile)  # (H, W, C), (H, W), (H, W)
 
     # Composite with background
     if img.shape[-1] == 4:  # RGBA
@@ -995,11 +1683,16 @@ def render_points_pytorch3d(points_world, colors_world, K, T_c2w=None, T_w2c=Non
     # Convert to uint8
     final_img_uint8 = (np.clip(final_img, 0.0, 1.0) * 255).astype(np.uint8)
     
+    aux = None
+    if return_aux:
+        aux = render_aux_from_nearest(nearest, zbuf, labels)
+
     # Only rotate for Aria-style orientation; standard cameras should keep native orientation.
     if is_aria:
         final_img_uint8 = cv2.rotate(final_img_uint8, cv2.ROTATE_90_CLOCKWISE)
+        aux = _rotate_render_aux(aux) if aux is not None else None
 
-    return final_img_uint8
+    return _render_output(final_img_uint8, aux, return_aux)
 
 def render_points_fisheye(points_world, colors_world, T_w2c, ego_intrinsics, W=640, H=480,
                          point_size=2, device="cuda",
@@ -1010,13 +1703,18 @@ def render_points_fisheye(points_world, colors_world, T_w2c, ego_intrinsics, W=6
                          original_image_size=None,
                          background_mode="solid", background_color=(0.0, 0.0, 0.0),
                          noise_range=(0, 255), seed=42,
-                         is_aria=True, near_clip=0.4):
+                         is_aria=True, near_clip=0.4,
+                         dynamic_points=None, dynamic_colors=None,
+                         normalize_colors: Optional[bool] = None,
+                         projection: Optional["FisheyeProjectionLUT"] = None,
+                         return_aux: bool = False,
+                         tile_memory_bytes: Optional[int] = None):
     """
     Render point cloud with fish-eye view using PyTorch3D FishEyeCameras.
     
     Args:
-        points_world: Nx3 array of 3D points in world coordinates
-        colors_world: Nx3 array of RGB colors
+        points_world: Nx3 array of 3D points in world coordinates (or a tensor on the render device)
+        colors_world: Nx3 array of RGB colors (or a tensor on the render device)
         T_w2c: 4x4 world-to-camera transformation matrix
         ego_intrinsics: 3x3 ego camera intrinsics matrix  
         W, H: Image dimensions
@@ -1030,6 +1728,14 @@ def render_points_fisheye(points_world, colors_world, T_w2c, ego_intrinsics, W=6
         background_color: Background color
         noise_range: Noise range for background
         seed: Random seed
+        dynamic_points, dynamic_colors: Per-frame points appended on the device (see assemble_render_points)
+        normalize_colors: Whether colors are 0-255; decided from the colors' max if None
+        projection: Precomputed projection of this camera (same intrinsics and distortion), used instead of
+            FishEyeCameras when given
+        return_aux: Also return the depth, coverage and static/dynamic label of the nearest rasterized point of
+            every pixel (see render_aux_from_nearest)
+        tile_memory_bytes: Rasterize in tiles whose fragment buffers fit this budget (see plan_render_tiles),
+            each with the points projecting into it and a camera mapped to the tile's NDC
     
     Note:
         Uses default fish-eye distortion coefficients [k1=-0.2, k2=0.1, k3=0.0, k4=0.0, k5=0.0, k6=0.0]
@@ -1037,8 +1743,10 @@ def render_points_fisheye(points_world, colors_world, T_w2c, ego_intrinsics, W=6
         coefficients should be calibrated and provided.
     
     Returns:
-        Rendered image as (H, W, 3) uint8 array
+        Rendered image as (H, W, 3) uint8 array, or (image, aux) if return_aux
     """
+    require_pytorch3d()
+
     # Resolve device
     device = torch.device(device if torch.cuda.is_available() else "cpu")
     
@@ -1063,80 +1771,25 @@ def render_points_fisheye(points_world, colors_world, T_w2c, ego_intrinsics, W=6
         bg_img = np.full((H, W, 3), background_color, dtype=np.float32)
     
     # Points / colors to tensors (with validity filtering)
-    pts_np = np.asarray(points_world, dtype=np.float32)
-    cols_np = np.asarray(colors_world, dtype=np.float32)
-    
-    logger.info(f"Fish-eye rendering - Total points before filtering: {pts_np.shape[0]}")
-    logger.info("Using FishEyeCameras for authentic fish-eye distortion")
-    
-    finite_mask = np.isfinite(pts_np).all(axis=1)
-    if finite_mask.sum() == 0:
+    pts, cols, labels = assemble_render_points(
+        points_world, colors_world, dynamic_points, dynamic_colors, device=device, normalize_colors=normalize_colors,
+        return_labels=True,
+    )
+    logger.info(f"Fish-eye rendering - Points after validity filtering: {pts.shape[0]}")
+    if pts.shape[0] == 0:
         logger.warning("No finite points found for fish-eye rendering!")
-        return (bg_img * 255).astype(np.uint8)
+        return _render_output((bg_img * 255).astype(np.uint8), empty_render_aux(H, W), return_aux)
     
-    pts_np = pts_np[finite_mask]
-    cols_np = cols_np[finite_mask]
-    
-    # Filter out extremely large coordinates
-    mag = np.linalg.norm(pts_np, axis=1)
-    keep = mag < 1e6
-    pts_np = pts_np[keep]
-    cols_np = cols_np[keep]
-    if pts_np.shape[0] == 0:
-        logger.warning("No points after magnitude filtering for fish-eye!")
-        return (bg_img * 255).astype(np.uint8)
-    
-    #TODO: test
     # Filter near-plane points (e.g., ego wearer's own head reconstructed from exo view)
     # Camera world position: cam_pos = -R^T @ t (since p_cam = R @ p_world + t)
-    cam_pos_world = -R_cv.T @ t_cv
-    distances = np.linalg.norm(pts_np - cam_pos_world.reshape(1, 3), axis=1)
-    logger.info(f"Fish-eye distance to camera: min={distances.min():.3f}, max={distances.max():.3f}")
-    near_keep = distances > near_clip
-    logger.info(f"Points after near-plane filter (>{near_clip}m): {near_keep.sum()}/{len(near_keep)}")
-    pts_np = pts_np[near_keep]
-    cols_np = cols_np[near_keep]
-    if pts_np.shape[0] == 0:
+    cam_pos_world = torch.as_tensor(-R_cv.T @ t_cv, dtype=torch.float32, device=device)
+    near_keep = torch.linalg.norm(pts - cam_pos_world[None], dim=1) > near_clip
+    pts, cols, labels = pts[near_keep], cols[near_keep], labels[near_keep]
+    if pts.shape[0] == 0:
         logger.warning("No points after near-plane filtering for fish-eye!")
-        return (bg_img * 255).astype(np.uint8)
-    logger.info(f"Final points for fish-eye rendering: {pts_np.shape[0]}")
-
-    pts = torch.from_numpy(pts_np).to(device=device, dtype=torch.float32)
-    cols = torch.from_numpy(cols_np).to(device=device, dtype=torch.float32)
-    if cols.max() > 1.0:
-        cols = cols / 255.0
-
-    # Create Pointclouds
-    point_cloud = Pointclouds(points=[pts], features=[cols])
-    
-    # Flip Y and Z axes to convert from OpenCV to PyTorch3D
-    # This is the same transformation that cameras_from_opencv_projection does internally
-    coord_transform_between_opencv_and_pytorch = np.array([
-        [-1,  0,  0],
-        [ 0, -1,  0],
-        [ 0,  0,  1]
-    ], dtype=np.float32)
+        return _render_output((bg_img * 255).astype(np.uint8), empty_render_aux(H, W), return_aux)
+    logger.info(f"Final points for fish-eye rendering: {pts.shape[0]}")
 
-    if is_aria:
-        # Aria cameras have a non-standard coordinate convention;
-        # apply an extra CCW 90-degree rotation to align axes.
-        coord_transform_for_aria_cam = np.array([
-            [ 0,  1,  0],
-            [-1,  0,  0],
-            [ 0,  0,  1]
-        ], dtype=np.float32)
-        coord_transform_total = coord_transform_between_opencv_and_pytorch @ coord_transform_for_aria_cam
-    else:
-        # Standard OpenCV cameras: only need OpenCV -> PyTorch3D conversion
-        coord_transform_total = coord_transform_between_opencv_and_pytorch
-
-    # Apply coordinate transformation to rotation and translation
-    R_pt3d = R_cv.T @ coord_transform_total
-    t_pt3d = coord_transform_total.T @ t_cv
-
-    R_t = torch.from_numpy(R_pt3d).to(device=device, dtype=torch.float32).unsqueeze(0)  # (1,3,3)
-    T_t = torch.from_numpy(t_pt3d).to(device=device, dtype=torch.float32).unsqueeze(0)  # (1,3)
-    
     # FishEyeCameras requires radial distortion parameters
     if radial_distortion_coeffs is None or len(radial_distortion_coeffs) == 0:
         raise ValueError("radial_distortion_coeffs must be provided")
@@ -1145,73 +1798,102 @@ def render_points_fisheye(points_world, colors_world, T_w2c, ego_intrinsics, W=6
     if thinPrism_distortion_coeffs is None or len(thinPrism_distortion_coeffs) == 0:
         raise ValueError("thinPrism_distortion_coeffs must be provided")
     
-    radial_distortion = torch.tensor([radial_distortion_coeffs], device=device, dtype=torch.float32)
-    tangential_distortion = torch.tensor([tangential_distortion_coeffs], device=device, dtype=torch.float32)
-    thinPrism_distortion = torch.tensor([thinPrism_distortion_coeffs], device=device, dtype=torch.float32)
+    # Convert pixel point_size to appropriate radius
+    radius_ndc = point_radius_ndc(point_size, W, H)
+    points_per_pixel = 20
+    tiles = plan_render_tiles(
+        H, W, max_tile_pixels(tile_memory_bytes, points_per_pixel * PYTORCH3D_BYTES_PER_FRAGMENT)
+    )
 
-    # Use focal_length and principal_point from online_calibration if available
-    if focal_length is not None and principal_point is not None:
-        f = focal_length[0]
-        cx, cy = principal_point[0], principal_point[1]
-        logger.info(f"Using intrinsics from online_calibration: f={f:.1f}, cx={cx:.1f}, cy={cy:.1f}")
-        
-        # Scale intrinsics if original image size is provided
-        if original_image_size:
-            f, cx, cy = scale_intrinsics(f, cx, cy, original_image_size, (H, W))
-        else:
-            logger.warning("original_image_size not provided, intrinsics may be incorrect for the target resolution.")
+    if projection is not None:
+        # Project with the camera's precomputed lookup table and rasterize the resulting NDC points through an
+        # identity orthographic camera (x, y and z kept as is) instead of evaluating FishEyeCameras per point.
+        R_t = torch.as_tensor(R_cv, dtype=torch.float32, device=device)
+        t_t = torch.as_tensor(t_cv, dtype=torch.float32, device=device)
+        pts_cam = (pts @ R_t.T + t_t[None]) @ torch.as_tensor(fisheye_camera_axes(is_aria), device=device)
+        # The rasterizer never draws points behind the camera.
+        in_front = pts_cam[:, 2] > 0
+        pts_cam, cols, labels = pts_cam[in_front], cols[in_front], labels[in_front]
+        if pts_cam.shape[0] == 0:
+            logger.warning("No points in front of the fish-eye camera!")
+            return _render_output((bg_img * 255).astype(np.uint8), empty_render_aux(H, W), return_aux)
+        render_pts = torch.cat([projection.project_ndc(pts_cam), pts_cam[:, 2:3]], dim=1)
+        pts_ndc = render_pts[:, :2]
+
+        def tile_camera(scale, offset):
+            # Tiles map the NDC of the whole image to their own (see tile_ndc_transform).
+            return OrthographicCameras(focal_length=((scale, scale),), principal_point=(offset,), device=device)
     else:
-        # Fallback to ego_intrinsics if online calibration data is not provided
-        f = ego_intrinsics[0,0]#, ego_intrinsics[1,1]
-        cx, cy = ego_intrinsics[0,2], ego_intrinsics[1,2]
-        logger.info(f"Using intrinsics from ego_intrinsics: f={f:.1f}, cx={cx:.1f}, cy={cy:.1f}")
+        render_pts = pts
     
-    def _pix_to_ndc(f, cx, cy, W, H):
-        f_ndc = 2.0 * f / W # W = H
-        cx_ndc = 2.0 * (cx / W) - 1.0
-        cy_ndc = 1.0 - 2.0 * (cy / H)
-        return f_ndc, cx_ndc, cy_ndc
-
-    f_ndc, cx_ndc, cy_ndc = _pix_to_ndc(f, cx, cy, W, H) # FishEyeCameras.in_ndc == True
-
-    logger.info(f"OpenCV principal point: cx={cx:.1f}, cy={cy:.1f}")
-    logger.info(f"PyTorch3D principal point(ndc): cx={cx_ndc:.1f}, cy={cy_ndc:.1f}")
-    
-    focal_length_tensor = torch.tensor([f_ndc], device=device, dtype=torch.float32)
-    principal_point_tensor = torch.tensor([[cx_ndc, cy_ndc]], device=device, dtype=torch.float32)
-    
-    camera = FishEyeCameras(
-        device=device,
-        R=R_t,
-        T=T_t,
-        radial_params=radial_distortion,
-        tangential_params=tangential_distortion,
-        thin_prism_params=thinPrism_distortion,
-        focal_length=focal_length_tensor,
-        principal_point=principal_point_tensor,
-        world_coordinates=True # default: False
-    )
-    
-    # Convert pixel point_size to appropriate radius
-    px_to_ndc = 2.0 / max(W, H)
-    radius_ndc = float(point_size) * px_to_ndc
-    radius_ndc = max(1e-5, min(0.25, radius_ndc))  # safety clamp
+        coord_transform_total = fisheye_camera_axes(is_aria)
+
+        # Apply coordinate transformation to rotation and translation
+        R_pt3d = R_cv.T @ coord_transform_total
+        t_pt3d = coord_transform_total.T @ t_cv
+
+        R_t = torch.from_numpy(R_pt3d).to(device=device, dtype=torch.float32).unsqueeze(0)  # (1,3,3)
+        T_t = torch.from_numpy(t_pt3d).to(device=device, dtype=torch.float32).unsqueeze(0)  # (1,3)
     
-    # Rasterizer / Renderer
-    raster_settings = PointsRasterizationSettings(
-        image_size=(H, W),
-        radius=radius_ndc,
-        points_per_pixel=20,
-    )
-    rasterizer = PointsRasterizer(cameras=camera, raster_settings=raster_settings)
-    renderer = PointsRenderer(
-        rasterizer=rasterizer,
-        compositor=AlphaCompositor(background_color=(0.0, 0.0, 0.0)),
-    )
+        radial_distortion = torch.tensor([radial_distortion_coeffs], device=device, dtype=torch.float32)
+        tangential_distortion = torch.tensor([tangential_distortion_coeffs], device=device, dtype=torch.float32)
+        thinPrism_distortion = torch.tensor([thinPrism_distortion_coeffs], device=device, dtype=torch.float32)
+
+        # Use focal_length and principal_point from online_calibration if available
+        f, cx, cy = resolve_fisheye_intrinsics(ego_intrinsics, focal_length, principal_point, original_image_size, W, H)
+        f_ndc, cx_ndc, cy_ndc = _fisheye_pix_to_ndc(f, cx, cy, W, H) # FishEyeCameras.in_ndc == True
+
+        logger.info(f"OpenCV principal point: cx={cx:.1f}, cy={cy:.1f}")
+        logger.info(f"PyTorch3D principal point(ndc): cx={cx_ndc:.1f}, cy={cy_ndc:.1f}")
+
+        if len(tiles) > 1:
+            # Same projection as FishEyeCameras, only to pick the points of every tile.
+            pts_cam = pts @ R_t[0] + T_t
+            z = pts_cam[:, 2]
+            uv_distorted = fisheye_distort(
+                pts_cam[:, :2] / z[:, None],
+                radial_distortion_coeffs, tangential_distortion_coeffs, thinPrism_distortion_coeffs,
+            )
+            pts_ndc = f_ndc * uv_distorted + torch.tensor([cx_ndc, cy_ndc], device=device)
+            pts_ndc[z <= 0] = float("nan")
+
+        def tile_camera(scale, offset):
+            # Tiles map the NDC of the whole image to their own (see tile_ndc_transform).
+            focal_length_tensor = torch.tensor([f_ndc * scale], device=device, dtype=torch.float32)
+            principal_point_tensor = torch.tensor(
+                [[cx_ndc * scale + offset[0], cy_ndc * scale + offset[1]]], device=device, dtype=torch.float32
+            )
+            return FishEyeCameras(
+                device=device,
+                R=R_t,
+                T=T_t,
+                radial_params=radial_distortion,
+                tangential_params=tangential_distortion,
+                thin_prism_params=thinPrism_distortion,
+                focal_length=focal_length_tensor,
+                principal_point=principal_point_tensor,
+                world_coordinates=True # default: False
+            )
+
+    if len(tiles) > 1:
+        # PyTorch3D NDC (+X left, +Y up, shorter side spanning [-1, 1]) to pixel coordinates.
+        half_size = min(W, H) / 2
+        pix = torch.stack([W / 2 - pts_ndc[:, 0] * half_size, H / 2 - pts_ndc[:, 1] * half_size], dim=-1)
+        margin_px = radius_ndc * half_size + 1.0
+
+    def render_tile(tile):
+        point_inds = None if len(tiles) == 1 else points_in_tile(pix, tile, margin_px)
+        tile_pts = render_pts if point_inds is None else render_pts[point_inds]
+        tile_cols = cols if point_inds is None else cols[point_inds]
+        scale, offset_x, offset_y = tile_ndc_transform(tile, W, H)
+        y0, y1, x0, x1 = tile
+        return rasterize_point_tile(
+            tile_camera(scale, (offset_x, offset_y)), tile_pts, tile_cols, y1 - y0, x1 - x0, radius_ndc * scale,
+            points_per_pixel, point_inds,
+        )
     
     # Render
-    image = renderer(point_cloud)  # (1, H, W, C)
-    img = image[0]                 # (H, W, C)
+    img, nearest, zbuf = stitch_render_tiles(tiles, H, W, render_tile)  # (H, W, C), (H, W), (H, W)
     
     # Composite with background
     if img.shape[-1] == 4:  # RGBA
@@ -1230,7 +1912,285 @@ def render_points_fisheye(points_world, colors_world, T_w2c, ego_intrinsics, W=6
     # Apply simple 90-degree rotation to fix image orientation
     # final_img_rotated = cv2.rotate(final_img_uint8, cv2.ROTATE_90_CLOCKWISE)
 
-    return final_img_uint8 #final_img_rotated
+    aux = None
+    if return_aux:
+        aux = render_aux_from_nearest(nearest, zbuf, labels)
+    return _render_output(final_img_uint8, aux, return_aux) #final_img_rotated
+
+def splat_points_zbuffer(pix: torch.Tensor, depth: torch.Tensor, colors: torch.Tensor, H: int, W: int,
+                         radius_px: float, max_pairs: int = 1 << 24,
+                         tile: Optional[Tuple[int, int, int, int]] = None
+                         ) -> Tuple[torch.Tensor, torch.Tensor, torch.Tensor, torch.Tensor]:
+    """
+    Z-buffer point splatting in plain torch (no PyTorch3D), used by the "zbuffer" renderer.
+
+    Every point with positive depth covers the pixels whose centers lie within radius_px of its projection `pix`
+    (pixel coordinates, pixel (i, j) centered at (j + 0.5, i + 0.5) as in the PyTorch3D rasterizer), and each pixel
+    takes the color of the nearest covering point (the first one on ties). Points are expanded into pixels in chunks
+    of at most max_pairs (point, pixel) pairs. If a tile (y0, y1, x0, x1) is given, only that window of the image is
+    rendered, with the same result as cropping the whole image.
+
+    Returns the (H, W, C) image, the (H, W) coverage mask, the (H, W) depth buffer (inf where uncovered) and the
+    (H, W) index of the nearest point (-1 where uncovered), or their (y1 - y0, x1 - x0) tile.
+    """
+    device = pix.device
+    y0, y1, x0, x1 = tile if tile is not None else (0, H, 0, W)
+    H, W = y1 - y0, x1 - x0
+    n_pixels = H * W
+    reach = int(math.ceil(radius_px + 0.5))
+    offsets = torch.arange(-reach, reach + 1, device=device)
+    off_y, off_x = torch.meshgrid(offsets, offsets, indexing="ij")
+    # A point lies within half a pixel of its pixel's center, so only these offsets can be within the radius.
+    reachable = (off_x.abs() - 0.5).clamp_min(0) ** 2 + (off_y.abs() - 0.5).clamp_min(0) ** 2 < radius_px**2
+    off_x, off_y = off_x[reachable].reshape(1, -1), off_y[reachable].reshape(1, -1)
+
+    # Points whose splat cannot reach the image are dropped before expanding them into pixels.
+    u, v = pix[:, 0], pix[:, 1]
+    in_reach = (u > x0 - reach) & (u < x1 + reach) & (v > y0 - reach) & (v < y1 + reach)
+    in_reach &= (depth > 0) & torch.isfinite(depth)
+    point_inds = torch.nonzero(in_reach).squeeze(1)
+
+    # The bits of positive floats sort like the floats, so (depth bits, point index) packed into one int64 gives the
+    # nearest point of every pixel, and the first one on ties, with a single min-reduction.
+    depth_bits = depth.to(torch.float32).contiguous().view(torch.int32).to(torch.int64)
+    no_point = torch.iinfo(torch.int64).max
+    # Pairs that miss the image or the radius go to an extra, discarded bin.
+    nearest = torch.full((n_pixels + 1,), no_point, dtype=torch.int64, device=device)
+    chunk_size = max(1, max_pairs // off_x.shape[1])
+    for start in range(0, point_inds.shape[0], chunk_size):
+        inds = point_inds[start:start + chunk_size]
+        u, v = pix[inds, 0:1], pix[inds, 1:2]
+        px = torch.floor(u).long() + off_x
+        py = torch.floor(v).long() + off_y
+        dist_sq = (px + 0.5 - u) ** 2 + (py + 0.5 - v) ** 2
+        covered = (dist_sq < radius_px**2) & (px >= x0) & (px < x1) & (py >= y0) & (py < y1)
+        pixel_ids = torch.where(covered, (py - y0) * W + px - x0, n_pixels)
+        keys = (depth_bits[inds] << 32 | inds)[:, None].expand_as(pixel_ids)
+        nearest.scatter_reduce_(0, pixel_ids.reshape(-1), keys.reshape(-1), reduce="amin")
+
+    nearest = nearest[:n_pixels]
+    coverage = nearest != no_point
+    winner = nearest[coverage] & 0xFFFFFFFF
+    image = torch.zeros((n_pixels, colors.shape[1]), dtype=colors.dtype, device=device)
+    image[coverage] = colors[winner]
+    zbuffer = torch.full((n_pixels,), float("inf"), dtype=depth.dtype, device=device)
+    zbuffer[coverage] = depth[winner]
+    nearest = torch.where(coverage, nearest & 0xFFFFFFFF, -1)
+    return image.view(H, W, -1), coverage.view(H, W), zbuffer.view(H, W), nearest.view(H, W)
+
+
+def splat_points_zbuffer_tiled(pix: torch.Tensor, depth: torch.Tensor, colors: torch.Tensor, H: int, W: int,
+                               radius_px: float, tile_memory_bytes: Optional[int] = None
+                               ) -> Tuple[torch.Tensor, torch.Tensor, torch.Tensor, torch.Tensor]:
+    """splat_points_zbuffer over the tiles of plan_render_tiles whose z-buffers fit tile_memory_bytes, stitched."""
+    tiles = plan_render_tiles(H, W, max_tile_pixels(tile_memory_bytes, ZBUFFER_BYTES_PER_PIXEL))
+
+    def render_tile(tile):
+        image, _, zbuffer, nearest = splat_points_zbuffer(pix, depth, colors, H, W, radius_px, tile=tile)
+        return image, nearest, zbuffer
+
+    image, nearest, zbuffer = stitch_render_tiles(tiles, H, W, render_tile)
+    return image, nearest >= 0, zbuffer, nearest
+
+
+def _w2c_rotation_translation(T_w2c: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    if T_w2c.shape == (4, 4):
+        R_cv, t_cv = T_w2c[:3, :3], T_w2c[:3, 3]
+    elif T_w2c.shape == (3, 4):
+        R_cv, t_cv = T_w2c[:, :3], T_w2c[:, 3]
+    else:
+        raise ValueError(f"T_w2c must be (3,4) or (4,4), got {T_w2c.shape}")
+    assert np.isfinite(R_cv).all(), "R has NaN/Inf"
+    assert np.isfinite(t_cv).all(), "t has NaN/Inf"
+    return R_cv, t_cv
+
+
+def _background_image(W, H, background_mode, background_color, noise_range, seed) -> np.ndarray:
+    if background_mode != "solid":
+        return generate_background(W, H, background_mode, background_color, noise_range, seed)
+    return np.full((H, W, 3), background_color, dtype=np.float32)
+
+
+def _composite_zbuffer(image: torch.Tensor, coverage: torch.Tensor, bg_img: np.ndarray) -> np.ndarray:
+    rendered_rgb = image[..., :3].clamp(0, 1).cpu().numpy()
+    final_img = np.where(coverage.cpu().numpy()[..., None], rendered_rgb, bg_img)
+    return (np.clip(final_img, 0.0, 1.0) * 255).astype(np.uint8)
+
+
+def render_points_zbuffer(points_world, colors_world, K, T_c2w=None, T_w2c=None,
+                          W=640, H=480, point_size=2, device="cpu",
+                          original_image_size=None,
+                          is_aria: bool = True,
+                          background_mode="solid", background_color=(0.0, 0.0, 0.0),
+                          noise_range=(0, 255), seed=42,
+                          dynamic_points=None, dynamic_colors=None,
+                          normalize_colors: Optional[bool] = None,
+                          return_aux: bool = False,
+                          tile_memory_bytes: Optional[int] = None):
+    """
+    Drop-in replacement of render_points_pytorch3d that splats the points into a z-buffer with plain torch ops,
+    for machines without a GPU or without PyTorch3D.
+
+    Uses the same pinhole projection, splat radius and Aria rotation, but every pixel takes the color of its nearest
+    point instead of alpha-compositing the nearest points_per_pixel ones, and uncovered pixels show the background.
+    If return_aux, returns (image, aux) with the depth, coverage and label of the z-buffer (see
+    render_aux_from_nearest), rotated like the image. tile_memory_bytes bounds the per-tile z-buffer as in
+    render_points_pytorch3d.
+    """
+    device = torch.device(device if torch.cuda.is_available() else "cpu")
+    if T_w2c is None:
+        assert T_c2w is not None, "Provide either T_w2c or T_c2w."
+        T_w2c = np.linalg.inv(T_c2w)
+    R_cv, t_cv = _w2c_rotation_translation(T_w2c)
+    assert np.isfinite(K).all(), "K has NaN/Inf"
+    bg_img = _background_image(W, H, background_mode, background_color, noise_range, seed)
+
+    pts, cols, labels = assemble_render_points(
+        points_world, colors_world, dynamic_points, dynamic_colors, device=device, normalize_colors=normalize_colors,
+        return_labels=True,
+    )
+    if pts.shape[0] == 0:
+        logger.warning("No points to render!")
+        return _render_output((bg_img * 255).astype(np.uint8), empty_render_aux(H, W), return_aux)
+
+    K_use = resolve_pinhole_intrinsics(K, original_image_size, W, H)
+    R_t = torch.as_tensor(R_cv, dtype=torch.float32, device=device)
+    t_t = torch.as_tensor(t_cv, dtype=torch.float32, device=device)
+    pts_cam = pts @ R_t.T + t_t[None]
+    # The rasterizer never draws points behind the camera.
+    in_front = pts_cam[:, 2] > 0
+    pts_cam, cols, labels = pts_cam[in_front], cols[in_front], labels[in_front]
+    z = pts_cam[:, 2]
+    pix = torch.stack(
+        [K_use[0, 0] * pts_cam[:, 0] / z + K_use[0, 2], K_use[1, 1] * pts_cam[:, 1] / z + K_use[1, 2]], dim=-1
+    )
+
+    radius_px = point_radius_ndc(point_size, W, H) * min(W, H) / 2
+    image, coverage, zbuffer, nearest = splat_points_zbuffer_tiled(pix, z, cols, H, W, radius_px, tile_memory_bytes)
+    final_img_uint8 = _composite_zbuffer(image, coverage, bg_img)
+    aux = render_aux_from_nearest(nearest, zbuffer, labels) if return_aux else None
+
+    # Only rotate for Aria-style orientation; standard cameras should keep native orientation.
+    if is_aria:
+        final_img_uint8 = cv2.rotate(final_img_uint8, cv2.ROTATE_90_CLOCKWISE)
+        aux = _rotate_render_aux(aux) if aux is not None else None
+    return _render_output(final_img_uint8, aux, return_aux)
+
+
+def render_points_zbuffer_fisheye(points_world, colors_world, T_w2c, ego_intrinsics, W=640, H=480,
+                                  point_size=2, device="cpu",
+                                  radial_distortion_coeffs=None,
+                                  tangential_distortion_coeffs=None,
+                                  thinPrism_distortion_coeffs=None,
+                                  focal_length=None, principal_point=None,
+                                  original_image_size=None,
+                                  background_mode="solid", background_color=(0.0, 0.0, 0.0),
+                                  noise_range=(0, 255), seed=42,
+                                  is_aria=True, near_clip=0.4,
+                                  dynamic_points=None, dynamic_colors=None,
+                                  normalize_colors: Optional[bool] = None,
+                                  projection: Optional[FisheyeProjectionLUT] = None,
+                                  return_aux: bool = False,
+                                  tile_memory_bytes: Optional[int] = None):
+    """
+    Drop-in replacement of render_points_fisheye that splats the points into a z-buffer with plain torch ops.
+
+    Points are projected with the same FisheyeRadTanThinPrism model and axes as FishEyeCameras (see
+    fisheye_camera_axes and fisheye_distort), or with the precomputed `projection` of the camera if given,
+    after the same near-plane filter. If return_aux, returns (image, aux) with the depth, coverage and label of the
+    z-buffer (see render_aux_from_nearest). tile_memory_bytes bounds the per-tile z-buffer.
+    """
+    device = torch.device(device if torch.cuda.is_available() else "cpu")
+    R_cv, t_cv = _w2c_rotation_translation(T_w2c)
+    if radial_distortion_coeffs is None or len(radial_distortion_coeffs) == 0:
+        raise ValueError("radial_distortion_coeffs must be provided")
+    if tangential_distortion_coeffs is None or len(tangential_distortion_coeffs) == 0:
+        raise ValueError("tangential_distortion_coeffs must be provided")
+    if thinPrism_distortion_coeffs is None or len(thinPrism_distortion_coeffs) == 0:
+        raise ValueError("thinPrism_distortion_coeffs must be provided")
+    bg_img = _background_image(W, H, background_mode, background_color, noise_range, seed)
+
+    pts, cols, labels = assemble_render_points(
+        points_world, colors_world, dynamic_points, dynamic_colors, device=device, normalize_colors=normalize_colors,
+        return_labels=True,
+    )
+    R_t = torch.as_tensor(R_cv, dtype=torch.float32, device=device)
+    t_t = torch.as_tensor(t_cv, dtype=torch.float32, device=device)
+    pts_cam = pts @ R_t.T + t_t[None]
+    # Distance to the camera center, as the near-plane filter of render_points_fisheye.
+    near_keep = torch.linalg.norm(pts_cam, dim=1) > near_clip
+    pts_cam, cols, labels = pts_cam[near_keep], cols[near_keep], labels[near_keep]
+    if pts_cam.shape[0] == 0:
+        logger.warning("No points after near-plane filtering for fish-eye!")
+        return _render_output((bg_img * 255).astype(np.uint8), empty_render_aux(H, W), return_aux)
+
+    pts_cam = pts_cam @ torch.as_tensor(fisheye_camera_axes(is_aria), device=device)
+    in_front = pts_cam[:, 2] > 0
+    pts_cam, cols, labels = pts_cam[in_front], cols[in_front], labels[in_front]
+    z = pts_cam[:, 2]
+
+    if projection is not None:
+        ndc = projection.project_ndc(pts_cam)
+        ndc_x, ndc_y = ndc[:, 0], ndc[:, 1]
+    else:
+        f, cx, cy = resolve_fisheye_intrinsics(
+            ego_intrinsics, focal_length, principal_point, original_image_size, W, H
+        )
+        f_ndc, cx_ndc, cy_ndc = _fisheye_pix_to_ndc(f, cx, cy, W, H)
+        uv_distorted = fisheye_distort(
+            pts_cam[:, :2] / z[:, None],
+            radial_distortion_coeffs, tangential_distortion_coeffs, thinPrism_distortion_coeffs,
+        )
+        ndc_x = f_ndc * uv_distorted[:, 0] + cx_ndc
+        ndc_y = f_ndc * uv_distorted[:, 1] + cy_ndc
+    # PyTorch3D NDC (+X left, +Y up, shorter side spanning [-1, 1]) to pixel coordinates.
+    half_size = min(W, H) / 2
+    pix = torch.stack([W / 2 - ndc_x * half_size, H / 2 - ndc_y * half_size], dim=-1)
+
+    radius_px = point_radius_ndc(point_size, W, H) * half_size
+    image, coverage, zbuffer, nearest = splat_points_zbuffer_tiled(pix, z, cols, H, W, radius_px, tile_memory_bytes)
+    aux = render_aux_from_nearest(nearest, zbuffer, labels) if return_aux else None
+    return _render_output(_composite_zbuffer(image, coverage, bg_img), aux, return_aux)
+
+
+def render_aux_paths(video_path: str) -> Tuple[str, str]:
+    """Depth and mask sidecars of a rendered prior video, e.g. ego_Prior_depth.zip and ego_Prior_mask.zip."""
+    stem = os.path.splitext(video_path)[0]
+    return f"{stem}_depth.zip", f"{stem}_mask.zip"
+
+
+class RenderAuxWriter:
+    """
+    Streams the auxiliary channels of rendered frames into lossless sidecars next to the prior video, laid out like
+    the ViPE depth and mask artifacts (one zip entry per frame, named by its index in the video):
+      <stem>_depth.zip: {frame:05d}.npy float32 depth of the nearest point, 0 where no point was drawn
+      <stem>_mask.zip:  {frame:05d}.png uint8 RENDER_LABEL_* per pixel (coverage is label != RENDER_LABEL_EMPTY)
+    """
+
+    def __init__(self, video_path: str) -> None:
+        self.depth_path, self.mask_path = render_aux_paths(video_path)
+        self._depth_zip = zipfile.ZipFile(self.depth_path, "w", zipfile.ZIP_DEFLATED)
+        self._mask_zip = zipfile.ZipFile(self.mask_path, "w", zipfile.ZIP_DEFLATED)
+        self.n_frames = 0
+
+    def write(self, aux: dict) -> None:
+        depth_buffer = io.BytesIO()
+        np.save(depth_buffer, aux["depth"].astype(np.float32))
+        self._depth_zip.writestr(f"{self.n_frames:05d}.npy", depth_buffer.getvalue())
+        _, mask_buffer = cv2.imencode(".png", aux["label"].astype(np.uint8))
+        self._mask_zip.writestr(f"{self.n_frames:05d}.png", mask_buffer.tobytes())
+        self.n_frames += 1
+
+    def close(self) -> None:
+        self._depth_zip.close()
+        self._mask_zip.close()
+
+    def __enter__(self) -> "RenderAuxWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
 
 def project_points_to_image_sequential(bg_points_3d: np.ndarray, bg_colors: np.ndarray,
                                       ego_extrinsics_list: List[np.ndarray], ego_intrinsics: np.ndarray,
@@ -1242,7 +2202,16 @@ def project_points_to_image_sequential(bg_points_3d: np.ndarray, bg_colors: np.n
                                       T_cam_to_world: Optional[np.ndarray] = None,
                                       only_bg: bool = False,
                                       is_aria: bool = True,
-                                      near_clip: float = 0.4) -> List[np.ndarray]:
+                                      near_clip: float = 0.4,
+                                      frustum_culling: bool = True,
+                                      cull_chunk_size: float = 0.25,
+                                      per_frame_calibration: bool = True,
+                                      calibration_start_idx: int = 0,
+                                      artifact_start_idx: int = 0,
+                                      renderer: str = "pytorch3d",
+                                      fisheye_lut: bool = True,
+                                      aux_writer: Optional[RenderAuxWriter] = None,
+                                      tile_memory_mb: Optional[float] = None) -> List[np.ndarray]:
     """
     Project 3D points to 2D images using ego camera poses with individual rendering.
     
@@ -1256,6 +2225,16 @@ def project_points_to_image_sequential(bg_points_3d: np.ndarray, bg_colors: np.n
         use_fisheye: Whether to use fish-eye rendering (180-degree FOV)
         online_calibration_path: Path to online_calibration.jsonl for real distortion coeffs
         original_image_size: (H, W) of the original ego camera(Project Aria in Ego-Exo4D), for scaling intrinsics
+        frustum_culling: Only pass the background chunks inside the view frustum (fisheye: view cone) to the renderer
+        cull_chunk_size: Edge length (m) of the voxel chunks used for culling
+        per_frame_calibration: Use the online calibration of every frame instead of the first one only
+        calibration_start_idx: Online calibration record of the first rendered frame (i.e. the start frame)
+        artifact_start_idx: Artifact frame of the first rendered frame, for the dynamic points
+        renderer: "pytorch3d" (rasterizer with alpha compositing) or "zbuffer" (torch z-buffer splatting, no PyTorch3D)
+        fisheye_lut: Project fisheye points with a lookup table built once per calibration (FisheyeProjectionLUT)
+        aux_writer: If given, receives the depth, coverage and static/dynamic label of every frame from the same
+            rasterization as its image
+        tile_memory_mb: Render each frame in tiles whose raster buffers fit this budget (MB) instead of in one pass
     
     Returns:
         List of rendered images as HxWx3 arrays
@@ -1264,9 +2243,19 @@ def project_points_to_image_sequential(bg_points_3d: np.ndarray, bg_colors: np.n
     num_frames = len(ego_extrinsics_list)
     
     if len(bg_points_3d) == 0 and artifact_path is None:
+        if aux_writer is not None:
+            for _ in range(num_frames):
+                aux_writer.write(empty_render_aux(height, width))
         return [np.zeros((height, width, 3), dtype=np.uint8) for _ in range(num_frames)]
     
     rendered_images = []
+    tile_memory_bytes = int(tile_memory_mb * 1024**2) if tile_memory_mb is not None else None
+    if renderer == "zbuffer":
+        render_pinhole, render_fisheye = render_points_zbuffer, render_points_zbuffer_fisheye
+    elif renderer == "pytorch3d":
+        render_pinhole, render_fisheye = render_points_pytorch3d, render_points_fisheye
+    else:
+        raise ValueError(f"Unknown renderer '{renderer}', expected one of {RENDERERS}")
     
     # Load Aria distortion coefficients if using fish-eye
     # load_aria_distortion_coeffs will return defaults if online_calibration_path is None
@@ -1306,38 +2295,103 @@ def project_points_to_image_sequential(bg_points_3d: np.ndarray, bg_colors: np.n
         except Exception as e:
             logger.error(f"Failed to load distortion coefficients: {e}")
             raise
-    
-    # Process each frame individually, building dynamic points per-frame and concatenating with background
+
+    # Time-varying online calibration: records are parsed lazily from an index shared within the process.
+    online_calibration = None
+    if use_fisheye and online_calibration_path and per_frame_calibration:
+        online_calibration = get_aria_online_calibration(online_calibration_path)
+        logger.info(
+            f"Using per-frame online calibration from record {calibration_start_idx} "
+            f"({len(online_calibration)} records)"
+        )
+    frame_calibration = None
+
+    # The background is uploaded to the render device once; each frame only uploads its dynamic points.
+    # With culling, the background is also indexed into chunks and each frame only gathers the chunks it can see.
+    render_device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+    bg_cloud = DevicePointCloud(
+        bg_points_3d, bg_colors, device=render_device, chunk_size=cull_chunk_size if frustum_culling else None
+    )
+    margin_ndc = point_radius_ndc(point_size, width, height)
+    if bg_cloud.index is not None and not use_fisheye:
+        K_render = resolve_pinhole_intrinsics(ego_intrinsics, aria_original_size, width, height)
+        margin_px = margin_ndc * max(width, height) + 2.0
+    # Per-camera fisheye state (culling cone, projection table), rebuilt whenever the calibration changes.
+    fisheye_camera_stale = use_fisheye
+    fisheye_projection = None
+    cone_half_angle = None
+    
+    # Process each frame individually, building dynamic points per-frame and appending them to the background
     for frame_idx, ego_extrinsic in enumerate(tqdm(ego_extrinsics_list, desc="Rendering frames")):
         # Build dynamic points for this frame if artifact_path is provided
         # If only_bg is True, skip building dynamic points to speed up rendering
         if (not only_bg) and artifact_path is not None and T_cam_to_world is not None:
-            dyn_points, dyn_colors = build_dynamic_points_for_frame(artifact_path, frame_idx, T_cam_to_world)
+            dyn_points, dyn_colors = build_dynamic_points_for_frame(artifact_path, artifact_start_idx + frame_idx,
+                                                                   T_cam_to_world)
         else:
             dyn_points, dyn_colors = np.empty((0, 3)), np.empty((0, 3))
 
-        # Concatenate background + dynamic
-        if dyn_points.size == 0:
-            points_to_render = bg_points_3d
-            colors_to_render = bg_colors
-        else:
-            points_to_render = np.vstack([bg_points_3d, dyn_points])
-            colors_to_render = np.vstack([bg_colors, dyn_colors])
-
         # ego_extrinsics is already W2C format in 4x4, use directly as transformation matrix
         T_w2c = ego_extrinsic
 
+        if online_calibration is not None:
+            record = online_calibration[calibration_start_idx + frame_idx]
+            if record[0] is None:
+                logger.warning(f"No usable online calibration for frame {frame_idx}, keeping the previous one")
+            elif record is not frame_calibration:
+                frame_calibration = record
+                (   aria_radial_distortion,
+                    aria_tan_distortion,
+                    aria_thin_distortion,
+                    aria_focal_length,
+                    aria_principal_point
+                ) = frame_calibration
+                fisheye_camera_stale = True
+
+        if fisheye_camera_stale:
+            f, cx, cy = resolve_fisheye_intrinsics(
+                ego_intrinsics, aria_focal_length, aria_principal_point, aria_original_size, width, height
+            )
+            f_ndc, cx_ndc, cy_ndc = _fisheye_pix_to_ndc(f, cx, cy, width, height)
+            fisheye_distortion = (aria_radial_distortion, aria_tan_distortion, aria_thin_distortion)
+            if fisheye_lut:
+                fisheye_projection = FisheyeProjectionLUT(
+                    f_ndc, (cx_ndc, cy_ndc), *fisheye_distortion, device=render_device
+                )
+                logger.debug(f"Fisheye projection table error bound: {fisheye_projection.max_error_ndc:.2e} NDC")
+            if bg_cloud.index is not None:
+                cone_half_angle = fisheye_cone_half_angle(
+                    f_ndc, (cx_ndc, cy_ndc), *fisheye_distortion, margin_ndc=2.0 * margin_ndc
+                )
+                logger.debug(f"Culling background to a {np.rad2deg(cone_half_angle):.1f} deg fisheye cone")
+            fisheye_camera_stale = False
+
+        visible_chunks = None
+        if bg_cloud.index is not None:
+            if use_fisheye:
+                visible_chunks = bg_cloud.index.cull_cone(T_w2c, cone_half_angle, near_clip)
+            else:
+                visible_chunks = bg_cloud.index.cull_pinhole(T_w2c, K_render, width, height, margin_px)
+        frame_bg_points, frame_bg_colors = bg_cloud.select(visible_chunks)
+
+        # The renderers rescale 0-255 colors based on the max color, so decide that on the whole background.
+        dyn_colors_max = float(np.max(dyn_colors)) if np.size(dyn_colors) > 0 else 0.0
+        normalize_colors = max(bg_cloud.colors_max, dyn_colors_max) > 1.0
+
         # Choose rendering function based on fish-eye option
         if use_fisheye:
-            rendered_image = render_points_fisheye(
-                points_world=points_to_render,
-                colors_world=colors_to_render,
+            rendered_image = render_fisheye(
+                points_world=frame_bg_points,
+                colors_world=frame_bg_colors,
+                dynamic_points=dyn_points,
+                dynamic_colors=dyn_colors,
+                normalize_colors=normalize_colors,
                 T_w2c=T_w2c,
                 ego_intrinsics=ego_intrinsics,
                 W=width,
                 H=height,
                 point_size=point_size,
-                device="cuda" if torch.cuda.is_available() else "cpu",
+                device=render_device,
                 radial_distortion_coeffs=aria_radial_distortion,
                 tangential_distortion_coeffs=aria_tan_distortion,
                 thinPrism_distortion_coeffs=aria_thin_distortion,
@@ -1347,25 +2401,36 @@ def project_points_to_image_sequential(bg_points_3d: np.ndarray, bg_colors: np.n
                 background_mode="solid",
                 background_color=(0.0, 0.0, 0.0),
                 is_aria=is_aria,
-                near_clip=near_clip
+                near_clip=near_clip,
+                projection=fisheye_projection,
+                return_aux=aux_writer is not None,
+                tile_memory_bytes=tile_memory_bytes,
             )
         else:
             # Regular perspective rendering
-            rendered_image = render_points_pytorch3d(
-                points_world=points_to_render,
-                colors_world=colors_to_render,
+            rendered_image = render_pinhole(
+                points_world=frame_bg_points,
+                colors_world=frame_bg_colors,
+                dynamic_points=dyn_points,
+                dynamic_colors=dyn_colors,
+                normalize_colors=normalize_colors,
                 K=ego_intrinsics,
                 T_w2c=T_w2c,
                 W=width,
                 H=height,
                 point_size=point_size,
-                device="cuda" if torch.cuda.is_available() else "cpu",
+                device=render_device,
                 original_image_size=aria_original_size,
                 is_aria=is_aria,
                 background_mode="solid",
-                background_color=(0.0, 0.0, 0.0)
+                background_color=(0.0, 0.0, 0.0),
+                return_aux=aux_writer is not None,
+                tile_memory_bytes=tile_memory_bytes,
             )
 
+        if aux_writer is not None:
+            rendered_image, aux = rendered_image
+            aux_writer.write(aux)
         rendered_images.append(rendered_image)
 
         if frame_idx % 10 == 0:
@@ -1384,10 +2449,19 @@ def get_parser():
     parser.add_argument("--batch_size", type=int, default=8, help="Batch size for rendering (default: 8)")
     parser.add_argument("--only_bg", action="store_true", help="Only render background points")
     parser.add_argument("--use_mean_bg", action="store_true", help="Use nanmean background instead of standard background")
+    parser.add_argument("--mean_bg_outlier_sigma", type=float, default=None, help="With --use_mean_bg: reject depth samples more than this many standard deviations from the running mean of their pixel (e.g. 2.5). Default: plain nanmean.")
     parser.add_argument("--fish_eye_rendering", action="store_true", help="Enable fish-eye rendering with 360-degree view")
     parser.add_argument("--online_calibration_path", type=str, default=None, help="(Optional) Path to online_calibration.jsonl file for real Aria distortion coefficients. If not provided, uses default Ego-Exo4D fisheye distortion coefficients.")
     parser.add_argument("--no_aria", action="store_true", help="Disable Aria-specific coordinate transform and image rotation. Use for standard OpenCV cameras (e.g., H2O dataset).")
     parser.add_argument("--near_clip", type=float, default=0.4, help="Filter points closer than this distance (meters) to ego camera. Useful for removing ego wearer's head/body. (default: 0.4)")
+    parser.add_argument("--no_frustum_culling", action="store_true", help="Pass the whole background cloud to the renderer for every frame instead of only the chunks in view.")
+    parser.add_argument("--renderer", type=str, default="pytorch3d", choices=RENDERERS, help="Point renderer: 'pytorch3d' (rasterizer with alpha compositing) or 'zbuffer' (nearest point per pixel in plain torch, fast on CPU and needs no PyTorch3D).")
+    parser.add_argument("--exact_fisheye_projection", action="store_true", help="Evaluate the fisheye distortion model per point instead of interpolating its precomputed radial lookup table.")
+    parser.add_argument("--image_size", type=int, nargs=2, default=(448, 448), metavar=("H", "W"), help="Rendering resolution (default: 448 448).")
+    parser.add_argument("--tile_memory_mb", type=float, default=None, help="Render each frame in tiles whose raster buffers fit this many MB (e.g. for 1024x1024 or larger priors). Default: whole frames.")
+    parser.add_argument("--no_render_aux", action="store_true", help="Do not write the depth (<prior>_depth.zip) and static/dynamic mask (<prior>_mask.zip) sidecars next to the rendered video.")
+    parser.add_argument("--window_background", action="store_true", help="Build the background from the rendered frames only, which may then be any window inside the inference range. Consecutive overlapping windows rendered in one process (render_vipe_batch.py) only unproject their new frames.")
+    parser.add_argument("--static_online_calibration", action="store_true", help="Render every frame with the first record of --online_calibration_path instead of each frame's own calibration.")
     parser.add_argument("--render_target", type=str, default="ego", choices=("ego", "exo"),
                         help="Render to ego view (exo->ego) or exo view (ego->exo). Default: ego.")
     parser.add_argument("--artifact_name", type=str, default=None,
@@ -1455,7 +2529,8 @@ def get_inference_frame_range(input_dir: str, artifact_name: Optional[str] = Non
 
 def validate_frame_range(args, total_frames_available: int, input_dir: str):
     """
-    Validate that frame range arguments exactly match the inference results range.
+    Validate that frame range arguments exactly match the inference results range
+    (with --window_background: lie within it).
     
     Args:
         args: Parsed command line arguments with start_frame and end_frame
@@ -1475,12 +2550,19 @@ def validate_frame_range(args, total_frames_available: int, input_dir: str):
     if args.end_frame <= args.start_frame:
         raise ValueError(f"end_frame ({args.end_frame}) must be greater than start_frame ({args.start_frame})")
     
-    # Check exact match with inference range
-    if args.start_frame != inference_start:
-        raise ValueError(f"start_frame ({args.start_frame}) must match inference range start ({inference_start})")
-    
-    if args.end_frame != inference_end:
-        raise ValueError(f"end_frame ({args.end_frame}) must match inference range end ({inference_end})")
+    if getattr(args, "window_background", False):
+        if args.start_frame < inference_start or args.end_frame > inference_end:
+            raise ValueError(
+                f"Frame range [{args.start_frame}, {args.end_frame}] must lie within the inference range "
+                f"[{inference_start}, {inference_end}]"
+            )
+    else:
+        # Check exact match with inference range
+        if args.start_frame != inference_start:
+            raise ValueError(f"start_frame ({args.start_frame}) must match inference range start ({inference_start})")
+
+        if args.end_frame != inference_end:
+            raise ValueError(f"end_frame ({args.end_frame}) must match inference range end ({inference_end})")
     
     if args.start_frame >= total_frames_available:
         raise ValueError(f"start_frame ({args.start_frame}) exceeds available frames ({total_frames_available})")
@@ -1491,11 +2573,16 @@ def validate_frame_range(args, total_frames_available: int, input_dir: str):
     num_frames_to_render = args.end_frame - args.start_frame + 1
     logger.info(f"Frame range validation passed. Rendering frames [{args.start_frame}, {args.end_frame}] ({num_frames_to_render} frames)")
 
-def main():
-    parser = get_parser()
-    
-    args = parser.parse_args()
+def render_prior(args: argparse.Namespace, backgrounds: Optional[dict] = None) -> Optional[str]:
+    """
+    Render one prior video as configured by arguments parsed with get_parser().
 
+    If a `backgrounds` dict is given, background point clouds are looked up in it and added to it, keyed by their
+    source, so that jobs over several frame ranges of the same take build them once (see render_vipe_batch.py).
+    With --window_background it holds the background accumulators instead, so that each window only adds the
+    frames it does not share with the previous window of the take.
+    Returns the path of the rendered video, or None if there was nothing to render.
+    """
     use_gtdepth = getattr(args, "gtdepth_dir", None) is not None
     if not use_gtdepth and not args.input_dir:
         raise ValueError("Either --input_dir (ViPE results) or --gtdepth_dir must be provided.")
@@ -1552,7 +2639,49 @@ def main():
         T_cam_to_world = np.linalg.inv(exo_extrinsic)
         logger.info("Render target: ego (exo->ego), world = exo frame")
 
+    # Everything the background depends on: the GT depth cloud is built from the rendered frame range only.
     if use_gtdepth:
+        background_key = ("gtdepth", os.path.realpath(args.gtdepth_dir), os.path.realpath(args.meta_json_path),
+                          args.start_frame, args.end_frame)
+    else:
+        background_key = ("mean" if getattr(args, 'use_mean_bg', False) else "standard",
+                          os.path.realpath(args.input_dir), artifact_name, getattr(args, "mean_bg_outlier_sigma", None))
+    background_key += (T_cam_to_world.tobytes(),)
+
+    # Background of the rendered window only, in artifact frame indices.
+    artifact_frame_range = None
+    if getattr(args, "window_background", False) and not use_gtdepth:
+        inference_start = get_inference_frame_range(args.input_dir, artifact_name)[0]
+        artifact_frame_range = (args.start_frame - inference_start, args.end_frame - inference_start)
+        background_key += ("window",)
+
+    if artifact_frame_range is not None:
+        accumulator = backgrounds.get(background_key) if backgrounds is not None else None
+        if getattr(args, 'use_mean_bg', False):
+            if accumulator is None:
+                accumulator = MeanBackgroundAccumulator("cuda" if torch.cuda.is_available() else "cpu",
+                                                        outlier_sigma=getattr(args, "mean_bg_outlier_sigma", None))
+            logger.info(f"Building NANMEAN background point cloud of artifact frames {artifact_frame_range} "
+                        f"from {args.input_dir}")
+            global_points_bg, global_colors_bg, pointcloud_image_size = build_mean_background_pointcloud(
+                args.input_dir, T_cam_to_world, artifact_name=artifact_name,
+                frame_range=artifact_frame_range, accumulator=accumulator
+            )
+        else:
+            if accumulator is None:
+                accumulator = BackgroundAccumulator()
+            logger.info(f"Building standard background point cloud of artifact frames {artifact_frame_range} "
+                        f"from {args.input_dir}")
+            global_points_bg, global_colors_bg, pointcloud_image_size = build_background_pointcloud(
+                args.input_dir, T_cam_to_world, artifact_name=artifact_name,
+                frame_range=artifact_frame_range, accumulator=accumulator
+            )
+        if backgrounds is not None:
+            backgrounds[background_key] = accumulator
+    elif backgrounds is not None and background_key in backgrounds:
+        logger.info(f"Reusing the {background_key[0]} background point cloud of {background_key[1]}")
+        global_points_bg, global_colors_bg, pointcloud_image_size = backgrounds[background_key]
+    elif use_gtdepth:
         exo_rgb_path = Path(sample["exo_path"]).resolve()
         if not exo_rgb_path.exists():
             exo_rgb_path = (Path.cwd() / sample["exo_path"].lstrip("./")).resolve()
@@ -1575,17 +2704,20 @@ def main():
     elif getattr(args, 'use_mean_bg', False):
         logger.info(f"Building NANMEAN background point cloud from {args.input_dir}")
         global_points_bg, global_colors_bg, pointcloud_image_size = build_mean_background_pointcloud(
-            args.input_dir, T_cam_to_world, artifact_name=artifact_name
+            args.input_dir, T_cam_to_world, artifact_name=artifact_name,
+            outlier_sigma=getattr(args, "mean_bg_outlier_sigma", None)
         )
     else:
         logger.info(f"Building standard background point cloud from {args.input_dir}")
         global_points_bg, global_colors_bg, pointcloud_image_size = build_background_pointcloud(
             args.input_dir, T_cam_to_world, artifact_name=artifact_name
         )
+    if backgrounds is not None and artifact_frame_range is None:
+        backgrounds[background_key] = (global_points_bg, global_colors_bg, pointcloud_image_size)
     
     if len(global_points_bg) == 0:
         logger.error("No points in background point cloud. Exiting.")
-        return
+        return None
     
     logger.info(f"Pointcloud source resolution: {pointcloud_image_size[0]} x {pointcloud_image_size[1]} (H x W)")
     render_original_image_size = pointcloud_image_size
@@ -1600,11 +2732,13 @@ def main():
         else:
             logger.warning("Could not resolve exo artifact resolution; continuing with pointcloud source resolution.")
     
-    # Use fixed resolution for rendering
-    fixed_image_size = (448, 448)  # (height, width)
-    logger.info(f"Using fixed rendering resolution: {fixed_image_size[0]} x {fixed_image_size[1]} (H x W)")
+    # Rendering resolution (448x448 unless --image_size is given)
+    fixed_image_size = tuple(args.image_size)  # (height, width)
+    logger.info(f"Using rendering resolution: {fixed_image_size[0]} x {fixed_image_size[1]} (H x W)")
+    if args.tile_memory_mb is not None:
+        logger.info(f"Rendering in tiles within {args.tile_memory_mb:.0f} MB of raster buffers")
     if render_target != 'exo' and getattr(args, 'override_ego_intrinsics', None) is not None:
-        render_original_image_size = fixed_image_size  # override values are already for 448x448, skip scaling
+        render_original_image_size = (448, 448)  # override values are for 448x448, scaled to the rendering resolution
 
     if not use_gtdepth:
         validate_frame_range(args, len(ego_extrinsics_list), args.input_dir)
@@ -1660,21 +2794,7 @@ def main():
         only_bg_render = args.only_bg
 
     is_aria = not getattr(args, 'no_aria', False)
-    rendered_images = project_points_to_image_sequential(
-        global_points_bg, global_colors_bg, render_extrinsics, render_intrinsic,
-        fixed_image_size, args.point_size, use_fisheye=fish_eye_enabled,
-        online_calibration_path=online_calib_path,
-        original_image_size=render_original_image_size,
-        artifact_path=artifact_path,
-        T_cam_to_world=T_cam_to_world,
-        only_bg=only_bg_render,
-        is_aria=is_aria,
-        near_clip=args.near_clip
-    )
 
-    # Save images returned by the renderer as MP4 video
-    import imageio
-    
     # Extract video name from input_dir (e.g., vipe_results/YOUR_VIPE_RESULT -> YOUR_VIPE_RESULT)
     # Use the configured output directory (already includes video_name)
     os.makedirs(args.out_dir, exist_ok=True)
@@ -1685,6 +2805,35 @@ def main():
     if render_target != "exo" and getattr(args, "override_ego_intrinsics", None) is not None:
         prior_name = prior_name.replace(".mp4", "_gtint.mp4")
     output_video_path = os.path.join(args.out_dir, prior_name)
+
+    # Depth and static/dynamic masks are written next to the video while rendering (see RenderAuxWriter).
+    aux_context = contextlib.nullcontext() if args.no_render_aux else RenderAuxWriter(output_video_path)
+    with aux_context as aux_writer:
+        rendered_images = project_points_to_image_sequential(
+            global_points_bg, global_colors_bg, render_extrinsics, render_intrinsic,
+            fixed_image_size, args.point_size, use_fisheye=fish_eye_enabled,
+            online_calibration_path=online_calib_path,
+            original_image_size=render_original_image_size,
+            artifact_path=artifact_path,
+            T_cam_to_world=T_cam_to_world,
+            only_bg=only_bg_render,
+            is_aria=is_aria,
+            near_clip=args.near_clip,
+            frustum_culling=not args.no_frustum_culling,
+            per_frame_calibration=not args.static_online_calibration,
+            calibration_start_idx=args.start_frame,
+            artifact_start_idx=artifact_frame_range[0] if artifact_frame_range is not None else 0,
+            renderer=args.renderer,
+            fisheye_lut=not args.exact_fisheye_projection,
+            aux_writer=aux_writer,
+            tile_memory_mb=args.tile_memory_mb,
+        )
+    if aux_writer is not None:
+        logger.info(f"Saved render depth to {aux_writer.depth_path} and masks to {aux_writer.mask_path}")
+
+    # Save images returned by the renderer as MP4 video
+    import imageio
+    
     # exo->ego: ego_Prior.mp4; ego->exo: exo_Prior.mp4 — different names, no overwrite when both run
     logger.info(f"Saving rendered frames as MP4 at 30 FPS: {output_video_path}")
     
@@ -1698,6 +2847,14 @@ def main():
     
     logger.info(f"Rendering complete. Saved {num_frames_to_render} frames to {output_video_path}")
     logger.info(f"Used sequential processing for stability with {render_mode} rendering")
+    return output_video_path
+
+
+def main():
+    parser = get_parser()
+    
+    args = parser.parse_args()
+    render_prior(args)
 
 if __name__ == "__main__":
     main()
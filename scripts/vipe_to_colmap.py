@@ -2,9 +2,10 @@
 
 import argparse
 import logging
+import struct
 
 from pathlib import Path
-from typing import Tuple
+from typing import BinaryIO, TextIO, Tuple
 
 import cv2
 import imageio
@@ -48,165 +49,264 @@ def matrix_to_colmap_pose(c2w_matrix: np.ndarray) -> Tuple[np.ndarray, np.ndarra
     return quaternion, translation
 
 
-def write_cameras_txt(output_dir: Path, artifact: ArtifactPath, frame_width: int, frame_height: int):
-    """Write COLMAP cameras.txt file."""
-    cameras_file = output_dir / "cameras.txt"
+# COLMAP camera model id of PINHOLE, see colmap/src/colmap/sensor/models.h
+COLMAP_PINHOLE_MODEL_ID = 1
 
+# Record layout of a points3D.bin entry with an empty track.
+POINTS3D_BIN_DTYPE = np.dtype(
+    [
+        ("point3d_id", "<u8"),
+        ("xyz", "<f8", (3,)),
+        ("rgb", "u1", (3,)),
+        ("error", "<f8"),
+        ("track_length", "<u8"),
+    ]
+)
+
+# Voxel keys are packed into a single int64 with 21 bits per axis.
+_VOXEL_KEY_BITS = 21
+_VOXEL_KEY_OFFSET = 1 << (_VOXEL_KEY_BITS - 1)
+
+
+def write_cameras(output_dir: Path, artifact: ArtifactPath, frame_width: int, frame_height: int, binary: bool):
+    """Write COLMAP cameras.txt / cameras.bin file."""
     _, intrinsics, camera_types = read_intrinsics_artifacts(artifact.intrinsics_path)
 
     # Use first frame's intrinsics (assuming constant intrinsics)
     assert camera_types[0] == CameraType.PINHOLE, "Only PINHOLE camera type is supported"
-    fx, fy, cx, cy = intrinsics[0].cpu().numpy()
-
-    with open(cameras_file, "w") as f:
-        f.write("# Camera list with one line of data per camera:\n")
-        f.write("#   CAMERA_ID, MODEL, WIDTH, HEIGHT, PARAMS[]\n")
-        f.write("# Number of cameras: 1\n")
+    fx, fy, cx, cy = intrinsics[0].cpu().numpy().astype(np.float64)
 
-        fx, fy, cx, cy = intrinsics[0]
-
-        # COLMAP camera format: CAMERA_ID MODEL WIDTH HEIGHT fx fy cx cy
-        f.write(f"1 PINHOLE {frame_width} {frame_height} {fx:.6f} {fy:.6f} {cx:.6f} {cy:.6f}\n")
+    if binary:
+        with open(output_dir / "cameras.bin", "wb") as f:
+            f.write(struct.pack("<Q", 1))
+            f.write(struct.pack("<iiQQ", 1, COLMAP_PINHOLE_MODEL_ID, frame_width, frame_height))
+            f.write(struct.pack("<4d", fx, fy, cx, cy))
+    else:
+        with open(output_dir / "cameras.txt", "w") as f:
+            f.write("# Camera list with one line of data per camera:\n")
+            f.write("#   CAMERA_ID, MODEL, WIDTH, HEIGHT, PARAMS[]\n")
+            f.write("# Number of cameras: 1\n")
 
-    logger.info(f"Written cameras.txt with intrinsics: fx={fx:.2f}, fy={fy:.2f}, cx={cx:.2f}, cy={cy:.2f}")
+            # COLMAP camera format: CAMERA_ID MODEL WIDTH HEIGHT fx fy cx cy
+            f.write(f"1 PINHOLE {frame_width} {frame_height} {fx:.6f} {fy:.6f} {cx:.6f} {cy:.6f}\n")
 
+    logger.info(f"Written cameras with intrinsics: fx={fx:.2f}, fy={fy:.2f}, cx={cx:.2f}, cy={cy:.2f}")
 
-def write_images_txt(output_dir: Path, artifact: ArtifactPath):
-    """Write COLMAP images.txt file."""
-    images_file = output_dir / "images.txt"
 
+def write_images(output_dir: Path, artifact: ArtifactPath, binary: bool):
+    """Write COLMAP images.txt / images.bin file."""
     # Load pose data
     pose_data = np.load(artifact.pose_path)
     poses = pose_data["data"]  # Shape: (N, 4, 4)
     indices = pose_data["inds"]  # Frame indices
 
-    with open(images_file, "w") as f:
-        f.write("# Image list with two lines of data per image:\n")
-        f.write("#   IMAGE_ID, QW, QX, QY, QZ, TX, TY, TZ, CAMERA_ID, NAME\n")
-        f.write("#   POINTS2D[] as (X, Y, POINT3D_ID)\n")
-        f.write(f"# Number of images: {len(poses)}\n")
+    # Batched conversion of c2w to COLMAP w2c (quaternion as w, x, y, z)
+    w2c = np.linalg.inv(poses)
+    quat_xyzw = Rotation.from_matrix(w2c[:, :3, :3]).as_quat()
+    quaternions = np.concatenate([quat_xyzw[:, 3:], quat_xyzw[:, :3]], axis=1)
+    translations = w2c[:, :3, 3]
+    image_names = [f"images/frame_{frame_idx:06d}.jpg" for frame_idx in indices]
+
+    if binary:
+        with open(output_dir / "images.bin", "wb") as f:
+            f.write(struct.pack("<Q", len(poses)))
+            for i, (quaternion, translation, image_name) in enumerate(zip(quaternions, translations, image_names)):
+                f.write(struct.pack("<i4d3di", i + 1, *quaternion, *translation, 1))
+                f.write(image_name.encode("utf-8") + b"\x00")
+                # No 2D-3D correspondences
+                f.write(struct.pack("<Q", 0))
+    else:
+        with open(output_dir / "images.txt", "w") as f:
+            f.write("# Image list with two lines of data per image:\n")
+            f.write("#   IMAGE_ID, QW, QX, QY, QZ, TX, TY, TZ, CAMERA_ID, NAME\n")
+            f.write("#   POINTS2D[] as (X, Y, POINT3D_ID)\n")
+            f.write(f"# Number of images: {len(poses)}\n")
 
-        for i, (pose_matrix, frame_idx) in enumerate(zip(poses, indices)):
-            # Convert pose to COLMAP format
-            quaternion, translation = matrix_to_colmap_pose(pose_matrix)
-            qw, qx, qy, qz = quaternion
-            tx, ty, tz = translation
+            for i, (quaternion, translation, image_name) in enumerate(zip(quaternions, translations, image_names)):
+                qw, qx, qy, qz = quaternion
+                tx, ty, tz = translation
+                f.write(f"{i + 1} {qw:.9f} {qx:.9f} {qy:.9f} {qz:.9f} {tx:.9f} {ty:.9f} {tz:.9f} 1 {image_name}\n")
+                # Empty points2D line (no 2D-3D correspondences)
+                f.write("\n")
 
-            # Image filename
-            image_name = f"images/frame_{frame_idx:06d}.jpg"
+    logger.info(f"Written images with {len(poses)} images")
 
-            # Write image line
-            f.write(f"{i + 1} {qw:.9f} {qx:.9f} {qy:.9f} {qz:.9f} {tx:.9f} {ty:.9f} {tz:.9f} 1 {image_name}\n")
-            # Empty points2D line (no 2D-3D correspondences)
-            f.write("\n")
 
-    logger.info(f"Written images.txt with {len(poses)} images")
+class Points3DWriter:
+    """
+    Stream 3D points to COLMAP points3D.txt and/or points3D.bin in per-frame batches.
 
+    The number of points is unknown until all frames are processed, so the count in the header is
+    written as a placeholder and patched when the writer is closed.
+    Points can be optionally voxel-downsampled (first point per voxel is kept across all frames).
+    With output_format="both" every batch is filtered once and written to both files.
 
-def write_points3d_txt_from_slam_map(output_dir: Path, artifact: ArtifactPath):
-    """Write points3D.txt from SLAM map (placeholder implementation)."""
-    assert artifact.slam_map_path.exists(), "SLAM map not found, please refer to README.md for more details."
+    Note that the text format keeps the visualization-only track of the legacy exporter
+    (`IMAGE_ID POINT3D_ID 0 0 0 0`, i.e. three (IMAGE_ID, POINT2D_IDX) pairs), while the
+    binary format stores empty tracks since there are no 2D observations.
+    """
 
-    slam_map = SLAMMap.load(artifact.slam_map_path, device=torch.device("cpu"))
+    TEXT_COUNT_PREFIX = "# Number of points: "
+    TEXT_COUNT_WIDTH = 20
+    TEXT_ROW_FMT = "%d %.6f %.6f %.6f %d %d %d %.6f %d %d %d %d %d %d\n"
+
+    def __init__(self, output_dir: Path, output_format: str = "text", voxel_size: float | None = None):
+        assert output_format in ("text", "binary", "both"), f"Unknown output format: {output_format}"
+        self.voxel_size = voxel_size
+        self.num_points = 0
+        self._seen_voxel_keys = np.empty((0,), dtype=np.int64)
+        self._count_offset = 0
+        self.binary_file: BinaryIO | None = None
+        self.text_file: TextIO | None = None
+
+        if output_format in ("binary", "both"):
+            self.binary_file = open(output_dir / "points3D.bin", "wb")
+            self.binary_file.write(struct.pack("<Q", 0))
+        if output_format in ("text", "both"):
+            self.text_file = open(output_dir / "points3D.txt", "w")
+            self.text_file.write("# 3D point list with one line of data per point:\n")
+            self.text_file.write("#   POINT3D_ID, X, Y, Z, R, G, B, ERROR, TRACK[] as (IMAGE_ID, POINT2D_IDX)\n")
+            self._count_offset = self.text_file.tell() + len(self.TEXT_COUNT_PREFIX)
+            self.text_file.write(f"{self.TEXT_COUNT_PREFIX}{0:<{self.TEXT_COUNT_WIDTH}d}\n")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def _voxel_filter(self, xyz: np.ndarray) -> np.ndarray:
+        """Returns indices of points occupying a voxel not seen before."""
+        voxel = np.floor(xyz / self.voxel_size).astype(np.int64) + _VOXEL_KEY_OFFSET
+        voxel = np.clip(voxel, 0, (1 << _VOXEL_KEY_BITS) - 1)
+        keys = (voxel[:, 0] << (2 * _VOXEL_KEY_BITS)) | (voxel[:, 1] << _VOXEL_KEY_BITS) | voxel[:, 2]
+        keys, first_inds = np.unique(keys, return_index=True)
+        is_new = ~np.isin(keys, self._seen_voxel_keys, assume_unique=True)
+        self._seen_voxel_keys = np.union1d(self._seen_voxel_keys, keys[is_new])
+        return np.sort(first_inds[is_new])
+
+    def write(self, xyz: np.ndarray, rgb: np.ndarray, image_id: int):
+        """
+        Args:
+            xyz: (N, 3) world-space points.
+            rgb: (N, 3) uint8 colors.
+            image_id: COLMAP image id the points are unprojected from.
+        """
+        if self.voxel_size is not None and self.voxel_size > 0 and len(xyz) > 0:
+            keep = self._voxel_filter(xyz)
+            xyz, rgb = xyz[keep], rgb[keep]
+
+        n_points = len(xyz)
+        if n_points == 0:
+            return
+        point_ids = np.arange(self.num_points + 1, self.num_points + n_points + 1, dtype=np.uint64)
+
+        if self.binary_file is not None:
+            records = np.zeros(n_points, dtype=POINTS3D_BIN_DTYPE)
+            records["point3d_id"] = point_ids
+            records["xyz"] = xyz
+            records["rgb"] = rgb
+            self.binary_file.write(records.tobytes())
+        if self.text_file is not None:
+            # Integer fields are stored as exact float64 values and printed with %d.
+            table = np.zeros((n_points, 14), dtype=np.float64)
+            table[:, 0] = point_ids
+            table[:, 1:4] = xyz
+            table[:, 4:7] = rgb
+            table[:, 8] = image_id
+            table[:, 9] = point_ids
+            # The last 4 values are for visualization purposes.
+            # A single format call over the whole batch instead of one per row.
+            self.text_file.write((self.TEXT_ROW_FMT * n_points) % tuple(table.ravel().tolist()))
+
+        self.num_points += n_points
+
+    def close(self):
+        if self.binary_file is not None and not self.binary_file.closed:
+            self.binary_file.seek(0)
+            self.binary_file.write(struct.pack("<Q", self.num_points))
+            self.binary_file.close()
+        if self.text_file is not None and not self.text_file.closed:
+            self.text_file.seek(self._count_offset)
+            self.text_file.write(f"{self.num_points:<{self.TEXT_COUNT_WIDTH}d}")
+            self.text_file.close()
+
+
+def write_points3d_from_slam_map(
+    output_dir: Path, artifact: ArtifactPath, output_format: str, voxel_size: float | None
+):
+    """Write points3D from SLAM map."""
+    assert (
+        artifact.slam_map_path.exists() or artifact.legacy_slam_map_path.exists()
+    ), "SLAM map not found, please refer to README.md for more details."
 
-    points3d_file = output_dir / "points3D.txt"
-    with open(points3d_file, "w") as f:
-        f.write("# 3D point list with one line of data per point:\n")
-        f.write("#   POINT3D_ID, X, Y, Z, R, G, B, ERROR, TRACK[] as (IMAGE_ID, POINT2D_IDX)\n")
-        f.write(f"# Number of points: {slam_map.dense_disp_xyz.shape[0]}\n")
+    slam_map = SLAMMap.load(artifact.slam_map_path, device=torch.device("cpu"))
 
-        point_id = 1
+    with Points3DWriter(output_dir, output_format, voxel_size) as writer:
         for keyframe_idx, frame_idx in enumerate(slam_map.dense_disp_frame_inds):
             xyz, rgb = slam_map.get_dense_disp_pcd(keyframe_idx)
-            xyz = xyz.cpu().numpy()
-            rgb = rgb.cpu().numpy()
+            xyz = xyz.cpu().numpy().astype(np.float64)
+            rgb = (rgb.cpu().numpy() * 255).astype(np.uint8)
+            writer.write(xyz, rgb, frame_idx)
 
-            for xyz, rgb in zip(xyz, rgb):
-                x, y, z = xyz
-                r, g, b = (rgb * 255).astype(np.uint8)
-                f.write(f"{point_id} {x:.6f} {y:.6f} {z:.6f} {r} {g} {b} 0.0 {frame_idx} {point_id} 0 0 0 0\n")
-                point_id += 1
+    logger.info(f"Written points3D with {writer.num_points} points")
 
 
-def write_points3d_txt_from_depth(
-    output_dir: Path, artifact: ArtifactPath, depth_step: int, spatial_subsample: int = 4
+def write_points3d_from_depth(
+    output_dir: Path,
+    artifact: ArtifactPath,
+    depth_step: int,
+    output_format: str,
+    voxel_size: float | None,
+    spatial_subsample: int = 4,
 ):
-    """Write empty COLMAP points3D.txt file."""
+    """Write points3D by unprojecting every `depth_step`-th depth map, one frame at a time."""
     _, pose_data = read_pose_artifacts(artifact.pose_path)
     _, intrinsics, camera_types = read_intrinsics_artifacts(artifact.intrinsics_path)
     camera_type = camera_types[0]
-    points3d_file = output_dir / "points3D.txt"
 
     image_dir = output_dir / "images"
     images = sorted(list(image_dir.glob("*.jpg")))
-    # Collect all 3D points first
-    all_points = []
-    point_id = 1
 
     rays: np.ndarray | None = None
+    c2w_matrices = pose_data.matrix().numpy()
+
+    with Points3DWriter(output_dir, output_format, voxel_size) as writer:
+        for idx, (_, depth) in enumerate(read_depth_artifacts(artifact.depth_path)):
+            if idx % 30 == 0:
+                logger.info(f"Processed {idx} depth maps")
+
+            if idx % depth_step != 0 or depth is None:
+                continue
+
+            rgb = cv2.cvtColor(cv2.imread(str(images[idx]), cv2.IMREAD_COLOR), cv2.COLOR_BGR2RGB)
+            frame_height, frame_width = rgb.shape[:2]
+            rgb = rgb[::spatial_subsample, ::spatial_subsample]
+
+            if rays is None:
+                camera_model = camera_type.build_camera_model(intrinsics[idx])
+                disp_v, disp_u = torch.meshgrid(
+                    torch.arange(frame_height).float()[::spatial_subsample],
+                    torch.arange(frame_width).float()[::spatial_subsample],
+                    indexing="ij",
+                )
+                if camera_type == CameraType.PANORAMA:
+                    disp_v = disp_v / (frame_height - 1)
+                    disp_u = disp_u / (frame_width - 1)
+                disp = torch.ones_like(disp_v)
+                pts, _, _ = camera_model.iproj_disp(disp, disp_u, disp_v)
+                rays = pts[..., :3].numpy()
+                if camera_type != CameraType.PANORAMA:
+                    rays /= rays[..., 2:3]
 
-    for idx, (_, depth) in enumerate(read_depth_artifacts(artifact.depth_path)):
-        if idx % 30 == 0:
-            logger.info(f"Processed {idx} depth maps")
-
-        if idx % depth_step != 0:
-            continue
-
-        rgb = cv2.cvtColor(cv2.imread(str(images[idx]), cv2.IMREAD_COLOR), cv2.COLOR_BGR2RGB)
-        frame_height, frame_width = rgb.shape[:2]
-        rgb = rgb[::spatial_subsample, ::spatial_subsample]
-
-        if rays is None:
-            camera_model = camera_type.build_camera_model(intrinsics[idx])
-            disp_v, disp_u = torch.meshgrid(
-                torch.arange(frame_height).float()[::spatial_subsample],
-                torch.arange(frame_width).float()[::spatial_subsample],
-                indexing="ij",
-            )
-            if camera_type == CameraType.PANORAMA:
-                disp_v = disp_v / (frame_height - 1)
-                disp_u = disp_u / (frame_width - 1)
-            disp = torch.ones_like(disp_v)
-            pts, _, _ = camera_model.iproj_disp(disp, disp_u, disp_v)
-            rays = pts[..., :3].numpy()
-            if camera_type != CameraType.PANORAMA:
-                rays /= rays[..., 2:3]
-
-        if depth is not None:
             pcd = rays * depth.numpy()[::spatial_subsample, ::spatial_subsample, None]
             depth_mask = reliable_depth_mask_range(depth)[::spatial_subsample, ::spatial_subsample].numpy()
-            rgb, pcd = rgb[depth_mask], pcd[depth_mask]
-            c2w_matrix = pose_data[idx].matrix().numpy()
+            rgb, pcd = rgb[depth_mask], pcd[depth_mask].astype(np.float64)
+            c2w_matrix = c2w_matrices[idx]
             pcd = pcd @ c2w_matrix[:3, :3].T + c2w_matrix[:3, 3][None]
+            writer.write(pcd, rgb, idx + 1)
 
-            for pts_rgb, pts_xyz in zip(rgb, pcd):
-                all_points.append(
-                    (
-                        point_id,
-                        pts_xyz[0],
-                        pts_xyz[1],
-                        pts_xyz[2],
-                        int(pts_rgb[0]),
-                        int(pts_rgb[1]),
-                        int(pts_rgb[2]),
-                        0.0,
-                        idx + 1,
-                    )
-                )
-                point_id += 1
-
-    # Write points to file
-    with open(points3d_file, "w") as f:
-        f.write("# 3D point list with one line of data per point:\n")
-        f.write("#   POINT3D_ID, X, Y, Z, R, G, B, ERROR, TRACK[] as (IMAGE_ID, POINT2D_IDX)\n")
-        f.write(f"# Number of points: {len(all_points)}\n")
-
-        for point_id, point_data in enumerate(all_points):
-            point_id, x, y, z, r, g, b, error, image_id = point_data
-            # The last 4 values are for visualization purposes.
-            f.write(f"{point_id} {x:.6f} {y:.6f} {z:.6f} {r} {g} {b} {error:.6f} {image_id} {point_id} 0 0 0 0\n")
-
-    logger.info(f"Written points3D.txt with {len(all_points)} points")
+    logger.info(f"Written points3D with {writer.num_points} points")
 
 
 def extract_frames(artifact: ArtifactPath, output_dir: Path) -> Tuple[int, int]:
@@ -229,11 +329,19 @@ def extract_frames(artifact: ArtifactPath, output_dir: Path) -> Tuple[int, int]:
     return frame_width, frame_height
 
 
-def convert_vipe_to_colmap(artifact: ArtifactPath, output_path: Path, depth_step: int, use_slam_map: bool):
+def convert_vipe_to_colmap(
+    artifact: ArtifactPath,
+    output_path: Path,
+    depth_step: int,
+    use_slam_map: bool,
+    output_format: str = "text",
+    voxel_size: float | None = None,
+):
     """Convert ViPE reconstruction results to COLMAP format."""
 
     logger.info(
-        f"Converting ViPE results from {artifact.base_path} ({artifact.artifact_name}) to COLMAP format at {output_path}"
+        f"Converting ViPE results from {artifact.base_path} ({artifact.artifact_name}) "
+        f"to COLMAP format at {output_path}"
     )
 
     # Verify required files exist
@@ -249,19 +357,22 @@ def convert_vipe_to_colmap(artifact: ArtifactPath, output_path: Path, depth_step
     frame_width, frame_height = extract_frames(artifact, output_path)
 
     # Write COLMAP files
-    write_cameras_txt(output_path, artifact, frame_width, frame_height)
-    write_images_txt(output_path, artifact)
+    binary_flags = {"text": [False], "binary": [True], "both": [False, True]}[output_format]
+    for binary in binary_flags:
+        write_cameras(output_path, artifact, frame_width, frame_height, binary)
+        write_images(output_path, artifact, binary)
+    # Points are unprojected once and streamed to every requested format.
     if use_slam_map:
-        write_points3d_txt_from_slam_map(output_path, artifact)
+        write_points3d_from_slam_map(output_path, artifact, output_format, voxel_size)
     else:
-        write_points3d_txt_from_depth(output_path, artifact, depth_step)
+        write_points3d_from_depth(output_path, artifact, depth_step, output_format, voxel_size)
 
     logger.info("COLMAP conversion completed successfully!")
     logger.info(f"Output directory: {output_path}")
-    logger.info("Files created:")
-    logger.info("  - cameras.txt: Camera intrinsics")
-    logger.info("  - images.txt: Camera poses")
-    logger.info("  - points3D.txt: 3D points")
+    logger.info(f"Files created ({output_format}):")
+    logger.info("  - cameras: Camera intrinsics")
+    logger.info("  - images: Camera poses")
+    logger.info("  - points3D: 3D points")
     logger.info("  - images/: Individual frame images")
 
 
@@ -281,6 +392,19 @@ def main():
     )
     parser.add_argument("--use_slam_map", action="store_true", help="Use SLAM map to unproject depth maps")
     parser.add_argument("--depth_step", type=int, default=16, help="Step size for depth extraction (default: 16)")
+    parser.add_argument(
+        "--format",
+        type=str,
+        default="text",
+        choices=("text", "binary", "both"),
+        help="COLMAP model format to write",
+    )
+    parser.add_argument(
+        "--voxel_size",
+        type=float,
+        default=None,
+        help="If set, keep only one 3D point per voxel of this size (in meters)",
+    )
     parser.add_argument(
         "--output",
         "-o",
@@ -305,7 +429,14 @@ def main():
         args.output = args.vipe_path.parent / f"{args.vipe_path.name}_colmap"
 
     for artifact in artifacts:
-        convert_vipe_to_colmap(artifact, args.output / artifact.artifact_name, args.depth_step, args.use_slam_map)
+        convert_vipe_to_colmap(
+            artifact,
+            args.output / artifact.artifact_name,
+            args.depth_step,
+            args.use_slam_map,
+            args.format,
+            args.voxel_size,
+        )
     return 0
 
 
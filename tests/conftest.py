@@ -0,0 +1,124 @@
+# SPDX-FileCopyrightText: Copyright (c) 2025 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import importlib.util
+import sys
+
+from pathlib import Path
+
+import pytest
+
+
+SCRIPTS_DIR = Path(__file__).resolve().parents[1] / "scripts"
+DATA_PREPROCESS_SCRIPTS_DIR = Path(__file__).resolve().parents[1] / "data_preprocess" / "scripts"
+
+
+def load_script(name: str, scripts_dir: Path = SCRIPTS_DIR):
+    """Import <scripts_dir>/<name>.py, which is not part of the vipe package, once per session."""
+    if name in sys.modules:
+        return sys.modules[name]
+    spec = importlib.util.spec_from_file_location(name, scripts_dir / f"{name}.py")
+    assert spec is not None and spec.loader is not None
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+@pytest.fixture(scope="session")
+def colmap_script():
+    """scripts/vipe_to_colmap.py, for tests/test_vipe_to_colmap.py."""
+    return load_script("vipe_to_colmap")
+
+
+@pytest.fixture(scope="session")
+def render_script():
+    """scripts/render_vipe_pointcloud.py, for tests/test_render_vipe_pointcloud.py and the batch renderer tests."""
+    return load_script("render_vipe_pointcloud")
+
+
+@pytest.fixture(scope="session")
+def postprocess_script():
+    """data_preprocess/scripts/postprocess_render_dir.py, which reads the mask sidecars of the render script."""
+    return load_script("postprocess_render_dir", DATA_PREPROCESS_SCRIPTS_DIR)
+
+
+@pytest.fixture(scope="session")
+def batch_script(render_script):
+    # render_vipe_batch imports render_vipe_pointcloud by name, which then resolves to the module loaded above.
+    return load_script("render_vipe_batch")
+
+
+@pytest.fixture
+def write_vipe_artifact():
+    """
+    Write the pose, intrinsics, RGB and depth artifacts of a small synthetic ViPE result: a PINHOLE camera sliding
+    sideways in front of a slanted wall, with depth and colors that change a little from frame to frame.
+    Returns a function (base_path, n_frames, artifact_name) -> ArtifactPath.
+    """
+    import torch
+
+    from vipe.ext.lietorch import SE3
+    from vipe.streams.base import VideoFrame, VideoStream
+    from vipe.utils import io
+    from vipe.utils.cameras import CameraType
+
+    height, width = 16, 24
+
+    class FrameListStream(VideoStream):
+        def __init__(self, frames: list) -> None:
+            super().__init__()
+            self.frames = frames
+
+        def frame_size(self) -> tuple[int, int]:
+            return (height, width)
+
+        def fps(self) -> float:
+            return 30.0
+
+        def name(self) -> str:
+            return "synthetic"
+
+        def __len__(self) -> int:
+            return len(self.frames)
+
+        def __iter__(self):
+            return iter(self.frames)
+
+    def write(base_path: Path, n_frames: int = 6, artifact_name: str = "exo") -> "io.ArtifactPath":
+        generator = torch.Generator().manual_seed(0)
+        v, u = torch.meshgrid(torch.arange(height) / height, torch.arange(width) / width, indexing="ij")
+        frames = []
+        for frame_idx in range(n_frames):
+            depth = 2.0 + 0.3 * u + 0.01 * torch.rand(height, width, generator=generator)
+            # The green and blue levels tell the frames apart.
+            green = 0.5 * v + 0.05 * ((frame_idx // 10) % 10)
+            rgb = torch.stack([u, green, torch.full_like(u, (frame_idx % 10) / 10)], dim=-1)
+            pose = torch.tensor([0.01 * frame_idx, 0.0, 0.0, 0.0, 0.0, 0.0, 1.0])
+            frames.append(
+                VideoFrame(
+                    raw_frame_idx=frame_idx,
+                    rgb=rgb,
+                    pose=SE3(pose),
+                    camera_type=CameraType.PINHOLE,
+                    intrinsics=torch.tensor([20.0, 20.0, width / 2, height / 2]),
+                    metric_depth=depth,
+                )
+            )
+        artifact_path = io.ArtifactPath(Path(base_path), artifact_name)
+        io.save_artifacts(artifact_path, FrameListStream(frames))
+        return artifact_path
+
+    return write
@@ -0,0 +1,82 @@
+# SPDX-FileCopyrightText: Copyright (c) 2025 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import subprocess
+import sys
+import textwrap
+
+import click
+import pytest
+
+from click.testing import CliRunner
+
+from vipe.cli.main import _make_windows, _parse_windows, infer
+
+
+def test_make_windows_with_overlap():
+    assert _make_windows(10, 100, 49, 25) == [(10, 58), (35, 83), (60, 108)]
+    assert _make_windows(10, 98, 49, 25) == [(10, 58), (35, 83)]
+    assert _make_windows(0, 98, 49, 49) == [(0, 48), (49, 97)]
+
+
+def test_make_windows_rejects_a_window_larger_than_the_input():
+    with pytest.raises(click.BadParameter, match="no window fits"):
+        _make_windows(0, 30, 49, 25)
+
+
+def test_parse_windows():
+    assert _parse_windows("0-48, 25-73") == [(0, 48), (25, 73)]
+
+
+@pytest.mark.parametrize("windows", ["10-5", "10", "a-b", "0-48,", "1-2-3"])
+def test_malformed_windows_are_a_cli_error(windows):
+    with pytest.raises(click.BadParameter):
+        _parse_windows(windows)
+    result = CliRunner().invoke(infer, ["--windows", windows])
+    assert result.exit_code == 2
+    assert "--windows" in result.output
+
+
+def test_window_stride_requires_window_size():
+    result = CliRunner().invoke(infer, ["--window_stride", "25"])
+    assert result.exit_code == 2
+    assert "--window_stride" in result.output
+
+
+@pytest.mark.parametrize("option", ["--window_size", "--window_stride"])
+@pytest.mark.parametrize("value", ["0", "-5"])
+def test_window_options_must_be_positive(option, value):
+    result = CliRunner().invoke(infer, [option, value])
+    assert result.exit_code == 2
+    assert option in result.output
+
+
+def test_help_does_not_import_heavy_modules():
+    code = textwrap.dedent(
+        """
+        import sys
+        from vipe.cli.main import main
+        try:
+            main(["--help"])
+        except SystemExit:
+            pass
+        print(",".join(sorted(sys.modules)))
+        """
+    )
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    modules = set(result.stdout.strip().splitlines()[-1].split(","))
+    assert "vipe.cli.main" in modules
+    for heavy in ("torch", "vipe.pipeline", "vipe.slam"):
+        assert heavy not in modules, f"vipe --help imported {heavy}"
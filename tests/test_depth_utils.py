@@ -0,0 +1,94 @@
+# SPDX-FileCopyrightText: Copyright (c) 2025 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import pytest
+import torch
+import torch.nn.functional as F
+
+from vipe.utils.depth import StreamingRobustMean, reliable_depth_mask_range, reliable_depth_mask_range_batch
+
+
+def reference_reliable_depth_mask_range(depth: torch.Tensor, window_size: int, ratio_thresh: float, eps: float = 1e-6):
+    """Per-frame 2D-window implementation that reliable_depth_mask_range_batch replaces."""
+    depth_unsq = depth[None, None]
+    padding = window_size // 2
+    local_max = F.max_pool2d(depth_unsq, kernel_size=window_size, stride=1, padding=padding)
+    local_min = -F.max_pool2d(-depth_unsq, kernel_size=window_size, stride=1, padding=padding)
+    local_mean = F.avg_pool2d(depth_unsq, kernel_size=window_size, stride=1, padding=padding)
+    ratio = ((local_max - local_min) / (local_mean + eps))[0, 0]
+    return (ratio < ratio_thresh) & (depth > 0)
+
+
+def make_depth_batch(batch_size: int = 4, height: int = 23, width: int = 31) -> torch.Tensor:
+    """Smooth depth with noise, holes (zeros) and depth discontinuities touching the image border."""
+    generator = torch.Generator().manual_seed(0)
+    depth = 2.0 + 0.02 * torch.rand(batch_size, height, width, generator=generator)
+    depth[torch.rand(batch_size, height, width, generator=generator) < 0.05] = 0.0
+    depth[:, :, :3] *= 1.5
+    depth[:, -2:, :] = 0.0
+    depth[0, 0, 0] = 10.0
+    depth[1, :, -1] = 0.5
+    return depth
+
+
+@pytest.mark.parametrize("window_size", [3, 5, 7])
+@pytest.mark.parametrize("ratio_thresh", [0.01, 0.1])
+def test_batch_matches_per_frame(window_size, ratio_thresh):
+    depth = make_depth_batch()
+    batch_mask = reliable_depth_mask_range_batch(depth, window_size, ratio_thresh)
+    assert batch_mask.shape == depth.shape and batch_mask.dtype == torch.bool
+    # Both outcomes occur, so the comparison is not trivially all True or all False.
+    assert 0 < batch_mask.sum() < batch_mask.numel()
+
+    for frame_idx, frame_depth in enumerate(depth):
+        expected = reference_reliable_depth_mask_range(frame_depth, window_size, ratio_thresh)
+        assert torch.equal(batch_mask[frame_idx], expected)
+        assert torch.equal(reliable_depth_mask_range(frame_depth, window_size, ratio_thresh), expected)
+
+
+def test_even_window_is_rejected():
+    with pytest.raises(AssertionError):
+        reliable_depth_mask_range_batch(make_depth_batch(), window_size=4)
+
+
+def make_background_clip(n_frames: int, height: int = 9, width: int = 13) -> tuple[torch.Tensor, torch.Tensor]:
+    """(T, H, W) depth and (T, H, W, 3) RGB of a background clip, both NaN where the depth is not valid."""
+    generator = torch.Generator().manual_seed(n_frames)
+    depth = 1.0 + 4.0 * torch.rand(n_frames, height, width, generator=generator)
+    rgb = torch.rand(n_frames, height, width, 3, generator=generator)
+    invalid = torch.rand(n_frames, height, width, generator=generator) < 0.3
+    invalid[:, 0, 0] = True
+    depth[invalid] = float("nan")
+    rgb[invalid] = float("nan")
+    return depth, rgb
+
+
+@pytest.mark.parametrize("n_frames", [1, 3, 8])
+def test_streaming_mean_matches_stacked_nanmean(n_frames):
+    viser_utils = pytest.importorskip("vipe.utils.viser")
+    # Two extra leading frames are added and removed again, as a sliding window does.
+    depth, rgb = make_background_clip(n_frames + 2)
+    expected_depth, expected_rgb = viser_utils.compute_robust_mean_tensors(depth[2:], rgb[2:])
+
+    stats = StreamingRobustMean()
+    for frame_depth, frame_rgb in zip(depth, rgb):
+        assert stats.add(frame_depth, frame_rgb).equal(~torch.isnan(frame_depth))
+    for frame_depth, frame_rgb in zip(depth[:2], rgb[:2]):
+        stats.remove(frame_depth, frame_rgb)
+    mean_depth, mean_rgb = stats.mean()
+
+    assert mean_depth[0, 0] == 0 and (mean_rgb[0, 0] == 0).all()
+    torch.testing.assert_close(mean_depth, expected_depth, rtol=1e-6, atol=1e-6)
+    torch.testing.assert_close(mean_rgb, expected_rgb, rtol=1e-6, atol=1e-6)
@@ -0,0 +1,118 @@
+# SPDX-FileCopyrightText: Copyright (c) 2025 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from pathlib import Path
+from typing import Iterable
+
+import cv2
+import numpy as np
+import pytest
+import torch
+
+from vipe.streams.frame_dir_stream import FrameDirStream
+
+
+N_FRAMES, HEIGHT, WIDTH = 12, 6, 10
+
+
+@pytest.fixture
+def frame_dir(tmp_path) -> Path:
+    """Directory of lossless frame images that differ per frame."""
+    rng = np.random.default_rng(0)
+    for frame_idx in range(N_FRAMES):
+        image = rng.integers(0, 256, (HEIGHT, WIDTH, 3), dtype=np.uint8)
+        assert cv2.imwrite(str(tmp_path / f"{frame_idx:05d}.png"), image)
+    return tmp_path
+
+
+@pytest.fixture
+def cpu_frames(monkeypatch):
+    """Keep the yielded frames on the CPU when CUDA is not available."""
+    if not torch.cuda.is_available():
+        monkeypatch.setattr(torch.Tensor, "cuda", lambda self, *args, **kwargs: self)
+
+
+def read_sequentially(frame_dir: Path, frame_inds: Iterable[int]) -> list[tuple[int, torch.Tensor]]:
+    """Reference decode of the frames with a plain imread loop."""
+    frame_files = sorted(frame_dir.glob("*.png"))
+    frames = []
+    for frame_idx in frame_inds:
+        image = cv2.cvtColor(cv2.imread(str(frame_files[frame_idx])), cv2.COLOR_BGR2RGB)
+        frames.append((frame_idx, torch.as_tensor(image).float() / 255.0))
+    return frames
+
+
+def assert_frames_equal(actual: list[tuple[int, torch.Tensor]], expected: list[tuple[int, torch.Tensor]]) -> None:
+    assert [frame_idx for frame_idx, _ in actual] == [frame_idx for frame_idx, _ in expected]
+    for (_, rgb), (_, expected_rgb) in zip(actual, expected):
+        assert torch.equal(rgb.cpu(), expected_rgb)
+
+
+@pytest.mark.parametrize("num_threads", [0, 1, 3])
+@pytest.mark.parametrize(
+    ("seek_range", "frame_inds"),
+    [
+        (None, range(N_FRAMES)),
+        (range(2, 11, 3), range(2, 11, 3)),
+        # A stop of -1 reads until the last frame.
+        (range(1, -1, 2), range(1, N_FRAMES, 2)),
+        (range(4, 100), range(4, N_FRAMES)),
+    ],
+)
+def test_decoded_frames_match_a_sequential_read(frame_dir, num_threads, seek_range, frame_inds):
+    stream = FrameDirStream(frame_dir, seek_range=seek_range, num_threads=num_threads, prefetch=2)
+    assert len(stream) == len(frame_inds)
+    expected = read_sequentially(frame_dir, frame_inds)
+
+    assert_frames_equal(list(stream._decoded_frames()), expected)
+    # Iterating again starts over.
+    assert_frames_equal(list(stream._decoded_frames()), expected)
+
+
+@pytest.mark.parametrize("num_threads", [0, 3])
+def test_iteration_yields_the_decoded_frames(frame_dir, cpu_frames, num_threads):
+    stream = FrameDirStream(frame_dir, seek_range=range(1, 9, 2), num_threads=num_threads)
+    frames = [(frame.raw_frame_idx, frame.rgb) for frame in stream]
+    assert_frames_equal(frames, read_sequentially(frame_dir, range(1, 9, 2)))
+
+
+@pytest.mark.parametrize("num_threads", [0, 3])
+def test_consumer_can_stop_early(frame_dir, num_threads):
+    stream = FrameDirStream(frame_dir, num_threads=num_threads, prefetch=4)
+    frames = []
+    decoded_frames = stream._decoded_frames()
+    for frame_idx, rgb in decoded_frames:
+        frames.append((frame_idx, rgb))
+        if len(frames) == 3:
+            break
+    # Closing the generator drops the pending decodes and shuts down the workers.
+    decoded_frames.close()
+    assert_frames_equal(frames, read_sequentially(frame_dir, range(3)))
+
+    assert_frames_equal(list(stream._decoded_frames()), read_sequentially(frame_dir, range(N_FRAMES)))
+
+
+@pytest.mark.parametrize("num_threads", [0, 3])
+def test_unreadable_frame(frame_dir, cpu_frames, num_threads):
+    (frame_dir / "00005.png").write_bytes(b"not an image")
+    stream = FrameDirStream(frame_dir, num_threads=num_threads)
+    assert [frame_idx for frame_idx, rgb in stream._decoded_frames() if rgb is None] == [5]
+
+    with pytest.raises(ValueError, match="00005.png"):
+        list(stream)
+
+    stream = FrameDirStream(frame_dir, num_threads=num_threads, skip_unreadable=True)
+    frames = [(frame.raw_frame_idx, frame.rgb) for frame in stream]
+    assert_frames_equal(frames, read_sequentially(frame_dir, [i for i in range(N_FRAMES) if i != 5]))
@@ -0,0 +1,36 @@
+# SPDX-FileCopyrightText: Copyright (c) 2025 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import pytest
+import torch
+
+from vipe.utils.io import read_depth_artifacts, read_rgb_artifacts
+
+
+@pytest.mark.parametrize("frame_indices", [[0], [3, 4, 5], [1, 7, 139], [130, 133, 200]])
+def test_reading_selected_frames_matches_a_sequential_read(write_vipe_artifact, tmp_path, frame_indices):
+    # More than 100 frames, so that the video reader seeks to the later indices instead of reading through.
+    artifact = write_vipe_artifact(tmp_path / "take", n_frames=140)
+    expected = [idx for idx in frame_indices if idx < 140]
+
+    for read_artifacts, path in [
+        (read_rgb_artifacts, artifact.rgb_path),
+        (read_depth_artifacts, artifact.depth_path),
+    ]:
+        sequential = dict(read_artifacts(path))
+        selected = list(read_artifacts(path, frame_indices))
+        assert [frame_idx for frame_idx, _ in selected] == expected
+        for frame_idx, value in selected:
+            assert torch.equal(value, sequential[frame_idx])
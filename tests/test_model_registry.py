@@ -0,0 +1,174 @@
+# SPDX-FileCopyrightText: Copyright (c) 2025 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import threading
+import time
+
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+import torch.nn as nn
+
+from vipe.priors import depth
+from vipe.utils import model_registry
+from vipe.utils.misc import run_per_view
+from vipe.utils.model_registry import ModelRegistry, estimate_model_nbytes, worker_slot
+
+
+# nn.Linear(10, 10) holds 110 float32 values.
+STUB_NBYTES = 440
+
+
+class StubFactory:
+    """Builds small CPU modules and counts the builds per name."""
+
+    def __init__(self, delay: float = 0.0) -> None:
+        self.delay = delay
+        self.n_builds: dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def __call__(self, name: str):
+        def build() -> nn.Module:
+            time.sleep(self.delay)
+            with self._lock:
+                self.n_builds[name] = self.n_builds.get(name, 0) + 1
+            return nn.Linear(10, 10)
+
+        return build
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    """A fresh process-wide registry."""
+    registry = ModelRegistry()
+    monkeypatch.setattr(model_registry, "_default_registry", registry)
+    return registry
+
+
+def test_estimate_model_nbytes_of_modules_and_wrappers():
+    linear = nn.Linear(10, 10)
+    assert estimate_model_nbytes(linear) == STUB_NBYTES
+
+    class Wrapper:
+        def __init__(self) -> None:
+            self.net = linear
+            self.same_net = linear
+            self.name = "wrapper"
+
+    assert estimate_model_nbytes(Wrapper()) == STUB_NBYTES
+    assert estimate_model_nbytes(object()) == 0
+
+
+def test_each_model_is_loaded_once(registry):
+    factory = StubFactory()
+    # Two pipeline instances asking for the same models share them.
+    first = [registry.get("depth", {"model": name}, factory(name)) for name in ("a", "b")]
+    second = [registry.get("depth", {"model": name}, factory(name)) for name in ("a", "b")]
+    assert all(a is b for a, b in zip(first, second))
+    assert first[0] is not first[1]
+    assert factory.n_builds == {"a": 1, "b": 1}
+    assert registry.n_loads == {"depth": 2}
+
+
+def test_config_key_ignores_dict_order(registry):
+    factory = StubFactory()
+    model = registry.get("depth", {"model": "a", "scale": 2}, factory("a"))
+    assert registry.get("depth", {"scale": 2, "model": "a"}, factory("a")) is model
+    assert factory.n_builds == {"a": 1}
+
+
+def test_concurrent_requests_wait_for_a_single_load(registry):
+    factory = StubFactory(delay=0.05)
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        models = list(executor.map(lambda _: registry.get("geocalib", None, factory("geocalib")), range(8)))
+    assert factory.n_builds == {"geocalib": 1}
+    assert all(model is models[0] for model in models)
+
+
+def test_each_worker_slot_gets_its_own_instance(registry):
+    factory = StubFactory()
+    model = registry.get("depth", {"model": "a"}, factory("a"))
+    with worker_slot(1):
+        worker_model = registry.get("depth", {"model": "a"}, factory("a"))
+        assert registry.get("depth", {"model": "a"}, factory("a")) is worker_model
+    assert worker_model is not model
+    assert registry.get("depth", {"model": "a"}, factory("a")) is model
+    assert factory.n_builds == {"a": 2}
+
+    # Evicting a config drops the instances of all slots.
+    assert registry.evict("depth", {"model": "a"})
+    assert len(registry) == 0
+
+
+def test_concurrent_views_do_not_share_models(registry):
+    factory = StubFactory()
+    # Both views wait for each other, so they run on two workers at the same time.
+    barrier = threading.Barrier(2, timeout=10.0)
+
+    def process(view_idx: int, item: None) -> nn.Module:
+        barrier.wait()
+        return registry.get("depth", {"model": "a"}, factory("a"))
+
+    models = run_per_view(process, [None, None])
+    assert models[0] is not models[1]
+    # The workers of a later run reuse the instances of their slots.
+    assert {id(model) for model in run_per_view(process, [None, None])} == {id(model) for model in models}
+    assert factory.n_builds == {"a": 2}
+
+
+def test_make_depth_model_goes_through_the_registry(registry, monkeypatch):
+    factory = StubFactory()
+    monkeypatch.setattr(depth, "_build_depth_model", lambda model: factory(model)())
+    assert depth.make_depth_model("unidepth-l") is depth.make_depth_model("unidepth-l")
+    assert factory.n_builds == {"unidepth-l": 1}
+
+
+def test_budget_evicts_least_recently_used(registry):
+    factory = StubFactory()
+    registry.set_memory_budget(2 * STUB_NBYTES)
+    a = registry.get("model", {"name": "a"}, factory("a"))
+    registry.get("model", {"name": "b"}, factory("b"))
+    # Using "a" makes "b" the least recently used model.
+    assert registry.get("model", {"name": "a"}, factory("a")) is a
+    registry.get("model", {"name": "c"}, factory("c"))
+
+    assert len(registry) == 2 and registry.memory_nbytes() == 2 * STUB_NBYTES
+    assert registry.get("model", {"name": "a"}, factory("a")) is a
+    registry.get("model", {"name": "b"}, factory("b"))
+    assert factory.n_builds == {"a": 1, "b": 2, "c": 1}
+
+
+def test_model_larger_than_budget_is_kept_alone(registry):
+    factory = StubFactory()
+    registry.get("model", {"name": "a"}, factory("a"))
+    registry.set_memory_budget(STUB_NBYTES // 2)
+    assert len(registry) == 0
+
+    registry.get("model", {"name": "b"}, factory("b"))
+    assert len(registry) == 1
+
+
+def test_evict_by_type_and_config(registry):
+    factory = StubFactory()
+    for name in ("a", "b"):
+        registry.get("depth", {"model": name}, factory(name))
+    registry.get("geocalib", None, factory("geocalib"))
+
+    assert registry.evict("depth", {"model": "a"})
+    assert not registry.evict("depth", {"model": "a"})
+    assert registry.evict("depth")
+    assert len(registry) == 1
+    registry.clear()
+    assert len(registry) == 0
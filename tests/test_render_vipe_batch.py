@@ -0,0 +1,122 @@
+# SPDX-FileCopyrightText: Copyright (c) 2025 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+import os
+import sys
+
+from pathlib import Path
+
+import numpy as np
+import pytest
+import torch
+
+
+N_FRAMES = 6
+
+
+@pytest.fixture
+def take_job(tmp_path, write_vipe_artifact) -> dict:
+    """Manifest job rendering every frame of a synthetic take from a static ego camera facing its wall."""
+    take_dir = tmp_path / "take_a"
+    write_vipe_artifact(take_dir, N_FRAMES)
+    K = [[20.0, 0.0, 12.0], [0.0, 20.0, 8.0], [0.0, 0.0, 1.0]]
+    sample = {
+        "exo_path": "takes/take_a/exo.mp4",
+        "camera_intrinsics": K,
+        "camera_extrinsics": np.eye(4)[:3].tolist(),
+        "ego_intrinsics": K,
+        "ego_extrinsics": [np.eye(4)[:3].tolist()] * N_FRAMES,
+    }
+    meta_path = tmp_path / "meta.json"
+    meta_path.write_text(json.dumps({"test_datasets": [sample]}))
+    return {
+        "input_dir": str(take_dir),
+        "meta_json_path": str(meta_path),
+        "start_frame": 0,
+        "end_frame": N_FRAMES - 1,
+        "image_size": [32, 48],
+        "no_aria": True,
+        # The synthetic take has no instance masks, so there are no dynamic points to render.
+        "only_bg": True,
+    }
+
+
+@pytest.fixture
+def in_process_worker(monkeypatch):
+    """Undo what the in-process worker (workers=0) changes for the rest of the session."""
+    monkeypatch.setenv("CUDA_VISIBLE_DEVICES", "")
+    monkeypatch.setattr(sys, "path", list(sys.path))
+    num_threads = torch.get_num_threads()
+    yield
+    torch.set_num_threads(num_threads)
+
+
+def test_run_batch_writes_status_and_skips_done_jobs(batch_script, take_job, tmp_path, in_process_worker):
+    out_root = tmp_path / "out"
+    status_dir = out_root / batch_script.STATUS_DIR_NAME
+    jobs = batch_script.prepare_jobs([take_job], str(out_root), "cpu")
+    job_id, argv = jobs[0]["id"], jobs[0]["argv"]
+    assert job_id == f"take_a_000000_{N_FRAMES - 1:06d}"
+    assert argv[argv.index("--renderer") + 1] == "zbuffer"
+
+    results = batch_script.run_batch(jobs, str(out_root), workers=0, device="cpu")
+    assert [status["state"] for status in results] == ["done"], results
+    status = json.loads((status_dir / f"{job_id}.json").read_text())
+    assert status["state"] == "done" and status["argv"] == argv
+    assert Path(status["output"]) == out_root / job_id / "ego_Prior.mp4"
+    assert Path(status["output"]).exists()
+    assert (status_dir / f"{job_id}.log").exists()
+
+    results = batch_script.run_batch(jobs, str(out_root), workers=0, device="cpu")
+    assert [status["state"] for status in results] == ["skipped"]
+    assert results[0]["output"] == status["output"]
+
+    # The same job with other options is rendered again.
+    jobs = batch_script.prepare_jobs([dict(take_job, point_size=2.0)], str(out_root), "cpu")
+    results = batch_script.run_batch(jobs, str(out_root), workers=0, device="cpu")
+    assert [status["state"] for status in results] == ["done"]
+
+
+def test_run_batch_records_failed_jobs_and_retries_them(batch_script, take_job, tmp_path, in_process_worker):
+    out_root = tmp_path / "out"
+    # The frame range must match the inference results.
+    jobs = batch_script.prepare_jobs([dict(take_job, end_frame=N_FRAMES + 3)], str(out_root), "cpu")
+    for _ in range(2):
+        results = batch_script.run_batch(jobs, str(out_root), workers=0, device="cpu")
+        assert [status["state"] for status in results] == ["failed"]
+        assert results[0]["error"].startswith("ValueError")
+        status = batch_script.read_status(str(out_root / batch_script.STATUS_DIR_NAME), jobs[0]["id"])
+        assert status["state"] == "failed"
+
+
+def test_run_batch_renders_in_a_worker_pool(batch_script, take_job, tmp_path, monkeypatch):
+    # The spawned worker imports the batch script by name.
+    monkeypatch.syspath_prepend(str(Path(batch_script.__file__).parent))
+    out_root = tmp_path / "out"
+    take_jobs = [take_job, dict(take_job, start_frame=2), dict(take_job, end_frame=N_FRAMES + 3)]
+    jobs = batch_script.prepare_jobs(take_jobs, str(out_root), "cpu")
+
+    results = batch_script.run_batch(jobs, str(out_root), workers=1, device="cpu")
+    states = {status["id"]: status["state"] for status in results}
+    assert states == {
+        f"take_a_000000_{N_FRAMES - 1:06d}": "done",
+        f"take_a_000002_{N_FRAMES - 1:06d}": "done",
+        f"take_a_000000_{N_FRAMES + 3:06d}": "failed",
+    }, results
+    for status in results:
+        assert status["pid"] != os.getpid()
+        if status["state"] == "done":
+            assert Path(status["output"]).exists()
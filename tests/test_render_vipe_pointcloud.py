@@ -0,0 +1,510 @@
+# SPDX-FileCopyrightText: Copyright (c) 2025 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import io
+import json
+import re
+import sys
+import zipfile
+
+import numpy as np
+import pytest
+import torch
+
+from vipe.utils.depth import reliable_depth_mask_range
+
+
+PINHOLE_SIZE = (48, 64)
+PINHOLE_K = np.array([[40.0, 0.0, 32.0], [0.0, 40.0, 24.0], [0.0, 0.0, 1.0]])
+FISHEYE_SIZE = (64, 64)
+FISHEYE_K = np.array([[20.0, 0.0, 32.0], [0.0, 20.0, 32.0], [0.0, 0.0, 1.0]])
+
+
+def make_room(n_points: int = 20000, half_size: float = 2.0, seed: int = 0) -> tuple[np.ndarray, np.ndarray]:
+    """Points on the six walls of a cube centered at the origin, with random 0-255 colors."""
+    rng = np.random.default_rng(seed)
+    points = rng.uniform(-half_size, half_size, (n_points, 3))
+    face = rng.integers(0, 6, n_points)
+    points[np.arange(n_points), face // 2] = np.where(face % 2 == 1, half_size, -half_size)
+    colors = rng.integers(0, 256, (n_points, 3)).astype(np.float64)
+    return points, colors
+
+
+def look_at_w2c(center, target, up=(0.0, 0.0, 1.0)) -> np.ndarray:
+    """4x4 world-to-camera matrix (OpenCV axes: x right, y down, z forward)."""
+    center = np.asarray(center, dtype=np.float64)
+    forward = np.asarray(target, dtype=np.float64) - center
+    forward /= np.linalg.norm(forward)
+    right = np.cross(forward, up)
+    right /= np.linalg.norm(right)
+    down = np.cross(forward, right)
+    T_w2c = np.eye(4)
+    T_w2c[:3, :3] = np.stack([right, down, forward])
+    T_w2c[:3, 3] = -T_w2c[:3, :3] @ center
+    return T_w2c
+
+
+# Room center, close to a wall, grazing along a wall and looking into a corner.
+ROOM_VIEWS = [
+    look_at_w2c((0.0, 0.0, 0.0), (1.0, 0.2, 0.1)),
+    look_at_w2c((1.5, 0.3, -0.2), (2.0, 0.0, 0.0)),
+    look_at_w2c((-1.8, -1.9, 0.0), (1.8, -1.9, 0.3)),
+    look_at_w2c((0.5, 0.5, 0.5), (2.0, 2.0, 2.0)),
+]
+
+
+def render_room(render_script, use_fisheye: bool, **kwargs) -> list[np.ndarray]:
+    points, colors = make_room()
+    size, K = (FISHEYE_SIZE, FISHEYE_K) if use_fisheye else (PINHOLE_SIZE, PINHOLE_K)
+    kwargs = dict(
+        image_size=size,
+        original_image_size=size,
+        use_fisheye=use_fisheye,
+        is_aria=False,
+        renderer="zbuffer",
+        **kwargs,
+    )
+    return render_script.project_points_to_image_sequential(points, colors, ROOM_VIEWS, K, **kwargs)
+
+
+@pytest.mark.parametrize("use_fisheye", [False, True])
+@pytest.mark.parametrize("point_size", [1.0, 3.0])
+def test_frustum_culling_renders_identical_images(render_script, use_fisheye, point_size):
+    culled = render_room(
+        render_script, use_fisheye, point_size=point_size, frustum_culling=True, cull_chunk_size=0.1
+    )
+    full = render_room(render_script, use_fisheye, point_size=point_size, frustum_culling=False)
+    assert len(culled) == len(full) == len(ROOM_VIEWS)
+    for culled_image, full_image in zip(culled, full):
+        assert full_image.any()
+        np.testing.assert_array_equal(culled_image, full_image)
+
+
+def test_culling_drops_chunks_behind_the_camera(render_script):
+    points, _ = make_room()
+    index = render_script.ChunkedPointCloud(points, chunk_size=0.1)
+    T_w2c = ROOM_VIEWS[0]
+    H, W = PINHOLE_SIZE
+    frustum = index.cull_pinhole(T_w2c, PINHOLE_K, W, H)
+    cone = index.cull_cone(T_w2c, np.deg2rad(60.0))
+    assert 0 < len(frustum) < len(index) // 2
+    assert 0 < len(cone) < len(index)
+
+    # Every point that projects into the image (away from its border, to stay clear of float32 rounding) belongs
+    # to a visible chunk.
+    pts_cam = points @ T_w2c[:3, :3].T + T_w2c[:3, 3]
+    in_front = pts_cam[:, 2] > 0
+    u = PINHOLE_K[0, 0] * pts_cam[:, 0] / pts_cam[:, 2] + PINHOLE_K[0, 2]
+    v = PINHOLE_K[1, 1] * pts_cam[:, 1] / pts_cam[:, 2] + PINHOLE_K[1, 2]
+    in_image = np.flatnonzero(in_front & (u >= 1) & (u < W - 1) & (v >= 1) & (v < H - 1))
+    assert np.isin(in_image, index.point_indices(frustum)).all()
+
+
+def aria_record(f: float, cx: float = 32.0, cy: float = 32.0, rgb: bool = True) -> str:
+    """One online_calibration.jsonl line with a FisheyeRadTanThinPrism camera-rgb calibration (if rgb)."""
+    params = [f, cx, cy, 0.01, -0.02, 0.003, 0.0, 0.0, 0.0, 1e-4, -1e-4, 1e-4, 0.0, -1e-4, 0.0]
+    cameras = [{"Label": "camera-slam-left", "Projection": {"Name": "FisheyeRadTanThinPrism", "Params": params}}]
+    if rgb:
+        cameras.append({"Label": "camera-rgb", "Projection": {"Name": "FisheyeRadTanThinPrism", "Params": params}})
+    return json.dumps({"CameraCalibrations": cameras})
+
+
+def test_online_calibration_skips_blank_lines_and_reads_unterminated_last_line(render_script, tmp_path):
+    path = tmp_path / "online_calibration.jsonl"
+    path.write_text(f"{aria_record(10.0)}\n\n{aria_record(11.0)}\n{aria_record(12.0)}")
+    calibration = render_script.AriaOnlineCalibration(str(path), block_size=64)
+
+    assert len(calibration) == 3
+    assert [calibration[i][3][0] for i in range(3)] == [10.0, 11.0, 12.0]
+    radial, tangential, thin_prism, focal_length, principal_point = calibration[1]
+    np.testing.assert_array_equal(radial, [0.01, -0.02, 0.003, 0.0, 0.0, 0.0])
+    np.testing.assert_array_equal(tangential, [1e-4, -1e-4])
+    np.testing.assert_array_equal(thin_prism, [1e-4, 0.0, -1e-4, 0.0])
+    np.testing.assert_array_equal(principal_point, [32.0, 32.0])
+    # Parsed records are cached.
+    assert calibration[1] is calibration[1]
+
+
+def test_online_calibration_out_of_range_access(render_script, tmp_path):
+    path = tmp_path / "online_calibration.jsonl"
+    path.write_text(f"{aria_record(10.0)}\n{aria_record(11.0)}\n")
+    calibration = render_script.AriaOnlineCalibration(str(path))
+
+    assert len(calibration) == 2
+    assert calibration[5] is calibration[1]
+    assert calibration[-3] is calibration[0]
+    # load_aria_distortion_coeffs falls back to the first record.
+    assert render_script.load_aria_distortion_coeffs(str(path), frame_idx=5)[3][0] == 10.0
+
+
+def test_online_calibration_record_without_rgb_camera(render_script, tmp_path):
+    path = tmp_path / "online_calibration.jsonl"
+    path.write_text(f"{aria_record(10.0)}\n{aria_record(11.0, rgb=False)}\n")
+    calibration = render_script.AriaOnlineCalibration(str(path))
+
+    assert calibration[1] == (None, None, None, None, None)
+    assert render_script.load_aria_distortion_coeffs(str(path), frame_idx=1) == (None, None, None, None, None)
+
+
+def test_renderer_keeps_previous_calibration_for_records_without_rgb_camera(render_script, tmp_path):
+    path = tmp_path / "online_calibration.jsonl"
+    path.write_text("\n".join([aria_record(20.0), aria_record(99.0, rgb=False), aria_record(14.0)]) + "\n")
+    points, colors = make_room()
+    images = render_script.project_points_to_image_sequential(
+        points,
+        colors,
+        [ROOM_VIEWS[0]] * 3,
+        FISHEYE_K,
+        image_size=FISHEYE_SIZE,
+        original_image_size=FISHEYE_SIZE,
+        use_fisheye=True,
+        online_calibration_path=str(path),
+        is_aria=False,
+        renderer="zbuffer",
+    )
+    np.testing.assert_array_equal(images[1], images[0])
+    assert not np.array_equal(images[2], images[0])
+
+
+def test_render_sidecars_hold_the_depth_and_labels_of_every_frame(
+    render_script, postprocess_script, tmp_path, monkeypatch, capsys
+):
+    video_path = tmp_path / "ego_Prior.mp4"
+    with render_script.RenderAuxWriter(str(video_path)) as aux_writer:
+        images = render_room(render_script, use_fisheye=False, aux_writer=aux_writer)
+    assert aux_writer.n_frames == len(ROOM_VIEWS)
+
+    with zipfile.ZipFile(tmp_path / "ego_Prior_depth.zip") as z:
+        assert z.namelist() == [f"{frame_idx:05d}.npy" for frame_idx in range(len(ROOM_VIEWS))]
+        depths = [np.load(io.BytesIO(z.read(name))) for name in z.namelist()]
+    labels = list(postprocess_script.read_label_sidecar(str(tmp_path / "ego_Prior_mask.zip")))
+    assert [frame_idx for frame_idx, _ in labels] == list(range(len(ROOM_VIEWS)))
+
+    for image, depth, (_, label) in zip(images, depths, labels):
+        assert depth.dtype == np.float32 and depth.shape == label.shape == PINHOLE_SIZE
+        coverage = label != render_script.RENDER_LABEL_EMPTY
+        # Only background points are rendered, every covered pixel is static and has a depth.
+        assert coverage.any()
+        assert np.isin(label, [render_script.RENDER_LABEL_EMPTY, render_script.RENDER_LABEL_STATIC]).all()
+        np.testing.assert_array_equal(depth > 0, coverage)
+        assert not image[~coverage].any()
+
+    # The post-processing counts the coverage of the mask sidecar.
+    monkeypatch.setattr(sys, "argv", ["postprocess_render_dir.py", "--dir", str(tmp_path)])
+    postprocess_script.main()
+    counts = dict(re.findall(r"^(\w+)=(\d+)$", capsys.readouterr().out, flags=re.MULTILINE))
+    assert int(counts["num_frames"]) == len(ROOM_VIEWS)
+    assert int(counts["total_white_pixels"]) == sum(int((label != 0).sum()) for _, label in labels)
+    assert int(counts["frames_with_any_white"]) == len(ROOM_VIEWS)
+    assert int(counts["total_dynamic_pixels"]) == 0
+    for frame_idx in range(len(ROOM_VIEWS)):
+        assert (tmp_path / f"frame_{frame_idx:05d}_mask.png").exists()
+
+
+def splat(render_script, pix, depth, colors, H=6, W=8, radius_px=0.7, **kwargs):
+    return render_script.splat_points_zbuffer(
+        torch.as_tensor(pix, dtype=torch.float32),
+        torch.as_tensor(depth, dtype=torch.float32),
+        torch.as_tensor(colors, dtype=torch.float32),
+        H,
+        W,
+        radius_px,
+        **kwargs,
+    )
+
+
+@pytest.mark.parametrize("near_first", [True, False])
+def test_zbuffer_nearest_point_wins(render_script, near_first):
+    # Both points project to pixel (2, 3); the red one is nearer.
+    pix = [[3.5, 2.5], [3.4, 2.6]]
+    depth, colors = [1.0, 2.0], [[1.0, 0.0, 0.0], [0.0, 1.0, 0.0]]
+    order = [0, 1] if near_first else [1, 0]
+    image, coverage, zbuffer, nearest = splat(
+        render_script, [pix[i] for i in order], [depth[i] for i in order], [colors[i] for i in order]
+    )
+    assert coverage.sum() == 1 and coverage[2, 3]
+    assert image[2, 3].tolist() == [1.0, 0.0, 0.0]
+    assert zbuffer[2, 3] == 1.0 and torch.isinf(zbuffer[~coverage]).all()
+    assert nearest[2, 3] == order.index(0) and (nearest[~coverage] == -1).all()
+
+
+def test_zbuffer_ties_go_to_the_first_point(render_script):
+    pix = [[3.5, 2.5], [3.5, 2.5], [3.5, 2.5]]
+    image, _, _, nearest = splat(render_script, pix, [2.0, 1.0, 1.0], [[1.0, 0, 0], [0, 1.0, 0], [0, 0, 1.0]])
+    assert nearest[2, 3] == 1
+    assert image[2, 3].tolist() == [0.0, 1.0, 0.0]
+
+
+def test_zbuffer_skips_points_behind_the_camera_and_outside(render_script):
+    pix = [[3.5, 2.5], [100.0, 2.5], [float("nan"), float("nan")]]
+    _, coverage, _, _ = splat(render_script, pix, [-1.0, 1.0, 1.0], [[1.0, 1.0, 1.0]] * 3)
+    assert not coverage.any()
+
+
+@pytest.mark.parametrize("radius_px, n_covered", [(0.7, 1), (1.0, 1), (1.5, 9), (2.3, 21)])
+def test_zbuffer_splat_covers_pixel_centers_within_the_radius(render_script, radius_px, n_covered):
+    _, coverage, _, _ = splat(render_script, [[10.5, 10.5]], [1.0], [[1.0, 1.0, 1.0]], H=21, W=21, radius_px=radius_px)
+    assert coverage.sum() == n_covered and coverage[10, 10]
+
+
+def test_zbuffer_tile_equals_crop_of_the_full_image(render_script):
+    generator = torch.Generator().manual_seed(0)
+    H, W, n_points = 23, 37, 400
+    pix = torch.rand(n_points, 2, generator=generator) * torch.tensor([W + 6.0, H + 6.0]) - 3.0
+    # Few distinct depths, so that ties occur.
+    depth = torch.randint(1, 5, (n_points,), generator=generator).float()
+    colors = torch.rand(n_points, 3, generator=generator)
+    full = render_script.splat_points_zbuffer(pix, depth, colors, H, W, radius_px=1.8)
+    # Small max_pairs expands the points in many chunks.
+    chunked = render_script.splat_points_zbuffer(pix, depth, colors, H, W, radius_px=1.8, max_pairs=97)
+    for full_output, chunked_output in zip(full, chunked):
+        assert torch.equal(full_output, chunked_output)
+
+    for tile in [(0, 10, 0, 13), (7, 23, 11, 37), (5, 6, 20, 21)]:
+        y0, y1, x0, x1 = tile
+        tiled = render_script.splat_points_zbuffer(pix, depth, colors, H, W, radius_px=1.8, tile=tile)
+        for full_output, tile_output in zip(full, tiled):
+            assert torch.equal(full_output[y0:y1, x0:x1], tile_output)
+
+
+def smooth_room(n_points: int = 60000) -> tuple[np.ndarray, np.ndarray]:
+    """make_room with colors that vary smoothly with the position, so compositing barely changes them."""
+    points, _ = make_room(n_points)
+    return points, 64.0 + (points + 2.0) / 4.0 * 128.0
+
+
+@pytest.mark.parametrize("use_fisheye", [False, True])
+def test_zbuffer_agrees_with_pytorch3d(render_script, use_fisheye):
+    if not render_script.HAS_PYTORCH3D:
+        pytest.skip("PyTorch3D is not installed")
+    points, colors = smooth_room()
+    for T_w2c in ROOM_VIEWS:
+        if use_fisheye:
+            kwargs = dict(
+                T_w2c=T_w2c,
+                ego_intrinsics=FISHEYE_K,
+                H=FISHEYE_SIZE[0],
+                W=FISHEYE_SIZE[1],
+                radial_distortion_coeffs=[0.01, -0.02, 0.003, 0.0, 0.0, 0.0],
+                tangential_distortion_coeffs=[1e-4, -1e-4],
+                thinPrism_distortion_coeffs=[1e-4, 0.0, -1e-4, 0.0],
+                is_aria=False,
+                return_aux=True,
+            )
+            reference = render_script.render_points_fisheye(points, colors, **kwargs)
+            zbuffer = render_script.render_points_zbuffer_fisheye(points, colors, **kwargs)
+        else:
+            kwargs = dict(
+                K=PINHOLE_K,
+                T_w2c=T_w2c,
+                H=PINHOLE_SIZE[0],
+                W=PINHOLE_SIZE[1],
+                original_image_size=PINHOLE_SIZE,
+                is_aria=False,
+                return_aux=True,
+            )
+            reference = render_script.render_points_pytorch3d(points, colors, **kwargs)
+            zbuffer = render_script.render_points_zbuffer(points, colors, **kwargs)
+
+        (reference_image, reference_aux), (zbuffer_image, zbuffer_aux) = reference, zbuffer
+        # The renderers only differ at splat borders and where PyTorch3D blends several points.
+        assert (reference_aux["coverage"] == zbuffer_aux["coverage"]).mean() > 0.97
+        both = reference_aux["coverage"] & zbuffer_aux["coverage"]
+        if not use_fisheye:
+            # Both take the depth along the camera axis of the nearest covering point.
+            depth_error = np.abs(reference_aux["depth"] - zbuffer_aux["depth"])[both] / zbuffer_aux["depth"][both]
+            assert (depth_error < 1e-3).mean() > 0.97
+        image_error = np.abs(reference_image.astype(np.int32) - zbuffer_image.astype(np.int32))[both]
+        assert np.median(image_error) <= 6
+
+
+def random_directions(n: int, max_theta: float, seed: int = 0) -> np.ndarray:
+    """(n, 3) points in front of the camera, uniform over the cap of directions up to max_theta off the axis."""
+    rng = np.random.default_rng(seed)
+    theta = np.arccos(rng.uniform(np.cos(max_theta), 1.0, n))
+    phi = rng.uniform(0.0, 2 * np.pi, n)
+    dirs = np.stack([np.sin(theta) * np.cos(phi), np.sin(theta) * np.sin(phi), np.cos(theta)], axis=-1)
+    return dirs * rng.uniform(0.5, 20.0, (n, 1))
+
+
+@pytest.mark.parametrize("table_size", [64, 4096])
+def test_fisheye_lut_stays_within_its_error_bound(render_script, table_size):
+    radial, tangential, thin_prism, _, _ = render_script.load_aria_distortion_coeffs(None)
+    f_ndc, c_ndc = 0.6, (0.01, -0.02)
+    lut = render_script.FisheyeProjectionLUT(f_ndc, c_ndc, radial, tangential, thin_prism, table_size=table_size)
+    # Up to (not including) 90 degrees, where x / z and y / z blow up.
+    pts = torch.from_numpy(random_directions(200000, np.deg2rad(89.9))).float()
+
+    ndc = lut.project_ndc(pts).double()
+    exact = render_script.fisheye_project_ndc(pts.double().numpy(), f_ndc, c_ndc, radial, tangential, thin_prism)
+    error = np.abs(ndc.numpy() - exact).max()
+    # max_error_ndc only covers the interpolation; the rest of the float32 evaluation adds a few ulps.
+    rounding = 4 * np.finfo(np.float32).eps * np.abs(exact).max()
+    assert error <= lut.max_error_ndc + rounding
+    assert lut.max_error_ndc < (1e-4 if table_size == 64 else 1e-6)
+
+
+# Odd, non-square image and a tile budget that splits it into 2 x 3 tiles.
+TILED_SIZE = (37, 53)
+TILE_PIXELS = 400
+
+
+def test_plan_render_tiles_partitions_the_image(render_script):
+    H, W = TILED_SIZE
+    tiles = render_script.plan_render_tiles(H, W, TILE_PIXELS)
+    assert len({y0 for y0, _, _, _ in tiles}) >= 2 and len({x0 for _, _, x0, _ in tiles}) >= 3
+    count = np.zeros((H, W), dtype=np.int64)
+    for y0, y1, x0, x1 in tiles:
+        assert 0 < (y1 - y0) * (x1 - x0) <= TILE_PIXELS
+        count[y0:y1, x0:x1] += 1
+    assert (count == 1).all()
+    assert render_script.plan_render_tiles(H, W, H * W) == [(0, H, 0, W)]
+
+
+def test_tile_ndc_transform_maps_pixel_centers_to_the_tile(render_script):
+    H, W = TILED_SIZE
+
+    def pixel_ndc(u, v, w, h):
+        # PyTorch3D NDC of pixel centers: +X left, +Y up, shorter side spanning [-1, 1].
+        half = min(w, h) / 2
+        return (w / 2 - (u + 0.5)) / half, (h / 2 - (v + 0.5)) / half
+
+    for tile in render_script.plan_render_tiles(H, W, TILE_PIXELS):
+        y0, y1, x0, x1 = tile
+        scale, offset_x, offset_y = render_script.tile_ndc_transform(tile, W, H)
+        for u, v in [(x0, y0), (x1 - 1, y1 - 1), ((x0 + x1) // 2, y0 + 1)]:
+            ndc_x, ndc_y = pixel_ndc(u, v, W, H)
+            expected = pixel_ndc(u - x0, v - y0, x1 - x0, y1 - y0)
+            assert scale * ndc_x + offset_x == pytest.approx(expected[0])
+            assert scale * ndc_y + offset_y == pytest.approx(expected[1])
+
+
+def render_odd_size(render_script, renderer: str, use_fisheye: bool, T_w2c: np.ndarray, tile_memory_bytes=None):
+    """Render the room at TILED_SIZE with one of the four renderers, returning (image, aux)."""
+    points, colors = make_room()
+    H, W = TILED_SIZE
+    kwargs = dict(T_w2c=T_w2c, H=H, W=W, is_aria=False, return_aux=True, tile_memory_bytes=tile_memory_bytes)
+    if use_fisheye:
+        render = dict(
+            pytorch3d=render_script.render_points_fisheye, zbuffer=render_script.render_points_zbuffer_fisheye
+        )[renderer]
+        return render(
+            points, colors,
+            ego_intrinsics=np.array([[15.0, 0.0, 26.0], [0.0, 15.0, 18.0], [0.0, 0.0, 1.0]]),
+            radial_distortion_coeffs=[0.01, -0.02, 0.003, 0.0, 0.0, 0.0],
+            tangential_distortion_coeffs=[1e-4, -1e-4],
+            thinPrism_distortion_coeffs=[1e-4, 0.0, -1e-4, 0.0],
+            **kwargs,
+        )
+    render = dict(
+        pytorch3d=render_script.render_points_pytorch3d, zbuffer=render_script.render_points_zbuffer
+    )[renderer]
+    K = np.array([[30.0, 0.0, 26.5], [0.0, 30.0, 18.5], [0.0, 0.0, 1.0]])
+    return render(points, colors, K=K, original_image_size=TILED_SIZE, **kwargs)
+
+
+@pytest.mark.parametrize("renderer", ["zbuffer", "pytorch3d"])
+@pytest.mark.parametrize("use_fisheye", [False, True])
+def test_tiled_render_matches_untiled(render_script, renderer, use_fisheye):
+    if renderer == "pytorch3d" and not render_script.HAS_PYTORCH3D:
+        pytest.skip("PyTorch3D is not installed")
+    if renderer == "pytorch3d":
+        tile_memory_bytes = TILE_PIXELS * 20 * render_script.PYTORCH3D_BYTES_PER_FRAGMENT
+    else:
+        tile_memory_bytes = TILE_PIXELS * render_script.ZBUFFER_BYTES_PER_PIXEL
+
+    for T_w2c in ROOM_VIEWS:
+        image, aux = render_odd_size(render_script, renderer, use_fisheye, T_w2c)
+        tiled_image, tiled_aux = render_odd_size(render_script, renderer, use_fisheye, T_w2c, tile_memory_bytes)
+        assert tiled_image.shape == image.shape == (*TILED_SIZE, 3)
+        assert aux["coverage"].any()
+        if renderer == "zbuffer":
+            assert np.array_equal(tiled_image, image)
+            for key in aux:
+                assert np.array_equal(tiled_aux[key], aux[key]), key
+        else:
+            # PyTorch3D projects into every tile's own NDC, which only moves splat borders by float rounding.
+            assert (tiled_image == image).all(axis=-1).mean() > 0.99
+            assert (tiled_aux["coverage"] == aux["coverage"]).mean() > 0.99
+
+
+@pytest.mark.parametrize("batch_size", [1, 3, 8])
+def test_depth_masks_are_computed_in_batches(render_script, batch_size):
+    generator = torch.Generator().manual_seed(0)
+    frames = []
+    for frame_idx in range(7):
+        # Rough depth with holes, so that the masks differ per frame.
+        depth = 2.0 + torch.rand(12, 16, generator=generator) * (0.05 + 0.1 * frame_idx)
+        depth[torch.rand(12, 16, generator=generator) < 0.1] = 0.0
+        # Frames without depth are dropped.
+        frames.append((frame_idx, torch.rand(12, 16, 3), None if frame_idx == 4 else depth, None))
+
+    masked = list(render_script.with_reliable_depth_masks(iter(frames), batch_size=batch_size))
+    assert [frame[0] for frame in masked] == [0, 1, 2, 3, 5, 6]
+    for frame_idx, rgb, depth, instance_mask, reliable_mask in masked:
+        assert rgb is frames[frame_idx][1] and depth is frames[frame_idx][2] and instance_mask is None
+        assert torch.equal(reliable_mask, reliable_depth_mask_range(depth))
+
+
+def test_frame_accumulator_is_abstract(render_script):
+    with pytest.raises(TypeError):
+        render_script.FrameAccumulator()
+
+
+@pytest.mark.parametrize("use_mean_bg", [False, True])
+def test_sliding_window_background_matches_scratch(
+    render_script, write_vipe_artifact, tmp_path, monkeypatch, use_mean_bg
+):
+    write_vipe_artifact(tmp_path / "take", n_frames=99)
+    decoded = {"rgb": [], "depth": []}
+
+    def recording(read_artifacts, name):
+        def read(path, frame_indices=None):
+            for frame_idx, value in read_artifacts(path, frame_indices):
+                decoded[name].append(frame_idx)
+                yield frame_idx, value
+
+        return read
+
+    monkeypatch.setattr(render_script, "read_rgb_artifacts", recording(render_script.read_rgb_artifacts, "rgb"))
+    monkeypatch.setattr(render_script, "read_depth_artifacts", recording(render_script.read_depth_artifacts, "depth"))
+    T_cam_to_world = look_at_w2c((0.3, -0.2, 0.1), (1.0, 0.5, 0.0))
+    if use_mean_bg:
+        build = render_script.build_mean_background_pointcloud
+        accumulator = render_script.MeanBackgroundAccumulator()
+    else:
+        build = render_script.build_background_pointcloud
+        accumulator = render_script.BackgroundAccumulator()
+
+    # 49-frame windows with stride 25, as rendered by render_vipe_batch.py with window_background.
+    for window, new_frames in [((0, 48), range(0, 49)), ((25, 73), range(49, 74)), ((50, 98), range(74, 99))]:
+        kwargs = dict(artifact_name="exo", frame_range=window)
+        decoded["rgb"].clear()
+        decoded["depth"].clear()
+        points, colors, image_size = build(str(tmp_path / "take"), T_cam_to_world, accumulator=accumulator, **kwargs)
+        # Frames shared with the previous window are not decoded again.
+        assert decoded["rgb"] == decoded["depth"] == list(new_frames)
+        expected_points, expected_colors, expected_image_size = build(str(tmp_path / "take"), T_cam_to_world, **kwargs)
+        assert sorted(accumulator.frame_indices) == list(range(window[0], window[1] + 1))
+        assert image_size == expected_image_size
+        assert len(points) > 0 and points.shape == expected_points.shape
+        if use_mean_bg:
+            # Removing a frame subtracts exactly the float16 depth and uint8 RGB read from the artifacts, so only
+            # the float64 running sums round differently.
+            np.testing.assert_allclose(points, expected_points, rtol=0, atol=1e-5)
+            assert np.abs(colors.astype(np.int32) - expected_colors.astype(np.int32)).max() <= 1
+        else:
+            assert np.array_equal(points, expected_points)
+            assert np.array_equal(colors, expected_colors)
@@ -0,0 +1,73 @@
+# SPDX-FileCopyrightText: Copyright (c) 2025 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import threading
+
+import pytest
+import torch
+
+from vipe.utils.misc import run_per_view
+
+
+def make_views(n_views: int = 2, n_frames: int = 4) -> list[torch.Tensor]:
+    """Synthetic views: (n_frames, H, W, 3) images that differ per view."""
+    generator = torch.Generator().manual_seed(0)
+    return [torch.rand(n_frames, 6, 8, 3, generator=generator) + view_idx for view_idx in range(n_views)]
+
+
+def test_results_are_in_view_order_when_views_finish_out_of_order():
+    views = make_views()
+    # View 0 only finishes after view 1, which also proves that both views run concurrently.
+    view_1_done = threading.Event()
+
+    def process(view_idx: int, frames: torch.Tensor) -> tuple[int, torch.Tensor]:
+        if view_idx == 0:
+            assert view_1_done.wait(timeout=10.0), "views did not run concurrently"
+        result = (view_idx, frames.mean(dim=(1, 2, 3)))
+        if view_idx == 1:
+            view_1_done.set()
+        return result
+
+    results = run_per_view(process, views)
+    assert [view_idx for view_idx, _ in results] == [0, 1]
+    for (_, result), frames in zip(results, views):
+        torch.testing.assert_close(result, frames.mean(dim=(1, 2, 3)))
+
+
+@pytest.mark.parametrize("max_workers", [1, None])
+def test_matches_sequential_loop(max_workers):
+    views = make_views(n_views=3)
+
+    def process(view_idx: int, frames: torch.Tensor) -> torch.Tensor:
+        return frames.flip(0) * (view_idx + 1)
+
+    expected = [process(view_idx, frames) for view_idx, frames in enumerate(views)]
+    for result, expected_result in zip(run_per_view(process, views, max_workers), expected):
+        assert torch.equal(result, expected_result)
+
+
+def test_single_worker_runs_on_calling_thread():
+    thread_ids = run_per_view(lambda view_idx, frames: threading.get_ident(), make_views(), max_workers=1)
+    assert thread_ids == [threading.get_ident()] * 2
+
+
+def test_exception_of_a_view_is_raised():
+    def process(view_idx: int, frames: torch.Tensor) -> torch.Tensor:
+        if view_idx == 1:
+            raise ValueError("view 1 failed")
+        return frames
+
+    with pytest.raises(ValueError, match="view 1 failed"):
+        run_per_view(process, make_views())
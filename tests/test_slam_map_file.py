@@ -0,0 +1,151 @@
+# SPDX-FileCopyrightText: Copyright (c) 2025 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+
+import numpy as np
+import pytest
+import torch
+
+from vipe.slam.interface import SLAMMap, SLAMMapFile
+
+
+FRAME_INDS = [0, 3, 7, 12, 20]
+# Points per (keyframe, view), including empty views and an empty keyframe.
+COUNTS = [[4, 2], [0, 3], [5, 0], [0, 0], [1, 6]]
+KEY_LIMIT = 1 << (SLAMMapFile.VOXEL_KEY_BITS - 1)
+
+
+def make_map(counts: list[list[int]], frame_inds: list[int], low: float = -1.0, high: float = 1.0) -> SLAMMap:
+    """Map whose points are drawn uniformly from the cube [low, high]^3."""
+    counts = torch.tensor(counts)
+    flat_counts = counts.reshape(-1)
+    packinfo = torch.stack([torch.cumsum(flat_counts, 0) - flat_counts, flat_counts], dim=-1)
+    generator = torch.Generator().manual_seed(0)
+    n_points = int(flat_counts.sum())
+    return SLAMMap(
+        dense_disp_xyz=low + (high - low) * torch.rand(n_points, 3, generator=generator),
+        dense_disp_rgb=torch.rand(n_points, 3, generator=generator),
+        dense_disp_packinfo=packinfo.reshape(*counts.shape, 2),
+        dense_disp_frame_inds=frame_inds,
+    )
+
+
+def assert_maps_equal(actual: SLAMMap, expected: SLAMMap) -> None:
+    assert actual.dense_disp_frame_inds == expected.dense_disp_frame_inds
+    assert torch.equal(actual.dense_disp_xyz, expected.dense_disp_xyz)
+    assert torch.equal(actual.dense_disp_rgb, expected.dense_disp_rgb)
+    assert torch.equal(actual.dense_disp_packinfo, expected.dense_disp_packinfo)
+
+
+@pytest.mark.parametrize("voxel_size", [0.1, None])
+def test_directory_round_trip(tmp_path, voxel_size):
+    slam_map = make_map(COUNTS, FRAME_INDS)
+    path = tmp_path / "slam_map"
+    slam_map.save(path, voxel_size=voxel_size)
+
+    assert path.is_dir()
+    meta = json.loads((path / "meta.json").read_text())
+    assert meta["format"] == SLAMMapFile.FORMAT_NAME and meta["version"] == SLAMMapFile.VERSION
+    assert meta["num_points"] == sum(map(sum, COUNTS)) and meta["num_views"] == 2
+    map_file = SLAMMap.open(path)
+    assert len(map_file) == len(FRAME_INDS)
+    assert map_file.has_spatial_index == (voxel_size is not None)
+    assert_maps_equal(SLAMMap.load(path), slam_map)
+
+    # Saving again replaces the map without leaving temporary directories behind.
+    other_map = make_map([[1, 1]], [5])
+    other_map.save(path, voxel_size=voxel_size)
+    assert_maps_equal(SLAMMap.load(path), other_map)
+    assert [p.name for p in tmp_path.iterdir()] == ["slam_map"]
+
+
+def test_legacy_file_round_trip(tmp_path):
+    slam_map = make_map(COUNTS, FRAME_INDS)
+    slam_map.save(tmp_path / "slam_map.pt")
+
+    assert (tmp_path / "slam_map.pt").is_file()
+    assert_maps_equal(SLAMMap.load(tmp_path / "slam_map.pt"), slam_map)
+    # Paths without the suffix fall back to the legacy file.
+    map_file = SLAMMap.open(tmp_path / "slam_map")
+    assert map_file.path == tmp_path / "slam_map.pt"
+    assert not map_file.has_spatial_index
+    assert_maps_equal(map_file.to_slam_map(), slam_map)
+
+
+@pytest.mark.parametrize("legacy", [False, True])
+@pytest.mark.parametrize("keyframe_range", [range(0, 5), range(1, 4), range(3, 5), range(2, 3), range(2, 2)])
+def test_load_keyframes_slices_the_map(tmp_path, legacy, keyframe_range):
+    slam_map = make_map(COUNTS, FRAME_INDS)
+    path = tmp_path / ("slam_map.pt" if legacy else "slam_map")
+    slam_map.save(path)
+
+    loaded = SLAMMap.open(path).load_keyframes(keyframe_range)
+    assert loaded.dense_disp_frame_inds == FRAME_INDS[keyframe_range.start : keyframe_range.stop]
+    assert loaded.dense_disp_packinfo.shape == (len(keyframe_range), 2, 2)
+    for keyframe_idx, map_keyframe_idx in enumerate(keyframe_range):
+        for view_idx in range(2):
+            xyz, rgb = loaded.get_dense_disp_pcd(keyframe_idx, view_idx)
+            expected_xyz, expected_rgb = slam_map.get_dense_disp_pcd(map_keyframe_idx, view_idx)
+            assert torch.equal(xyz, expected_xyz) and torch.equal(rgb, expected_rgb)
+    n_points = sum(sum(COUNTS[i]) for i in keyframe_range)
+    assert loaded.dense_disp_xyz.shape == loaded.dense_disp_rgb.shape == (n_points, 3)
+
+
+@pytest.mark.parametrize(
+    ("frame_start", "frame_end", "keyframe_range"),
+    [
+        (0, 21, range(0, 5)),
+        (3, 12, range(1, 3)),
+        (4, 13, range(2, 4)),
+        (8, 12, range(3, 3)),
+        (21, 30, range(5, 5)),
+    ],
+)
+def test_load_frame_window_selects_keyframes_in_the_window(tmp_path, frame_start, frame_end, keyframe_range):
+    make_map(COUNTS, FRAME_INDS).save(tmp_path / "slam_map")
+    map_file = SLAMMap.open(tmp_path / "slam_map")
+
+    assert_maps_equal(map_file.load_frame_window(frame_start, frame_end), map_file.load_keyframes(keyframe_range))
+
+
+@pytest.mark.parametrize(
+    ("low", "high", "voxel_size", "bbox_min", "bbox_max"),
+    [
+        (-3.0, 1.0, None, (-2.0, -1.5, -3.0), (0.5, 0.0, -0.25)),
+        (-3.0, 1.0, 0.25, (-2.0, -1.5, -3.0), (0.5, 0.0, -0.25)),
+        # Box corners between voxel boundaries.
+        (-3.0, 1.0, 0.3, (-2.125, -0.75, -1.375), (0.25, 1.0, 0.875)),
+        (-3.0, 1.0, 0.3, (-5.0, -5.0, -5.0), (5.0, 5.0, 5.0)),
+        # Near the limit of the voxel keys, where out-of-range coordinates share the boundary voxels.
+        (KEY_LIMIT - 8, KEY_LIMIT + 8, 1.0, (KEY_LIMIT - 4, KEY_LIMIT - 6, KEY_LIMIT - 8), (KEY_LIMIT + 3,) * 3),
+        (KEY_LIMIT - 8, KEY_LIMIT + 8, 1.0, (KEY_LIMIT + 1,) * 3, (KEY_LIMIT + 8,) * 3),
+        (-KEY_LIMIT - 8, -KEY_LIMIT + 8, 1.0, (-KEY_LIMIT - 8,) * 3, (-KEY_LIMIT - 1,) * 3),
+        (-KEY_LIMIT - 8, -KEY_LIMIT + 8, 1.0, (-KEY_LIMIT - 3, -KEY_LIMIT, -KEY_LIMIT - 8), (-KEY_LIMIT + 2,) * 3),
+    ],
+)
+def test_query_region_matches_brute_force(tmp_path, low, high, voxel_size, bbox_min, bbox_max):
+    slam_map = make_map([[500, 300], [700, 500]], [0, 1], low=low, high=high)
+    slam_map.save(tmp_path / "slam_map", voxel_size=voxel_size)
+    map_file = SLAMMap.open(tmp_path / "slam_map")
+    assert map_file.has_spatial_index == (voxel_size is not None)
+
+    xyz, rgb = map_file.query_region(np.array(bbox_min), np.array(bbox_max))
+    bbox_min = torch.tensor(bbox_min, dtype=torch.float32)
+    bbox_max = torch.tensor(bbox_max, dtype=torch.float32)
+    in_box = torch.all((slam_map.dense_disp_xyz >= bbox_min) & (slam_map.dense_disp_xyz <= bbox_max), dim=1)
+    assert in_box.any()
+    assert torch.equal(xyz, slam_map.dense_disp_xyz[in_box])
+    assert torch.equal(rgb, slam_map.dense_disp_rgb[in_box])
@@ -0,0 +1,125 @@
+# SPDX-FileCopyrightText: Copyright (c) 2025 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import pytest
+import torch
+
+from vipe.ext.lietorch import SE3
+from vipe.slam import interface
+from vipe.slam.interface import SLAMMap
+from vipe.utils.cameras import CameraType
+
+
+HEIGHT, WIDTH = 8, 10
+# fx, fy, cx, cy: the optical axis hits pixel (row 3, column 4).
+INTRINSICS = torch.tensor([10.0, 10.0, 4.5, 3.5])
+
+
+def make_map(keyframe_points: list[list[tuple[float, float, float]]], frame_inds: list[int]) -> SLAMMap:
+    """Single-view map whose keyframe i holds keyframe_points[i] (world coordinates)."""
+    xyz = torch.tensor([p for points in keyframe_points for p in points], dtype=torch.float32)
+    counts = torch.tensor([len(points) for points in keyframe_points])
+    packinfo = torch.stack([torch.cumsum(counts, 0) - counts, counts], dim=-1)[:, None]
+    return SLAMMap(
+        dense_disp_xyz=xyz,
+        dense_disp_rgb=torch.zeros_like(xyz),
+        dense_disp_packinfo=packinfo,
+        dense_disp_frame_inds=frame_inds,
+    )
+
+
+def translation_poses(translations: list[tuple[float, float, float]]) -> SE3:
+    vec = torch.zeros(len(translations), 7)
+    vec[:, :3] = torch.tensor(translations)
+    vec[:, 6] = 1.0
+    return SE3.InitFromVec(vec)
+
+
+def project_batch(slam_map: SLAMMap, frame_tstamps: list[int], poses: SE3, tstamp_nn: int = 3):
+    return slam_map.project_map_batch(
+        frame_tstamps, 0, (HEIGHT, WIDTH), INTRINSICS, poses, CameraType.PINHOLE, tstamp_nn=tstamp_nn
+    )
+
+
+@pytest.mark.parametrize("near_first", [True, False])
+def test_nearer_point_wins_pixel(near_first):
+    # Both points lie on the optical axis; the background one is further away.
+    points = [(0.0, 0.0, 1.0), (0.0, 0.0, 3.0)]
+    slam_map = make_map([points if near_first else points[::-1]], [0])
+    depth, mask = project_batch(slam_map, [0], translation_poses([(0.0, 0.0, 0.0)]))
+
+    assert depth.shape == mask.shape == (1, HEIGHT, WIDTH)
+    assert mask.sum() == 1 and mask[0, 3, 4]
+    assert depth[0, 3, 4] == pytest.approx(1.0)
+    assert torch.all(depth[~mask] == 0)
+
+
+def test_points_behind_camera_and_outside_image_are_dropped():
+    slam_map = make_map([[(0.0, 0.0, -1.0), (100.0, 0.0, 1.0), (0.1, 0.1, 2.0)]], [0])
+    depth, mask = project_batch(slam_map, [0], translation_poses([(0.0, 0.0, 0.0)]))
+    # (0.1, 0.1, 2.0) projects to u = 5.0, v = 4.0.
+    assert mask.sum() == 1 and mask[0, 4, 5]
+    assert depth[0, 4, 5] == pytest.approx(2.0)
+
+
+def test_batch_matches_per_frame_projection():
+    keyframe_points = [
+        [(0.0, 0.0, 2.0), (0.1, 0.0, 2.5)],
+        [(0.0, 0.1, 1.5), (-0.1, -0.1, 3.0)],
+        [(0.05, 0.05, 1.0), (0.0, 0.0, 4.0)],
+    ]
+    slam_map = make_map(keyframe_points, [0, 5, 10])
+    frame_tstamps = [0, 4, 7, 10]
+    translations = [(0.0, 0.0, 0.0), (0.05, 0.0, 0.0), (0.0, -0.05, -0.2), (0.1, 0.1, 0.0)]
+
+    depth, mask = project_batch(slam_map, frame_tstamps, translation_poses(translations), tstamp_nn=1)
+    for batch_idx, (frame_tstamp, translation) in enumerate(zip(frame_tstamps, translations)):
+        frame_depth, frame_mask = project_batch(
+            slam_map, [frame_tstamp], translation_poses([translation]), tstamp_nn=1
+        )
+        torch.testing.assert_close(depth[batch_idx], frame_depth[0])
+        assert torch.equal(mask[batch_idx], frame_mask[0])
+
+
+@pytest.fixture
+def nearest_neighbours(monkeypatch):
+    """The kNN extension is CUDA-only; on CPU use a brute-force search with the same interface."""
+    if torch.cuda.is_available():
+        return
+
+    def brute_force_nearest_neighbours(query: torch.Tensor, tree: torch.Tensor, knn: int):
+        dist, inds = torch.cdist(query, tree).square().topk(knn, dim=-1, largest=False)
+        return dist, inds
+
+    monkeypatch.setattr(interface.utils_ext, "nearest_neighbours", brute_force_nearest_neighbours, raising=False)
+
+
+def test_infill_only_propagates_z_tested_depth(nearest_neighbours):
+    # Pixel (3, 4) holds an occluder at depth 1 in front of a background point at depth 3.
+    # Pixel (3, 8) only sees background at depth 3. The occluded point comes last, so an unordered scatter would
+    # keep it.
+    slam_map = make_map([[(0.0, 0.0, 1.0), (1.2, 0.0, 3.0), (0.0, 0.0, 3.0)]], [0])
+    pose = translation_poses([(0.0, 0.0, 0.0)])
+    _, sparse_mask = project_batch(slam_map, [0], pose)
+    assert sparse_mask[0].nonzero().tolist() == [[3, 4], [3, 8]]
+
+    dense_depth = slam_map.project_map(0, 0, (HEIGHT, WIDTH), INTRINSICS, pose[0], CameraType.PINHOLE, infill=True)
+    assert dense_depth.shape == (HEIGHT, WIDTH)
+    assert dense_depth[3, 4] == pytest.approx(1.0)
+    assert dense_depth[3, 8] == pytest.approx(3.0)
+    # Every pixel takes the depth of its closest z-tested pixel.
+    columns = torch.arange(WIDTH) + 0.5
+    expected_row = torch.where((columns - 4.5).abs() <= (columns - 8.5).abs(), 1.0, 3.0)
+    torch.testing.assert_close(dense_depth, expected_row.expand(HEIGHT, WIDTH))
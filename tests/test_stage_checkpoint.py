@@ -0,0 +1,211 @@
+# SPDX-FileCopyrightText: Copyright (c) 2025 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+
+import numpy as np
+import pytest
+import torch
+
+from omegaconf import OmegaConf
+
+from vipe.ext.lietorch import SE3
+from vipe.pipeline import default
+from vipe.pipeline.checkpoint import stream_fingerprint
+from vipe.pipeline.default import DefaultAnnotationPipeline
+from vipe.slam.interface import SLAMOutput
+from vipe.streams.base import FrameAttribute, ProcessedVideoStream, StreamProcessor, VideoFrame, VideoStream
+from vipe.utils import io
+from vipe.utils.cameras import CameraType
+
+
+N_FRAMES, HEIGHT, WIDTH = 6, 8, 12
+
+
+class SyntheticStream(VideoStream):
+    """In-memory CPU stream without a source path."""
+
+    def __init__(self, seed: int = 0) -> None:
+        super().__init__()
+        self.frames = torch.rand(N_FRAMES, HEIGHT, WIDTH, 3, generator=torch.Generator().manual_seed(seed))
+
+    def frame_size(self) -> tuple[int, int]:
+        return (HEIGHT, WIDTH)
+
+    def fps(self) -> float:
+        return 30.0
+
+    def name(self) -> str:
+        return "synthetic"
+
+    def __len__(self) -> int:
+        return N_FRAMES
+
+    def supports_random_access(self) -> bool:
+        return True
+
+    def get_frame(self, index: int) -> VideoFrame:
+        return VideoFrame(raw_frame_idx=index, rgb=self.frames[index].clone())
+
+    def __iter__(self):
+        for frame_idx in range(N_FRAMES):
+            yield self.get_frame(frame_idx)
+
+
+class StubIntrinsicsProcessor(StreamProcessor):
+    def update_attributes(self, previous_attributes: set[FrameAttribute]) -> set[FrameAttribute]:
+        return previous_attributes | {FrameAttribute.INTRINSICS, FrameAttribute.CAMERA_TYPE}
+
+    def __call__(self, frame_idx: int, frame: VideoFrame) -> VideoFrame:
+        frame.intrinsics = torch.tensor([10.0, 10.0, WIDTH / 2, HEIGHT / 2])
+        frame.camera_type = CameraType.PINHOLE
+        return frame
+
+
+class StubDepthProcessor(StreamProcessor):
+    def __init__(self, fail_at: int | None) -> None:
+        self.fail_at = fail_at
+
+    def update_attributes(self, previous_attributes: set[FrameAttribute]) -> set[FrameAttribute]:
+        return previous_attributes | {FrameAttribute.METRIC_DEPTH}
+
+    def __call__(self, frame_idx: int, frame: VideoFrame) -> VideoFrame:
+        if frame_idx == self.fail_at:
+            raise RuntimeError("Interrupted in the depth stage")
+        frame.metric_depth = 1.0 + frame.rgb.mean(dim=-1)
+        return frame
+
+
+class StubSLAMSystem:
+    def __init__(self, device: torch.device, config) -> None:
+        self.device = device
+
+    def run(self, video_streams: list[VideoStream], **kwargs) -> SLAMOutput:
+        n_frames = len(video_streams[0])
+        trajectory = torch.zeros(n_frames, 7)
+        trajectory[:, 0] = torch.linspace(0.0, 1.0, n_frames)
+        trajectory[:, 6] = 1.0
+        rig = torch.tensor([[0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 1.0]])
+        intrinsics = torch.stack([frame.intrinsics for frame in video_streams[0]])[:1]
+        return SLAMOutput(
+            trajectory=SE3(trajectory.to(self.device)),
+            intrinsics=intrinsics.to(self.device),
+            rig=SE3(rig.to(self.device)),
+            ba_residual=0.25,
+        )
+
+
+@pytest.fixture
+def stub_models(monkeypatch):
+    """Replace the models of all stages with CPU stubs and count how often the init and SLAM stages run."""
+    calls = {"init": 0, "slam": 0, "fail_at": None}
+
+    if not torch.cuda.is_available():
+        monkeypatch.setattr(VideoFrame, "cuda", lambda self, non_blocking=False: self)
+
+    def add_init_processors(self, video_stream: VideoStream) -> ProcessedVideoStream:
+        calls["init"] += 1
+        return ProcessedVideoStream(video_stream, [StubIntrinsicsProcessor()])
+
+    class CountingSLAMSystem(StubSLAMSystem):
+        def run(self, video_streams: list[VideoStream], **kwargs) -> SLAMOutput:
+            calls["slam"] += 1
+            return super().run(video_streams, **kwargs)
+
+    monkeypatch.setattr(DefaultAnnotationPipeline, "_add_init_processors", add_init_processors)
+    monkeypatch.setattr(default, "SLAMSystem", CountingSLAMSystem)
+    monkeypatch.setattr(default, "AdaptiveDepthProcessor", lambda *args: StubDepthProcessor(calls["fail_at"]))
+    return calls
+
+
+def make_pipeline(out_path, save_checkpoints: bool, resume: bool) -> DefaultAnnotationPipeline:
+    pipeline = DefaultAnnotationPipeline(
+        init=OmegaConf.create({"camera_type": "pinhole", "instance": None}),
+        slam=OmegaConf.create({"optimize_intrinsics": True}),
+        post=OmegaConf.create({"depth_align_model": "stub"}),
+        output=OmegaConf.create(
+            {
+                "path": str(out_path),
+                "save_checkpoints": save_checkpoints,
+                "resume": resume,
+                "save_artifacts": True,
+                "save_slam_map": False,
+                "save_viz": False,
+            }
+        ),
+    )
+    pipeline.device = torch.device("cpu")
+    return pipeline
+
+
+def read_artifacts(artifact_path: io.ArtifactPath) -> dict[str, np.ndarray]:
+    poses = np.load(artifact_path.pose_path)
+    intrinsics = np.load(artifact_path.intrinsics_path)
+    depths = [depth.numpy() for _, depth in io.read_depth_artifacts(artifact_path.depth_path)]
+    return {
+        "pose": poses["data"],
+        "pose_inds": poses["inds"],
+        "intrinsics": intrinsics["data"],
+        "depth": np.stack(depths),
+    }
+
+
+def test_resume_skips_completed_stages(stub_models, tmp_path):
+    stub_models["fail_at"] = 3
+    with pytest.raises(RuntimeError, match="depth stage"):
+        make_pipeline(tmp_path / "resumed", save_checkpoints=True, resume=False).run(SyntheticStream())
+    assert stub_models["init"] == 1 and stub_models["slam"] == 1
+
+    stub_models["fail_at"] = None
+    make_pipeline(tmp_path / "resumed", save_checkpoints=True, resume=True).run(SyntheticStream())
+    assert stub_models["init"] == 1 and stub_models["slam"] == 1
+
+    make_pipeline(tmp_path / "scratch", save_checkpoints=False, resume=False).run(SyntheticStream())
+    assert stub_models["init"] == 2 and stub_models["slam"] == 2
+
+    resumed = read_artifacts(io.ArtifactPath(tmp_path / "resumed", "synthetic"))
+    scratch = read_artifacts(io.ArtifactPath(tmp_path / "scratch", "synthetic"))
+    assert resumed.keys() == scratch.keys()
+    for name in resumed:
+        np.testing.assert_array_equal(resumed[name], scratch[name], err_msg=name)
+
+
+def test_resume_recomputes_for_a_different_input(stub_models, tmp_path):
+    make_pipeline(tmp_path, save_checkpoints=True, resume=False).run(SyntheticStream(seed=0))
+    make_pipeline(tmp_path, save_checkpoints=True, resume=True).run(SyntheticStream(seed=1))
+    assert stub_models["init"] == 2 and stub_models["slam"] == 2
+
+
+def test_frame_dir_fingerprint_sees_frames_overwritten_in_place(tmp_path):
+    cv2 = pytest.importorskip("cv2")
+    from vipe.streams.frame_dir_stream import FrameDirStream
+
+    rng = np.random.default_rng(0)
+    for frame_idx in range(3):
+        cv2.imwrite(str(tmp_path / f"{frame_idx:05d}.png"), rng.integers(0, 256, (HEIGHT, WIDTH, 3), np.uint8))
+    dir_stat = tmp_path.stat()
+    before = stream_fingerprint(FrameDirStream(tmp_path))
+
+    # Overwrite a frame a second later, with an image of the same size, and keep the directory stat unchanged.
+    frame_path = tmp_path / "00001.png"
+    frame_stat = frame_path.stat()
+    cv2.imwrite(str(frame_path), rng.integers(0, 256, (HEIGHT, WIDTH, 3), np.uint8))
+    os.utime(frame_path, ns=(frame_stat.st_atime_ns, frame_stat.st_mtime_ns + 1_000_000_000))
+    os.utime(tmp_path, ns=(dir_stat.st_atime_ns, dir_stat.st_mtime_ns))
+    after = stream_fingerprint(FrameDirStream(tmp_path))
+
+    assert before["source"]["size"] == after["source"]["size"]
+    assert before["source"]["mtime"] == after["source"]["mtime"]
+    assert before != after
@@ -0,0 +1,222 @@
+# SPDX-FileCopyrightText: Copyright (c) 2025 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import struct
+
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from scipy.spatial.transform import Rotation
+
+from vipe.utils.io import ArtifactPath
+
+
+# COLMAP camera model id of PINHOLE, see colmap/src/colmap/sensor/models.h
+COLMAP_PINHOLE_MODEL_ID = 1
+
+# Record layout of a points3D.bin entry with an empty track.
+POINTS3D_BIN_DTYPE = np.dtype(
+    [
+        ("point3d_id", "<u8"),
+        ("xyz", "<f8", (3,)),
+        ("rgb", "u1", (3,)),
+        ("error", "<f8"),
+        ("track_length", "<u8"),
+    ]
+)
+
+
+def read_cameras_bin(path: Path) -> dict[int, tuple[int, int, int, np.ndarray]]:
+    """Reference reader of cameras.bin (PINHOLE only), returns {camera_id: (model_id, width, height, params)}."""
+    cameras = {}
+    with open(path, "rb") as f:
+        (num_cameras,) = struct.unpack("<Q", f.read(8))
+        for _ in range(num_cameras):
+            camera_id, model_id, width, height = struct.unpack("<iiQQ", f.read(24))
+            assert model_id == COLMAP_PINHOLE_MODEL_ID, "Only PINHOLE camera model is supported"
+            params = np.frombuffer(f.read(8 * 4), dtype="<f8")
+            cameras[camera_id] = (model_id, width, height, params)
+    return cameras
+
+
+def read_images_bin(path: Path) -> dict[int, tuple[np.ndarray, np.ndarray, int, str]]:
+    """Reference reader of images.bin, returns {image_id: (qvec, tvec, camera_id, name)}."""
+    images = {}
+    with open(path, "rb") as f:
+        (num_images,) = struct.unpack("<Q", f.read(8))
+        for _ in range(num_images):
+            image_id, *pose, camera_id = struct.unpack("<i4d3di", f.read(64))
+            name = b""
+            while (char := f.read(1)) != b"\x00":
+                name += char
+            (num_points2d,) = struct.unpack("<Q", f.read(8))
+            f.read(24 * num_points2d)
+            images[image_id] = (np.array(pose[:4]), np.array(pose[4:]), camera_id, name.decode("utf-8"))
+    return images
+
+
+def read_points3d_bin(path: Path) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Reference reader of points3D.bin written with empty tracks, returns (ids, xyz, rgb)."""
+    with open(path, "rb") as f:
+        (num_points,) = struct.unpack("<Q", f.read(8))
+        records = np.frombuffer(f.read(), dtype=POINTS3D_BIN_DTYPE, count=num_points)
+    assert np.all(records["track_length"] == 0), "Only empty tracks are supported"
+    return records["point3d_id"], records["xyz"], records["rgb"]
+
+
+def _read_txt_data_lines(path: Path) -> list[str]:
+    with open(path, "r") as f:
+        return [line.rstrip("\n") for line in f if not line.startswith("#")]
+
+
+def read_cameras_txt(path: Path) -> dict[int, tuple[str, int, int, np.ndarray]]:
+    """Reference reader of cameras.txt, returns {camera_id: (model, width, height, params)}."""
+    cameras = {}
+    for line in _read_txt_data_lines(path):
+        if not line.strip():
+            continue
+        camera_id, model, width, height, *params = line.split()
+        cameras[int(camera_id)] = (model, int(width), int(height), np.array(params, dtype=np.float64))
+    return cameras
+
+
+def read_images_txt(path: Path) -> dict[int, tuple[np.ndarray, np.ndarray, int, str]]:
+    """
+    Reference reader of images.txt written without 2D points, returns {image_id: (qvec, tvec, camera_id, name)}.
+    """
+    lines = _read_txt_data_lines(path)
+    assert len(lines) % 2 == 0, "images.txt holds two lines per image"
+    images = {}
+    for image_line, points2d_line in zip(lines[::2], lines[1::2]):
+        image_id, *pose, camera_id, name = image_line.split()
+        assert not points2d_line.strip(), "Only images without 2D points are supported"
+        pose = np.array(pose, dtype=np.float64)
+        images[int(image_id)] = (pose[:4], pose[4:], int(camera_id), name)
+    return images
+
+
+def read_points3d_txt(path: Path) -> tuple[np.ndarray, np.ndarray, np.ndarray, list[np.ndarray]]:
+    """
+    Reference reader of points3D.txt, returns (ids, xyz, rgb, tracks) with (K, 2) (IMAGE_ID, POINT2D_IDX) tracks.
+    """
+    with open(path, "r") as f:
+        num_points = None
+        ids, xyz, rgb, tracks = [], [], [], []
+        for line in f:
+            if line.startswith("# Number of points:"):
+                num_points = int(line.split(":")[1])
+            if line.startswith("#") or not line.strip():
+                continue
+            values = line.split()
+            track = np.array(values[8:], dtype=np.int64)
+            assert len(track) % 2 == 0, "TRACK[] must hold (IMAGE_ID, POINT2D_IDX) pairs"
+            ids.append(int(values[0]))
+            xyz.append([float(v) for v in values[1:4]])
+            rgb.append([int(v) for v in values[4:7]])
+            tracks.append(track.reshape(-1, 2))
+    assert num_points is None or num_points == len(ids), "Point count in the header does not match the points"
+    return (
+        np.array(ids, dtype=np.uint64),
+        np.array(xyz, dtype=np.float64).reshape(-1, 3),
+        np.array(rgb, dtype=np.uint8).reshape(-1, 3),
+        tracks,
+    )
+
+
+@pytest.fixture
+def artifact(tmp_path):
+    """Pose and intrinsics artifacts of a 3-frame PINHOLE sequence."""
+    artifact = ArtifactPath(tmp_path / "vipe", "seq")
+    artifact.pose_path.parent.mkdir(parents=True)
+    artifact.intrinsics_path.parent.mkdir(parents=True)
+
+    c2w = np.tile(np.eye(4), (3, 1, 1))
+    c2w[:, :3, :3] = Rotation.from_euler("y", [[0.0], [10.0], [20.0]], degrees=True).as_matrix()
+    c2w[:, :3, 3] = [[0.0, 0.0, 0.0], [0.1, 0.0, 0.0], [0.2, 0.05, 0.0]]
+    np.savez(artifact.pose_path, data=c2w, inds=np.arange(3))
+    intrinsics = np.tile(np.array([[500.0, 510.0, 320.0, 240.0]], dtype=np.float32), (3, 1))
+    np.savez(artifact.intrinsics_path, data=intrinsics, inds=np.arange(3))
+    return artifact
+
+
+def _write_points(colmap_script, output_dir, output_format, voxel_size=None):
+    rng = np.random.default_rng(0)
+    batches = [(rng.uniform(-2, 2, (n, 3)), rng.integers(0, 256, (n, 3), dtype=np.uint8)) for n in (50, 0, 70)]
+    with colmap_script.Points3DWriter(output_dir, output_format, voxel_size) as writer:
+        for image_id, (xyz, rgb) in enumerate(batches, start=1):
+            writer.write(xyz, rgb, image_id)
+    return batches, writer.num_points
+
+
+def test_points3d_text_and_binary_round_trip(colmap_script, tmp_path):
+    batches, num_points = _write_points(colmap_script, tmp_path, "both")
+    xyz = np.concatenate([b[0] for b in batches])
+    rgb = np.concatenate([b[1] for b in batches])
+    assert num_points == len(xyz)
+
+    ids_bin, xyz_bin, rgb_bin = read_points3d_bin(tmp_path / "points3D.bin")
+    np.testing.assert_array_equal(ids_bin, np.arange(1, num_points + 1))
+    np.testing.assert_array_equal(xyz_bin, xyz)
+    np.testing.assert_array_equal(rgb_bin, rgb)
+
+    ids_txt, xyz_txt, rgb_txt, tracks = read_points3d_txt(tmp_path / "points3D.txt")
+    np.testing.assert_array_equal(ids_txt, ids_bin)
+    np.testing.assert_allclose(xyz_txt, xyz, atol=1e-6)
+    np.testing.assert_array_equal(rgb_txt, rgb)
+    # Legacy visualization track: (IMAGE_ID, POINT3D_ID) followed by two (0, 0) pairs.
+    image_ids = np.repeat([1, 3], [50, 70])
+    for point_id, image_id, track in zip(ids_txt, image_ids, tracks):
+        np.testing.assert_array_equal(track, [[image_id, point_id], [0, 0], [0, 0]])
+
+
+def test_points3d_voxel_downsampling_is_shared_by_both_formats(colmap_script, tmp_path):
+    _, num_points = _write_points(colmap_script, tmp_path, "both", voxel_size=1.0)
+    ids_bin, xyz_bin, _ = read_points3d_bin(tmp_path / "points3D.bin")
+    ids_txt, xyz_txt, _, _ = read_points3d_txt(tmp_path / "points3D.txt")
+    assert 0 < num_points == len(ids_bin) == len(ids_txt)
+    np.testing.assert_allclose(xyz_txt, xyz_bin, atol=1e-6)
+    voxels = np.floor(xyz_bin / 1.0).astype(np.int64)
+    assert len(np.unique(voxels, axis=0)) == num_points
+
+
+@pytest.mark.parametrize("binary", [False, True])
+def test_cameras_and_images_round_trip(colmap_script, artifact, tmp_path, binary):
+    colmap_script.write_cameras(tmp_path, artifact, 640, 480, binary)
+    colmap_script.write_images(tmp_path, artifact, binary)
+
+    if binary:
+        cameras = read_cameras_bin(tmp_path / "cameras.bin")
+        images = read_images_bin(tmp_path / "images.bin")
+        (model, width, height, params) = cameras[1]
+        assert model == COLMAP_PINHOLE_MODEL_ID
+    else:
+        cameras = read_cameras_txt(tmp_path / "cameras.txt")
+        images = read_images_txt(tmp_path / "images.txt")
+        (model, width, height, params) = cameras[1]
+        assert model == "PINHOLE"
+    assert (width, height) == (640, 480)
+    np.testing.assert_allclose(params, [500.0, 510.0, 320.0, 240.0], atol=1e-6)
+
+    c2w = np.load(artifact.pose_path)["data"]
+    assert sorted(images) == [1, 2, 3]
+    for image_id, (qvec, tvec, camera_id, name) in images.items():
+        w2c = np.linalg.inv(c2w[image_id - 1])
+        qw, qx, qy, qz = qvec
+        np.testing.assert_allclose(Rotation.from_quat([qx, qy, qz, qw]).as_matrix(), w2c[:3, :3], atol=1e-8)
+        np.testing.assert_allclose(tvec, w2c[:3, 3], atol=1e-8)
+        assert camera_id == 1
+        assert name == f"images/frame_{image_id - 1:06d}.jpg"
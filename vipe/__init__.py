@@ -14,10 +14,13 @@
 # limitations under the License.
 
 from pathlib import Path
+from typing import TYPE_CHECKING
 
 from omegaconf import OmegaConf
 
-from vipe.pipeline import make_pipeline
+
+if TYPE_CHECKING:
+    from vipe.pipeline import make_pipeline
 
 
 __version__ = "0.1.1"
@@ -31,3 +34,12 @@ if not OmegaConf.has_resolver("neq"):
 
 def get_config_path() -> Path:
     return Path(__file__).parent.parent / "configs"
+
+
+def __getattr__(name: str):
+    # The pipeline pulls in torch, the SLAM stack and the priors, so it is only imported when first used.
+    if name == "make_pipeline":
+        from vipe.pipeline import make_pipeline
+
+        return make_pipeline
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
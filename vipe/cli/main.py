@@ -13,17 +13,47 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import logging
+
 from pathlib import Path
 
 import click
-import hydra
 
-from vipe import get_config_path, make_pipeline
-from vipe.streams.base import ProcessedVideoStream
-from vipe.streams.raw_mp4_stream import RawMp4Stream
-from vipe.streams.frame_dir_stream import FrameDirStream
+from vipe import get_config_path
 from vipe.utils.logging import configure_logging
-from vipe.utils.viser import run_viser
+
+# Heavy dependencies (torch, hydra, the pipeline and viser) are imported inside the subcommand that uses them,
+# so that `vipe --help` and the other subcommands start quickly.
+
+
+def _parse_windows(windows: str) -> list[tuple[int, int]]:
+    """Parse inclusive frame windows given as 'start-end,start-end,...'."""
+    parsed = []
+    for window in windows.split(","):
+        try:
+            start, end = (int(v) for v in window.strip().split("-"))
+        except ValueError:
+            raise click.BadParameter(f"'{window}' is not a 'start-end' frame window.", param_hint="--windows") from None
+        if end < start:
+            raise click.BadParameter(f"Window end must not precede its start: {window}", param_hint="--windows")
+        parsed.append((start, end))
+    return parsed
+
+
+def _make_windows(start_frame: int, n_frames: int, window_size: int, window_stride: int) -> list[tuple[int, int]]:
+    """
+    Fixed-size inclusive windows over [start_frame, start_frame + n_frames), as in process_h2o_batch.sh:
+    window_stride == window_size gives non-overlapping clips, e.g. 49/25 the 50% overlap strategy.
+    Trailing frames that do not fill a whole window are dropped.
+    """
+    if window_size > n_frames:
+        raise click.BadParameter(
+            f"{window_size} exceeds the {n_frames} frames to process, so no window fits.", param_hint="--window_size"
+        )
+    return [
+        (start_frame + offset, start_frame + offset + window_size - 1)
+        for offset in range(0, n_frames - window_size + 1, window_stride)
+    ]
 
 
 @click.command()
@@ -46,9 +76,26 @@ from vipe.utils.viser import run_viser
 @click.option("--end_frame", type=int, default=None, help="Ending frame number (inclusive, default: process all frames)")
 @click.option("--assume_fixed_camera_pose", is_flag=True, help="Assume camera pose is fixed throughout the video (skips SLAM pose estimation)")
 @click.option("--use_exo_intrinsic_gt", type=str, default=None, help="3x3 intrinsics matrix in JSON format, e.g., '[[fx,0,cx],[0,fy,cy],[0,0,1]]' (sets optimize_intrinsics=False)")
-def infer(video: Path, image_dir: Path, output: Path, pipeline: str, visualize: bool, start_frame: int, end_frame: int, assume_fixed_camera_pose: bool, use_exo_intrinsic_gt: str):
+@click.option("--resume", is_flag=True, help="Save stage checkpoints and skip stages already completed with the same config and input")
+@click.option("--windows", type=str, default=None, help="Batch-window mode: inclusive frame windows 'start-end,start-end,...', each written to its own output directory")
+@click.option("--window_size", type=click.IntRange(min=1), default=None, help="Batch-window mode: split the frame range into windows of this many frames (e.g. 49)")
+@click.option("--window_stride", type=click.IntRange(min=1), default=None, help="Stride between window starts (default: window_size, i.e. no overlap; e.g. 25 for 50% overlap)")
+def infer(video: Path, image_dir: Path, output: Path, pipeline: str, visualize: bool, start_frame: int, end_frame: int, assume_fixed_camera_pose: bool, use_exo_intrinsic_gt: str, resume: bool, windows: str, window_size: int, window_stride: int):
     """Run inference on a video file or directory of images."""
 
+    # Reject malformed window options before the heavy imports.
+    if window_stride is not None and window_size is None:
+        raise click.BadParameter("only applies together with --window_size.", param_hint="--window_stride")
+    if windows is not None:
+        _parse_windows(windows)
+
+    import hydra
+
+    from vipe import make_pipeline
+    from vipe.streams.base import ProcessedVideoStream
+    from vipe.streams.frame_dir_stream import FrameDirStream
+    from vipe.streams.raw_mp4_stream import RawMp4Stream
+
     logger = configure_logging()
 
     # Validate that exactly one input source is provided
@@ -60,9 +107,13 @@ def infer(video: Path, image_dir: Path, output: Path, pipeline: str, visualize:
         click.echo("Error: Cannot provide both video file and --image-dir", err=True)
         raise click.Abort()
 
+    if windows is not None and window_size is not None:
+        click.echo("Error: --windows and --window_size are mutually exclusive", err=True)
+        raise click.Abort()
+
     # Create output directory based on parent folder name (video_name)
     # For structure like: {video_name}/exo.mp4 -> use {video_name}
-    video_name = video.parent.name  # Get parent directory name
+    video_name = (video if video else image_dir).parent.name  # Get parent directory name
     video_output_path = output / video_name
     
     overrides = [f"pipeline={pipeline}", f"pipeline.output.path={video_output_path}", "pipeline.output.save_artifacts=true"]
@@ -72,6 +123,9 @@ def infer(video: Path, image_dir: Path, output: Path, pipeline: str, visualize:
     else:
         overrides.append("pipeline.output.save_viz=false")
     
+    if resume:
+        overrides.append("pipeline.output.resume=true")
+
     if assume_fixed_camera_pose:
         overrides.append("pipeline.assume_fixed_camera_pose=true")
         logger.info("Fixed camera pose mode enabled - SLAM pose estimation will be skipped")
@@ -109,12 +163,21 @@ def infer(video: Path, image_dir: Path, output: Path, pipeline: str, visualize:
         args = hydra.compose("default", overrides=overrides)
 
     logger.info(f"Processing {input_desc}...")
+
+    if windows is not None or window_size is not None:
+        _infer_windows(
+            logger, args, video, image_dir, output, video_name, start_frame, end_frame, windows, window_size, window_stride
+        )
+        logger.info("Finished")
+        return
+
     logger.info(f"Output will be saved to: {video_output_path}")
     vipe_pipeline = make_pipeline(args.pipeline)
 
     if image_dir:
         # Use frame directory stream
-        video_stream = ProcessedVideoStream(FrameDirStream(image_dir), []).cache(desc="Reading image frames")
+        # Frame directories have an exact frame count and random access, so they are read lazily.
+        video_stream = FrameDirStream(image_dir)
     else:
         # Some input videos can be malformed, so we need to cache the videos to obtain correct number of frames.
         # Apply frame range if specified
@@ -124,10 +187,9 @@ def infer(video: Path, image_dir: Path, output: Path, pipeline: str, visualize:
             logger.info(f"Processing frames {start_frame} to {end_frame} ({end_frame - start_frame + 1} frames)")
         elif start_frame > 0:
             # If only start_frame is specified, process from start_frame to end
-            video_stream = ProcessedVideoStream(RawMp4Stream(video), []).cache(desc="Reading video stream")
-            total_frames = len(video_stream)
-            seek_range = range(start_frame, total_frames)
+            seek_range = range(start_frame, -1)
             video_stream = ProcessedVideoStream(RawMp4Stream(video, seek_range=seek_range), []).cache(desc="Reading video stream")
+            total_frames = start_frame + len(video_stream)
             logger.info(f"Processing frames {start_frame} to {total_frames-1} ({total_frames - start_frame} frames)")
         else:
             video_stream = ProcessedVideoStream(RawMp4Stream(video), []).cache(desc="Reading video stream")
@@ -137,12 +199,65 @@ def infer(video: Path, image_dir: Path, output: Path, pipeline: str, visualize:
     logger.info("Finished")
 
 
+def _infer_windows(
+    logger: logging.Logger,
+    args,
+    video: Path | None,
+    image_dir: Path | None,
+    output: Path,
+    video_name: str,
+    start_frame: int,
+    end_frame: int | None,
+    windows: str | None,
+    window_size: int | None,
+    window_stride: int | None,
+) -> None:
+    """
+    Run the pipeline over many frame windows of one input in a single process.
+    The input is decoded once and every window is a view over the shared frames, written to
+    `{output}/{video_name}_{start:06d}_{end:06d}`.
+    """
+
+    from vipe import make_pipeline
+    from vipe.streams.base import ProcessedVideoStream
+    from vipe.streams.frame_dir_stream import FrameDirStream
+    from vipe.streams.raw_mp4_stream import RawMp4Stream
+
+    frame_windows = _parse_windows(windows) if windows is not None else None
+    if frame_windows is not None:
+        start_frame = min(start for start, _ in frame_windows)
+        end_frame = max(end for _, end in frame_windows)
+    seek_range = range(start_frame, end_frame + 1 if end_frame is not None else -1)
+
+    if image_dir:
+        stream = FrameDirStream(image_dir, seek_range=seek_range)
+    else:
+        stream = RawMp4Stream(video, seek_range=seek_range)
+    video_stream = ProcessedVideoStream(stream, []).cache(desc="Reading video stream")
+
+    if frame_windows is None:
+        frame_windows = _make_windows(start_frame, len(video_stream), window_size, window_stride or window_size)
+    for window_start, window_end in frame_windows:
+        if window_end - start_frame >= len(video_stream):
+            raise click.BadParameter(f"Window {window_start}-{window_end} exceeds the decoded frames.")
+    logger.info(f"Processing {len(frame_windows)} windows over frames {start_frame} to {start_frame + len(video_stream) - 1}")
+
+    for window_start, window_end in frame_windows:
+        window_output_path = output / f"{video_name}_{window_start:06d}_{window_end:06d}"
+        logger.info(f"Window {window_start}-{window_end}: output will be saved to {window_output_path}")
+        args.pipeline.output.path = str(window_output_path)
+        window_stream = video_stream.view(range(window_start - start_frame, window_end - start_frame + 1))
+        make_pipeline(args.pipeline).run(window_stream)
+
+
 @click.command()
 @click.argument("data_path", type=click.Path(exists=True, path_type=Path), default=Path.cwd() / "vipe_results")
 @click.option("--port", "-p", default=20540, type=int, help="Port for the visualization server (default: 20540)")
 @click.option("--use_mean_bg", is_flag=True, help="Use robust statistical mean background instead of standard background")
 @click.option("--ego_manual", is_flag=True, help="Enable manual ego camera control with transform handles")
 def visualize(data_path: Path, port: int, use_mean_bg: bool, ego_manual: bool):
+    from vipe.utils.viser import run_viser
+
     run_viser(data_path, port, use_mean_bg, ego_manual)
 
 
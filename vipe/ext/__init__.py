@@ -14,33 +14,63 @@
 # limitations under the License.
 
 import os
+import threading
 
-from torch.utils.cpp_extension import load
+from types import ModuleType
 
-from vipe.ext.specs import get_cpp_flags, get_cuda_flags, get_sources
 
+_C: ModuleType | None = None
+_C_lock = threading.Lock()
 
-try:
-    import vipe_ext as _C
 
-    vipe_ext_not_found = False
-except ImportError:
-    vipe_ext_not_found = True
+def _load_extension() -> ModuleType:
+    """Import the compiled extension (or JIT-build it) on first use instead of on package import."""
+    global _C
+    with _C_lock:
+        if _C is not None:
+            return _C
+
+        try:
+            import vipe_ext as ext_module
+
+            vipe_ext_not_found = False
+        except ImportError:
+            vipe_ext_not_found = True
+
+        if vipe_ext_not_found or os.environ.get("VIPE_EXT_JIT", "0") == "1":
+            from torch.utils.cpp_extension import load
+
+            from vipe.ext.specs import get_cpp_flags, get_cuda_flags, get_sources
+
+            ext_module = load(
+                name="vipe_ext_jit",
+                sources=get_sources(),
+                extra_cflags=get_cpp_flags(),
+                extra_cuda_cflags=get_cuda_flags(),
+                verbose=True,
+            )
+        _C = ext_module
+        return _C
+
+
+class _LazyExtension:
+    """Stands in for a submodule of the compiled extension and resolves its attributes on first access."""
+
+    def __init__(self, name: str) -> None:
+        self._name = name
+
+    def __getattr__(self, attr: str):
+        return getattr(getattr(_load_extension(), self._name), attr)
+
+    def __repr__(self) -> str:
+        return f"<lazy extension module {self._name}>"
 
-if vipe_ext_not_found or os.environ.get("VIPE_EXT_JIT", "0") == "1":
-    _C = load(
-        name="vipe_ext_jit",
-        sources=get_sources(),
-        extra_cflags=get_cpp_flags(),
-        extra_cuda_cflags=get_cuda_flags(),
-        verbose=True,
-    )
 
 # Reference to submodules
-droid_net_ext = _C.droid_net_ext
-grounding_dino_ext = _C.grounding_dino_ext
-utils_ext = _C.utils_ext
-slam_ext = _C.slam_ext
-scatter_ext = _C.scatter_ext
-lietorch_ext = _C.lietorch_ext
-corr_ext = _C.corr_ext
+droid_net_ext = _LazyExtension("droid_net_ext")
+grounding_dino_ext = _LazyExtension("grounding_dino_ext")
+utils_ext = _LazyExtension("utils_ext")
+slam_ext = _LazyExtension("slam_ext")
+scatter_ext = _LazyExtension("scatter_ext")
+lietorch_ext = _LazyExtension("lietorch_ext")
+corr_ext = _LazyExtension("corr_ext")
@@ -11,11 +11,15 @@ from vipe.ext import lietorch_ext as lietorch_backends
 class GroupOp(torch.autograd.Function):
     """group operation base class"""
 
+    # Names of the backend functions, resolved at call time so that the extension is only loaded on first use.
+    forward_op: str
+    backward_op: str | None
+
     @classmethod
     def forward(cls, ctx, group_id, *inputs):
         ctx.group_id = group_id
         ctx.save_for_backward(*inputs)
-        out = cls.forward_op(ctx.group_id, *inputs)
+        out = getattr(lietorch_backends, cls.forward_op)(ctx.group_id, *inputs)
         return out
 
     @classmethod
@@ -25,68 +29,68 @@ class GroupOp(torch.autograd.Function):
 
         inputs = ctx.saved_tensors
         grad = grad.contiguous()
-        grad_inputs = cls.backward_op(ctx.group_id, grad, *inputs)
+        grad_inputs = getattr(lietorch_backends, cls.backward_op)(ctx.group_id, grad, *inputs)
         return (None,) + tuple(grad_inputs)
 
 
 class Exp(GroupOp):
     """exponential map"""
 
-    forward_op, backward_op = lietorch_backends.expm, lietorch_backends.expm_backward
+    forward_op, backward_op = "expm", "expm_backward"
 
 
 class Log(GroupOp):
     """logarithm map"""
 
-    forward_op, backward_op = lietorch_backends.logm, lietorch_backends.logm_backward
+    forward_op, backward_op = "logm", "logm_backward"
 
 
 class Inv(GroupOp):
     """group inverse"""
 
-    forward_op, backward_op = lietorch_backends.inv, lietorch_backends.inv_backward
+    forward_op, backward_op = "inv", "inv_backward"
 
 
 class Mul(GroupOp):
     """group multiplication"""
 
-    forward_op, backward_op = lietorch_backends.mul, lietorch_backends.mul_backward
+    forward_op, backward_op = "mul", "mul_backward"
 
 
 class Adj(GroupOp):
     """adjoint operator"""
 
-    forward_op, backward_op = lietorch_backends.adj, lietorch_backends.adj_backward
+    forward_op, backward_op = "adj", "adj_backward"
 
 
 class AdjT(GroupOp):
     """adjoint operator"""
 
-    forward_op, backward_op = lietorch_backends.adjT, lietorch_backends.adjT_backward
+    forward_op, backward_op = "adjT", "adjT_backward"
 
 
 class Act3(GroupOp):
     """action on point"""
 
-    forward_op, backward_op = lietorch_backends.act, lietorch_backends.act_backward
+    forward_op, backward_op = "act", "act_backward"
 
 
 class Act4(GroupOp):
     """action on point"""
 
-    forward_op, backward_op = lietorch_backends.act4, lietorch_backends.act4_backward
+    forward_op, backward_op = "act4", "act4_backward"
 
 
 class Jinv(GroupOp):
     """adjoint operator"""
 
-    forward_op, backward_op = lietorch_backends.Jinv, None
+    forward_op, backward_op = "Jinv", None
 
 
 class ToMatrix(GroupOp):
     """convert to matrix representation"""
 
-    forward_op, backward_op = lietorch_backends.as_matrix, None
+    forward_op, backward_op = "as_matrix", None
 
 
 ### conversion operations to/from Euclidean embeddings ###
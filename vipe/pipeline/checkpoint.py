@@ -0,0 +1,243 @@
+# SPDX-FileCopyrightText: Copyright (c) 2025 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+import torch
+
+from omegaconf import DictConfig, OmegaConf
+
+from vipe.ext.lietorch import SE3
+from vipe.slam.interface import SLAMMap, SLAMOutput
+from vipe.streams.base import (
+    CachedVideoStream,
+    FrameAttribute,
+    FrameSubsetStream,
+    StreamProcessor,
+    VideoFrame,
+    VideoStream,
+)
+from vipe.utils.io import ArtifactPath
+
+
+logger = logging.getLogger(__name__)
+
+
+# Frame fields persisted by each per-frame stage.
+INIT_STAGE_FIELDS = ("intrinsics", "camera_type", "instance", "instance_phrases", "mask")
+DEPTH_STAGE_FIELDS = ("metric_depth", "information")
+
+
+def stage_key(*parts: Any) -> str:
+    """
+    Hash the inputs of a stage. Parts can be configs, fingerprints or keys of upstream stages,
+    so that a change anywhere upstream invalidates all downstream checkpoints.
+    """
+    hasher = hashlib.sha256()
+    for part in parts:
+        if isinstance(part, DictConfig):
+            part = OmegaConf.to_container(part, resolve=True)
+        hasher.update(json.dumps(part, sort_keys=True, default=str).encode())
+    return hasher.hexdigest()
+
+
+def _hash_sampled_frames(video_stream: VideoStream, get_frame, n_samples: int) -> str:
+    hasher = hashlib.sha256()
+    for frame_idx in np.linspace(0, len(video_stream) - 1, n_samples).round().astype(int):
+        rgb = get_frame(int(frame_idx)).rgb[::8, ::8]
+        hasher.update((rgb * 255).round().byte().cpu().numpy().tobytes())
+    return hasher.hexdigest()
+
+
+def _hash_file_stats(file_paths: list[Path]) -> str:
+    hasher = hashlib.sha256()
+    for file_path in file_paths:
+        file_stat = file_path.stat()
+        hasher.update(f"{file_path.name}:{file_stat.st_size}:{file_stat.st_mtime_ns}\n".encode())
+    return hasher.hexdigest()
+
+
+def stream_fingerprint(video_stream: VideoStream, n_samples: int = 8) -> dict[str, Any] | None:
+    """
+    Identify the input of a video stream.
+    Fully cached streams are identified by the content of a few sampled frames, otherwise we fall back
+    to the source file (size and modification time) of the innermost stream that has a path. For frame
+    directories every frame file in the range is stat'ed, since a frame overwritten in place leaves the
+    directory itself untouched.
+    Without a path the innermost stream is identified by its sampled frames if it supports random access.
+    Returns None if the stream cannot be identified, in which case it must not be checkpointed.
+    """
+    fingerprint: dict[str, Any] = {
+        "name": video_stream.name(),
+        "n_frames": len(video_stream),
+        "fps": video_stream.fps(),
+        "frame_size": list(video_stream.frame_size()),
+    }
+
+    if isinstance(video_stream, FrameSubsetStream):
+        if (base_fingerprint := stream_fingerprint(video_stream.stream, n_samples)) is None:
+            return None
+        fingerprint["base"] = base_fingerprint
+        fingerprint["indices"] = list(video_stream.indices)
+        return fingerprint
+
+    if isinstance(video_stream, CachedVideoStream) and len(video_stream.data) == len(video_stream):
+        fingerprint["content"] = _hash_sampled_frames(video_stream, video_stream.data.__getitem__, n_samples)
+        return fingerprint
+
+    stream: Any = video_stream
+    while True:
+        if (source_path := getattr(stream, "path", None)) is not None:
+            source_stat = Path(source_path).stat()
+            fingerprint["source"] = {
+                "path": str(Path(source_path).resolve()),
+                "size": source_stat.st_size,
+                "mtime": source_stat.st_mtime,
+                "range": [getattr(stream, attr, None) for attr in ("start", "end", "step")],
+            }
+            if (frame_files := getattr(stream, "frame_files", None)) is not None:
+                fingerprint["source"]["frames"] = _hash_file_stats(
+                    [frame_files[frame_idx] for frame_idx in range(stream.start, stream.end, stream.step)]
+                )
+            return fingerprint
+        if getattr(stream, "stream", None) is None:
+            break
+        stream = stream.stream
+
+    # In-memory stream: the shape alone would let two different inputs share their checkpoints.
+    if isinstance(stream, VideoStream) and len(stream) > 0 and stream.supports_random_access():
+        fingerprint["content"] = _hash_sampled_frames(stream, stream.get_frame, n_samples)
+        return fingerprint
+    return None
+
+
+class StageCheckpoint:
+    """
+    Result of a pipeline stage persisted under `<base>/checkpoint/<artifact_name>/`.
+
+    Each stage writes a payload and a small json file holding the stage key. The json file is written last
+    so that a run interrupted while saving leaves the stage incomplete rather than corrupted.
+    """
+
+    def __init__(self, artifact_path: ArtifactPath, stage: str, key: str) -> None:
+        self.artifact_path = artifact_path
+        self.stage = stage
+        self.key = key
+
+    @property
+    def meta_path(self) -> Path:
+        return self.artifact_path.checkpoint_dir / f"{self.stage}.json"
+
+    @property
+    def data_path(self) -> Path:
+        return self.artifact_path.checkpoint_dir / f"{self.stage}.pt"
+
+    @property
+    def slam_map_path(self) -> Path:
+        return self.artifact_path.checkpoint_dir / f"{self.stage}_slam_map"
+
+    def is_complete(self) -> bool:
+        if not self.meta_path.exists():
+            return False
+        with self.meta_path.open("r") as f:
+            meta = json.load(f)
+        return meta.get("key") == self.key
+
+    def invalidate(self) -> None:
+        self.meta_path.unlink(missing_ok=True)
+
+    def _mark_complete(self) -> None:
+        tmp_path = self.meta_path.with_suffix(".json.tmp")
+        with tmp_path.open("w") as f:
+            json.dump({"stage": self.stage, "key": self.key}, f)
+        os.replace(tmp_path, self.meta_path)
+        logger.info(f"Saved {self.stage} checkpoint to {self.artifact_path.checkpoint_dir}")
+
+    def _save_payload(self, payload: dict[str, Any]) -> None:
+        self.invalidate()
+        self.artifact_path.checkpoint_dir.mkdir(exist_ok=True, parents=True)
+        tmp_path = self.data_path.with_suffix(".pt.tmp")
+        torch.save(payload, tmp_path)
+        os.replace(tmp_path, self.data_path)
+
+    def save_frames(self, video_stream: CachedVideoStream, fields: tuple[str, ...]) -> None:
+        """Persist the given fields of all (cached) frames of the stream."""
+        frames: list[dict[str, Any]] = []
+        for frame_idx in range(len(video_stream)):
+            _ = video_stream[frame_idx]
+            frame = video_stream.data[frame_idx]
+            frames.append({field: getattr(frame, field) for field in fields})
+        self._save_payload({"frames": frames})
+        self._mark_complete()
+
+    def load_frames(self) -> list[dict[str, Any]]:
+        return torch.load(self.data_path, weights_only=False)["frames"]
+
+    def save_slam_output(self, slam_output: SLAMOutput) -> None:
+        self._save_payload(
+            {
+                "trajectory": slam_output.trajectory.data.cpu(),
+                "intrinsics": slam_output.intrinsics.cpu(),
+                "rig": slam_output.rig.data.cpu() if slam_output.rig is not None else None,
+                "ba_residual": slam_output.ba_residual,
+            }
+        )
+        if self.slam_map_path.exists():
+            shutil.rmtree(self.slam_map_path)
+        if slam_output.slam_map is not None:
+            slam_output.slam_map.save(self.slam_map_path)
+        self._mark_complete()
+
+    def load_slam_output(self, device: torch.device) -> SLAMOutput:
+        data = torch.load(self.data_path, weights_only=False)
+        slam_map = SLAMMap.load(self.slam_map_path, device=device) if self.slam_map_path.exists() else None
+        return SLAMOutput(
+            trajectory=SE3(data["trajectory"].to(device)),
+            intrinsics=data["intrinsics"].to(device),
+            rig=SE3(data["rig"].to(device)) if data["rig"] is not None else None,
+            slam_map=slam_map,
+            ba_residual=data["ba_residual"],
+        )
+
+
+class RestoreFramesProcessor(StreamProcessor):
+    """Assign the fields restored from a per-frame stage checkpoint back to the frames."""
+
+    def __init__(self, frames: list[dict[str, Any]]) -> None:
+        self.frames = frames
+        attribute_names = {attribute.value for attribute in FrameAttribute}
+        self.attributes = {
+            FrameAttribute(field)
+            for field, value in frames[0].items()
+            if field in attribute_names and value is not None
+        }
+
+    def update_attributes(self, previous_attributes: set[FrameAttribute]) -> set[FrameAttribute]:
+        return previous_attributes | self.attributes
+
+    def __call__(self, frame_idx: int, frame: VideoFrame) -> VideoFrame:
+        for field, value in self.frames[frame_idx].items():
+            if isinstance(value, torch.Tensor):
+                value = value.to(frame.device)
+            setattr(frame, field, value)
+        return frame
@@ -26,6 +26,7 @@ from omegaconf import DictConfig
 from vipe.slam.system import SLAMOutput, SLAMSystem
 from vipe.streams.base import (
     AssignAttributesProcessor,
+    CachedVideoStream,
     FrameAttribute,
     MultiviewVideoList,
     ProcessedVideoStream,
@@ -34,9 +35,18 @@ from vipe.streams.base import (
 )
 from vipe.utils import io
 from vipe.utils.cameras import CameraType
+from vipe.utils.misc import run_per_view
 from vipe.utils.visualization import save_projection_video
 
 from . import AnnotationPipelineOutput, Pipeline
+from .checkpoint import (
+    DEPTH_STAGE_FIELDS,
+    INIT_STAGE_FIELDS,
+    RestoreFramesProcessor,
+    StageCheckpoint,
+    stage_key,
+    stream_fingerprint,
+)
 from .processors import AdaptiveDepthProcessor, GeoCalibIntrinsicsProcessor, GTIntrinsicsProcessor, TrackAnythingProcessor
 
 
@@ -44,13 +54,16 @@ logger = logging.getLogger(__name__)
 
 
 class DefaultAnnotationPipeline(Pipeline):
-    def __init__(self, init: DictConfig, slam: DictConfig, post: DictConfig, output: DictConfig, assume_fixed_camera_pose: bool = False, use_exo_intrinsic_gt: str = None) -> None:
+    def __init__(self, init: DictConfig, slam: DictConfig, post: DictConfig, output: DictConfig, assume_fixed_camera_pose: bool = False, use_exo_intrinsic_gt: str = None, max_view_workers: int | None = None) -> None:
         super().__init__()
+        # Number of views processed concurrently in the per-view stages (None: all views).
+        self.max_view_workers = max_view_workers
         self.init_cfg = init
         self.slam_cfg = slam
         self.post_cfg = post
         self.out_cfg = output
         self.assume_fixed_camera_pose = assume_fixed_camera_pose
+        self.device = torch.device("cuda")
         
         # Parse intrinsics matrix from JSON string if provided
         if use_exo_intrinsic_gt is not None:
@@ -102,7 +115,11 @@ class DefaultAnnotationPipeline(Pipeline):
         return ProcessedVideoStream(video_stream, init_processors)
 
     def _add_post_processors(
-        self, view_idx: int, video_stream: VideoStream, slam_output: SLAMOutput
+        self,
+        view_idx: int,
+        video_stream: VideoStream,
+        slam_output: SLAMOutput,
+        depth_frames: list[dict] | None = None,
     ) -> ProcessedVideoStream:
         post_processors: list[StreamProcessor] = [
             AssignAttributesProcessor(
@@ -112,7 +129,10 @@ class DefaultAnnotationPipeline(Pipeline):
                 }
             )
         ]
-        if (depth_align_model := self.post_cfg.depth_align_model) is not None:
+        if depth_frames is not None:
+            # Aligned depth restored from a checkpoint.
+            post_processors.append(RestoreFramesProcessor(depth_frames))
+        elif (depth_align_model := self.post_cfg.depth_align_model) is not None:
             post_processors.append(AdaptiveDepthProcessor(slam_output, view_idx, depth_align_model))
         return ProcessedVideoStream(video_stream, post_processors)
 
@@ -134,13 +154,65 @@ class DefaultAnnotationPipeline(Pipeline):
             logger.info(f"{video_data.name()} has been proccessed already, skip it!!")
             return annotate_output
 
-        slam_streams: list[VideoStream] = [
-            # GeoCalibIntrinsicsProcessor로 초기 intrinsics 추정
-            self._add_init_processors(video_stream).cache("process", online=True) for video_stream in video_streams
+        # Stage checkpoints are keyed by the config of the stage, the input video and all upstream stages.
+        save_checkpoints = self.out_cfg.get("save_checkpoints", False) or self.out_cfg.get("resume", False)
+        resume = self.out_cfg.get("resume", False)
+        fingerprints = [stream_fingerprint(stream) if save_checkpoints else None for stream in video_streams]
+        if save_checkpoints and any(fingerprint is None for fingerprint in fingerprints):
+            logger.warning(f"Cannot identify the input of {video_data.name()}, stage checkpoints are disabled")
+            save_checkpoints = resume = False
+        init_checkpoints = [
+            StageCheckpoint(
+                artifact_path,
+                "init",
+                stage_key(fingerprint, self.init_cfg, self.use_exo_intrinsic_gt),
+            )
+            for fingerprint, artifact_path in zip(fingerprints, artifact_paths)
+        ]
+        slam_checkpoint = StageCheckpoint(
+            artifact_paths[0],
+            "slam",
+            stage_key([c.key for c in init_checkpoints], self.slam_cfg, self.assume_fixed_camera_pose),
+        )
+        depth_checkpoints = [
+            StageCheckpoint(artifact_path, "depth", stage_key(slam_checkpoint.key, view_idx, self.post_cfg))
+            for view_idx, artifact_path in enumerate(artifact_paths)
         ]
 
-        slam_pipeline = SLAMSystem(device=torch.device("cuda"), config=self.slam_cfg)
-        slam_output = slam_pipeline.run(slam_streams, rig=slam_rig, camera_type=self.camera_type, camera_fix=self.assume_fixed_camera_pose)
+        # Views are independent until SLAM, so the init processors of all views run concurrently
+        # instead of being interleaved in the SLAM frame loop.
+        def init_view(view_idx: int, video_stream: VideoStream) -> tuple[CachedVideoStream, bool]:
+            init_checkpoint = init_checkpoints[view_idx]
+            if resume and init_checkpoint.is_complete():
+                logger.info(f"Restoring intrinsics and instances of {video_stream.name()} from checkpoint")
+                restore_processor = RestoreFramesProcessor(init_checkpoint.load_frames())
+                return ProcessedVideoStream(video_stream, [restore_processor]).cache("process", online=True), False
+
+            # GeoCalibIntrinsicsProcessor로 초기 intrinsics 추정
+            slam_stream = self._add_init_processors(video_stream).cache("process", online=True)
+            if len(video_streams) > 1 or save_checkpoints:
+                _ = slam_stream[len(slam_stream) - 1]
+            if save_checkpoints:
+                init_checkpoint.save_frames(slam_stream, INIT_STAGE_FIELDS)
+            return slam_stream, True
+
+        init_results = run_per_view(init_view, video_streams, self.max_view_workers)
+        slam_streams: list[VideoStream] = [slam_stream for slam_stream, _ in init_results]
+
+        # A recomputed stage can differ from its previous run, so its downstream checkpoints are not reused.
+        stage_recomputed = any(recomputed for _, recomputed in init_results)
+
+        if resume and not stage_recomputed and slam_checkpoint.is_complete():
+            logger.info("Restoring SLAM output from checkpoint")
+            slam_output = slam_checkpoint.load_slam_output(self.device)
+        else:
+            slam_pipeline = SLAMSystem(device=self.device, config=self.slam_cfg)
+            slam_output = slam_pipeline.run(
+                slam_streams, rig=slam_rig, camera_type=self.camera_type, camera_fix=self.assume_fixed_camera_pose
+            )
+            stage_recomputed = True
+            if save_checkpoints:
+                slam_checkpoint.save_slam_output(slam_output)
 
         if self.return_payload:
             annotate_output.payload = slam_output
@@ -152,13 +224,22 @@ class DefaultAnnotationPipeline(Pipeline):
         # AdaptiveDepthProcessor: 적응형 깊이 정렬
         # SVDA (Supervised Video Depth Alignment) 모델 사용
         # 메트릭 스케일 복구
-        output_streams = [
-            self._add_post_processors(view_idx, slam_stream, slam_output).cache("depth", online=True)
-            for view_idx, slam_stream in enumerate(slam_streams)
-        ]
 
-        # Dumping artifacts for all views in the streams
-        for output_stream, artifact_path in zip(output_streams, artifact_paths):
+        # Depth post-processing and artifact dumping are independent across views.
+        def post_view(view_idx: int, slam_stream: VideoStream) -> CachedVideoStream:
+            artifact_path, depth_checkpoint = artifact_paths[view_idx], depth_checkpoints[view_idx]
+            if resume and not stage_recomputed and depth_checkpoint.is_complete():
+                logger.info(f"Restoring aligned depth of {slam_stream.name()} from checkpoint")
+                output_stream = self._add_post_processors(
+                    view_idx, slam_stream, slam_output, depth_frames=depth_checkpoint.load_frames()
+                ).cache("depth", online=True)
+            else:
+                output_stream = self._add_post_processors(view_idx, slam_stream, slam_output).cache(
+                    "depth", online=True
+                )
+                if save_checkpoints:
+                    depth_checkpoint.save_frames(output_stream, DEPTH_STAGE_FIELDS)
+
             artifact_path.meta_info_path.parent.mkdir(exist_ok=True, parents=True)
             if self.out_cfg.save_artifacts:
                 logger.info(f"Saving artifacts to {artifact_path}")
@@ -179,6 +260,10 @@ class DefaultAnnotationPipeline(Pipeline):
                 logger.info(f"Saving SLAM map to {artifact_path.slam_map_path}")
                 slam_output.slam_map.save(artifact_path.slam_map_path)
 
+            return output_stream
+
+        output_streams = run_per_view(post_view, slam_streams, self.max_view_workers)
+
         if self.return_output_streams:
             annotate_output.output_streams = output_streams
 
@@ -23,15 +23,12 @@ import torch
 
 from vipe.priors.depth import DepthEstimationInput, make_depth_model
 from vipe.priors.depth.alignment import align_inv_depth_to_depth, align_metric_depth_to_depth
-from vipe.priors.depth.priorda import PriorDAModel
-from vipe.priors.depth.videodepthanything import VideoDepthAnythingDepthModel
-from vipe.priors.geocalib import GeoCalib
-from vipe.priors.track_anything import TrackAnythingPipeline
 from vipe.slam.interface import SLAMOutput
 from vipe.streams.base import CachedVideoStream, FrameAttribute, StreamProcessor, VideoFrame, VideoStream
 from vipe.utils.cameras import CameraType
 from vipe.utils.logging import pbar
 from vipe.utils.misc import unpack_optional
+from vipe.utils.model_registry import get_model_registry
 from vipe.utils.morph import erode
 
 
@@ -73,14 +70,19 @@ class GeoCalibIntrinsicsProcessor(IntrinsicEstimationProcessor):
     ) -> None:
         super().__init__(video_stream, gap_sec)
 
+        from vipe.priors.geocalib import GeoCalib
+
         is_pinhole = camera_type == CameraType.PINHOLE
         weights = "pinhole" if is_pinhole else "distorted"
 
-        model = GeoCalib(weights=weights).cuda()
-        indexable_stream = CachedVideoStream(video_stream)
+        model = get_model_registry().get("geocalib", {"weights": weights}, lambda: GeoCalib(weights=weights).cuda())
+        # Only the sampled frames are needed, so avoid caching the stream if it can be accessed randomly.
+        indexable_stream = video_stream if video_stream.supports_random_access() else CachedVideoStream(video_stream)
 
         if is_pinhole:
-            sample_frames = torch.stack([indexable_stream[i].rgb.moveaxis(-1, 0) for i in self.sample_frame_inds])
+            sample_frames = torch.stack(
+                [indexable_stream.get_frame(i).rgb.moveaxis(-1, 0) for i in self.sample_frame_inds]
+            )
             res = model.calibrate(
                 sample_frames,
                 shared_intrinsics=True,
@@ -92,7 +94,7 @@ class GeoCalibIntrinsicsProcessor(IntrinsicEstimationProcessor):
                 CameraType.MEI: "simple_mei",
             }[camera_type]
             res = model.calibrate(
-                indexable_stream[self.sample_frame_inds[0]].rgb.moveaxis(-1, 0)[None],
+                indexable_stream.get_frame(self.sample_frame_inds[0]).rgb.moveaxis(-1, 0)[None],
                 camera_model=camera_model,
             )
 
@@ -168,6 +170,8 @@ class TrackAnythingProcessor(StreamProcessor):
         sam_run_gap: int = 30,
         mask_expand: int = 5,
     ) -> None:
+        from vipe.priors.track_anything import TrackAnythingPipeline
+
         self.mask_phrases = mask_phrases
         self.sam_run_gap = sam_run_gap
         self.add_sky = add_sky
@@ -207,24 +211,28 @@ class AdaptiveDepthProcessor(StreamProcessor):
         view_idx: int = 0,
         model: str = "adaptive_unidepth-l_svda",
         share_depth_model: bool = False,
+        projection_batch_size: int = 16,
     ):
         super().__init__()
         self.slam_output = slam_output
+        self.projection_batch_size = projection_batch_size
         self.infill_target_pose = self.slam_output.get_view_trajectory(view_idx)
         assert view_idx == 0, "Adaptive depth processor only supports view_idx=0"
         assert not share_depth_model, "Adaptive depth processor does not support shared depth model"
         self.require_cache = True
         self.model = model
 
+        from vipe.priors.depth.priorda import PriorDAModel
+        from vipe.priors.depth.videodepthanything import VideoDepthAnythingDepthModel
+
         try:
             prefix, metric_model, video_model = model.split("_")
             assert video_model in ["svda", "vda", "metric-vda"]
-            if video_model == "metric-vda":
-                self.video_depth_model = VideoDepthAnythingDepthModel(model="mvitl")
-                self.is_metric_video = True
-            else:
-                self.video_depth_model = VideoDepthAnythingDepthModel(model="vits" if video_model == "svda" else "vitl")
-                self.is_metric_video = False
+            vda_model = {"metric-vda": "mvitl", "svda": "vits", "vda": "vitl"}[video_model]
+            self.video_depth_model = get_model_registry().get(
+                "video_depth_anything", {"model": vda_model}, lambda: VideoDepthAnythingDepthModel(model=vda_model)
+            )
+            self.is_metric_video = video_model == "metric-vda"
 
         except ValueError:
             prefix, metric_model = model.split("_")
@@ -235,7 +243,7 @@ class AdaptiveDepthProcessor(StreamProcessor):
         assert prefix == "adaptive", "Model name should start with 'adaptive_'"
 
         self.depth_model = make_depth_model(metric_model)
-        self.prompt_model = PriorDAModel()
+        self.prompt_model = get_model_registry().get("prior_depth_anything", None, PriorDAModel)
         self.update_momentum = 0.99
 
     def __call__(self, frame_idx: int, frame: VideoFrame) -> VideoFrame:
@@ -252,6 +260,18 @@ class AdaptiveDepthProcessor(StreamProcessor):
         depth_exist = depth_crop.any(dim=(1, 3))
         return depth_exist.float().mean().item()
 
+    def _project_slam_map(self, frame_inds: list[int], frame: VideoFrame) -> torch.Tensor:
+        """Z-buffered projection of the SLAM map onto a batch of frames sharing the intrinsics of `frame`."""
+        depth, _ = self.slam_output.slam_map.project_map_batch(
+            frame_inds,
+            0,
+            frame.size(),
+            unpack_optional(frame.intrinsics),
+            self.infill_target_pose[frame_inds],
+            unpack_optional(frame.camera_type),
+        )
+        return depth
+
     def _compute_video_da(self, frame_iterator: Iterator[VideoFrame]) -> tuple[torch.Tensor, list[VideoFrame]]:
         frame_list: list[np.ndarray] = []
         frame_data_list: list[VideoFrame] = []
@@ -278,27 +298,22 @@ class AdaptiveDepthProcessor(StreamProcessor):
             video_depth_result = None
             data_iterator = previous_iterator
 
+        prompt_batch: torch.Tensor | None = None
+        prompt_batch_start = 0
+
         for frame_idx, frame in pbar(enumerate(data_iterator), desc="Aligning depth"):
             # Convert back to GPU if not already.
             frame = frame.cuda()
 
             # Compute the minimum UV score only once at the 0-th frame.
             if frame_idx == 0:
-                for test_frame_idx in range(self.slam_output.trajectory.shape[0]):
-                    if test_frame_idx % 10 != 0:
-                        continue
-                    depth_infilled = self.slam_output.slam_map.project_map(
-                        test_frame_idx,
-                        0,
-                        frame.size(),
-                        unpack_optional(frame.intrinsics),
-                        self.infill_target_pose[test_frame_idx],
-                        unpack_optional(frame.camera_type),
-                        infill=False,
-                    )
-                    uv_score = self._compute_uv_score(depth_infilled)
-                    if uv_score < min_uv_score:
-                        min_uv_score = uv_score
+                test_frame_inds = list(range(0, self.slam_output.trajectory.shape[0], 10))
+                for batch_start in range(0, len(test_frame_inds), self.projection_batch_size):
+                    batch_inds = test_frame_inds[batch_start : batch_start + self.projection_batch_size]
+                    for depth_projected in self._project_slam_map(batch_inds, frame):
+                        uv_score = self._compute_uv_score(depth_projected)
+                        if uv_score < min_uv_score:
+                            min_uv_score = uv_score
 
                 logger.info(f"Minimum UV score: {min_uv_score:.4f}")
 
@@ -318,15 +333,14 @@ class AdaptiveDepthProcessor(StreamProcessor):
                 frame.information = f"uv={min_uv_score:.2f}(Metric)"
                 logger.debug(f"Frame {frame_idx}: using metric depth prompt (uv={min_uv_score:.4f}).")
             else:
-                depth_map = self.slam_output.slam_map.project_map(
-                    frame_idx,
-                    0,
-                    frame.size(),
-                    unpack_optional(frame.intrinsics),
-                    self.infill_target_pose[frame_idx],
-                    unpack_optional(frame.camera_type),
-                    infill=False,
-                )
+                # Project the map for a batch of upcoming frames at once.
+                batch_offset = frame_idx - prompt_batch_start
+                if prompt_batch is None or batch_offset >= prompt_batch.shape[0]:
+                    prompt_batch_start, batch_offset = frame_idx, 0
+                    n_frames = self.slam_output.trajectory.shape[0]
+                    batch_end = min(frame_idx + self.projection_batch_size, n_frames)
+                    prompt_batch = self._project_slam_map(list(range(frame_idx, batch_end)), frame)
+                depth_map = prompt_batch[batch_offset]
                 if frame.mask is not None:
                     depth_map = depth_map * frame.mask.float()
                 prompt_result = self.prompt_model.estimate(
@@ -13,10 +13,17 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+from vipe.utils.model_registry import get_model_registry
+
 from .base import DepthEstimationInput, DepthEstimationModel, DepthEstimationResult, DepthType
 
 
 def make_depth_model(model: str):
+    """Depth model by name. Models are shared through the process-wide model registry."""
+    return get_model_registry().get("depth", {"model": model}, lambda: _build_depth_model(model))
+
+
+def _build_depth_model(model: str):
     if "-" not in model:
         model_name, model_sub = model, ""
     else:
@@ -8,6 +8,8 @@ import torch.nn.functional as F
 
 from torchvision import transforms
 
+from vipe.utils.model_registry import get_model_registry
+
 from .aot import config as engine_config
 from .aot.networks.engines import build_engine
 from .aot.networks.engines.aot_engine import AOTEngine, AOTInferEngine
@@ -20,8 +22,12 @@ from .aot.utils.checkpoint import load_network
 class AOTTracker(object):
     def __init__(self, cfg, gpu_id=0):
         self.gpu_id = gpu_id
-        self.model = build_vos_model(cfg.MODEL_VOS, cfg).cuda(gpu_id)
-        self.model, _ = load_network(self.model, cfg.TEST_CKPT_PATH, gpu_id)
+        # The network weights are shared; the engine below keeps the per-video memory.
+        self.model = get_model_registry().get(
+            "aot",
+            {"model": cfg.MODEL_NAME, "checkpoint": cfg.TEST_CKPT_PATH, "gpu_id": gpu_id},
+            lambda: load_network(build_vos_model(cfg.MODEL_VOS, cfg).cuda(gpu_id), cfg.TEST_CKPT_PATH, gpu_id)[0],
+        )
         self.engine = build_engine(
             cfg.MODEL_ENGINE,
             phase="eval",
@@ -8,6 +8,8 @@ import torch
 
 from torchvision.ops import box_convert
 
+from vipe.utils.model_registry import get_model_registry
+
 from .groundingdino.config import config
 from .groundingdino.datasets import transforms as T
 from .groundingdino.models import build_model as build_grounding_dino
@@ -20,14 +22,18 @@ class Detector:
         args = config
         args.device = device
         self.deivce = device
-        self.gd = build_grounding_dino(args)
+        self.gd = get_model_registry().get("grounding_dino", {"device": device}, lambda: self._build_model(args))
 
+    @staticmethod
+    def _build_model(args):
+        gd = build_grounding_dino(args)
         checkpoint = torch.hub.load_state_dict_from_url(
             "https://huggingface.co/ShilongLiu/GroundingDINO/resolve/main/groundingdino_swint_ogc.pth",
             map_location="cpu",
         )
-        self.gd.load_state_dict(clean_state_dict(checkpoint["model"]), strict=False)
-        self.gd.eval()
+        gd.load_state_dict(clean_state_dict(checkpoint["model"]), strict=False)
+        gd.eval()
+        return gd
 
     def image_transform_grounding(self, init_image):
         transform = T.Compose(
@@ -5,6 +5,8 @@
 import numpy as np
 import torch
 
+from vipe.utils.model_registry import get_model_registry
+
 from .sam import SamAutomaticMaskGenerator, sam_model_registry
 
 
@@ -17,8 +19,14 @@ class Segmentor:
             gpu_id: device
         """
         self.device = sam_args["gpu_id"]
-        self.sam = sam_model_registry[sam_args["model_type"]](checkpoint=sam_args["sam_checkpoint"])
-        self.sam.to(device=self.device)
+        # The SAM weights are shared; the generator and predictor below keep the per-image state.
+        self.sam = get_model_registry().get(
+            "sam",
+            {"model_type": sam_args["model_type"], "checkpoint": sam_args["sam_checkpoint"], "device": self.device},
+            lambda: sam_model_registry[sam_args["model_type"]](checkpoint=sam_args["sam_checkpoint"]).to(
+                device=self.device
+            ),
+        )
         self.everything_generator = SamAutomaticMaskGenerator(model=self.sam, **sam_args["generator_args"])
         self.interactive_predictor = self.everything_generator.predictor
         self.have_embedded = False
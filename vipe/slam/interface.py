@@ -13,6 +13,11 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import json
+import os
+import shutil
+import uuid
+
 from dataclasses import dataclass
 from pathlib import Path
 
@@ -38,10 +43,19 @@ class SLAMMap:
     def scale(self, factor: float):
         self.dense_disp_xyz *= factor
 
-    def save(self, path: Path):
+    def save(self, path: Path, voxel_size: float | None = 0.1):
         """
-        Save the SLAM map to a directory.
+        Save the SLAM map.
+        If the path has a `.pt` suffix, the legacy single-file torch format is used, otherwise the map is
+        saved as a memory-mappable directory (see `SLAMMapFile`) with an optional voxel index of `voxel_size`.
         """
+        path = Path(path)
+        if path.suffix == ".pt":
+            self._save_legacy(path)
+        else:
+            SLAMMapFile.write(self, path, voxel_size=voxel_size)
+
+    def _save_legacy(self, path: Path):
         map_device = self.dense_disp_xyz.device
         torch.save(
             {
@@ -55,19 +69,24 @@ class SLAMMap:
         )
 
     @staticmethod
-    def load(path: Path, device: torch.device | None = None):
+    def load(path: Path, device: torch.device | None = None) -> "SLAMMap":
         """
-        Load the SLAM map from a directory.
+        Load the full SLAM map, either from the directory format or a legacy `.pt` file.
+        To only read a subset of keyframes or a spatial region, use `SLAMMap.open` instead.
         """
-        data = torch.load(path)
-        if device is None:
-            device = data["device"]
-        return SLAMMap(
-            dense_disp_xyz=data["dense_disp_xyz"].to(device),
-            dense_disp_rgb=data["dense_disp_rgb"].to(device),
-            dense_disp_packinfo=data["dense_disp_packinfo"].to(device),
-            dense_disp_frame_inds=data["dense_disp_frame_inds"],
-        )
+        return SLAMMap.open(path).to_slam_map(device=device)
+
+    @staticmethod
+    def open(path: Path) -> "SLAMMapFile":
+        """
+        Open a saved SLAM map lazily. Point arrays of the directory format are memory-mapped.
+        If `path` does not exist but a legacy `<path>.pt` file does, the legacy file is opened.
+        """
+        path = Path(path)
+        legacy_path = path.parent / (path.name + ".pt")
+        if not path.exists() and legacy_path.exists():
+            path = legacy_path
+        return SLAMMapFile(path)
 
     @staticmethod
     def from_masked_dense_disp(xyz: torch.Tensor, rgb: torch.Tensor, mask: torch.Tensor, tstamps: torch.Tensor):
@@ -117,53 +136,123 @@ class SLAMMap:
             color_list.append(color)
         return torch.cat(xyz_list, dim=0), torch.cat(color_list, dim=0)
 
-    def project_map(
+    def _keyframe_window(self, frame_tstamp: int, tstamp_nn: int) -> tuple[int, int]:
+        right_keyframe_idx = np.searchsorted(self.dense_disp_frame_inds, frame_tstamp).item()
+        right_keyframe_idx = min(right_keyframe_idx + tstamp_nn, len(self.dense_disp_frame_inds) - 1)
+        left_keyframe_idx = max(right_keyframe_idx - 2 * tstamp_nn, 0)
+        return left_keyframe_idx, right_keyframe_idx
+
+    def project_map_batch(
         self,
-        frame_tstamp: int,
+        frame_tstamps: list[int],
         view_idx: int,
         target_size: tuple[int, int],
         target_intrinsics: torch.Tensor,
-        target_pose: SE3,
+        target_poses: SE3,
         target_camera_type: CameraType,
-        infill: bool = False,
         tstamp_nn: int = 3,
-    ) -> torch.Tensor:
-        right_keyframe_idx = np.searchsorted(self.dense_disp_frame_inds, frame_tstamp).item()
-        right_keyframe_idx = min(right_keyframe_idx + tstamp_nn, len(self.dense_disp_frame_inds) - 1)
-        left_keyframe_idx = max(right_keyframe_idx - 2 * tstamp_nn, 0)
+    ) -> tuple[torch.Tensor, torch.Tensor]:
+        """
+        Project the map points of the keyframes around each frame into that frame, with a z-test.
+        When several points fall into the same pixel the closest one is kept.
 
-        xyz_list = []
-        for keyframe_idx in range(left_keyframe_idx, right_keyframe_idx + 1):
-            # If view_idx = -1 this will be all views
-            xyz, _ = self.get_dense_disp_pcd(keyframe_idx, view_idx)
-            xyz_list.append(xyz)
-        all_xyz = torch.cat(xyz_list, dim=0)
+        Args:
+            frame_tstamps: (B,) frame indices to project to.
+            view_idx: view index of the map points to use (-1 for all views).
+            target_size: (H, W) of the target frames.
+            target_intrinsics: (4+D,) intrinsics shared by all target frames.
+            target_poses: (B,) c2w poses of the target frames.
+            target_camera_type: camera type of the target frames.
+            tstamp_nn: number of neighbouring keyframes on each side to use.
 
-        target_pose_mat = target_pose.inv().matrix()
-        all_xyz = all_xyz @ target_pose_mat[:3, :3].T + target_pose_mat[:3, 3]
+        Returns:
+            depth: (B, H, W) sparse depth, 0 where no point is projected.
+            mask: (B, H, W) boolean mask of pixels with a projected point.
+        """
+        n_frames = len(frame_tstamps)
+        height, width = target_size
+        device = self.dense_disp_xyz.device
 
-        xyz_h = torch.cat(
-            [all_xyz, torch.ones(all_xyz.shape[0], device="cuda").unsqueeze(-1)],
-            dim=-1,
+        # Gather (start, count) ranges of all keyframes (and views) in the window of each frame.
+        range_frame_inds, range_keyframe_inds = [], []
+        for batch_idx, frame_tstamp in enumerate(frame_tstamps):
+            left_keyframe_idx, right_keyframe_idx = self._keyframe_window(frame_tstamp, tstamp_nn)
+            n_keyframes = right_keyframe_idx - left_keyframe_idx + 1
+            range_frame_inds.extend([batch_idx] * n_keyframes)
+            range_keyframe_inds.extend(range(left_keyframe_idx, right_keyframe_idx + 1))
+        range_keyframe_inds_t = torch.as_tensor(range_keyframe_inds, device=device, dtype=torch.long)
+        range_frame_inds_t = torch.as_tensor(range_frame_inds, device=device, dtype=torch.long)
+        if view_idx == -1:
+            # All views of a keyframe are contiguous.
+            packinfo = self.dense_disp_packinfo[range_keyframe_inds_t].long()
+            starts = packinfo[:, 0, 0]
+            counts = packinfo[:, :, 1].sum(dim=1)
+        else:
+            packinfo = self.dense_disp_packinfo[range_keyframe_inds_t, view_idx].long()
+            starts, counts = packinfo[:, 0], packinfo[:, 1]
+
+        # Flatten ranges into point indices and their target frame index.
+        point_frame_inds = torch.repeat_interleave(range_frame_inds_t, counts)
+        range_offsets = torch.cumsum(counts, dim=0) - counts
+        point_inds = torch.arange(point_frame_inds.shape[0], device=device) + torch.repeat_interleave(
+            starts - range_offsets, counts
         )
+        all_xyz = self.dense_disp_xyz[point_inds]
+
+        target_pose_mat = target_poses.inv().matrix().to(all_xyz)[point_frame_inds]
+        all_xyz = torch.einsum("nij,nj->ni", target_pose_mat[:, :3, :3], all_xyz) + target_pose_mat[:, :3, 3]
+
+        xyz_h = torch.cat([all_xyz, torch.ones_like(all_xyz[:, :1])], dim=-1)
         disp = 1.0 / all_xyz[:, 2]
 
         camera_model = target_camera_type.build_camera_model(target_intrinsics)
         uv, _, _ = camera_model.proj_points(xyz_h, limit_min_depth=False)
         uu, vv = uv[..., 0], uv[..., 1]
 
-        in_mask = (uu > 0) & (uu < target_size[1]) & (vv > 0) & (vv < target_size[0]) & (disp > 0)
+        in_mask = (uu > 0) & (uu < width) & (vv > 0) & (vv < height) & (disp > 0)
         uu, vv, depth = uu[in_mask], vv[in_mask], disp[in_mask].reciprocal()
+        pixel_inds = (point_frame_inds[in_mask] * height + vv.floor().long()) * width + uu.floor().long()
 
-        if not infill:
-            target_depth = torch.zeros(target_size, device="cuda")
-            target_depth[vv.floor().long(), uu.floor().long()] = depth
-        else:
-            tree = torch.stack((uu, vv), dim=-1)
+        # Z-buffer: keep the minimum depth per pixel.
+        target_depth = torch.full((n_frames * height * width,), float("inf"), device=device, dtype=depth.dtype)
+        target_depth.scatter_reduce_(0, pixel_inds, depth, reduce="amin", include_self=True)
+        target_depth = target_depth.reshape(n_frames, height, width)
+        target_mask = torch.isfinite(target_depth)
+        target_depth[~target_mask] = 0.0
+        return target_depth, target_mask
+
+    def project_map(
+        self,
+        frame_tstamp: int,
+        view_idx: int,
+        target_size: tuple[int, int],
+        target_intrinsics: torch.Tensor,
+        target_pose: SE3,
+        target_camera_type: CameraType,
+        infill: bool = False,
+        tstamp_nn: int = 3,
+    ) -> torch.Tensor:
+        target_depth, target_mask = self.project_map_batch(
+            [frame_tstamp],
+            view_idx,
+            target_size,
+            target_intrinsics,
+            target_pose[None],
+            target_camera_type,
+            tstamp_nn=tstamp_nn,
+        )
+        target_depth, target_mask = target_depth[0], target_mask[0]
+
+        if infill:
+            # Nearest neighbour infill from the z-tested pixels, so occluded points are not propagated.
+            device = target_depth.device
+            vv, uu = torch.nonzero(target_mask, as_tuple=True)
+            depth = target_depth[vv, uu]
+            tree = torch.stack((uu.float() + 0.5, vv.float() + 0.5), dim=-1)
             query = torch.stack(
                 torch.meshgrid(
-                    torch.arange(target_size[1], device="cuda").float() + 0.5,
-                    torch.arange(target_size[0], device="cuda").float() + 0.5,
+                    torch.arange(target_size[1], device=device).float() + 0.5,
+                    torch.arange(target_size[0], device=device).float() + 0.5,
                     indexing="xy",
                 ),
                 dim=-1,
@@ -173,6 +262,197 @@ class SLAMMap:
         return target_depth
 
 
+class SLAMMapFile:
+    """
+    On-disk SLAM map that can be partially loaded.
+
+    Directory layout (version 1):
+    - meta.json: format name, version, frame indices of the keyframes, number of points and views.
+    - xyz.npy / rgb.npy: (M, 3) float32 point arrays, memory-mapped on read.
+    - packinfo.npy: (N, V, 2) per-keyframe (and view) offset table into the point arrays.
+    - voxel_keys.npy / voxel_starts.npy / voxel_point_inds.npy (optional): voxel grid index in CSR form,
+      points of voxel voxel_keys[i] are voxel_point_inds[voxel_starts[i]:voxel_starts[i + 1]].
+
+    Legacy `.pt` maps are also supported, in which case everything is loaded into memory.
+    """
+
+    FORMAT_NAME = "vipe_slam_map"
+    VERSION = 1
+
+    # Voxel coordinates are packed into a single int64 key with 21 bits per axis.
+    VOXEL_KEY_BITS = 21
+
+    def __init__(self, path: Path) -> None:
+        self.path = Path(path)
+        self.voxel_size: float | None = None
+        self.voxel_keys: np.ndarray | None = None
+        self.voxel_starts: np.ndarray | None = None
+        self.voxel_point_inds: np.ndarray | None = None
+
+        if self.path.is_dir():
+            with (self.path / "meta.json").open("r") as f:
+                meta = json.load(f)
+            if meta.get("format") != self.FORMAT_NAME or meta.get("version", 0) > self.VERSION:
+                raise ValueError(
+                    f"Unsupported SLAM map format in {self.path}: {meta.get('format')} v{meta.get('version')}"
+                )
+            self.frame_inds: list[int] = meta["frame_inds"]
+            self.device = torch.device(meta.get("device", "cpu"))
+            self.xyz: np.ndarray = np.load(self.path / "xyz.npy", mmap_mode="r")
+            self.rgb: np.ndarray = np.load(self.path / "rgb.npy", mmap_mode="r")
+            self.packinfo: np.ndarray = np.load(self.path / "packinfo.npy")
+            if meta.get("voxel_size") is not None:
+                self.voxel_size = float(meta["voxel_size"])
+                self.voxel_keys = np.load(self.path / "voxel_keys.npy")
+                self.voxel_starts = np.load(self.path / "voxel_starts.npy")
+                self.voxel_point_inds = np.load(self.path / "voxel_point_inds.npy", mmap_mode="r")
+        else:
+            data = torch.load(self.path)
+            self.frame_inds = data["dense_disp_frame_inds"]
+            self.device = torch.device(data["device"])
+            self.xyz = data["dense_disp_xyz"].numpy()
+            self.rgb = data["dense_disp_rgb"].numpy()
+            self.packinfo = data["dense_disp_packinfo"].numpy()
+
+    @classmethod
+    def voxel_coords_to_keys(cls, coords: np.ndarray) -> np.ndarray:
+        offset = 1 << (cls.VOXEL_KEY_BITS - 1)
+        coords = np.clip(coords + offset, 0, (1 << cls.VOXEL_KEY_BITS) - 1).astype(np.int64)
+        return (coords[:, 0] << (2 * cls.VOXEL_KEY_BITS)) | (coords[:, 1] << cls.VOXEL_KEY_BITS) | coords[:, 2]
+
+    @classmethod
+    def voxel_keys_to_coords(cls, keys: np.ndarray) -> np.ndarray:
+        offset = 1 << (cls.VOXEL_KEY_BITS - 1)
+        mask = (1 << cls.VOXEL_KEY_BITS) - 1
+        coords = np.stack([keys >> (2 * cls.VOXEL_KEY_BITS), (keys >> cls.VOXEL_KEY_BITS) & mask, keys & mask], axis=-1)
+        return coords - offset
+
+    @classmethod
+    def write(cls, slam_map: SLAMMap, path: Path, voxel_size: float | None = None) -> None:
+        """
+        Write the map into a temporary sibling directory and move it to `path` once complete, so that an
+        interrupted save leaves either the previous map or no map at `path`, never a mix of both.
+        """
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.parent / f".{path.name}.tmp-{uuid.uuid4().hex}"
+        tmp_path.mkdir()
+        try:
+            cls._write_files(slam_map, tmp_path, voxel_size)
+        except BaseException:
+            shutil.rmtree(tmp_path, ignore_errors=True)
+            raise
+
+        # A directory cannot be renamed onto a non-empty one, so an existing map is moved aside first.
+        old_path = None
+        if path.exists():
+            old_path = path.parent / f".{path.name}.old-{uuid.uuid4().hex}"
+            os.replace(path, old_path)
+        os.replace(tmp_path, path)
+        if old_path is not None:
+            shutil.rmtree(old_path, ignore_errors=True)
+
+    @classmethod
+    def _write_files(cls, slam_map: SLAMMap, path: Path, voxel_size: float | None) -> None:
+        xyz = slam_map.dense_disp_xyz.float().cpu().numpy()
+        np.save(path / "xyz.npy", xyz)
+        np.save(path / "rgb.npy", slam_map.dense_disp_rgb.float().cpu().numpy())
+        np.save(path / "packinfo.npy", slam_map.dense_disp_packinfo.long().cpu().numpy())
+
+        if voxel_size is not None:
+            keys = cls.voxel_coords_to_keys(np.floor(xyz / voxel_size).astype(np.int64))
+            point_inds = np.argsort(keys, kind="stable")
+            voxel_keys, voxel_counts = np.unique(keys[point_inds], return_counts=True)
+            np.save(path / "voxel_keys.npy", voxel_keys)
+            np.save(path / "voxel_starts.npy", np.concatenate([[0], np.cumsum(voxel_counts)]).astype(np.int64))
+            np.save(path / "voxel_point_inds.npy", point_inds.astype(np.int64))
+
+        meta = {
+            "format": cls.FORMAT_NAME,
+            "version": cls.VERSION,
+            "frame_inds": [int(t) for t in slam_map.dense_disp_frame_inds],
+            "num_points": int(xyz.shape[0]),
+            "num_views": int(slam_map.dense_disp_packinfo.shape[1]),
+            "voxel_size": voxel_size,
+            "device": str(slam_map.dense_disp_xyz.device),
+        }
+        with (path / "meta.json").open("w") as f:
+            json.dump(meta, f)
+
+    def __len__(self) -> int:
+        return len(self.frame_inds)
+
+    @property
+    def has_spatial_index(self) -> bool:
+        return self.voxel_keys is not None
+
+    def to_slam_map(self, device: torch.device | None = None) -> SLAMMap:
+        """Load the full map into memory."""
+        return self.load_keyframes(range(len(self)), device=device)
+
+    def load_keyframes(self, keyframe_range: range, device: torch.device | None = None) -> SLAMMap:
+        """
+        Load a contiguous range of keyframes (all views) as a standalone SLAMMap.
+        Only the corresponding slice of the point arrays is read from disk.
+        """
+        if device is None:
+            device = self.device
+        assert keyframe_range.step == 1, "Only contiguous keyframe ranges are supported."
+        packinfo = self.packinfo[keyframe_range.start : keyframe_range.stop]
+        if len(packinfo) == 0:
+            start = end = 0
+        else:
+            start = int(packinfo[0, 0, 0])
+            end = int(packinfo[-1, -1, 0] + packinfo[-1, -1, 1])
+        packinfo = packinfo.copy()
+        packinfo[..., 0] -= start
+        return SLAMMap(
+            dense_disp_xyz=torch.from_numpy(np.array(self.xyz[start:end])).to(device),
+            dense_disp_rgb=torch.from_numpy(np.array(self.rgb[start:end])).to(device),
+            dense_disp_packinfo=torch.from_numpy(packinfo).to(device),
+            dense_disp_frame_inds=self.frame_inds[keyframe_range.start : keyframe_range.stop],
+        )
+
+    def load_frame_window(self, frame_start: int, frame_end: int, device: torch.device | None = None) -> SLAMMap:
+        """Load keyframes whose frame indices are within [frame_start, frame_end)."""
+        left = int(np.searchsorted(self.frame_inds, frame_start, side="left"))
+        right = int(np.searchsorted(self.frame_inds, frame_end, side="left"))
+        return self.load_keyframes(range(left, right), device=device)
+
+    def query_region(
+        self, bbox_min: np.ndarray, bbox_max: np.ndarray, device: torch.device | None = None
+    ) -> tuple[torch.Tensor, torch.Tensor]:
+        """
+        Return xyz and rgb of all points inside the axis-aligned box [bbox_min, bbox_max].
+        With a voxel index only the points of the overlapping voxels are read, otherwise all points are scanned.
+        """
+        if device is None:
+            device = self.device
+        bbox_min, bbox_max = np.asarray(bbox_min, dtype=np.float32), np.asarray(bbox_max, dtype=np.float32)
+
+        if self.has_spatial_index:
+            assert self.voxel_keys is not None and self.voxel_starts is not None and self.voxel_point_inds is not None
+            assert self.voxel_size is not None
+            voxel_coords = self.voxel_keys_to_coords(self.voxel_keys)
+            # Points beyond the key range were clipped into the boundary voxels, so the box is clipped alike.
+            key_limit = 1 << (self.VOXEL_KEY_BITS - 1)
+            voxel_min = np.clip(np.floor(bbox_min / self.voxel_size), -key_limit, key_limit - 1)
+            voxel_max = np.clip(np.floor(bbox_max / self.voxel_size), -key_limit, key_limit - 1)
+            voxel_inds = np.where(np.all((voxel_coords >= voxel_min) & (voxel_coords <= voxel_max), axis=1))[0]
+            point_inds = np.concatenate(
+                [self.voxel_point_inds[self.voxel_starts[v] : self.voxel_starts[v + 1]] for v in voxel_inds]
+                + [np.empty((0,), dtype=np.int64)]
+            )
+            # Sorted access is friendlier to the memory-mapped arrays.
+            point_inds = np.sort(point_inds)
+            xyz, rgb = self.xyz[point_inds], self.rgb[point_inds]
+        else:
+            xyz, rgb = np.asarray(self.xyz), np.asarray(self.rgb)
+
+        in_box = np.all((xyz >= bbox_min) & (xyz <= bbox_max), axis=1)
+        return torch.from_numpy(np.array(xyz[in_box])).to(device), torch.from_numpy(np.array(rgb[in_box])).to(device)
+
+
 @dataclass(kw_only=True)
 class SLAMOutput:
     trajectory: SE3  # (N,)
@@ -28,6 +28,7 @@ from vipe.streams.base import FrameAttribute, ProcessedVideoStream, StreamProces
 from vipe.utils.cameras import CameraType
 from vipe.utils.logging import pbar
 from vipe.utils.misc import unpack_optional
+from vipe.utils.model_registry import get_model_registry
 
 from .components.backend import SLAMBackend
 from .components.buffer import GraphBuffer
@@ -87,7 +88,9 @@ class SLAMSystem:
         OmegaConf.set_struct(self.config, False)
 
     def _build_components(self):
-        self.droid_net = DroidNet().to(self.device)
+        self.droid_net = get_model_registry().get(
+            "droid_net", {"device": self.device}, lambda: DroidNet().to(self.device)
+        )
         self.sparse_tracks = build_sparse_tracks(self.config.sparse_tracks, self.config.n_views)
         self.buffer = GraphBuffer(
             height=self.config.height,
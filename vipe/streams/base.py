@@ -19,7 +19,7 @@ import logging
 
 from dataclasses import dataclass
 from enum import Enum
-from typing import Any, Iterable, Iterator, Protocol
+from typing import Any, Iterable, Iterator, Protocol, Sequence
 
 import torch
 
@@ -29,6 +29,7 @@ from torch.utils.data import IterableDataset
 from vipe.ext.lietorch import SE3
 from vipe.utils.cameras import CameraType
 from vipe.utils.logging import pbar
+from vipe.utils.transfer import get_pinned_buffer_pool
 
 
 logger = logging.getLogger(__name__)
@@ -129,37 +130,58 @@ class VideoFrame:
         else:
             raise ValueError(f"Attribute {attribute} is not available in the frame.")
 
-    def cpu(self) -> "VideoFrame":
-        map_cpu = lambda x: x.cpu() if x is not None else None
+    def _map_tensors(self, map_fn) -> "VideoFrame":
+        map_optional = lambda x: map_fn(x) if x is not None else None
 
         return VideoFrame(
             raw_frame_idx=self.raw_frame_idx,
-            rgb=self.rgb.cpu(),
-            mask=map_cpu(self.mask),
-            instance=map_cpu(self.instance),
+            rgb=map_fn(self.rgb),
+            mask=map_optional(self.mask),
+            instance=map_optional(self.instance),
             instance_phrases=self.instance_phrases,
-            metric_depth=map_cpu(self.metric_depth),
-            pose=map_cpu(self.pose),
-            intrinsics=map_cpu(self.intrinsics),
+            metric_depth=map_optional(self.metric_depth),
+            pose=SE3(map_fn(self.pose.data)) if self.pose is not None else None,
+            intrinsics=map_optional(self.intrinsics),
             camera_type=self.camera_type,
             information=self.information,
         )
 
-    def cuda(self) -> "VideoFrame":
-        map_cuda = lambda x: x.cuda() if x is not None else None
+    def tensors(self) -> list[torch.Tensor]:
+        """All tensors held by the frame."""
+        tensors = [self.rgb, self.mask, self.instance, self.metric_depth, self.intrinsics]
+        if self.pose is not None:
+            tensors.append(self.pose.data)
+        return [t for t in tensors if t is not None]
 
-        return VideoFrame(
-            raw_frame_idx=self.raw_frame_idx,
-            rgb=self.rgb.cuda(),
-            mask=map_cuda(self.mask),
-            instance=map_cuda(self.instance),
-            instance_phrases=self.instance_phrases,
-            metric_depth=map_cuda(self.metric_depth),
-            pose=map_cuda(self.pose),
-            intrinsics=map_cuda(self.intrinsics),
-            camera_type=self.camera_type,
-            information=self.information,
-        )
+    def cpu(self, non_blocking: bool = False) -> "VideoFrame":
+        """
+        Copy the frame to host memory.
+        With `non_blocking`, device tensors are copied into pinned memory asynchronously and the host waits
+        once for all fields instead of once per field; pinned frames can later be uploaded asynchronously.
+        """
+        if not non_blocking or not self.rgb.is_cuda:
+            return self._map_tensors(lambda x: x.cpu())
+
+        def copy_pinned(x: torch.Tensor) -> torch.Tensor:
+            if not x.is_cuda:
+                return x
+            return torch.empty(x.shape, dtype=x.dtype, pin_memory=True).copy_(x, non_blocking=True)
+
+        frame = self._map_tensors(copy_pinned)
+        torch.cuda.current_stream().synchronize()
+        return frame
+
+    def cuda(self, non_blocking: bool = False) -> "VideoFrame":
+        """
+        Copy the frame to the device.
+        With `non_blocking`, pageable tensors are staged through the pinned buffer pool and copied asynchronously
+        on the current CUDA stream, so the result must only be used on that stream (or after synchronizing).
+        """
+        if not non_blocking or not torch.cuda.is_available():
+            return self._map_tensors(lambda x: x.cuda())
+
+        pool = get_pinned_buffer_pool()
+        return self._map_tensors(pool.upload)
 
     def resize(self, size: tuple[int, int]) -> "VideoFrame":
         """
@@ -283,6 +305,24 @@ class VideoStream(IterableDataset[VideoFrame]):
     def attributes(self) -> set[FrameAttribute]:
         return set()
 
+    def supports_random_access(self) -> bool:
+        """
+        Whether `get_frame` can fetch an arbitrary frame without iterating (and caching) the stream.
+        """
+        return False
+
+    def get_frame(self, index: int) -> VideoFrame:
+        """
+        Fetch the frame at `index` (in [0, len(self))). Only available if `supports_random_access()`.
+        """
+        raise NotImplementedError(f"{self.__class__.__name__} does not support random access.")
+
+    def view(self, indices: range | Sequence[int], name: str | None = None) -> "FrameSubsetStream":
+        """
+        A stream over a subset of the frames of this stream (slice, stride or index list), without copying them.
+        """
+        return FrameSubsetStream(self, indices, name=name)
+
     def get_stream_attribute(self, attribute: FrameAttribute) -> list[Any]:
         stream_attribute = []
         for frame in self:
@@ -334,7 +374,7 @@ class CachedVideoStream(VideoStream):
 
     DISPLAY_THRESH = 20
 
-    def __init__(self, video_stream: VideoStream, desc: str = "Caching") -> None:
+    def __init__(self, video_stream: VideoStream, desc: str = "Caching", prefetch: bool = True) -> None:
         self._frame_size = video_stream.frame_size()
         self._fps = video_stream.fps()
         self._name = video_stream.name()
@@ -344,6 +384,8 @@ class CachedVideoStream(VideoStream):
         self.data: list[VideoFrame] = []
         self.desc = desc
         self.stream = video_stream  # Store original stream for access to underlying properties
+        # Upload frame i+1 to the device while frame i is processed when iterating (CUDA only).
+        self.prefetch = prefetch
 
     def fps(self) -> float:
         return self._fps
@@ -389,17 +431,113 @@ class CachedVideoStream(VideoStream):
         return self.data[index].cuda()
 
     def __iter__(self):
+        if not (self.prefetch and torch.cuda.is_available()):
+            for idx in range(len(self)):
+                # Since len(self) might change during iteration, we check again here:
+                if idx >= len(self):
+                    break
+
+                yield self[idx]
+            return
+
+        # Upload the next cached frame on a side stream while the current frame is being processed.
+        upload_stream = torch.cuda.Stream()
+        pending: tuple[int, VideoFrame, torch.cuda.Event] | None = None
         for idx in range(len(self)):
-            # Since len(self) might change during iteration, we check again here:
             if idx >= len(self):
                 break
 
-            yield self[idx]
+            if pending is not None and pending[0] == idx:
+                _, frame, upload_event = pending
+                torch.cuda.current_stream().wait_event(upload_event)
+                for tensor in frame.tensors():
+                    tensor.record_stream(torch.cuda.current_stream())
+            else:
+                frame = self[idx]
+
+            pending = None
+            if idx + 1 < len(self.data):
+                with torch.cuda.stream(upload_stream):
+                    next_frame = self.data[idx + 1].cuda(non_blocking=True)
+                    upload_event = torch.cuda.Event()
+                    upload_event.record(upload_stream)
+                pending = (idx + 1, next_frame, upload_event)
+
+            yield frame
+
+    def supports_random_access(self) -> bool:
+        return True
+
+    def get_frame(self, index: int) -> VideoFrame:
+        return self[index]
 
     def attributes(self) -> set[FrameAttribute]:
         return self._attributes
 
 
+class FrameSubsetStream(VideoStream):
+    """
+    A view over a subset of the frames of another stream, given as a range (slice/stride) or a list of indices.
+    Frames are fetched from the underlying stream (e.g. the CPU storage of a `CachedVideoStream`), so any number
+    of views can share one decoded video.
+    Non-increasing index lists require an underlying stream with random access.
+    """
+
+    def __init__(self, stream: VideoStream, indices: range | Sequence[int], name: str | None = None) -> None:
+        super().__init__()
+        n_frames = len(stream)
+        if isinstance(indices, range):
+            if indices.step > 0:
+                indices = range(indices.start, min(indices.stop, n_frames), indices.step)
+        else:
+            indices = list(indices)
+        assert all(0 <= idx < n_frames for idx in indices), f"Frame indices out of range [0, {n_frames})."
+        self.stream = stream
+        self.indices = indices
+        self._name = name if name is not None else stream.name()
+
+    def frame_size(self) -> tuple[int, int]:
+        return self.stream.frame_size()
+
+    def fps(self) -> float:
+        if isinstance(self.indices, range):
+            return self.stream.fps() / abs(self.indices.step)
+        return self.stream.fps()
+
+    def name(self) -> str:
+        return self._name
+
+    def attributes(self) -> set[FrameAttribute]:
+        return self.stream.attributes()
+
+    def __len__(self) -> int:
+        return len(self.indices)
+
+    def supports_random_access(self) -> bool:
+        return self.stream.supports_random_access()
+
+    def get_frame(self, index: int) -> VideoFrame:
+        return self.stream.get_frame(self.indices[index])
+
+    def __iter__(self) -> Iterator[VideoFrame]:
+        if self.stream.supports_random_access():
+            for idx in self.indices:
+                yield self.stream.get_frame(idx)
+            return
+
+        assert all(a < b for a, b in zip(self.indices, self.indices[1:])), (
+            "Non-increasing frame indices require random access on the underlying stream."
+        )
+        wanted = iter(self.indices)
+        next_idx = next(wanted, None)
+        for frame_idx, frame in enumerate(self.stream):
+            if next_idx is None:
+                break
+            if frame_idx == next_idx:
+                yield frame
+                next_idx = next(wanted, None)
+
+
 class StreamProcessor(Protocol):
     """
     Interface of a stream processor that processes each video frame.
@@ -483,6 +621,20 @@ class ProcessedVideoStream(VideoStream):
             iterator = processor.update_iterator(iterator)
         return iterator
 
+    def supports_random_access(self) -> bool:
+        # Processors that override `update_iterator` may carry state across frames, so only streams of
+        # purely per-frame processors can be accessed randomly.
+        return self.stream.supports_random_access() and all(
+            type(processor).update_iterator is StreamProcessor.update_iterator for processor in self.processors
+        )
+
+    def get_frame(self, index: int) -> VideoFrame:
+        assert self.supports_random_access(), "Underlying stream or processors do not support random access."
+        frame = self.stream.get_frame(index)
+        for processor in self.processors:
+            frame = processor(index, frame)
+        return frame
+
 
 class StreamList:
     @staticmethod
@@ -13,7 +13,12 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import logging
+
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
+from typing import Iterator
 
 import cv2
 import torch
@@ -21,13 +26,36 @@ import torch
 from vipe.streams.base import ProcessedVideoStream, StreamList, VideoFrame, VideoStream
 
 
+logger = logging.getLogger(__name__)
+
+
 class FrameDirStream(VideoStream):
     """
     A video stream from a directory of frame images.
     This does not support nested iterations.
+
+    Frames are decoded by `num_threads` worker threads, at most `prefetch` frames ahead of the consumer,
+    and yielded in the original order. `decode_scale` (1, 2, 4 or 8) downscales the images while decoding.
+    If `skip_unreadable` is set, frames that cannot be decoded are skipped with a warning instead of raising.
     """
 
-    def __init__(self, path: Path, seek_range: range | None = None, name: str | None = None) -> None:
+    REDUCED_DECODE_FLAGS = {
+        1: cv2.IMREAD_COLOR,
+        2: cv2.IMREAD_REDUCED_COLOR_2,
+        4: cv2.IMREAD_REDUCED_COLOR_4,
+        8: cv2.IMREAD_REDUCED_COLOR_8,
+    }
+
+    def __init__(
+        self,
+        path: Path,
+        seek_range: range | None = None,
+        name: str | None = None,
+        num_threads: int = 4,
+        prefetch: int = 16,
+        decode_scale: int = 1,
+        skip_unreadable: bool = False,
+    ) -> None:
         super().__init__()
         if seek_range is None:
             seek_range = range(-1)
@@ -35,6 +63,12 @@ class FrameDirStream(VideoStream):
         self.path = path
         self._name = name if name is not None else path.name
 
+        assert decode_scale in self.REDUCED_DECODE_FLAGS, f"decode_scale must be one of {list(self.REDUCED_DECODE_FLAGS)}"
+        self.num_threads = num_threads
+        self.prefetch = max(prefetch, num_threads, 1)
+        self.decode_flag = self.REDUCED_DECODE_FLAGS[decode_scale]
+        self.skip_unreadable = skip_unreadable
+
         # Find all image files in the directory
         image_extensions = ['.jpg', '.jpeg', '.png', '.bmp', '.tiff', '.tif']
         self.frame_files = []
@@ -48,7 +82,7 @@ class FrameDirStream(VideoStream):
             raise ValueError(f"No image files found in directory: {path}")
 
         # Read metadata from first frame
-        first_frame = cv2.imread(str(self.frame_files[0]))
+        first_frame = cv2.imread(str(self.frame_files[0]), self.decode_flag)
         if first_frame is None:
             raise ValueError(f"Could not read first frame: {self.frame_files[0]}")
         
@@ -76,38 +110,70 @@ class FrameDirStream(VideoStream):
     def __len__(self) -> int:
         return len(range(self.start, self.end, self.step))
 
-    def __iter__(self):
-        self.current_frame_idx = -1
-        return self
-
-    def __next__(self) -> VideoFrame:
-        self.current_frame_idx += 1
-        
-        if self.current_frame_idx >= self.end:
-            raise StopIteration
-
-        if self.current_frame_idx < self.start:
-            return self.__next__()
-
-        if (self.current_frame_idx - self.start) % self.step != 0:
-            return self.__next__()
-
-        # Load the frame
-        frame_path = self.frame_files[self.current_frame_idx]
-        frame = cv2.imread(str(frame_path))
-        
+    def _decode_frame(self, frame_idx: int) -> torch.Tensor | None:
+        frame = cv2.imread(str(self.frame_files[frame_idx]), self.decode_flag)
         if frame is None:
-            raise ValueError(f"Could not read frame: {frame_path}")
-
+            return None
         frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        frame_rgb = torch.as_tensor(frame).float() / 255.0
-        frame_rgb = frame_rgb.cuda()
-
-        return VideoFrame(raw_frame_idx=self.current_frame_idx, rgb=frame_rgb)
+        return torch.as_tensor(frame).float() / 255.0
+
+    def _decoded_frames(self) -> Iterator[tuple[int, torch.Tensor | None]]:
+        frame_inds = range(self.start, self.end, self.step)
+        if self.num_threads <= 0:
+            for frame_idx in frame_inds:
+                yield frame_idx, self._decode_frame(frame_idx)
+            return
+
+        # Keep a bounded window of in-flight decodes; popping from the left preserves the frame order.
+        with ThreadPoolExecutor(max_workers=self.num_threads, thread_name_prefix="frame_decode") as executor:
+            pending: deque[tuple[int, Future]] = deque()
+            frame_idx_iter = iter(frame_inds)
+            try:
+                for frame_idx in frame_idx_iter:
+                    pending.append((frame_idx, executor.submit(self._decode_frame, frame_idx)))
+                    if len(pending) >= self.prefetch:
+                        break
+                while pending:
+                    frame_idx, future = pending.popleft()
+                    if (next_frame_idx := next(frame_idx_iter, None)) is not None:
+                        pending.append((next_frame_idx, executor.submit(self._decode_frame, next_frame_idx)))
+                    yield frame_idx, future.result()
+            finally:
+                # Early exit of the consumer: drop the decodes that have not started yet.
+                for _, future in pending:
+                    future.cancel()
+
+    def supports_random_access(self) -> bool:
+        return True
+
+    def get_frame(self, index: int) -> VideoFrame:
+        frame_idx = range(self.start, self.end, self.step)[index]
+        frame_rgb = self._decode_frame(frame_idx)
+        if frame_rgb is None:
+            raise ValueError(f"Could not read frame: {self.frame_files[frame_idx]}")
+        return VideoFrame(raw_frame_idx=frame_idx, rgb=frame_rgb.cuda())
+
+    def __iter__(self) -> Iterator[VideoFrame]:
+        for frame_idx, frame_rgb in self._decoded_frames():
+            if frame_rgb is None:
+                if not self.skip_unreadable:
+                    raise ValueError(f"Could not read frame: {self.frame_files[frame_idx]}")
+                logger.warning(f"Skipping unreadable frame: {self.frame_files[frame_idx]}")
+                continue
+            yield VideoFrame(raw_frame_idx=frame_idx, rgb=frame_rgb.cuda())
 
 
 class FrameDirStreamList(StreamList):
-    def __init__(self, base_path: str, frame_start: int, frame_end: int, frame_skip: int, cached: bool = False) -> None:
+    def __init__(
+        self,
+        base_path: str,
+        frame_start: int,
+        frame_end: int,
+        frame_skip: int,
+        cached: bool = False,
+        num_threads: int = 4,
+        decode_scale: int = 1,
+    ) -> None:
         super().__init__()
         base_path_obj = Path(base_path)
         
@@ -126,12 +192,19 @@ class FrameDirStreamList(StreamList):
             
         self.frame_range = range(frame_start, frame_end, frame_skip)
         self.cached = cached
+        self.num_threads = num_threads
+        self.decode_scale = decode_scale
 
     def __len__(self) -> int:
         return len(self.frame_directories)
 
     def __getitem__(self, index: int) -> VideoStream:
-        stream: VideoStream = FrameDirStream(self.frame_directories[index], seek_range=self.frame_range)
+        stream: VideoStream = FrameDirStream(
+            self.frame_directories[index],
+            seek_range=self.frame_range,
+            num_threads=self.num_threads,
+            decode_scale=self.decode_scale,
+        )
         if self.cached:
             stream = ProcessedVideoStream(stream, []).cache(desc="Loading frames", online=False)
         return stream
@@ -14,6 +14,7 @@
 # limitations under the License.
 
 from pathlib import Path
+from typing import Iterator
 
 import cv2
 import torch
@@ -27,6 +28,9 @@ class RawMp4Stream(VideoStream):
     This does not support nested iterations.
     """
 
+    # Maximum number of frames to decode forward instead of seeking in `get_frame`.
+    SEEK_GRAB_LIMIT = 30
+
     def __init__(self, path: Path, seek_range: range | None = None, name: str | None = None) -> None:
         super().__init__()
         if seek_range is None:
@@ -49,6 +53,10 @@ class RawMp4Stream(VideoStream):
         self.step = seek_range.step
         self._fps = _fps / self.step
 
+        # Separate capture for random access, so that it does not interfere with iteration.
+        self._seek_vcap: cv2.VideoCapture | None = None
+        self._seek_next_frame_idx = -1
+
     def frame_size(self) -> tuple[int, int]:
         return (self._height, self._width)
 
@@ -61,35 +69,56 @@ class RawMp4Stream(VideoStream):
     def __len__(self) -> int:
         return len(range(self.start, self.end, self.step))
 
-    def __iter__(self):
-        self.vcap = cv2.VideoCapture(self.path)
-        self.current_frame_idx = -1
-        return self
-
-    def __next__(self) -> VideoFrame:
-        while True:
-            ret, frame = self.vcap.read()
-            self.current_frame_idx += 1
-
-            if not ret:
-                self.vcap.release()
-                raise StopIteration
-
-            if self.current_frame_idx >= self.end:
-                self.vcap.release()
-                raise StopIteration
+    def _decoded_frames(self) -> Iterator[tuple[int, torch.Tensor]]:
+        """Decode the frames of the seek range into host memory, in order."""
+        vcap = cv2.VideoCapture(str(self.path))
+        try:
+            frame_idx = -1
+            while True:
+                ret, frame = vcap.read()
+                frame_idx += 1
+                if not ret or frame_idx >= self.end:
+                    return
+                if frame_idx >= self.start and (frame_idx - self.start) % self.step == 0:
+                    yield frame_idx, self._to_rgb(frame)
+        finally:
+            vcap.release()
+
+    def __iter__(self) -> Iterator[VideoFrame]:
+        for frame_idx, frame_rgb in self._decoded_frames():
+            yield VideoFrame(raw_frame_idx=frame_idx, rgb=frame_rgb.cuda())
+
+    @staticmethod
+    def _to_rgb(frame) -> torch.Tensor:
+        frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        return torch.as_tensor(frame).float() / 255.0
 
-            if self.current_frame_idx < self.start:
-                continue
+    def supports_random_access(self) -> bool:
+        return True
 
-            if (self.current_frame_idx - self.start) % self.step == 0:
-                break
+    def get_frame(self, index: int) -> VideoFrame:
+        frame_idx = range(self.start, self.end, self.step)[index]
+        if self._seek_vcap is None:
+            self._seek_vcap = cv2.VideoCapture(str(self.path))
+            self._seek_next_frame_idx = 0
 
-        frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        frame_rgb = torch.as_tensor(frame).float() / 255.0
-        frame_rgb = frame_rgb.cuda()
-
-        return VideoFrame(raw_frame_idx=self.current_frame_idx, rgb=frame_rgb)
+        # Seeking makes the decoder jump to the preceding keyframe and decode forward, so short forward gaps
+        # (e.g. consecutive or strided accesses) are cheaper to grab through.
+        if frame_idx < self._seek_next_frame_idx or frame_idx - self._seek_next_frame_idx > self.SEEK_GRAB_LIMIT:
+            self._seek_vcap.set(cv2.CAP_PROP_POS_FRAMES, frame_idx)
+        else:
+            for _ in range(frame_idx - self._seek_next_frame_idx):
+                self._seek_vcap.grab()
+
+        ret, frame = self._seek_vcap.read()
+        if not ret:
+            raise IndexError(f"Could not decode frame {frame_idx} of {self.path}")
+        self._seek_next_frame_idx = frame_idx + 1
+        return VideoFrame(raw_frame_idx=frame_idx, rgb=self._to_rgb(frame).cuda())
+
+    def __del__(self) -> None:
+        if getattr(self, "_seek_vcap", None) is not None:
+            self._seek_vcap.release()
 
 
 class RawMP4StreamList(StreamList):
@@ -403,20 +403,123 @@ def reliable_depth_mask_range(
     Returns:
         torch.Tensor: Boolean mask (H, W) where True indicates a reliable depth pixel.
     """
+    return reliable_depth_mask_range_batch(depth[None], window_size, ratio_thresh, eps)[0]
+
+
+def reliable_depth_mask_range_batch(
+    depth: torch.Tensor,
+    window_size: int = 5,
+    ratio_thresh: float = 0.1,
+    eps: float = 1e-6,
+):
+    """
+    Batched version of `reliable_depth_mask_range` for a stack of depth maps.
+    The local max and min come from one separable (row then column) max pooling over the (depth, -depth)
+    channel pair, which gives the same values as the 2D window on CPU and GPU with fewer comparisons.
+
+    Args:
+        depth (torch.Tensor): Depth images of shape (B, H, W).
+        window_size (int): Size of the local neighborhood (must be odd).
+        ratio_thresh (float): Maximum allowed variation ratio.
+        eps (float): Small constant to avoid division by zero.
+
+    Returns:
+        torch.Tensor: Boolean mask (B, H, W) where True indicates a reliable depth pixel.
+    """
     assert window_size % 2 == 1, "Window size must be odd."
+    assert depth.dim() == 3, "Depth must have shape (B, H, W)."
 
-    # Prepare the tensor for 2D pooling.
-    depth_unsq = depth.unsqueeze(0).unsqueeze(0)
+    padding = window_size // 2
+    depth_unsq = depth.unsqueeze(1)
 
     # Compute local max, min, and mean values using pooling.
-    local_max = F.max_pool2d(depth_unsq, kernel_size=window_size, stride=1, padding=window_size // 2)
-    local_min = -F.max_pool2d(-depth_unsq, kernel_size=window_size, stride=1, padding=window_size // 2)
-    local_mean = F.avg_pool2d(depth_unsq, kernel_size=window_size, stride=1, padding=window_size // 2)
+    local_max_neg_min = torch.cat([depth_unsq, -depth_unsq], dim=1)
+    local_max_neg_min = F.max_pool2d(local_max_neg_min, kernel_size=(1, window_size), stride=1, padding=(0, padding))
+    local_max_neg_min = F.max_pool2d(local_max_neg_min, kernel_size=(window_size, 1), stride=1, padding=(padding, 0))
+    local_mean = F.avg_pool2d(depth_unsq, kernel_size=window_size, stride=1, padding=padding)
 
     # Calculate the ratio of the local range to the local mean.
-    ratio = (local_max - local_min) / (local_mean + eps)
-    ratio = ratio.squeeze(0).squeeze(0)  # Restore original shape (H, W)
+    local_range = local_max_neg_min[:, 0] + local_max_neg_min[:, 1]
+    ratio = local_range / (local_mean[:, 0] + eps)
 
     # Mark pixels as reliable if their local variation is below the threshold.
     reliable_mask = (ratio < ratio_thresh) & (depth > 0)
     return reliable_mask
+
+
+class StreamingRobustMean:
+    """
+    Per-pixel NaN-aware mean of depth maps and their colors, accumulated one frame at a time with O(H * W) state
+    (float64 running sums, sums of squares and sample counts) instead of a (T, H, W) stack of all frames.
+
+    Without outlier_sigma the result equals torch.nanmean over the stacked frames (with NaN replaced by 0).
+    With it, the frames are sigma-clipped as they stream in: once a pixel has min_samples accepted depth samples,
+    a sample further than outlier_sigma standard deviations (and at least outlier_rel_tol times the mean) from the
+    running mean of the pixel is rejected together with its color. The result then depends on the frame order,
+    and outliers among the first min_samples samples of a pixel are kept.
+
+    Args:
+        device: Device of the running state.
+        outlier_sigma: Rejection threshold in standard deviations, or None to average every valid sample.
+        min_samples: Accepted samples of a pixel before its samples can be rejected.
+        outlier_rel_tol: Smallest rejection distance relative to the running mean, so that pixels whose first
+            samples agree closely do not reject every later one.
+    """
+
+    def __init__(
+        self,
+        device: torch.device | str = "cpu",
+        outlier_sigma: Optional[float] = None,
+        min_samples: int = 3,
+        outlier_rel_tol: float = 0.05,
+    ):
+        self.device = torch.device(device)
+        self.outlier_sigma = outlier_sigma
+        self.min_samples = min_samples
+        self.outlier_rel_tol = outlier_rel_tol
+        self.depth_sum = self.depth_sq_sum = self.rgb_sum = self.count = None
+
+    def _accumulate(self, depth: torch.Tensor, rgb: torch.Tensor, valid: torch.Tensor, sign: int) -> None:
+        depth = torch.where(valid, depth, 0).double()
+        self.depth_sum += sign * depth
+        self.depth_sq_sum += sign * depth.square()
+        self.rgb_sum += sign * torch.where(valid[..., None], rgb, 0).double()
+        self.count += sign * valid.int()
+
+    def add(self, depth: torch.Tensor, rgb: torch.Tensor) -> torch.Tensor:
+        """
+        Add one frame: depth (H, W) and rgb (H, W, 3), NaN where the pixel has no valid sample.
+
+        Returns:
+            torch.Tensor: Boolean mask (H, W) of the samples that were accumulated.
+        """
+        depth = depth.to(self.device, torch.float32)
+        rgb = rgb.to(self.device, torch.float32)
+        if self.count is None:
+            self.depth_sum = torch.zeros(depth.shape, dtype=torch.float64, device=self.device)
+            self.depth_sq_sum = torch.zeros_like(self.depth_sum)
+            self.rgb_sum = torch.zeros(rgb.shape, dtype=torch.float64, device=self.device)
+            self.count = torch.zeros(depth.shape, dtype=torch.int32, device=self.device)
+
+        valid = ~torch.isnan(depth)
+        if self.outlier_sigma is not None:
+            count = self.count.double().clamp_min(1)
+            mean = self.depth_sum / count
+            std = (self.depth_sq_sum / count - mean.square()).clamp_min(0).sqrt()
+            tolerance = torch.maximum(self.outlier_sigma * std, self.outlier_rel_tol * mean)
+            valid &= ~((self.count >= self.min_samples) & ((depth.double() - mean).abs() > tolerance))
+        self._accumulate(depth, rgb, valid, 1)
+        return valid
+
+    def remove(self, depth: torch.Tensor, rgb: torch.Tensor) -> None:
+        """Subtract a frame added before, with NaN depth where its samples were not accumulated."""
+        depth = depth.to(self.device, torch.float32)
+        self._accumulate(depth, rgb.to(self.device, torch.float32), ~torch.isnan(depth), -1)
+
+    def mean(self) -> Tuple[torch.Tensor, torch.Tensor]:
+        """(H, W) mean depth and (H, W, 3) mean RGB as float32, 0 where no sample was accumulated."""
+        count = self.count.double().clamp_min(1)
+        has_samples = self.count > 0
+        mean_depth = torch.where(has_samples, self.depth_sum / count, 0)
+        mean_rgb = torch.where(has_samples[..., None], self.rgb_sum / count[..., None], 0)
+        return mean_depth.float(), mean_rgb.float()
@@ -19,7 +19,7 @@ import zipfile
 
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Iterator
+from typing import Iterable, Iterator
 
 import cv2
 import imageio
@@ -96,8 +96,16 @@ class ArtifactPath:
 
     @property
     def slam_map_path(self) -> Path:
+        return self.base_path / "vipe" / f"{self.artifact_name}_slam_map"
+
+    @property
+    def legacy_slam_map_path(self) -> Path:
         return self.base_path / "vipe" / f"{self.artifact_name}_slam_map.pt"
 
+    @property
+    def checkpoint_dir(self) -> Path:
+        return self.base_path / "checkpoint" / self.artifact_name
+
     @property
     def essential_paths(self) -> list[Path]:
         return [
@@ -241,14 +249,30 @@ def save_rgb_artifacts(out_path: ArtifactPath, cached_final_stream: VideoStream)
             rgb_writer.write((frame_data.rgb.cpu().numpy() * 255).astype(np.uint8))
 
 
-def read_rgb_artifacts(rgb_file_path: Path) -> Iterator[tuple[int, torch.Tensor]]:
+def read_rgb_artifacts(
+    rgb_file_path: Path, frame_indices: Iterable[int] | None = None
+) -> Iterator[tuple[int, torch.Tensor]]:
     """
     Read RGB from H264-encoded video.
+    With ascending frame_indices, only those frames are returned: the reader seeks to them instead of returning
+    every frame before them, with the same decoding as a sequential read. Indices past the end are ignored.
     """
     reader = imageio.get_reader(rgb_file_path, "ffmpeg")
-    for frame_idx, rgb in enumerate(reader):
-        rgb = torch.from_numpy(rgb) / 255.0
-        yield frame_idx, rgb
+    if frame_indices is None:
+        for frame_idx, rgb in enumerate(reader):
+            rgb = torch.from_numpy(rgb) / 255.0
+            yield frame_idx, rgb
+        return
+
+    try:
+        for frame_idx in frame_indices:
+            try:
+                rgb = reader.get_data(frame_idx)
+            except IndexError:
+                break
+            yield frame_idx, torch.from_numpy(rgb) / 255.0
+    finally:
+        reader.close()
 
 
 def save_depth_artifacts(out_path: ArtifactPath, cached_final_stream: VideoStream, gt: bool = False) -> None:
@@ -279,14 +303,19 @@ def save_depth_artifacts(out_path: ArtifactPath, cached_final_stream: VideoStrea
                     z.write(f.name, f"{frame_idx:05d}.exr")
 
 
-def read_depth_artifacts(zip_file_path: Path) -> Iterator[tuple[int, torch.Tensor]]:
+def read_depth_artifacts(
+    zip_file_path: Path, frame_indices: Iterable[int] | None = None
+) -> Iterator[tuple[int, torch.Tensor]]:
     """
-    Read metric depth from zipped exr files.
+    Read metric depth from zipped exr files, only of the frames in frame_indices if given.
     """
+    wanted = None if frame_indices is None else set(frame_indices)
     valid_width, valid_height = 0, 0
     with zipfile.ZipFile(zip_file_path, "r") as z:
         for file_name in sorted(z.namelist()):
             frame_idx = int(file_name.split(".")[0])
+            if wanted is not None and frame_idx not in wanted:
+                continue
             with z.open(file_name) as f:
                 try:
                     exr = OpenEXR.InputFile(f)
@@ -313,14 +342,17 @@ def read_depth_artifacts(zip_file_path: Path) -> Iterator[tuple[int, torch.Tenso
 
 
 def read_instance_artifacts(
-    zip_file_path: Path,
+    zip_file_path: Path, frame_indices: Iterable[int] | None = None
 ) -> Iterator[tuple[int, torch.Tensor]]:
     """
-    Read instance mask from zipped PNG files.
+    Read instance mask from zipped PNG files, only of the frames in frame_indices if given.
     """
+    wanted = None if frame_indices is None else set(frame_indices)
     with zipfile.ZipFile(zip_file_path, "r") as z:
         for file_name in sorted(z.namelist()):
             frame_idx = int(file_name.split(".")[0])
+            if wanted is not None and frame_idx not in wanted:
+                continue
             with z.open(file_name) as f:
                 mask_buffer = np.frombuffer(f.read(), dtype=np.uint8)
                 mask = cv2.imdecode(mask_buffer, cv2.IMREAD_UNCHANGED)
@@ -13,10 +13,18 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-from typing import Optional, TypeVar
+import itertools
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional, Sequence, TypeVar
+
+import torch
+
+from vipe.utils.model_registry import set_worker_slot
 
 
 T = TypeVar("T")
+R = TypeVar("R")
 
 
 def unpack_optional(maybe_value: Optional[T]) -> T:
@@ -25,3 +33,37 @@ def unpack_optional(maybe_value: Optional[T]) -> T:
         raise ValueError("Can't unpack empty optional")
 
     return maybe_value
+
+
+def run_per_view(fn: Callable[[int, T], R], items: Sequence[T], max_workers: int | None = None) -> list[R]:
+    """
+    Run `fn(view_idx, item)` for independent views concurrently and return the results in view order.
+    With CUDA available each worker issues its work on its own CUDA stream, which is synchronized before the
+    result is returned. A single view (or `max_workers=1`) runs inline on the calling thread.
+    Each worker uses its own worker slot of the model registry and therefore its own model instances, see
+    `vipe.utils.model_registry.ModelRegistry`.
+    """
+    if max_workers is None:
+        max_workers = len(items)
+    if len(items) <= 1 or max_workers <= 1:
+        return [fn(view_idx, item) for view_idx, item in enumerate(items)]
+
+    def run_view(view_idx: int, item: T) -> R:
+        if not torch.cuda.is_available():
+            return fn(view_idx, item)
+        cuda_stream = torch.cuda.Stream()
+        cuda_stream.wait_stream(torch.cuda.current_stream())
+        with torch.cuda.stream(cuda_stream):
+            result = fn(view_idx, item)
+        cuda_stream.synchronize()
+        return result
+
+    # Worker slots are numbered per run, so the workers of later runs reuse the models of the same slots.
+    slots = itertools.count()
+    with ThreadPoolExecutor(
+        max_workers=max_workers,
+        thread_name_prefix="view",
+        initializer=lambda: set_worker_slot(next(slots)),
+    ) as executor:
+        futures = [executor.submit(run_view, view_idx, item) for view_idx, item in enumerate(items)]
+        return [future.result() for future in futures]
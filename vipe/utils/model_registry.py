@@ -0,0 +1,198 @@
+# SPDX-FileCopyrightText: Copyright (c) 2025 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+import logging
+import os
+import threading
+
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator, TypeVar
+
+import torch
+import torch.nn as nn
+
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+_worker_state = threading.local()
+
+
+def current_worker_slot() -> int:
+    """Worker slot of the calling thread, 0 unless set with `worker_slot`."""
+    return getattr(_worker_state, "slot", 0)
+
+
+def set_worker_slot(slot: int) -> None:
+    _worker_state.slot = slot
+
+
+@contextmanager
+def worker_slot(slot: int) -> Iterator[None]:
+    """Request models from the registry as worker `slot` on the calling thread."""
+    previous_slot = current_worker_slot()
+    set_worker_slot(slot)
+    try:
+        yield
+    finally:
+        set_worker_slot(previous_slot)
+
+
+def estimate_model_nbytes(model: Any) -> int:
+    """
+    Memory held by the parameters and buffers of a model. Wrappers that are not modules themselves
+    (e.g. the depth models) are measured through their module attributes.
+    """
+    if isinstance(model, nn.Module):
+        modules = [model]
+    else:
+        modules = [v for v in vars(model).values() if isinstance(v, nn.Module)] if hasattr(model, "__dict__") else []
+
+    seen: set[int] = set()
+    nbytes = 0
+    for module in modules:
+        for tensor in list(module.parameters()) + list(module.buffers()):
+            if id(tensor) not in seen:
+                seen.add(id(tensor))
+                nbytes += tensor.numel() * tensor.element_size()
+    return nbytes
+
+
+class ModelRegistry:
+    """
+    Process-wide cache of loaded models, keyed by model type and construction config.
+
+    Models are built lazily by the factory passed to `get` and reused by every later pipeline or processor that
+    asks for the same key, so checkpoints are deserialized once per process. Only stateless weights should be
+    registered: per-video state (trackers, memories, embeddings) must stay with the caller.
+    Models are not locked, since several of them keep state during the forward pass. Instead every thread that
+    runs concurrently with others uses its own worker slot (see `worker_slot`, set by the view workers of
+    `vipe.utils.misc.run_per_view`) and gets its own instance of each model. Later runs reuse the instances of
+    their slot, so the number of copies of a model is bounded by the number of concurrent workers.
+    When a memory budget is set, the least recently used models are evicted once the estimated footprint of the
+    registry exceeds it.
+    """
+
+    def __init__(self, memory_budget_bytes: int | None = None) -> None:
+        self.memory_budget_bytes = memory_budget_bytes
+        self._models: OrderedDict[tuple[str, str, int], tuple[Any, int]] = OrderedDict()
+        self._key_locks: dict[tuple[str, str, int], threading.Lock] = {}
+        self._lock = threading.Lock()
+        self.n_loads: dict[str, int] = {}
+
+    @staticmethod
+    def make_key(model_type: str, config: dict | None = None) -> tuple[str, str]:
+        return model_type, json.dumps(config or {}, sort_keys=True, default=str)
+
+    def get(self, model_type: str, config: dict | None, factory: Callable[[], T]) -> T:
+        """
+        Return the cached model for (model_type, config) of the current worker slot, building it with `factory`
+        on first use.
+        """
+        key = (*self.make_key(model_type, config), current_worker_slot())
+        with self._lock:
+            if key in self._models:
+                self._models.move_to_end(key)
+                return self._models[key][0]
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+
+        # Concurrent requests for the same model wait for a single load.
+        with key_lock:
+            with self._lock:
+                if key in self._models:
+                    self._models.move_to_end(key)
+                    return self._models[key][0]
+
+            logger.debug(f"Loading model {model_type} with config {key[1]} for worker slot {key[2]}")
+            model = factory()
+            nbytes = estimate_model_nbytes(model)
+
+            with self._lock:
+                self._models[key] = (model, nbytes)
+                self.n_loads[model_type] = self.n_loads.get(model_type, 0) + 1
+                self._enforce_budget(keep=key)
+        return model
+
+    def _enforce_budget(self, keep: tuple[str, str, int] | None = None) -> None:
+        if self.memory_budget_bytes is None:
+            return
+        evicted = False
+        while self.memory_nbytes() > self.memory_budget_bytes:
+            candidates = [k for k in self._models if k != keep]
+            if not candidates:
+                break
+            logger.info(f"Evicting model {candidates[0][0]} to stay within the model memory budget")
+            del self._models[candidates[0]]
+            evicted = True
+        if evicted:
+            self._empty_cache()
+
+    @staticmethod
+    def _empty_cache() -> None:
+        if torch.cuda.is_available():
+            torch.cuda.empty_cache()
+
+    def memory_nbytes(self) -> int:
+        return sum(nbytes for _, nbytes in self._models.values())
+
+    def __len__(self) -> int:
+        return len(self._models)
+
+    def set_memory_budget(self, memory_budget_bytes: int | None) -> None:
+        with self._lock:
+            self.memory_budget_bytes = memory_budget_bytes
+            self._enforce_budget()
+
+    def evict(self, model_type: str, config: dict | None = None) -> bool:
+        """
+        Drop one model (in all worker slots), or all models of `model_type` if no config is given.
+        Returns whether any was dropped.
+        """
+        with self._lock:
+            if config is not None:
+                config_key = self.make_key(model_type, config)
+                keys = [k for k in self._models if k[:2] == config_key]
+            else:
+                keys = [k for k in self._models if k[0] == model_type]
+            evicted = [self._models.pop(k, None) is not None for k in keys]
+        if any(evicted):
+            self._empty_cache()
+        return any(evicted)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._models.clear()
+        self._empty_cache()
+
+
+_default_registry: ModelRegistry | None = None
+_default_registry_lock = threading.Lock()
+
+
+def get_model_registry() -> ModelRegistry:
+    """
+    Process-wide registry used by the pipeline. The memory budget can be set in GB through
+    the `VIPE_MODEL_MEMORY_BUDGET_GB` environment variable (unlimited by default).
+    """
+    global _default_registry
+    with _default_registry_lock:
+        if _default_registry is None:
+            budget_gb = os.environ.get("VIPE_MODEL_MEMORY_BUDGET_GB")
+            budget = int(float(budget_gb) * 1024**3) if budget_gb else None
+            _default_registry = ModelRegistry(memory_budget_bytes=budget)
+        return _default_registry
@@ -0,0 +1,90 @@
+# SPDX-FileCopyrightText: Copyright (c) 2025 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import threading
+
+from collections import defaultdict
+
+import torch
+
+
+class PinnedBufferPool:
+    """
+    Pool of page-locked host buffers used to stage host-to-device copies.
+
+    Copies from pageable memory are synchronous, so `upload` first copies the tensor into a pinned buffer of the
+    same shape and dtype and then issues a `non_blocking` copy on the current CUDA stream. A buffer is handed out
+    again only after the copy that used it has completed (tracked with a CUDA event).
+    """
+
+    def __init__(self, max_buffers_per_shape: int = 4) -> None:
+        self.max_buffers_per_shape = max_buffers_per_shape
+        self._buffers: dict[tuple, list[tuple[torch.Tensor, torch.cuda.Event | None]]] = defaultdict(list)
+        self._lock = threading.Lock()
+
+    def _acquire(self, shape: torch.Size, dtype: torch.dtype) -> torch.Tensor:
+        key = (tuple(shape), dtype)
+        with self._lock:
+            buffers = self._buffers[key]
+            for buffer_idx, (buffer, event) in enumerate(buffers):
+                if event is None or event.query():
+                    return buffers.pop(buffer_idx)[0]
+            if len(buffers) < self.max_buffers_per_shape:
+                return torch.empty(shape, dtype=dtype, pin_memory=True)
+            buffer, event = buffers.pop(0)
+        # All buffers are in flight: wait for the oldest copy.
+        assert event is not None
+        event.synchronize()
+        return buffer
+
+    def _release(self, buffer: torch.Tensor, event: torch.cuda.Event) -> None:
+        with self._lock:
+            self._buffers[(tuple(buffer.shape), buffer.dtype)].append((buffer, event))
+
+    def upload(self, tensor: torch.Tensor, device: torch.device | str = "cuda") -> torch.Tensor:
+        """Copy a host tensor to the device without blocking the host on the transfer."""
+        if tensor.device.type != "cpu":
+            return tensor.to(device)
+        if tensor.is_pinned():
+            return tensor.to(device, non_blocking=True)
+
+        buffer = self._acquire(tensor.shape, tensor.dtype)
+        buffer.copy_(tensor)
+        result = buffer.to(device, non_blocking=True)
+        event = torch.cuda.Event()
+        event.record()
+        self._release(buffer, event)
+        return result
+
+    def clear(self) -> None:
+        with self._lock:
+            for buffers in self._buffers.values():
+                for _, event in buffers:
+                    if event is not None:
+                        event.synchronize()
+            self._buffers.clear()
+
+
+_default_pool: PinnedBufferPool | None = None
+_default_pool_lock = threading.Lock()
+
+
+def get_pinned_buffer_pool() -> PinnedBufferPool:
+    """Process-wide staging pool used by `VideoFrame.cuda(non_blocking=True)`."""
+    global _default_pool
+    with _default_pool_lock:
+        if _default_pool is None:
+            _default_pool = PinnedBufferPool()
+        return _default_pool
@@ -37,7 +37,7 @@ import pandas as pd
 from scipy.spatial.transform import Rotation as R
 
 from vipe.utils.cameras import CameraType
-from vipe.utils.depth import reliable_depth_mask_range
+from vipe.utils.depth import StreamingRobustMean, reliable_depth_mask_range
 from vipe.utils.io import (
     ArtifactPath,
     read_depth_artifacts,
@@ -121,9 +121,13 @@ class SceneFrameHandle:
 
 
 def compute_mean_background_depth(artifact_path: ArtifactPath, 
-                                  spatial_subsample: int = 2, max_frames: int = None) -> Tuple[torch.Tensor, torch.Tensor]:
+                                  spatial_subsample: int = 2, max_frames: int = None,
+                                  outlier_sigma: Optional[float] = None) -> Tuple[torch.Tensor, torch.Tensor]:
     """
     모든 프레임에서 background depth와 RGB의 nanmean을 미리 계산.
+    Frames are accumulated into running sums (StreamingRobustMean) instead of being stacked, so memory does not grow
+    with the clip length; the result matches compute_robust_mean_tensors over the stacked frames. outlier_sigma
+    enables streaming sigma clipping of the depth samples.
     """
     logger.info("Computing mean background depth using nanmean...")
     
@@ -146,8 +150,7 @@ def compute_mean_background_depth(artifact_path: ArtifactPath,
             while True:
                 yield None, None
 
-    valid_depth_frames = []
-    valid_rgb_frames = []
+    robust_mean = StreamingRobustMean(device, outlier_sigma=outlier_sigma)
     frame_count = 0
 
     for frame_idx, ((_, rgb), (_, depth), (_, instance_mask)) in enumerate(
@@ -191,24 +194,20 @@ def compute_mean_background_depth(artifact_path: ArtifactPath,
             masked_depth = masked_depth[::spatial_subsample, ::spatial_subsample]
             masked_rgb = masked_rgb[::spatial_subsample, ::spatial_subsample]
 
-        valid_depth_frames.append(masked_depth)
-        valid_rgb_frames.append(masked_rgb)
+        robust_mean.add(masked_depth, masked_rgb)
         
         frame_count += 1
         if frame_idx % 10 == 0:
             logger.info(f"Processed frame {frame_idx} for mean background computation.")
 
-    if not valid_depth_frames:
+    if frame_count == 0:
         logger.warning("No valid background frames found.")
         return None, None
 
-    logger.info(f"Computing nanmean from {len(valid_depth_frames)} frames...")
-    
-    stacked_depth = torch.stack(valid_depth_frames, dim=0)  # [N_frames, H, W]
-    stacked_rgb = torch.stack(valid_rgb_frames, dim=0)      # [N_frames, H, W, 3]
+    logger.info(f"Computing nanmean from {frame_count} frames...")
     
     # Nanmean 계산
-    mean_depth, mean_rgb = compute_robust_mean_tensors(stacked_depth, stacked_rgb)
+    mean_depth, mean_rgb = robust_mean.mean()
     
     logger.info(f"Mean background depth computed: {mean_depth.shape}, device: {mean_depth.device}")
     return mean_depth, mean_rgb
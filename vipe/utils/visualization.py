@@ -13,6 +13,9 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import queue
+import threading
+
 from pathlib import Path
 from typing import Any
 
@@ -26,7 +29,7 @@ from pycg import image
 
 from vipe.ext.lietorch import SE3
 from vipe.slam.interface import SLAMOutput
-from vipe.streams.base import CachedVideoStream, VideoFrame, VideoStream
+from vipe.streams.base import CachedVideoStream, VideoFrame
 from vipe.utils.cameras import CameraType
 from vipe.utils.logging import pbar
 from vipe.utils.misc import unpack_optional
@@ -80,6 +83,44 @@ class VideoWriter:
             self.vw.close()
 
 
+class ThreadedVideoWriter(VideoWriter):
+    """
+    Video writer that encodes frames on a background thread.
+    The interface is the same as `VideoWriter`, frames are queued (bounded) and written in order.
+    """
+
+    def __init__(self, path: Path, fps: float, max_queue_size: int = 16):
+        super().__init__(path, fps)
+        self.queue: queue.Queue[np.ndarray | None] = queue.Queue(maxsize=max_queue_size)
+        self.thread: threading.Thread | None = None
+        self.error: BaseException | None = None
+
+    def _encode_loop(self):
+        while (frame := self.queue.get()) is not None:
+            if self.error is not None:
+                continue
+            try:
+                VideoWriter.write(self, frame)
+            except BaseException as e:
+                self.error = e
+
+    def write(self, frame: np.ndarray):
+        if self.error is not None:
+            raise self.error
+        if self.thread is None:
+            self.thread = threading.Thread(target=self._encode_loop, daemon=True)
+            self.thread.start()
+        self.queue.put(frame)
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if self.thread is not None:
+            self.queue.put(None)
+            self.thread.join()
+        super().__exit__(exc_type, exc_val, exc_tb)
+        if self.error is not None and exc_type is None:
+            raise self.error
+
+
 def bbox_with_size(pcd_xyz: torch.Tensor, quantile: float = 0.98):
     from pycg import vis
 
@@ -286,14 +327,56 @@ def image_above_text(img: np.ndarray, text: str = "<TEXT>") -> Image.Image:
     return new_image
 
 
+def estimate_depth_range(
+    video_stream: CachedVideoStream,
+    subsample_factor: int,
+    quantiles: tuple[float, float] = (0.05, 0.95),
+    margin: float = 1.3,
+) -> tuple[float, float]:
+    """
+    Estimate the (inverse) depth range used to colorize the whole video.
+
+    This is a cheap pre-pass that only touches the CPU copies of the cached depth maps at the
+    visualization resolution, so no frame is moved to the GPU.
+
+    Returns:
+        (depth_min, depth_max) tuple, enlarged by `margin` around the center of the range.
+    """
+    # Make sure all frames are cached (no-op if already done).
+    if len(video_stream) > 0:
+        _ = video_stream[len(video_stream) - 1]
+
+    depth_range = [np.inf, -np.inf]
+    for frame_data in video_stream.data:
+        if (depth_data := frame_data.metric_depth) is None:
+            continue
+        sky_mask = frame_data.sky_mask[::subsample_factor, ::subsample_factor]
+        depth_data = depth_data[::subsample_factor, ::subsample_factor].float().reciprocal()
+
+        # Remove sky regions if any
+        depth_data = depth_data[~sky_mask & torch.isfinite(depth_data)]
+        if depth_data.numel() == 0:
+            continue
+
+        depth_min_q, depth_max_q = torch.quantile(depth_data, torch.tensor(quantiles, device=depth_data.device))
+        depth_range[0] = min(depth_range[0], depth_min_q.item())
+        depth_range[1] = max(depth_range[1], depth_max_q.item())
+
+    depth_middle = (depth_range[0] + depth_range[1]) / 2
+    depth_scale = depth_range[1] - depth_range[0]
+    return depth_middle - depth_scale / 2 * margin, depth_middle + depth_scale / 2 * margin
+
+
 def save_projection_video(
     video_path: Path,
-    video_stream: VideoStream,
+    video_stream: CachedVideoStream,
     slam_output: SLAMOutput | None,
     subsample_factor: int,
     attributes: list[list[str]],
 ):
-    assert isinstance(video_stream, CachedVideoStream)
+    # The depth range is estimated from the cached CPU frames (see estimate_depth_range), so callers cache the
+    # stream first, e.g. with `stream.cache(...)`.
+    assert isinstance(video_stream, CachedVideoStream), "save_projection_video requires a CachedVideoStream"
 
     img_h, img_w = video_stream.frame_size()
     img_h //= subsample_factor
@@ -309,77 +392,58 @@ def save_projection_video(
     )
     na_img = (na_img[..., :3] * 255).astype(np.uint8)
 
-    def get_depth_imgs():
-        depth_range = [np.inf, -np.inf]
-
-        # Run first to obtain depth range
-        for frame_data in video_stream:
-            assert isinstance(frame_data, VideoFrame)
-
-            if (depth_data := frame_data.metric_depth) is None:
-                continue
-            depth_data = depth_data.reciprocal()
-
-            # Remove sky regions if any
-            depth_data = depth_data[~frame_data.sky_mask & torch.isfinite(depth_data)]
-
-            depth_min_q, depth_max_q = torch.quantile(depth_data, torch.tensor([0.05, 0.95], device=depth_data.device))
-            depth_range[0] = min(depth_range[0], depth_min_q.item())
-            depth_range[1] = max(depth_range[1], depth_max_q.item())
-        depth_middle = (depth_range[0] + depth_range[1]) / 2
-        depth_scale = depth_range[1] - depth_range[0]
-        depth_min = depth_middle - depth_scale / 2 * 1.3
-        depth_max = depth_middle + depth_scale / 2 * 1.3
-
-        # Then output normalized depth
-        for frame_data in video_stream:
-            if (depth_data := frame_data.metric_depth) is None:
-                yield na_img
-                continue
+    all_attributes = {t for t_arr in attributes for t in t_arr}
 
-            depth_data = depth_data.reciprocal()
-            depth_data[frame_data.sky_mask] = depth_min
-            depth_data[~torch.isfinite(depth_data)] = depth_min
+    if "depth" in all_attributes:
+        depth_min, depth_max = estimate_depth_range(video_stream, subsample_factor)
 
-            depth_data = depth_data[::subsample_factor, ::subsample_factor]
-            depth_img = depth_data.cpu().numpy().astype(float)
-            depth_img = (depth_img - depth_min) / (depth_max - depth_min)
-            depth_img = np.clip(depth_img, 0, 1)
-            yield colorize_depth(depth_img)
-
-    def get_pcd_imgs():
+    if "pcd" in all_attributes:
         assert slam_output is not None, "SLAM output is required!"
         slam_map = unpack_optional(slam_output.slam_map)
         pcd_xyz = slam_map.dense_disp_xyz.cpu().numpy()
         pcd_rgb = slam_map.dense_disp_rgb.cpu().numpy()
-        for frame_data in video_stream:
-            assert isinstance(frame_data, VideoFrame)
-            rgb_img = frame_data.rgb.cpu().numpy().astype(float)
-            rgb_img = (rgb_img * 255).astype(np.uint8)
-            rgb_img = cv2.resize(rgb_img, (img_w, img_h))
-            intrinsics = unpack_optional(frame_data.intrinsics)
-            if torch.sum(intrinsics) < 1e-6:
-                pcd_img = project_points_panorama(
-                    pcd_xyz,
-                    frame_data.pose,
-                    frame_size=(img_h, img_w),
-                    color=pcd_rgb,
-                )
-            else:
-                pcd_img = project_points(
-                    pcd_xyz,
-                    frame_data.intrinsics.cpu().numpy(),
-                    camera_type=frame_data.camera_type,
-                    pose=frame_data.pose,
-                    frame_size=(img_h, img_w),
-                    subsample_factor=subsample_factor,
-                    color=pcd_rgb,
-                )
-            yield cv2.addWeighted(rgb_img, 0.2, pcd_img, 0.8, 0)
-
-    def get_rectified_imgs():
-        # Obtain rectification map
-        for frame_data in video_stream:
+
+    # Rectification map is the same for all frames, obtained lazily from the first frame.
+    rectify_coords_norm: torch.Tensor | None = None
+
+    def get_depth_img(frame_data: VideoFrame, rgb_img: np.ndarray) -> np.ndarray:
+        if (depth_data := frame_data.metric_depth) is None:
+            return na_img
+
+        depth_data = depth_data.reciprocal()
+        depth_data[frame_data.sky_mask] = depth_min
+        depth_data[~torch.isfinite(depth_data)] = depth_min
+
+        depth_data = depth_data[::subsample_factor, ::subsample_factor]
+        depth_img = depth_data.cpu().numpy().astype(float)
+        depth_img = (depth_img - depth_min) / (depth_max - depth_min)
+        depth_img = np.clip(depth_img, 0, 1)
+        return colorize_depth(depth_img)
+
+    def get_pcd_img(frame_data: VideoFrame, rgb_img: np.ndarray) -> np.ndarray:
+        intrinsics = unpack_optional(frame_data.intrinsics)
+        if torch.sum(intrinsics) < 1e-6:
+            pcd_img = project_points_panorama(
+                pcd_xyz,
+                frame_data.pose,
+                frame_size=(img_h, img_w),
+                color=pcd_rgb,
+            )
+        else:
+            pcd_img = project_points(
+                pcd_xyz,
+                intrinsics.cpu().numpy(),
+                camera_type=frame_data.camera_type,
+                pose=frame_data.pose,
+                frame_size=(img_h, img_w),
+                subsample_factor=subsample_factor,
+                color=pcd_rgb,
+            )
+        return cv2.addWeighted(rgb_img, 0.2, pcd_img, 0.8, 0)
+
+    def get_rectified_img(frame_data: VideoFrame, rgb_img: np.ndarray) -> np.ndarray:
+        nonlocal rectify_coords_norm
+        if rectify_coords_norm is None:
             original_intr = frame_data.camera_type.build_camera_model(frame_data.intrinsics).scaled(
                 1 / subsample_factor
             )
@@ -390,87 +454,75 @@ def save_projection_video(
             pts, _, _ = pinhole_intr.iproj_disp(torch.ones_like(x), x, y)
             coords, _, _ = original_intr.proj_points(pts)
             coords_norm = 2.0 * coords / torch.tensor([img_w, img_h], device=coords.device) - 1.0
-            coords_norm = coords_norm.reshape(1, img_h, img_w, 2)
-            break
-        for frame_data in video_stream:
+            rectify_coords_norm = coords_norm.reshape(1, img_h, img_w, 2)
+
+        img = frame_data.rgb.permute(2, 0, 1).unsqueeze(0)
+        img = torch.nn.functional.grid_sample(
+            img,
+            rectify_coords_norm.to(img.device),
+            mode="bilinear",
+            align_corners=False,
+        )[0].float()
+        img = img.permute(1, 2, 0).cpu().numpy()
+        return (img * 255).astype(np.uint8)
+
+    def get_rgb_img(frame_data: VideoFrame, rgb_img: np.ndarray) -> np.ndarray:
+        return rgb_img
+
+    def get_instance_img(frame_data: VideoFrame, rgb_img: np.ndarray) -> np.ndarray:
+        if frame_data.instance is None:
+            return na_img
+        instance_img = (inst_np := frame_data.instance.cpu().numpy()).astype(float)
+        instance_img = colorize_mask(instance_img)
+
+        if frame_data.instance_phrases is not None:
+            for instance_id, instance_phrase in frame_data.instance_phrases.items():
+                if instance_id <= 0:
+                    continue
+                text_img = image.text(instance_phrase)
+                inst_mask = inst_np == instance_id
+                try:
+                    h_min, h_max = np.where(np.any(inst_mask, axis=1))[0][[0, -1]]
+                    w_min, w_max = np.where(np.any(inst_mask, axis=0))[0][[0, -1]]
+                    instance_img = image.place_image(
+                        text_img,
+                        instance_img,
+                        (w_min + w_max) // 2,
+                        (h_min + h_max) // 2,
+                    )
+                except IndexError:
+                    pass
+
+        if instance_img.dtype == np.float64:
+            instance_img = (instance_img[..., :3] * 255).astype(np.uint8)
+        instance_img = cv2.resize(instance_img, (img_w, img_h))
+        return cv2.addWeighted(rgb_img, 0.5, instance_img, 0.5, 0)
+
+    def get_empty_img(frame_data: VideoFrame, rgb_img: np.ndarray) -> np.ndarray:
+        return na_img
+
+    panel_fns = {
+        "rgb": get_rgb_img,
+        "depth": get_depth_img,
+        "pcd": get_pcd_img,
+        "instance": get_instance_img,
+        "rectified": get_rectified_img,
+        "empty": get_empty_img,
+    }
+    panel_layout = [[panel_fns[t] for t in t_arr] for t_arr in attributes]
+
+    # All panels are computed from a single traversal of the stream, while encoding runs in the background.
+    with ThreadedVideoWriter(video_path, video_stream.fps()) as vw:
+        trajectory_length = 0.0
+        last_pose = None
+        for frame_idx, frame_data in pbar(enumerate(video_stream), total=len(video_stream), desc="Writing viz video"):
             assert isinstance(frame_data, VideoFrame)
-            img = frame_data.rgb.permute(2, 0, 1).unsqueeze(0)
-            img = torch.nn.functional.grid_sample(
-                img,
-                coords_norm,
-                mode="bilinear",
-                align_corners=False,
-            )[0].float()
-            img = img.permute(1, 2, 0).cpu().numpy()
-            yield (img * 255).astype(np.uint8)
-
-    def get_rgb_imgs():
-        for frame_data in video_stream:
-            rgb_img = frame_data.rgb.cpu().numpy().astype(float)
-            rgb_img = (rgb_img * 255).astype(np.uint8)
+            rgb_img = (frame_data.rgb.cpu().numpy().astype(float) * 255).astype(np.uint8)
             rgb_img = cv2.resize(rgb_img, (img_w, img_h))
-            yield rgb_img
 
-    def get_instance_imgs():
-        for frame_data, rgb_img in zip(video_stream, get_rgb_imgs()):
-            assert isinstance(frame_data, VideoFrame)
-            if frame_data.instance is None:
-                yield na_img
-                continue
-            instance_img = (inst_np := frame_data.instance.cpu().numpy()).astype(float)
-            instance_img = colorize_mask(instance_img)
-
-            if frame_data.instance_phrases is not None:
-                for instance_id, instance_phrase in frame_data.instance_phrases.items():
-                    if instance_id <= 0:
-                        continue
-                    text_img = image.text(instance_phrase)
-                    inst_mask = inst_np == instance_id
-                    try:
-                        h_min, h_max = np.where(np.any(inst_mask, axis=1))[0][[0, -1]]
-                        w_min, w_max = np.where(np.any(inst_mask, axis=0))[0][[0, -1]]
-                        instance_img = image.place_image(
-                            text_img,
-                            instance_img,
-                            (w_min + w_max) // 2,
-                            (h_min + h_max) // 2,
-                        )
-                    except IndexError:
-                        pass
-
-            if instance_img.dtype == np.float64:
-                instance_img = (instance_img[..., :3] * 255).astype(np.uint8)
-            instance_img = cv2.resize(instance_img, (img_w, img_h))
-            yield cv2.addWeighted(rgb_img, 0.5, instance_img, 0.5, 0)
-
-    def get_empty_imgs():
-        for _ in range(len(video_stream)):
-            yield na_img
-
-    img_iterators = [
-        [
-            {
-                "rgb": get_rgb_imgs(),
-                "depth": get_depth_imgs(),
-                "pcd": get_pcd_imgs(),
-                "instance": get_instance_imgs(),
-                "rectified": get_rectified_imgs(),
-                "empty": get_empty_imgs(),
-            }[t]
-            for t in t_arr
-        ]
-        for t_arr in attributes
-    ]
-    with VideoWriter(video_path, video_stream.fps()) as vw:
-        trajectory_length = 0.0
-        last_pose = video_stream[0].pose
-        for frame_idx, frame_data in pbar(enumerate(video_stream), total=len(video_stream), desc="Writing viz video"):
             img_rows = []
-            for img_iterator in img_iterators:
-                img_row = []
-                for img in img_iterator:
-                    img_row.append(next(img))
-                img_rows.append(np.concatenate(img_row, axis=1))
+            for panel_row in panel_layout:
+                img_rows.append(np.concatenate([panel_fn(frame_data, rgb_img) for panel_fn in panel_row], axis=1))
             img_final = np.concatenate(img_rows, axis=0)
             text_desc = f"Frame {frame_idx:03d}"
             # text_desc += f" | BA {slam_output.ba_residual:.4f}"
@@ -481,6 +533,8 @@ def save_projection_video(
                     fov_y = np.rad2deg(fov_y)
                     text_desc += f" | fovY {fov_y:.2f}"
             current_pose = frame_data.pose
+            if last_pose is None:
+                last_pose = current_pose
             trajectory_length += np.linalg.norm((last_pose.inv() * current_pose).translation()[:3].cpu().numpy())
             last_pose = current_pose
             text_desc += f" | Traj {trajectory_length:.4f}"